@@ -30,27 +30,18 @@ def main(test=False,extra=False):
     tilt = 6; # TODO
     V0=V0*np.cos(tilt*np.pi/180)
 
-    CP=np.zeros((len(vlambda),len(vpitch)))
-    CT=np.zeros((len(vlambda),len(vpitch)))
-
-    i=0
-    ntot=len(vlambda)*len(vpitch)
-    for il,lambd in enumerate(vlambda):
-        for ip,pitch in enumerate(vpitch):
-            i+=1
-            Omega=lambd*V0/R * 60/(2*np.pi)
-            xdot=0      #[m/s]
-            u_turb=0    #[m/s]
-            a0,ap0 = None, None
-            BEM=calcSteadyBEM(Omega,pitch,V0,xdot,u_turb,
-                        nB,cone,r,chord,twist,polars,
-                        rho=rho,bTIDrag=True,bAIDrag=True,
-                        a_init =a0, ap_init=ap0
-                        )
-            a0,ap0 = BEM.a, BEM.aprime
-            print('{:5d}/{:d} lambda={:4.2f} pitch={:4.0f} CP={:5.3f}'.format(i,ntot,lambd,pitch,BEM.CP))
-            CP[il,ip]=BEM.CP
-            CT[il,ip]=BEM.CT
+    # --- Run all operating points at once (batch mode of calcSteadyBEM)
+    LL, PP = np.meshgrid(vlambda, vpitch, indexing='ij')
+    Omega  = LL.ravel()*V0/R * 60/(2*np.pi)
+    xdot=0      #[m/s]
+    u_turb=0    #[m/s]
+    BEM=calcSteadyBEM(Omega,PP.ravel(),V0,xdot,u_turb,
+                nB,cone,r,chord,twist,polars,
+                rho=rho,bTIDrag=True,bAIDrag=True,
+                )
+    print('{:d} operating points, max iterations: {:d}'.format(len(Omega), np.max(BEM.nIt)))
+    CP = BEM.CP.reshape(LL.shape)
+    CT = BEM.CT.reshape(LL.shape)
     CP[CP<0]=0
     CT[CT<0]=0
 
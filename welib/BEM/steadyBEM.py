@@ -10,6 +10,7 @@ import os
 from numpy import pi, cos, exp, sqrt, sin, arctan2, arccos
 from scipy.interpolate import interp1d
 import pandas as pd
+from welib.airfoils.Polar import PolarTable
 
 
 # --------------------------------------------------------------------------------}
@@ -164,6 +165,14 @@ class SteadyBEM():
             self.pitch0  = F.ED['BlPitch(1)']
             pass
 
+    @property
+    def polarTable(self):
+        """ Lookup table of the polars, rebuilt only when self.polars is changed """
+        if getattr(self, '_polarTable', None) is None or self._polarTableSrc is not self.polars:
+            self._polarTable    = PolarTable(self.polars)
+            self._polarTableSrc = self.polars
+        return self._polarTable
+
     def __repr__(self):
         s='<{} object>:\n'.format(type(self).__name__)
         # Aero Data
@@ -238,7 +247,7 @@ class SteadyBEM():
         self.cone0  = cone
 
         out = calcSteadyBEM(Omega, pitch, V0, xdot, u_turb,
-            nB=self.nB, cone=cone, r=self.r, chord=self.chord, twist=self.twist, polars=self.polars, # Rotor
+            nB=self.nB, cone=cone, r=self.r, chord=self.chord, twist=self.twist, polars=self.polarTable, # Rotor
             rho=self.rho, KinVisc=self.kinVisc,    # Environment
             nItMax=self.nIt, aTol=self.aTol, bTipLoss=self.bTipLoss, bHubLoss=self.bHubLoss, 
             bAIDrag=self.bAIDrag, bTIDrag=self.bTIDrag, bSwirl=self.bSwirl, bUseCm=self.bUseCm, relaxation=self.relaxation, 
@@ -246,13 +255,15 @@ class SteadyBEM():
             a_init=a_init, ap_init=ap_init)
         return out
 
-    def parametric(self, rotSpeed, pitch, windSpeed, outputFilename=None, radialBasename=None, plot=False, **kwargs):
+    def parametric(self, rotSpeed, pitch, windSpeed, outputFilename=None, radialBasename=None, plot=False, batch=False, **kwargs):
         """ Run the BEM on multiple operating conditions
             Inputs:
             -------
             rotSpeed   [rpm]: rotational speed, array-like, size n
             pitch      [deg]: pitch angle, array-like, size n
             windSpeed  [m/s]: wind speed, array-like, size n
+            batch           : if True, all operating conditions are solved at once (see calcSteadyBEMBatch)
+                              instead of one after the other
         """
         # --- Sanity
         createParentDir(outputFilename)
@@ -260,23 +271,35 @@ class SteadyBEM():
         nSim = len(rotSpeed)
 
         # --- Running BEM simulations for each operating conditions
-        a0 , ap0 = None,None # Initial guess for inductions, to speed up BEM
-        dfOut=None
-        for i,(u0,rpm,theta), in enumerate(zip(windSpeed,rotSpeed,pitch)):
-            xdot   = 0        # structrual velocity [m/s] 
-            u_turb = 0        # turbulence fluctuation [m/s] 
-            BEM = self.calcOutput(rpm, theta, u0, xdot=xdot, u_turb=u_turb, a_init=a0, ap_init=ap0)
-            # Store previous values to speed up convergence
-            a0, ap0 = BEM.a, BEM.aprime
-            # Export radial data to file
-            if radialBasename:
-                #filenameRadial = radialBasename+'_i{:04d}_ws{:02.0f}_radial.csv'.format(i,u0)
+        if batch:
+            BEMs = calcSteadyBEMBatch(rotSpeed, pitch, windSpeed, 0, 0,
+                nB=self.nB, cone=self.cone0, r=self.r, chord=self.chord, twist=self.twist, polars=self.polarTable, # Rotor
+                rho=self.rho, KinVisc=self.kinVisc,    # Environment
+                nItMax=self.nIt, aTol=self.aTol, bTipLoss=self.bTipLoss, bHubLoss=self.bHubLoss, 
+                bAIDrag=self.bAIDrag, bTIDrag=self.bTIDrag, bSwirl=self.bSwirl, bUseCm=self.bUseCm, relaxation=self.relaxation, 
+                algorithm=self.algorithm)
+            dfOut  = BEMs.StoreIntegratedValues()
+            BEMOPs = [BEMs.operatingPoint(i) for i in range(nSim)]
+        else:
+            a0 , ap0 = None,None # Initial guess for inductions, to speed up BEM
+            dfOut  = None
+            BEMOPs = []
+            for i,(u0,rpm,theta), in enumerate(zip(windSpeed,rotSpeed,pitch)):
+                xdot   = 0        # structrual velocity [m/s] 
+                u_turb = 0        # turbulence fluctuation [m/s] 
+                BEM = self.calcOutput(rpm, theta, u0, xdot=xdot, u_turb=u_turb, a_init=a0, ap_init=ap0)
+                # Store previous values to speed up convergence
+                a0, ap0 = BEM.a, BEM.aprime
+                # Cumulative storage of integrated values
+                dfOut = BEM.StoreIntegratedValues(dfOut)
+                BEMOPs.append(BEM)
+
+        # --- Export radial data to file
+        if radialBasename:
+            for u0, BEM in zip(windSpeed, BEMOPs):
                 filenameRadial = radialBasename+'ws{:02.0f}_radial.csv'.format(u0)
                 BEM.WriteRadialFile(filenameRadial)
-            # Cumulative storage of integrated values
-            dfOut = BEM.StoreIntegratedValues(dfOut)
-
-            self.lastRun=BEM
+        self.lastRun = BEMOPs[-1]
 
         if outputFilename:
             dfOut.to_csv(outputFilename, index=False, sep='\t')
@@ -370,6 +393,18 @@ class SteadyBEM():
 # --------------------------------------------------------------------------------{
 class SteadyBEM_Outputs:
 
+    def operatingPoint(BEM, i):
+        """ Return outputs of operating point i when BEM was computed with calcSteadyBEMBatch """
+        OP = SteadyBEM_Outputs()
+        for k, v in BEM.__dict__.items():
+            if k in ['R', 'r']:
+                OP.__dict__[k] = v
+            elif isinstance(v, np.ndarray) and v.ndim>0:
+                OP.__dict__[k] = v[i]
+            else:
+                OP.__dict__[k] = v
+        return OP
+
     def radialDataFrame(BEM):
         header='r_[m] a_[-] a_prime_[-] Ct_[-] Cq_[-] Cp_[-] cn_[-] ct_[-] phi_[deg] alpha_[deg] Cl_[-] Cd_[-] Pn_[N/m] Pt_[N/m] Vrel_[m/s] Un_[m/s] Ut_[m/s] F_[-] Re_[-] Gamma_[m^2/s] uia_[m/s] uit_[m/s] u_turb_[m/s]'
         header=header.split()
@@ -383,7 +418,8 @@ class SteadyBEM_Outputs:
         #df.to_csv(filename, index=False, sep='\t')
 
     def StoreIntegratedValues(BEM, df=None):
-        S=pd.Series(dtype='float64')
+        # NOTE: integrated values are arrays (one row per operating point) for calcSteadyBEMBatch
+        S={}
         S['WS_[m/s]']         = BEM.V0
         S['RotSpeed_[rpm]']   = BEM.Omega *60/(2*np.pi)
         S['Pitch_[deg]']      = BEM.Pitch
@@ -395,11 +431,12 @@ class SteadyBEM_Outputs:
         S['AeroCT_[-]']       = BEM.CT
         S['AeroCP_[-]']       = BEM.CP
         S['AeroCQ_[-]']       = BEM.CQ
+        dfNew = pd.DataFrame({k:np.atleast_1d(v).astype('float64') for k,v in S.items()})
 
         if df is None:
-            df = pd.DataFrame([S])
+            df = dfNew
         else:
-            df = pd.concat((df, pd.DataFrame([S])))
+            df = pd.concat((df, dfNew))
         return df
 
 # --------------------------------------------------------------------------------}
@@ -420,26 +457,28 @@ def calcSteadyBEM(Omega,pitch,V0,xdot,u_turb,
         cone  [deg]:
         r     [m]  : from rhub to R
         chord [m]  :
-        polars     : nSpan matrices  
+        polars     : nSpan matrices, or PolarTable (to avoid rebuilding the table at each call)
 
         Outputs
         ----------
         BEM : class with attributes, such as BEM.r, BEM.a, BEM.Power
+
+        NOTE: if Omega, pitch or V0 are arrays, all operating points are solved at once,
+              see calcSteadyBEMBatch.
     """
+    if np.ndim(Omega)>0 or np.ndim(pitch)>0 or np.ndim(V0)>0:
+        return calcSteadyBEMBatch(Omega,pitch,V0,xdot,u_turb, nB, cone, r, chord, twist, polars,
+                rho=rho, KinVisc=KinVisc, nItMax=nItMax, aTol=aTol, bTipLoss=bTipLoss, bHubLoss=bHubLoss,
+                bAIDrag=bAIDrag, bTIDrag=bTIDrag, bSwirl=bSwirl, bUseCm=bUseCm, relaxation=relaxation, algorithm=algorithm,
+                verbose=verbose, a_init=a_init, ap_init=ap_init)
     if algorithm is None:
         algorithm='legacy'
 
-    VHubHeight = V0
     # --- Converting units
     fulltwist = (twist+pitch) *pi/180    # [rad]
     Omega    = Omega*2*pi/60 # [rad/s]
     # --- Derived params
     rhub, R  = r[0], r[-1]
-    # Computing a dr, such that sum(dr)=R-rhub
-    dr    = np.diff(r) 
-    MidPointAfter = np.concatenate((  r[0:-1]+dr/2 , [R] ))
-    MidPointBefore= np.concatenate(( [r[0]] ,  r[1:]-dr/2))
-    dr    = MidPointAfter-MidPointBefore
     cCone    = cos(cone*pi/180.) #  = dr/dz (if no sweep)
     rPolar = r * cCone
     if algorithm=='legacy':
@@ -450,8 +489,8 @@ def calcSteadyBEM(Omega,pitch,V0,xdot,u_turb,
         R_ap = rotPolar2Airfoil(tau=0, kappa=cone*pi/180, beta=fulltwist) # NOTE: sweep and prebend 
     sigma    = chord * nB / (2.0 * pi * rPolar) # NOTE: based on polar radial coordinate
     lambda_r = Omega * rPolar/ V0
-    # Creating interpolation functions for each polar, now in rad!
-    fPolars = [interp1d(p[:,0]*pi/180,p[:,1:],axis=0) for p in polars]
+    # Lookup table for all polars, now in rad!
+    fPolars = polars if isinstance(polars, PolarTable) else PolarTable(polars)
     # Initializing outputs
     if a_init is None:
         a_init = np.ones((len(r)))*0.2
@@ -528,84 +567,8 @@ def calcSteadyBEM(Omega,pitch,V0,xdot,u_turb,
         # --------------------------------------------------------------------------------
         # --- Step 6: Outputs
         # --------------------------------------------------------------------------------
-        BEM=SteadyBEM_Outputs();
-        # Operating conditions
-        BEM.R=R
-        BEM.Omega = Omega
-        BEM.Pitch = pitch
-        BEM.V0 = V0
-
-        # --- Coefficients
-        BEM.Cl,BEM.Cd,BEM.Cm = Cl,Cd,Cm
-        
-        # --- Loads
-
-        # --- Velocities
-        BEM.a,BEM.aprime,BEM.phi, = a,aprime,phi_k
-        BEM.Un,BEM.Ut,BEM.Vrel = Un_p,Ut_p,Vrel_norm_k
-        BEM.uia    = V0 * BEM.a
-        BEM.uit    = Omega * r * BEM.aprime
-        BEM.u_turb = np.ones(r.shape)*u_turb
-        
-        # Misc
-        BEM.F,BEM.nIt = F,nIt
-        # Radial quantities (recomputed since thhough as derived outputs)
-        BEM.r=r
-        BEM.alpha = (BEM.phi - fulltwist)*180/pi               # [deg]
-        if R_ap is not None:
-            # --- Airfoil coordinates (OpenFAST convention)
-            Cxa      =  BEM.Cl * cos(BEM.alpha*np.pi/180) + BEM.Cd * sin(BEM.alpha*np.pi/180)
-            Cya      = -BEM.Cl * sin(BEM.alpha*np.pi/180) + BEM.Cd * cos(BEM.alpha*np.pi/180)
-            # --- Polar coordinates
-            # Cp = R_pa * Ca     NOTE:  R_pa = R_ap^T
-            Cxp      = R_ap[0,0] * Cxa      + R_ap[1,0] * Cya 
-            Cyp      = R_ap[0,1] * Cxa      + R_ap[1,1] * Cya
-            BEM.cn =  Cxp
-            BEM.ct = -Cyp
-        else:
-            BEM.cn = BEM.Cl * cos(BEM.phi) + BEM.Cd * sin(BEM.phi)
-            BEM.ct = BEM.Cl * sin(BEM.phi) - BEM.Cd * cos(BEM.phi)
-        if algorithm=='legacy':
-            BEM.Pn    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.cn *cCone    # [N/m]
-            BEM.Pt    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.ct           # [N/m] 
-        else:
-            BEM.Pn    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.cn   # [N/m]
-            BEM.Pt    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.ct   # [N/m] 
-        if bUseCm:
-            BEM.MzLn  = 0.5 * rho * BEM.Vrel**2 * chord**2 * BEM.Cm   # [Nm/m] 
-        else:
-            BEM.Cm    = 0*BEM.Pn
-            BEM.MzLn  = 0*BEM.Pn
-        BEM.phi   = BEM.phi*180/pi                             # [deg]
-        BEM.Re    = BEM.Vrel * chord / KinVisc / 10**6  # Reynolds number in Millions
-        BEM.Gamma = 0.5 * BEM.Vrel * chord * BEM.Cl   # Circulation [m^2/s]
-        # L = 0.5 * rho * Vrel_norm ** 2 * chord[e] * Cl
-        # D = 0.5 * rho * Vrel_norm ** 2 * chord[e] * Cd
-        # Radial quantities, "dr" formulation
-        BEM.ThrLoc   = dr * BEM.Pn
-        BEM.ThrLocLn =      BEM.Pn
-        BEM.TqLoc    = dr * BEM.Pt * rPolar
-        BEM.TqLocLn  =      BEM.Pt * rPolar
-        # TODO verify those below
-        BEM.Ct       = nB * BEM.ThrLoc / (0.5 * rho * VHubHeight** 2 * (2*pi * rPolar * dr))
-        BEM.Cq      = nB * BEM.TqLoc / (0.5 * rho * VHubHeight** 2 * (2*pi * rPolar)) * dr * rPolar
-        BEM.Cp      = BEM.Cq*lambda_r
-
-        # --- Integral quantities per blade
-        BEM.Mz    = np.trapz(BEM.MzLn, r)
-        QMz = nB * BEM.Mz * np.sin(cone*np.pi/180)
-
-        # --- Integral quantities for rotor
-        # TODO integration variable might need to be rPolar
-        BEM.Torque = nB * np.trapz(rPolar * BEM.Pt, r) + QMz # Rotor shaft torque [N]
-        BEM.Thrust = nB * np.trapz(         BEM.Pn, r) # Rotor shaft thrust [N]
-        BEM.Flap   = np.trapz( BEM.Pn * (r - rhub), r) # Flap moment at blade root [Nm]
-        BEM.Edge   = np.trapz( BEM.Pt * (r - rhub), r) # Edge moment at blade root [Nm]
-        BEM.Power = Omega * BEM.Torque
-        BEM.CP = BEM.Power  / (0.5 * rho * V0**3 * pi * R**2) # TODO ref area with coning
-        BEM.CT = BEM.Thrust / (0.5 * rho * V0**2 * pi * R**2)
-        BEM.CQ = BEM.Torque / (0.5 * rho * V0**2 * pi * R**3)
-
+        BEM = _steadyBEMOutputs(Omega, pitch, V0, u_turb, a, aprime, phi_k, Un_p, Ut_p, Vrel_norm_k, F, nIt, Cl, Cd, Cm,
+                nB, cone, r, chord, fulltwist, rho, KinVisc, bUseCm, algorithm)
 
         if verbose:
             print('Pn   ' , BEM.Pn)
@@ -614,6 +577,212 @@ def calcSteadyBEM(Omega,pitch,V0,xdot,u_turb,
             print('Thrust', BEM.Power)
     return BEM
 
+def calcSteadyBEMBatch(Omega,pitch,V0,xdot,u_turb,
+        nB, cone, r, chord, twist, polars, # Rotor
+        rho=1.225,KinVisc=15.68*10**-6,    # Environment
+        nItMax=100, aTol=10**-6, bTipLoss=True, bHubLoss=False, bAIDrag=True, bTIDrag=True, bSwirl=True, bUseCm=True, relaxation=0.4, algorithm=None,
+        verbose=False,
+        a_init=None, ap_init=None):
+    """ Run the BEM main loop for nOP operating points at once.
+    Same algorithm as calcSteadyBEM, but all radial quantities are (nOP x nr) arrays.
+    Convergence is checked per operating point, and only the operating points that
+    have not yet converged are iterated upon.
+
+        Inputs:
+        -------
+        Omega [rpm]: rotational speed, scalar or array of size nOP
+        pitch [deg]: pitch angle, scalar or array of size nOP
+        V0    [m/s]: wind speed, scalar or array of size nOP
+        xdot, u_turb [m/s]: scalar or array of size nOP
+        cone  [deg]: scalar
+        a_init, ap_init: initial inductions, array of size nr or nOP x nr
+        See calcSteadyBEM for other inputs
+
+        Outputs
+        ----------
+        BEM : class with attributes, such as BEM.r (nr), BEM.a (nOP x nr), BEM.Power (nOP)
+              Use BEM.operatingPoint(i) to extract the outputs of a given operating point.
+    """
+    if algorithm is None:
+        algorithm='legacy'
+    Omega, pitch, V0, xdot, u_turb = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in (Omega, pitch, V0, xdot, u_turb)])
+    nOP = len(V0)
+    nr  = len(r)
+    # Column vectors, broadcasted against radial quantities
+    V0c, xdotc, u_turbc = V0[:,None], xdot[:,None], u_turb[:,None]
+
+    # --- Converting units
+    fulltwist = (twist[None,:]+pitch[:,None]) *pi/180    # [rad]
+    Omega     = Omega*2*pi/60 # [rad/s]
+    Omegac    = Omega[:,None]
+    # --- Derived params
+    rhub, R  = r[0], r[-1]
+    cCone    = cos(cone*pi/180.) #  = dr/dz (if no sweep)
+    rPolar = r * cCone
+    if algorithm=='legacy':
+        drdz = 1
+    else:
+        drdz = cCone
+    sigma    = chord * nB / (2.0 * pi * rPolar) # NOTE: based on polar radial coordinate
+    lambda_r = Omegac * rPolar/ V0c
+    # Lookup table for all polars, now in rad!
+    fPolars = polars if isinstance(polars, PolarTable) else PolarTable(polars)
+    # Initializing inductions
+    if a_init is None:
+        a_init = 0.2
+    if ap_init is None:
+        ap_init = 0.01
+    a      = np.array(np.broadcast_to(a_init , (nOP, nr)), dtype=float)
+    aprime = np.array(np.broadcast_to(ap_init, (nOP, nr)), dtype=float)
+    # Quantities from the last iteration of each operating point
+    Ut_p, Un_p, Vrel_norm_k, phi_k, F = [np.zeros((nOP, nr)) for i in range(5)]
+    Cl, Cd, Cm                        = [np.zeros((nOP, nr)) for i in range(3)]
+    nIt = np.zeros(nOP, dtype=int)
+
+    # --- Vectorized BEM algorithm, iterating only on operating points not converged
+    IOP = np.arange(nOP)
+    for iterations in np.arange(nItMax):
+        aI, apI = a[IOP], aprime[IOP]
+        # --- Step 1: velocity components
+        UtI_p = Omegac[IOP] * rPolar * (1. + apI)
+        UnI_p = V0c[IOP] * (1. - aI) - xdotc[IOP] + u_turbc[IOP]
+        UtI_k = UtI_p
+        UnI_k = V0c[IOP] * (1. - aI) * drdz - xdotc[IOP] + u_turbc[IOP]
+        VrelI_k = np.sqrt(UnI_k** 2 + UtI_k** 2)
+        # --- Step 2: Flow Angle and tip loss
+        phiI_k = arctan2(UnI_k, UtI_k) # flow angle [rad] in kappa system
+        Ftip = np.ones(phiI_k.shape)
+        Fhub = np.ones(phiI_k.shape)
+        bOK  = sin(phiI_k)>0.01
+        rOK  = np.broadcast_to(r, phiI_k.shape)[bOK]
+        if bTipLoss:
+            Ftip[bOK] = 2/pi*arccos(exp(-nB/2*(R-rOK)/(rOK*sin(phiI_k[bOK]))))
+        if bHubLoss:
+            Fhub[bOK] = 2/pi*arccos(exp(-nB/2*(rOK-rhub)/(rhub*sin(phiI_k[bOK]))))
+        FI=Ftip*Fhub
+        FI[FI<=0]=0.5 # To avoid singularities
+        # --- Step 3: Angle of attack
+        alphaI = phiI_k - fulltwist[IOP] # [rad], contains pitch
+        # --- Step 4: Aerodynamic Coefficients
+        R_ap = None if algorithm=='legacy' else rotPolar2Airfoil(tau=0, kappa=cone*pi/180, beta=fulltwist[IOP])
+        ClI, CdI, CmI, cnForAI, ctForTI = _fAeroCoeffWrap(fPolars, alphaI, phiI_k, bAIDrag, bTIDrag, R_ap)
+        # --- Step 5: Quasi-steady induction
+        aI_new, apI_new, _ = _fInductionCoefficients(VrelI_k, V0c[IOP], FI, cnForAI, ctForTI,
+                                  lambda_r[IOP], sigma, phiI_k, a_last=aI, relaxation=relaxation, bSwirl=bSwirl, drdz=drdz, algorithm=algorithm)
+        # --- Storing values for operating points still iterating
+        a[IOP], aprime[IOP] = aI_new, apI_new
+        Ut_p[IOP], Un_p[IOP], Vrel_norm_k[IOP], phi_k[IOP], F[IOP] = UtI_p, UnI_p, VrelI_k, phiI_k, FI
+        Cl[IOP], Cd[IOP], Cm[IOP] = ClI, CdI, CmI
+        nIt[IOP] = iterations + 1
+        # --- Convergence, per operating point
+        if iterations > 3:
+            bConv = (np.mean(np.abs(aI_new-aI), axis=1) + np.mean(np.abs(apI_new-apI), axis=1)) < aTol
+            IOP = IOP[~bConv]
+            if len(IOP)==0:
+                break
+    if verbose and len(IOP)>0:
+        print('Maximum iterations reached for {} operating points'.format(len(IOP)))
+
+    # --------------------------------------------------------------------------------
+    # --- Step 6: Outputs
+    # --------------------------------------------------------------------------------
+    return _steadyBEMOutputs(Omega, pitch, V0, u_turb, a, aprime, phi_k, Un_p, Ut_p, Vrel_norm_k, F, nIt, Cl, Cd, Cm,
+                nB, cone, r, chord, fulltwist, rho, KinVisc, bUseCm, algorithm)
+
+def _steadyBEMOutputs(Omega, pitch, V0, u_turb, a, aprime, phi_k, Un_p, Ut_p, Vrel_norm_k, F, nIt, Cl, Cd, Cm,
+        nB, cone, r, chord, fulltwist, rho, KinVisc, bUseCm, algorithm):
+    """ 
+    Outputs of the steady BEM (radial and integral quantities), from the converged inductions and flow angles.
+    Used by calcSteadyBEM (one operating point, radial quantities of size nr) and calcSteadyBEMBatch 
+    (Omega, pitch, V0, u_turb of size nOP, radial quantities of size nOP x nr).
+        Omega [rad/s], pitch [deg], phi_k [rad], fulltwist [rad]
+    """
+    # Column vectors, broadcasted against radial quantities
+    V0c, Omegac, u_turbc = np.asarray(V0)[...,None], np.asarray(Omega)[...,None], np.asarray(u_turb)[...,None]
+    # --- Derived params
+    rhub, R  = r[0], r[-1]
+    # Computing a dr, such that sum(dr)=R-rhub
+    dr    = np.diff(r) 
+    MidPointAfter = np.concatenate((  r[0:-1]+dr/2 , [R] ))
+    MidPointBefore= np.concatenate(( [r[0]] ,  r[1:]-dr/2))
+    dr    = MidPointAfter-MidPointBefore
+    cCone    = cos(cone*pi/180.) #  = dr/dz (if no sweep)
+    rPolar = r * cCone
+    lambda_r = Omegac * rPolar/ V0c
+
+    BEM=SteadyBEM_Outputs();
+    # Operating conditions
+    BEM.R=R
+    BEM.Omega = Omega
+    BEM.Pitch = pitch
+    BEM.V0    = V0
+    # --- Coefficients
+    BEM.Cl,BEM.Cd,BEM.Cm = Cl,Cd,Cm
+    # --- Velocities
+    BEM.a,BEM.aprime,BEM.phi, = a,aprime,phi_k
+    BEM.Un,BEM.Ut,BEM.Vrel = Un_p,Ut_p,Vrel_norm_k
+    BEM.uia    = V0c * BEM.a
+    BEM.uit    = Omegac * r * BEM.aprime
+    BEM.u_turb = np.ones(a.shape)*u_turbc
+    # Misc
+    BEM.F,BEM.nIt = F,nIt
+    # Radial quantities (recomputed since thhough as derived outputs)
+    BEM.r=r
+    BEM.alpha = (BEM.phi - fulltwist)*180/pi               # [deg]
+    if algorithm!='legacy':
+        R_ap = rotPolar2Airfoil(tau=0, kappa=cone*pi/180, beta=fulltwist) # NOTE: sweep and prebend 
+        # --- Airfoil coordinates (OpenFAST convention)
+        Cxa      =  BEM.Cl * cos(BEM.alpha*np.pi/180) + BEM.Cd * sin(BEM.alpha*np.pi/180)
+        Cya      = -BEM.Cl * sin(BEM.alpha*np.pi/180) + BEM.Cd * cos(BEM.alpha*np.pi/180)
+        # --- Polar coordinates
+        # Cp = R_pa * Ca     NOTE:  R_pa = R_ap^T
+        Cxp      = R_ap[0,0] * Cxa      + R_ap[1,0] * Cya 
+        Cyp      = R_ap[0,1] * Cxa      + R_ap[1,1] * Cya
+        BEM.cn =  Cxp
+        BEM.ct = -Cyp
+    else:
+        BEM.cn = BEM.Cl * cos(BEM.phi) + BEM.Cd * sin(BEM.phi)
+        BEM.ct = BEM.Cl * sin(BEM.phi) - BEM.Cd * cos(BEM.phi)
+    if algorithm=='legacy':
+        BEM.Pn    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.cn *cCone    # [N/m]
+    else:
+        BEM.Pn    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.cn   # [N/m]
+    BEM.Pt    = 0.5 * rho * BEM.Vrel**2 * chord * BEM.ct   # [N/m] 
+    if bUseCm:
+        BEM.MzLn  = 0.5 * rho * BEM.Vrel**2 * chord**2 * BEM.Cm   # [Nm/m] 
+    else:
+        BEM.Cm    = 0*BEM.Pn
+        BEM.MzLn  = 0*BEM.Pn
+    BEM.phi   = BEM.phi*180/pi                             # [deg]
+    BEM.Re    = BEM.Vrel * chord / KinVisc / 10**6  # Reynolds number in Millions
+    BEM.Gamma = 0.5 * BEM.Vrel * chord * BEM.Cl   # Circulation [m^2/s]
+    # L = 0.5 * rho * Vrel_norm ** 2 * chord[e] * Cl
+    # D = 0.5 * rho * Vrel_norm ** 2 * chord[e] * Cd
+    # Radial quantities, "dr" formulation
+    BEM.ThrLoc   = dr * BEM.Pn
+    BEM.ThrLocLn =      BEM.Pn
+    BEM.TqLoc    = dr * BEM.Pt * rPolar
+    BEM.TqLocLn  =      BEM.Pt * rPolar
+    # TODO verify those below
+    BEM.Ct       = nB * BEM.ThrLoc / (0.5 * rho * V0c** 2 * (2*pi * rPolar * dr))
+    BEM.Cq       = nB * BEM.TqLoc / (0.5 * rho * V0c** 2 * (2*pi * rPolar)) * dr * rPolar
+    BEM.Cp       = BEM.Cq*lambda_r
+
+    # --- Integral quantities per blade
+    BEM.Mz    = np.trapz(BEM.MzLn, r, axis=-1)
+    QMz = nB * BEM.Mz * np.sin(cone*np.pi/180)
+    # --- Integral quantities for rotor
+    # TODO integration variable might need to be rPolar
+    BEM.Torque = nB * np.trapz(rPolar * BEM.Pt, r, axis=-1) + QMz # Rotor shaft torque [N]
+    BEM.Thrust = nB * np.trapz(         BEM.Pn, r, axis=-1) # Rotor shaft thrust [N]
+    BEM.Flap   = np.trapz( BEM.Pn * (r - rhub), r, axis=-1) # Flap moment at blade root [Nm]
+    BEM.Edge   = np.trapz( BEM.Pt * (r - rhub), r, axis=-1) # Edge moment at blade root [Nm]
+    BEM.Power = Omega * BEM.Torque
+    BEM.CP = BEM.Power  / (0.5 * rho * V0**3 * pi * R**2) # TODO ref area with coning
+    BEM.CT = BEM.Thrust / (0.5 * rho * V0**2 * pi * R**2)
+    BEM.CQ = BEM.Torque / (0.5 * rho * V0**2 * pi * R**3)
+    return BEM
+
 # --------------------------------------------------------------------------------}
 # --- Utils common between steady and unsteady BEM
 # --------------------------------------------------------------------------------{
@@ -694,8 +863,8 @@ def _fAeroCoeffWrap(fPolars, alpha, phi, bAIDrag=True, bTIDrag=True, R_ap=None):
     """Tabulated airfoil data interpolation
         Inputs
         ----------
-        Polars: interpolant function for each alpha
-        alpha: Angle Of Attack [rad]
+        fPolars: PolarTable for all radial stations
+        alpha: Angle Of Attack [rad], array of size nr, or nOP x nr
         phi  : flow angle  [rad]
 
         Outputs
@@ -705,12 +874,7 @@ def _fAeroCoeffWrap(fPolars, alpha, phi, bAIDrag=True, bTIDrag=True, R_ap=None):
     """
     alpha[alpha<-pi] += 2*pi
     alpha[alpha> pi] -= 2*pi
-    Cl = np.zeros(alpha.shape)
-    Cd = np.zeros(alpha.shape)
-    Cm = np.zeros(alpha.shape)
-    for i,(fPolar,alph) in enumerate(zip(fPolars,alpha)):
-        ClCdCm = fPolar(alph)
-        Cl[i], Cd[i], Cm[i] = ClCdCm[0], ClCdCm[1], ClCdCm[2]
+    Cl, Cd, Cm = fPolars(alpha)
     if R_ap is not None:
         # --- Airfoil coordinates (OpenFAST convention)
         Cxa      =  Cl * cos(alpha) + Cd * sin(alpha)
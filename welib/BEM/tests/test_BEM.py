@@ -34,5 +34,42 @@ class Test(unittest.TestCase):
 
         np.seterr(**old_settings)
 
+    def test_BEM_batch(self):
+        # Operating points solved at once should match operating points solved one by one
+        old_settings = np.seterr()
+        np.seterr(all='raise')
+        nB,cone,r,chord,twist,polars,rho,KinVisc = FASTFile2SteadyBEM(os.path.join(MyDir,'../../../data/NREL5MW/Main_Onshore.fst'))
+        V0    = np.array([5, 10, 15, 20])
+        Omega = np.array([7, 11, 12.1, 12.1])
+        pitch = np.array([2, 0, 10, 17])
+        BEMs = calcSteadyBEM(Omega,pitch,V0,0,0,
+                    nB,cone,r,chord,twist,polars,
+                    rho=rho,KinVisc=KinVisc,bTIDrag=False,bAIDrag=True, bUseCm=False)
+        df = BEMs.StoreIntegratedValues()
+        np.testing.assert_equal(len(df), 4)
+        for i in range(len(V0)):
+            BEM=calcSteadyBEM(Omega[i],pitch[i],V0[i],0,0,
+                        nB,cone,r,chord,twist,polars,
+                        rho=rho,KinVisc=KinVisc,bTIDrag=False,bAIDrag=True, bUseCm=False)
+            np.testing.assert_almost_equal(BEMs.Power[i] , BEM.Power , 5)
+            np.testing.assert_almost_equal(BEMs.Thrust[i], BEM.Thrust, 5)
+            np.testing.assert_almost_equal(BEMs.a[i,:]   , BEM.a     , 8)
+            np.testing.assert_equal(BEMs.nIt[i], BEM.nIt)
+            np.testing.assert_almost_equal(df['AeroPower_[kW]'].values[i], BEM.Power/1000, 5)
+        np.testing.assert_almost_equal(BEMs.Power[0] ,445680.62,1)
+        np.seterr(**old_settings)
+
+    def test_BEM_parametric(self):
+        # Parametric study, with and without batch
+        BEM = SteadyBEM(os.path.join(MyDir,'../../../data/NREL5MW/Main_Onshore.fst'))
+        V0    = np.array([5, 10, 15])
+        Omega = np.array([7, 11, 12.1])
+        pitch = np.array([2, 0, 10])
+        df , _ = BEM.parametric(Omega, pitch, V0)
+        a      = BEM.lastRun.a
+        dfB, _ = BEM.parametric(Omega, pitch, V0, batch=True)
+        np.testing.assert_allclose(dfB.values, df.values, rtol=1e-5)
+        np.testing.assert_allclose(BEM.lastRun.a, a, atol=1e-4)
+
 if __name__ == '__main__':
     unittest.main()
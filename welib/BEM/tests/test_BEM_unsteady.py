@@ -181,6 +181,29 @@ class Test(unittest.TestCase):
         #plt.show()
 
 
+    def test_ensemble(self):
+        # Test that an ensemble simulation gives the same results as individual simulations
+        BEM = UnsteadyBEM(os.path.join(MyDir,'../../../data/NREL5MW/Main_Onshore.fst'))
+        BEM.bYawModel = True
+        time = np.arange(0,1,0.1)
+        RPM  = np.array([8,10,12])
+        WS   = np.array([6,9,12])
+        dfs = BEM.simulationEnsemble(time, RPM, windSpeed=WS, tilt=5, cone=-2.5)
+        self.assertEqual(len(dfs), 3)
+        for i in range(3):
+            df = BEM.simulationConstantRPM(time, RPM[i], windSpeed=WS[i], tilt=5, cone=-2.5)
+            np.testing.assert_allclose(dfs[i].values, df.values, rtol=1e-10, atol=1e-10)
+        # Long format
+        df = BEM.simulationEnsemble(time, 10, windSpeed=WS, longFormat=True)
+        np.testing.assert_equal(np.unique(df['Case']), [0,1,2])
+        # Cases distributed to a pool of processes
+        dfs2 = BEM.simulationEnsemble(time, RPM, windSpeed=WS, tilt=5, cone=-2.5, nProcs=2)
+        self.assertEqual(len(dfs2), 3)
+        for df, df2 in zip(dfs, dfs2):
+            self.assertEqual(list(df.columns), list(df2.columns))
+            np.testing.assert_allclose(df2.values, df.values, rtol=1e-12, atol=1e-12)
+
+
 
 if __name__ == '__main__':
     unittest.main()
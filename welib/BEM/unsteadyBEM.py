@@ -7,15 +7,16 @@ Reference:
 """
 import numpy as np
 import os
+import copy
 from numpy import cos, sin, arctan2, pi, arccos, exp, abs, min, sqrt
 from scipy.interpolate import interp1d
-import copy
 import pandas as pd
 import matplotlib.pyplot as plt
 
 # Load more models
 # try:
 from welib.BEM.highthrust import a_Ct
+from welib.airfoils.Polar import PolarTable
 # except: 
 #     pass
 
@@ -29,21 +30,33 @@ class BEMStates:
         # Dynamic stall
 
 class BEMDiscreteStates:
-    def __init__(self, nB, nr):
+    def __init__(self, nB, nr, nCases=None):
+        """ 
+        nCases: if provided, the states have a leading dimension of size nCases (ensemble simulations)
+        """
         self.t = None
         self.it=-1
+        self.nCases = nCases
+        lead = () if nCases is None else (nCases,)
         # Induction
-        self.Vind_g  = np.zeros((nB,nr,3)) # Dynamic induced velocity with skew and dyn wake, global coordinates
-        self.Vind_p  = np.zeros((nB,nr,3)) # Dynamic induced velocity with skew and dyn wake, polar coordinates
-        self.a       = np.zeros((nB,nr)) # axial induction
+        self.Vind_g  = np.zeros(lead+(nB,nr,3)) # Dynamic induced velocity with skew and dyn wake, global coordinates
+        self.Vind_p  = np.zeros(lead+(nB,nr,3)) # Dynamic induced velocity with skew and dyn wake, polar coordinates
+        self.a       = np.zeros(lead+(nB,nr)) # axial induction
         # Dynamic wake
-        self.Vind_qs_p  = np.zeros((nB,nr,3)) # Quasi-steady velocity, polar coordinates
-        self.Vind_qs_g  = np.zeros((nB,nr,3)) # Quasi-steady velocity
-        self.Vind_int_p = np.zeros((nB,nr,3)) # Intermediate velocity, polar coordinates
-        self.Vind_dyn_p = np.zeros((nB,nr,3)) # Dynamic induced velocity (before skew/yaw), polar coordinates
-        self.Vind_dyn_g = np.zeros((nB,nr,3)) # Dynamic induced velocity (before skew/yaw), global coordinates
+        self.Vind_qs_p  = np.zeros(lead+(nB,nr,3)) # Quasi-steady velocity, polar coordinates
+        self.Vind_qs_g  = np.zeros(lead+(nB,nr,3)) # Quasi-steady velocity
+        self.Vind_int_p = np.zeros(lead+(nB,nr,3)) # Intermediate velocity, polar coordinates
+        self.Vind_dyn_p = np.zeros(lead+(nB,nr,3)) # Dynamic induced velocity (before skew/yaw), polar coordinates
+        self.Vind_dyn_g = np.zeros(lead+(nB,nr,3)) # Dynamic induced velocity (before skew/yaw), global coordinates
         # Dynamic stall
-        self.fs = np.zeros((nB,nr)) # Separation 
+        self.fs = np.zeros(lead+(nB,nr)) # Separation 
+
+    def copyFrom(self, xd):
+        """ Copy the values of the discrete states xd into the arrays of self, without allocation """
+        self.t  = xd.t
+        self.it = xd.it
+        for k in ['Vind_g', 'Vind_p', 'a', 'Vind_qs_p', 'Vind_qs_g', 'Vind_int_p', 'Vind_dyn_p', 'Vind_dyn_g', 'fs']:
+            getattr(self, k)[:] = getattr(xd, k)
 
 # --------------------------------------------------------------------------------}
 # --- Main Class UnsteadyBEM 
@@ -226,78 +239,82 @@ class UnsteadyBEM():
         return s
 
     def _init(self):
-        # Creating interpolation functions for each polar, now in rad!
-        self.fPolars = [interp1d(p[:,0]*np.pi/180,p[:,1:],axis=0) for p in self.polars]
+        # Lookup table for all polars, now in rad!
+        self.fPolars = PolarTable(self.polars)
 
-    def getInitStates(self):
-        return BEMDiscreteStates(self.nB, len(self.r))
+    def getInitStates(self, nCases=None):
+        return BEMDiscreteStates(self.nB, len(self.r), nCases=nCases)
 
-    def timeStepInit(self, t0, tmax, dt):
-        """ Allocate storage for tiem step values"""
+    def timeStepInit(self, t0, tmax, dt, nCases=None):
+        """ Allocate storage for tiem step values
+        nCases: if provided, all time series have a second dimension of size nCases (ensemble simulations)
+        """
         self.time=np.arange(t0,tmax+dt/2,dt)
+        self.nCases = nCases
         nt = len(self.time)
         nB = self.nB
         nr = len(self.r)
+        nt = (nt,) if nCases is None else (nt, nCases)
         # --- Spanwise data
         # Coeffients
-        self.Cl_qs  = np.zeros((nt,nB,nr))
-        self.Cd_qs  = np.zeros((nt,nB,nr))
-        self.Cl     = np.zeros((nt,nB,nr))
-        self.Cd     = np.zeros((nt,nB,nr))
-        self.Cm     = np.zeros((nt,nB,nr))
-        self.cn     = np.zeros((nt,nB,nr))
-        self.ct     = np.zeros((nt,nB,nr))
-        self.Cx_a   = np.zeros((nt,nB,nr))
-        self.Cy_a   = np.zeros((nt,nB,nr))
-        self.Ct     = np.zeros((nt,nB,nr))
-        self.Cq     = np.zeros((nt,nB,nr))
+        self.Cl_qs  = np.zeros(nt+(nB,nr))
+        self.Cd_qs  = np.zeros(nt+(nB,nr))
+        self.Cl     = np.zeros(nt+(nB,nr))
+        self.Cd     = np.zeros(nt+(nB,nr))
+        self.Cm     = np.zeros(nt+(nB,nr))
+        self.cn     = np.zeros(nt+(nB,nr))
+        self.ct     = np.zeros(nt+(nB,nr))
+        self.Cx_a   = np.zeros(nt+(nB,nr))
+        self.Cy_a   = np.zeros(nt+(nB,nr))
+        self.Ct     = np.zeros(nt+(nB,nr))
+        self.Cq     = np.zeros(nt+(nB,nr))
         # Velocities
-        self.Vrel_p = np.zeros((nt,nB,nr,3)) # Un,Ut,Ur
-        self.Vrel_xa = np.zeros((nt,nB,nr)) # 
-        self.Vrel_ya = np.zeros((nt,nB,nr)) # 
-        self.Vrel_za = np.zeros((nt,nB,nr)) # 
-        self.Vind_p = np.zeros((nt,nB,nr,3))
-        self.Vind_s = np.zeros((nt,nB,nr,3))
-        self.Vind_qs_p = np.zeros((nt,nB,nr,3))
-        self.Vflw_p = np.zeros((nt,nB,nr,3)) # Vwnd-Vstr
-        self.Vwnd_p = np.zeros((nt,nB,nr,3))
-        self.Vwnd_s = np.zeros((nt,nB,nr,3))
-        self.Vwnd_a = np.zeros((nt,nB,nr,3))
-        self.Vstr_p = np.zeros((nt,nB,nr,3))
-        self.Vstr_s = np.zeros((nt,nB,nr,3))
-        self.Vstr_xa = np.zeros((nt,nB,nr))
-        self.Vstr_ya = np.zeros((nt,nB,nr))
-        self.Vrel   = np.zeros((nt,nB,nr))
-        self.AxInd  = np.zeros((nt,nB,nr))
-        self.TnInd  = np.zeros((nt,nB,nr))
+        self.Vrel_p = np.zeros(nt+(nB,nr,3)) # Un,Ut,Ur
+        self.Vrel_xa = np.zeros(nt+(nB,nr)) # 
+        self.Vrel_ya = np.zeros(nt+(nB,nr)) # 
+        self.Vrel_za = np.zeros(nt+(nB,nr)) # 
+        self.Vind_p = np.zeros(nt+(nB,nr,3))
+        self.Vind_s = np.zeros(nt+(nB,nr,3))
+        self.Vind_qs_p = np.zeros(nt+(nB,nr,3))
+        self.Vflw_p = np.zeros(nt+(nB,nr,3)) # Vwnd-Vstr
+        self.Vwnd_p = np.zeros(nt+(nB,nr,3))
+        self.Vwnd_s = np.zeros(nt+(nB,nr,3))
+        self.Vwnd_a = np.zeros(nt+(nB,nr,3))
+        self.Vstr_p = np.zeros(nt+(nB,nr,3))
+        self.Vstr_s = np.zeros(nt+(nB,nr,3))
+        self.Vstr_xa = np.zeros(nt+(nB,nr))
+        self.Vstr_ya = np.zeros(nt+(nB,nr))
+        self.Vrel   = np.zeros(nt+(nB,nr))
+        self.AxInd  = np.zeros(nt+(nB,nr))
+        self.TnInd  = np.zeros(nt+(nB,nr))
         # Loads per span
-        self.L      = np.zeros((nt,nB,nr))
-        self.D      = np.zeros((nt,nB,nr))
-        self.Mm     = np.zeros((nt,nB,nr))
-        self.Fn     = np.zeros((nt,nB,nr))
-        self.Ft     = np.zeros((nt,nB,nr))
-        self.F_a   = np.zeros((nt,nB,nr,3))
-        self.F_s    = np.zeros((nt,nB,nr,3))
-        self.Gamma  = np.zeros((nt,nB,nr))
-        self.alpha  = np.zeros((nt,nB,nr))
-        self.phi    = np.zeros((nt,nB,nr))
-        self.Re     = np.zeros((nt,nB,nr))
+        self.L      = np.zeros(nt+(nB,nr))
+        self.D      = np.zeros(nt+(nB,nr))
+        self.Mm     = np.zeros(nt+(nB,nr))
+        self.Fn     = np.zeros(nt+(nB,nr))
+        self.Ft     = np.zeros(nt+(nB,nr))
+        self.F_a   = np.zeros(nt+(nB,nr,3))
+        self.F_s    = np.zeros(nt+(nB,nr,3))
+        self.Gamma  = np.zeros(nt+(nB,nr))
+        self.alpha  = np.zeros(nt+(nB,nr))
+        self.phi    = np.zeros(nt+(nB,nr))
+        self.Re     = np.zeros(nt+(nB,nr))
         # Integrated values
         self.Thrust   = np.zeros(nt)
         self.Torque   = np.zeros(nt)
         self.Power    = np.zeros(nt)
         self.chi      = np.zeros(nt)
         self.chi0     = np.zeros(nt)
-        self.RtVAvg   = np.zeros((nt,3))
+        self.RtVAvg   = np.zeros(nt+(3,))
         self.psi      = np.zeros(nt)
         self.Omega    = np.zeros(nt)  # [rpm]
         self.RtArea   = np.zeros(nt)
-        self.SkewAzimuth  = np.zeros((nt,nB))
+        self.SkewAzimuth  = np.zeros(nt+(nB,))
         # Blade blades
-        self.BladeTorque = np.zeros((nt,nB))
-        self.BladeThrust = np.zeros((nt,nB))
-        self.BladeEdge   = np.zeros((nt,nB))
-        self.BladeFlap   = np.zeros((nt,nB))
+        self.BladeTorque = np.zeros(nt+(nB,))
+        self.BladeThrust = np.zeros(nt+(nB,))
+        self.BladeEdge   = np.zeros(nt+(nB,))
+        self.BladeFlap   = np.zeros(nt+(nB,))
 
 
 
@@ -306,10 +323,10 @@ class UnsteadyBEM():
         Compute output for current state variables and inputs.
         """
         R = np.sqrt(self.RtArea/pi)
-        q = 0.5*self.rho*self.RtArea*self.RtVAvg[:,0]**2
+        q = 0.5*self.rho*self.RtArea*self.RtVAvg[...,0]**2
         self.CT=self.Thrust/(q)
         self.CQ=self.Torque/(q*R)
-        self.CP=self.Power /(q*self.RtVAvg[:,0])
+        self.CP=self.Power /(q*self.RtVAvg[...,0])
 
 
     # --------------------------------------------------------------------------------}
@@ -482,6 +499,8 @@ class UnsteadyBEM():
          - t: current time step [s]
          - dt: time interval [s]
          - xd0: discreate states at current time step. Instance of BEMDiscreteStates
+                NOTE: the states returned are stored in a buffer that is reused at the next
+                      time step, use xd1.copyFrom to keep a copy of them.
          - psi: current azimuth [rad]
          - psiB0: azimuthal offsets for each blades compared to psi 
          - origin_pos_gl: position of rotor origin in global coordinates
@@ -495,7 +514,14 @@ class UnsteadyBEM():
          - R_s2g  : transformation matrix from "section" to global     (nB x nr x 3 x 3)
          - R_a2g  : transformation matrix from airfoil to global       (nB x nr x 3 x 3)
         """
-        xd1   = copy.deepcopy(xd0)
+        # NOTE: all arrays may have leading "case" dimensions (ensemble simulations), denoted "..." 
+        # Discrete states at t+dt, updated in place into a preallocated buffer, distinct from xd0
+        nB, nr = pos_gl.shape[-3:-1]
+        xd1 = getattr(self, '_xdBuffer', None)
+        if xd1 is None or xd1 is xd0 or xd1.a.shape!=xd0.a.shape:
+            xd1 = BEMDiscreteStates(nB, nr, nCases=xd0.nCases)
+        self._xdBuffer = xd0 # Next call will write into the current states
+        xd1.copyFrom(xd0)
         xd1.t = t
         xd1.it = xd0.it+1 # Increase time step 
         # Safety
@@ -503,37 +529,24 @@ class UnsteadyBEM():
             if np.abs((xd0.t+dt-t))>dt/10:
                 raise Exception('timeStep method expects to be called on regular intervals')
 
-        # Time step storage for vectorization
-        nB, nr, _ = pos_gl.shape
         p = self # alias
-        ### Loop on blades
+        # Stacks of transformation matrices
+        R_p2g   = np.asarray(R_ntr2g)                  # from polar grid to global (... x nB x 3 x 3)
+        R_bld2g = np.einsum('...ij,...bjk->...bik', R_r2g, np.asarray(R_bld2r)) # from blade to global (... x nB x 3 x 3)
         # --------------------------------------------------------------------------------
         # --- Step 0: geometry 
         # --------------------------------------------------------------------------------
         # --- Compute rotor radius, hub radius, and section radii
-        r_p = np.zeros((nB,nr)) # radius in polar grid
-        r_b = np.zeros((nB,nr)) # radius in blade coordinates
-        Rs_p=[0]*nB
-        R_bld2g = np.zeros((nB,3,3)) # from blade to global
-        for iB in np.arange(nB):
-            R_p2g = R_ntr2g[iB] # TODO make it a function of element
-            R_bld2g[iB] =  R_r2g.dot(R_bld2r[iB])
-            # radial position (in polar grid) of first and last node taken
-            Rs_p[iB] = (R_p2g.T).dot(pos_gl[iB,-1,:]-origin_pos_gl)[2]
-            rhub_p   = (R_p2g.T).dot(pos_gl[iB, 0,:]-origin_pos_gl)[2]
-            # loop on elements
-            for ie in np.arange(nr):
-                r_p[iB,ie] = (R_p2g.T)  .dot(pos_gl[iB,ie,:]-origin_pos_gl)[2] # radial position in polar grid
-                r_b[iB,ie] = (R_bld2g[iB].T).dot(pos_gl[iB,ie,:]-origin_pos_gl)[2] # radial position in blade coordinate (from rotor center) 
-            #print('r_b',r_b[iB])
-            #print('r_p',r_p[iB])
-            #dr = np.diff(r_p[iB])
-            #dz = np.diff(r_b[iB])
-            #print('k', kappa, np.arccos(dr/dz)*180/np.pi) # NOTE: not accurate, need sign as well
-        R_p = np.max(Rs_p) # Rotor radius projected onto polar grid
+        dpos_gl = pos_gl-np.asarray(origin_pos_gl)[...,None,None,:]
+        r_p = np.einsum('...bj,...bnj->...bn', R_p2g[...,:,2]  , dpos_gl) # radius in polar grid
+        r_b = np.einsum('...bj,...bnj->...bn', R_bld2g[...,:,2], dpos_gl) # radius in blade coordinates (from rotor center) 
+        R_p    = np.max(r_p[...,:,-1], axis=-1) # Rotor radius projected onto polar grid
+        rhub_p = r_p[...,-1,0]                  # radial position (in polar grid) of first node of last blade
+        R_p_   = R_p   [...,None,None] # for broadcasting with nB x nr arrays
+        rhub_p_= rhub_p[...,None,None]
         # --- Rotor speed for power
-        omega_r = R_r2g.T.dot(omega_gl) # rotational speed in rotor coordinate system
-        Omega = omega_r[0] # rotation speed of shaft (along x)
+        omega_r = np.einsum('...ji,...j->...i', R_r2g, omega_gl) # rotational speed in rotor coordinate system
+        Omega = omega_r[...,0] # rotation speed of shaft (along x)
 
         if kappa is None:
             kappa = 0 # TODO TODO could compute it based on r_p and r_b
@@ -547,46 +560,36 @@ class UnsteadyBEM():
             nItMax=50
         else:
             nItMax=1
+        # Polar coordinates of wind and structural velocity
+        Vstr_p = np.einsum('...bji,...bnj->...bni', R_p2g, Vstr_gl) # Structural velocity in polar coordinates
+        Vwnd_p = np.einsum('...bji,...bnj->...bni', R_p2g, Vwnd_gl) # Wind Velocity in polar coordinates
+        Vflw_p  = Vwnd_p-Vstr_p # Relative flow velocity, including wind and structural motion
+        Vflw_g  = Vwnd_gl-Vstr_gl # Relative flow velocity, including wind and structural motion
         for iterations in np.arange(nItMax):
             # --------------------------------------------------------------------------------
             # --- Step 1: velocity components
             # --------------------------------------------------------------------------------
-            Vrel_a  = np.zeros((nB,nr,3))
-            Vrel_p  = np.zeros((nB,nr,3))
-            Vstr_p  = np.zeros((nB,nr,3))
-            Vwnd_p  = np.zeros((nB,nr,3))
-            Vrel_k  = np.zeros((nB,nr,3))
-            for iB in np.arange(nB):
-                R_p2g = R_ntr2g[iB]
-                for ie in np.arange(nr):
-                    # Velocity in global
-                    Vwnd_g = Vwnd_gl[iB,ie]
-                    # NOTE: inductions from previous time step, in polar grid (more realistic than global)
-                    #Vind_g = xd0.Vind_g[iB,ie] # dynamic inductions at previous time step
-                    Vind_g = (R_p2g).dot(xd0.Vind_p[iB,ie]) # dynamic inductions at previous time step
-                    Vstr_g = Vstr_gl[iB,ie]
-                    Vrel_g = Vwnd_g+Vind_g-Vstr_g
-                    # Polar coordinates
-                    Vstr_p[iB,ie] = (R_p2g.T).dot(Vstr_g) # Structural velocity in polar coordinates
-                    Vrel_p[iB,ie] = (R_p2g.T).dot(Vrel_g)
-                    Vwnd_p[iB,ie] = (R_p2g.T).dot(Vwnd_g) # Wind Velocity in polar coordinates
-                    # Kappa coordinates
-                    Vrel_k[iB,ie,0] = Vrel_p[iB,ie,0]*np.cos(kappa*np.pi/180) # n  # TODO TODO use cant
-                    Vrel_k[iB,ie,1] = Vrel_p[iB,ie,1] # t
-                    # Airfoil coordinates
-                    Vrel_a[iB,ie] = (R_a2g[iB,ie].T).dot(Vrel_g) # TODO use R_p2a instead, and remove zp component
-            Vflw_p  = Vwnd_p-Vstr_p # Relative flow velocity, including wind and structural motion
-            Vflw_g  = Vwnd_gl-Vstr_gl # Relative flow velocity, including wind and structural motion
+            # NOTE: inductions from previous time step, in polar grid (more realistic than global)
+            Vind_g = np.einsum('...bij,...bnj->...bni', R_p2g, xd0.Vind_p) # dynamic inductions at previous time step
+            Vrel_g = Vwnd_gl+Vind_g-Vstr_gl
+            # Polar coordinates
+            Vrel_p = np.einsum('...bji,...bnj->...bni', R_p2g, Vrel_g)
+            # Kappa coordinates
+            Vrel_k = np.zeros(Vrel_p.shape)
+            Vrel_k[...,0] = Vrel_p[...,0]*np.cos(kappa*np.pi/180) # n  # TODO TODO use cant
+            Vrel_k[...,1] = Vrel_p[...,1] # t
+            # Airfoil coordinates
+            Vrel_a = np.einsum('...bnji,...bnj->...bni', R_a2g, Vrel_g) # TODO use R_p2a instead, and remove zp component
 
             # Velocity norm and Reynolds
-            Vrel_norm_k = sqrt(Vrel_k[:,:,0]**2 + Vrel_k[:,:,1]**2)
-            Vrel_norm_a = sqrt(Vrel_a[:,:,0]**2 + Vrel_a[:,:,1]**2)
+            Vrel_norm_k = sqrt(Vrel_k[...,0]**2 + Vrel_k[...,1]**2)
+            Vrel_norm_a = sqrt(Vrel_a[...,0]**2 + Vrel_a[...,1]**2)
             Re        = Vrel_norm_a*p.chord/p.kinVisc/10**6 # Reynolds in million
             # --------------------------------------------------------------------------------
             # --- Step 2: Flow Angle and tip loss
             # --------------------------------------------------------------------------------
-            phi_k = np.arctan2(Vrel_k[:,:,0],-Vrel_k[:,:,1]) # flow angle [rad] in kappa system
-            phi_p = np.arctan2(Vrel_p[:,:,0],-Vrel_p[:,:,1])  # NOTE: using polar grid for phi
+            phi_k = np.arctan2(Vrel_k[...,0],-Vrel_k[...,1]) # flow angle [rad] in kappa system
+            phi_p = np.arctan2(Vrel_p[...,0],-Vrel_p[...,1])  # NOTE: using polar grid for phi
             if self.algorithm=='legacy':
                 phi_tl = phi_p
                 phi    = phi_p
@@ -596,61 +599,54 @@ class UnsteadyBEM():
             else:
                 raise Exception()
             # --- Tip and hub losses
-            F = np.ones((nB,nr))
+            F = np.ones(r_p.shape)
             if (p.bTipLoss): #Glauert tip correction
                 b=sin(phi_tl)>0.01
-                F[b] = 2./pi*arccos(exp(-(nB *(R_p-r_p[b]))/(2*r_p[b]*sin(phi_tl[b]))))
-                b2=abs(r_p-R_p)<1e-3
+                F[b] = 2./pi*arccos(exp(-(nB *(np.broadcast_to(R_p_, r_p.shape)[b]-r_p[b]))/(2*r_p[b]*sin(phi_tl[b]))))
+                b2=abs(r_p-R_p_)<1e-3
                 F[b2]=0.001
             # --- Hub loss
             if (p.bHubLoss): #Glauert hub loss correction
-                F = F* 2./pi*arccos(exp(-nB/2. *(r_p-rhub_p)/ (rhub_p*np.sin(phi_tl))))
+                F = F* 2./pi*arccos(exp(-nB/2. *(r_p-rhub_p_)/ (rhub_p_*np.sin(phi_tl))))
             #F[F<=1e-3]=0.5
             # --------------------------------------------------------------------------------
             # --- Step 3: Angle of attack
             # --------------------------------------------------------------------------------
-            alpha = np.arctan2(Vrel_a[:,:,0],Vrel_a[:,:,1])        # angle of attack [rad]
+            alpha = np.arctan2(Vrel_a[...,0],Vrel_a[...,1])        # angle of attack [rad]
             # --------------------------------------------------------------------------------
             # --- Step 4: Aerodynamic Coefficients
             # --------------------------------------------------------------------------------
-            ClCdCm = np.array([p.fPolars[ie](alpha[iB,ie]) for iB in np.arange(nB) for ie in np.arange(nr)]).reshape((nB,nr,3))
-            Cl=ClCdCm[:,:,0]
-            Cd=ClCdCm[:,:,1]
-            Cm=ClCdCm[:,:,2]
+            Cl, Cd, Cm = p.fPolars(alpha) # ... x nB x nr
             # Project to airfoil coordinates
             C_xa       ,C_ya        = Cl*cos(alpha)+ Cd*sin(alpha  )   ,  -Cl*sin(alpha)+ Cd*cos(alpha)
             C_xa_noDrag,C_ya_noDrag = Cl*cos(alpha)                    ,  -Cl*sin(alpha)
             # Project to polar coordinates
-            C_p        = np.zeros((nB,nr,3))
-            C_g        = np.zeros((nB,nr,3))
-            C_p_noDrag = np.zeros((nB,nr,3))
-            for iB in np.arange(nB):
-                R_p2g = R_ntr2g[iB]
-                for ie in np.arange(nr):
-                    C_g        [iB,ie]=R_a2g[iB,ie].dot(np.array([C_xa       [iB,ie], C_ya       [iB,ie], 0]))
-                    C_p        [iB,ie]=(R_p2g.T).dot(C_g[iB,ie])
-                    C_p_noDrag [iB,ie]=(R_p2g.T).dot(R_a2g[iB,ie]).dot(np.array([C_xa_noDrag[iB,ie], C_ya_noDrag[iB,ie], 0]))
+            C_a        = np.stack((C_xa       , C_ya       , np.zeros(alpha.shape)), axis=-1)
+            C_a_noDrag = np.stack((C_xa_noDrag, C_ya_noDrag, np.zeros(alpha.shape)), axis=-1)
+            C_g        = np.einsum('...bnij,...bnj->...bni', R_a2g, C_a)
+            C_p        = np.einsum('...bji,...bnj->...bni', R_p2g, C_g)
+            C_p_noDrag = np.einsum('...bji,...bnj->...bni', R_p2g, np.einsum('...bnij,...bnj->...bni', R_a2g, C_a_noDrag))
             # Project elementary radial element ds vs dr
             # 
             # Cn and Ct 
             if (p.bAIDrag):
-                cnForAI = C_p[:,:,0]
+                cnForAI = C_p[...,0]
             else:
-                cnForAI = C_p_noDrag[:,:,0]
+                cnForAI = C_p_noDrag[...,0]
             if (p.bTIDrag):
-                ctForTI = C_p[:,:,1]
+                ctForTI = C_p[...,1]
             else:
-                ctForTI = C_p_noDrag[:,:,1]
+                ctForTI = C_p_noDrag[...,1]
             # L = 0.5 * p.rho * Vrel_norm**2 * p.chord[ie]*Cl
             # --------------------------------------------------------------------------------
             # --- Step 5: Quasi-steady induction
             # --------------------------------------------------------------------------------
             # NOTE: all is done in polar grid
-            #lambda_r = Vstr_p[:,:,1]/Vwnd_p[:,:,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
-            lambda_r = -Vflw_p[:,:,1]/Vflw_p[:,:,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
-            #lambda_r = Vflw_p[:,:,1]/Vflw_p[:,:,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
-            #V0       = np.sqrt(Vwnd_p[:,:,0]**2 + Vwnd_p[:,:,1]**2) # TODO think about that # TODO TODO TOD
-            V0       = np.sqrt(Vflw_p[:,:,0]**2 + Vwnd_p[:,:,1]**2) # TODO think about that
+            #lambda_r = Vstr_p[...,1]/Vwnd_p[...,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
+            lambda_r = -Vflw_p[...,1]/Vflw_p[...,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
+            #lambda_r = Vflw_p[...,1]/Vflw_p[...,0] # "omega r/ U0n" defined in polar grid # TODO TODO TODO
+            #V0       = np.sqrt(Vwnd_p[...,0]**2 + Vwnd_p[...,1]**2) # TODO think about that # TODO TODO TOD
+            V0       = np.sqrt(Vflw_p[...,0]**2 + Vwnd_p[...,1]**2) # TODO think about that
             sigma    = p.chord*p.nB/(2*pi*r_p) # NOTE: using radius in polar grid
             #a,aprime,CT = fInductionCoefficients(a_last,Vrel_in4,Un,Ut,V0_in3,V0_in4,nnW_in4,omega,chord(e),F,Ftip,CnForAI,CtForTI,lambda_r,sigma(e),phi,Algo)
             if p.WakeMod==0:
@@ -663,142 +659,110 @@ class UnsteadyBEM():
                         algorithm=self.algorithm, drdz=drdz
                 )
                 # TODO consider using these
-                k  = sigma*cnForAI/(4*F)*Vrel_norm_a**2/(Vrel_p[:,:,0]**2)            /drdz
-                kp =-sigma*ctForTI/(4*F)*Vrel_norm_a**2/(Vrel_p[:,:,0]*Vrel_p[:,:,1]) /drdz # NOTE: yp has different convention OpenFAST/WELIB
-                #a[:,:]      = 0.3
-                #aprime[:,:] = 0.02
+                #k  = sigma*cnForAI/(4*F)*Vrel_norm_a**2/(Vrel_p[...,0]**2)            /drdz
+                #kp =-sigma*ctForTI/(4*F)*Vrel_norm_a**2/(Vrel_p[...,0]*Vrel_p[...,1]) /drdz # NOTE: yp has different convention OpenFAST/WELIB
 
             if np.any(np.isnan(a)):
                 print('>> BEM crashing')
 
             # Storing last values, for relaxation
-            xd1.a=a.copy()
+            xd1.a[:] = a
             # Quasi steady inductions, polar and global coordinates
-            xd1.Vind_qs_p = np.zeros((nB,nr,3))
-            for iB in np.arange(nB):
-                R_p2g = R_ntr2g[iB]
-                for ie in np.arange(nr):
-                    # NOTE: Vind is negative along n and t!
-                    xd1.Vind_qs_p[iB,ie] = np.array([-a[iB,ie]*Vflw_p[iB,ie,0],  aprime[iB,ie]*Vflw_p[iB,ie,1], 0])
-                    xd1.Vind_qs_g[iB,ie] = R_p2g.dot(xd1.Vind_qs_p[iB,ie]) # global
+            # NOTE: Vind is negative along n and t!
+            xd1.Vind_qs_p[...,0] = -a*Vflw_p[...,0]
+            xd1.Vind_qs_p[...,1] = aprime*Vflw_p[...,1]
+            xd1.Vind_qs_p[...,2] = 0
+            np.einsum('...bij,...bnj->...bni', R_p2g, xd1.Vind_qs_p, out=xd1.Vind_qs_g) # global
 
             if firstCallEquilibrium:
                 # We update the previous states induction
-                xd0.a      = a.copy()
-                xd0.Vind_g = xd1.Vind_qs_g.copy()
-                xd0.Vind_p = xd1.Vind_qs_p.copy()
-            #print('')
-            #print('Vflw',Vflw_p[0,19,:])
-            #print('F      ',F[0,19])
-            #print('phi tl ',phi_tl[0,19])
-            #print('sigma  ',sigma[0,19])
-            #print('Vrel_p ',Vrel_p[0,19,:])
-            #print('Vrel_a ',Vrel_a[0,19,:])
-            #print('cn     ',cnForAI[0,19], ctForTI[0,19])
-            #print('drdz   ',drdz) # TODO
-            #print('k      ',k[0,19], kp[0,19])
-
-
+                xd0.a[:]      = a
+                xd0.Vind_g[:] = xd1.Vind_qs_g
+                xd0.Vind_p[:] = xd1.Vind_qs_p
 
         if firstCallEquilibrium:
             # Initialize dynamic wake variables
-            xd0.Vind_qs_p  = xd1.Vind_qs_p.copy()
-            xd1.Vind_qs_p  = xd1.Vind_qs_p.copy()
-            xd0.Vind_int_p = xd1.Vind_qs_p.copy()
-            xd0.Vind_dyn_p = xd1.Vind_qs_p.copy()
+            xd0.Vind_qs_p[:]  = xd1.Vind_qs_p
+            xd0.Vind_int_p[:] = xd1.Vind_qs_p
+            xd0.Vind_dyn_p[:] = xd1.Vind_qs_p
         # --------------------------------------------------------------------------------
         # --- Dynamic wake model, in polar coordinates (for "constant" structural velocity)
         # --------------------------------------------------------------------------------
         if (p.bDynaWake):
-            a_avg = min([np.mean(a),0.5])
-            V_avg = max([np.mean(V0),0.001])
-            tau1 = 1.1 / (1 - 1.3 *a_avg)*R_p/V_avg
-            tau2 = (0.39 - 0.26 * (r_p/R_p)**2) * tau1
-            tau2 = np.tile(tau2[:,:,None],3)
+            a_avg = np.minimum(np.mean(a, axis=(-2,-1)),0.5)
+            V_avg = np.maximum(np.mean(V0, axis=(-2,-1)),0.001)
+            tau1 = (1.1 / (1 - 1.3 *a_avg)*R_p/V_avg)[...,None,None,None]
+            tau2 = (0.39 - 0.26 * (r_p/R_p_)**2)[...,None] * tau1
             # Oye's dynamic inflow model, discrete time integration
-            H              = xd1.Vind_qs_p + 0.6 * tau1 * (xd1.Vind_qs_p - xd0.Vind_qs_p) /dt
-            xd1.Vind_int_p = H + (xd0.Vind_int_p - H) * exp(-dt/tau1) # intermediate velocity
-            xd1.Vind_dyn_p = xd1.Vind_int_p + (xd0.Vind_dyn_p - xd1.Vind_int_p) * exp(-dt/tau2)
+            H                 = xd1.Vind_qs_p + 0.6 * tau1 * (xd1.Vind_qs_p - xd0.Vind_qs_p) /dt
+            xd1.Vind_int_p[:] = H + (xd0.Vind_int_p - H) * exp(-dt/tau1) # intermediate velocity
+            xd1.Vind_dyn_p[:] = xd1.Vind_int_p + (xd0.Vind_dyn_p - xd1.Vind_int_p) * exp(-dt/tau2)
             # In global
-            for iB in np.arange(nB):
-                R_p2g = R_ntr2g[iB]
-                for ie in np.arange(nr):
-                    xd1.Vind_dyn_g[iB,ie] = R_p2g.dot(xd1.Vind_dyn_p[iB,ie]) # global
+            np.einsum('...bij,...bnj->...bni', R_p2g, xd1.Vind_dyn_p, out=xd1.Vind_dyn_g) # global
         else:
-            xd1.Vind_dyn_g = xd1.Vind_qs_g.copy()
-            xd1.Vind_dyn_p = xd1.Vind_qs_p.copy()
+            xd1.Vind_dyn_g[:] = xd1.Vind_qs_g
+            xd1.Vind_dyn_p[:] = xd1.Vind_qs_p
 
         # --------------------------------------------------------------------------------}
         # --- Disk averaged quantities
         # --------------------------------------------------------------------------------{
         # Average wind in global, and rotor coord
-        Vwnd_avg_g = np.mean(np.mean(Vwnd_gl[:,:,:],axis=0),axis=0)
-        Vwnd_avg_r = (R_r2g.T).dot(Vwnd_avg_g)
+        Vwnd_avg_g = np.mean(Vwnd_gl, axis=(-3,-2))
+        Vwnd_avg_r = np.einsum('...ji,...j->...i', R_r2g, Vwnd_avg_g)
         # Average relative wind (Wnd-Str)
-        Vflw_avg_g = np.mean(np.mean(Vflw_g[:,:,:],axis=0),axis=0)
-        x_hat_disk = R_r2g[:,0]
+        Vflw_avg_g = np.mean(Vflw_g, axis=(-3,-2))
+        x_hat_disk = R_r2g[...,:,0]
         # Coordinate system with "y" in the cross wind direction for skew model
-        V_dot_x  = np.dot(Vflw_avg_g, x_hat_disk)
-        V_ytmp   = V_dot_x * x_hat_disk - Vflw_avg_g
-        V_ynorm  = sqrt(V_ytmp[0]**2+V_ytmp[1]**2+V_ytmp[2]**2)
-        if abs(V_ynorm)<1e-8:
-            y_hat_disk = R_r2g[:,1]
-            z_hat_disk = R_r2g[:,2]
-        else:
-            y_hat_disk = V_ytmp / V_ynorm
-            z_hat_disk = np.cross(Vflw_avg_g, x_hat_disk ) / V_ynorm
+        V_dot_x  = np.sum(Vflw_avg_g*x_hat_disk, axis=-1)
+        V_ytmp   = V_dot_x[...,None] * x_hat_disk - Vflw_avg_g
+        V_ynorm  = sqrt(V_ytmp[...,0]**2+V_ytmp[...,1]**2+V_ytmp[...,2]**2)
+        bAligned = (abs(V_ynorm)<1e-8)[...,None]
+        V_ynorm  = np.where(bAligned[...,0], 1, V_ynorm)[...,None]
+        y_hat_disk = np.where(bAligned, R_r2g[...,:,1], V_ytmp / V_ynorm)
+        z_hat_disk = np.where(bAligned, R_r2g[...,:,2], np.cross(Vflw_avg_g, x_hat_disk ) / V_ynorm)
         # Fake "Azimuth angle" used for skew model
-        SkewAzimuth=np.zeros(nB)
-        for iB in np.arange(nB):
-            z_hat = R_ntr2g[iB][:,2]
-            tmp_sz_y = -1.0*np.dot(z_hat,y_hat_disk)
-            tmp_sz   =      np.dot(z_hat,z_hat_disk)
-            if np.abs(tmp_sz_y)<1e-8 and np.abs(tmp_sz)<1e-8:
-                SkewAzimuth[iB]=0
-            else:
-                SkewAzimuth[iB] = arctan2( tmp_sz_y, tmp_sz )
+        z_hat = R_p2g[...,:,2] # ... x nB x 3
+        tmp_sz_y = -1.0*np.einsum('...bj,...j->...b', z_hat, y_hat_disk)
+        tmp_sz   =      np.einsum('...bj,...j->...b', z_hat, z_hat_disk)
+        SkewAzimuth = arctan2( tmp_sz_y, tmp_sz )
+        SkewAzimuth[np.logical_and(np.abs(tmp_sz_y)<1e-8, np.abs(tmp_sz)<1e-8)] = 0
         # Skew angle without induction
-        Vw_r = (R_r2g.T).dot(Vflw_avg_g)
-        Vw_rn     = Vw_r[0] # normal to disk
-        Vw_r_norm = sqrt(Vw_r[0]**2+Vw_r[1]**2+Vw_r[2]**2)
+        Vw_r = np.einsum('...ji,...j->...i', R_r2g, Vflw_avg_g)
+        Vw_rn     = Vw_r[...,0] # normal to disk
+        Vw_r_norm = sqrt(Vw_r[...,0]**2+Vw_r[...,1]**2+Vw_r[...,2]**2)
         chi0      = np.arccos(Vw_rn / Vw_r_norm)
 
         # --------------------------------------------------------------------------------
         # ---  Yaw model, repartition of the induced velocity
         # --------------------------------------------------------------------------------
         if p.bYawModel:
-           #xd1.Vind_g = xd1.Vind_dyn_g.copy()
-           #xd1.Vind_p = xd1.Vind_dyn_p.copy()
            #psi0 = np.arctan( Vwnd_avg_g[2]/Vwnd_avg_r[1])  # TODO
            # Sections that are about 0.7%R
-           Ir= np.logical_and(r_p[0]>=0.5*R_p, r_p[0] <=0.8*R_p)
+           Ir= np.logical_and(r_p[...,0,:]>=0.5*R_p[...,None], r_p[...,0,:] <=0.8*R_p[...,None])
            if len(Ir)==0:
-               Ir=r_p[0]>0
-           Vind_avg_g = np.mean(np.mean(xd1.Vind_dyn_g[:,Ir,:],axis=0),axis=0)
-           Vind_avg_r = (R_r2g.T).dot(Vind_avg_g)
+               Ir=r_p[...,0,:]>0
+           # Average over all blades and selected sections
+           wr = Ir[...,None,:,None] / (nB*np.sum(Ir, axis=-1))[...,None,None,None]
+           Vind_avg_g = np.sum(xd1.Vind_dyn_g*wr, axis=(-3,-2))
+           Vind_avg_r = np.einsum('...ji,...j->...i', R_r2g, Vind_avg_g)
            # Skew angle with induction
            V_r      = Vwnd_avg_r + Vind_avg_r
-           V_rn     = V_r[0] # normal to disk
-           V_r_norm = sqrt(V_r[0]**2+V_r[1]**2+V_r[2]**2)
+           V_rn     = V_r[...,0] # normal to disk
+           V_r_norm = sqrt(V_r[...,0]**2+V_r[...,1]**2+V_r[...,2]**2)
            chi = np.arccos(V_rn/V_r_norm)
            #print('chi0',chi0*180/pi,'chi',chi*180/pi,'psi0',psi0*180/np.pi)
-           if np.abs(chi)>pi/2:
+           if np.any(np.abs(chi)>pi/2):
                print('>>> chi too large')
            yawCorrFactor = 15*np.pi/32 # close to 3/2
-           for iB in np.arange(nB):
-               R_p2g = R_ntr2g[iB]
-               for ie in np.arange(nr):
-                   xd1.Vind_p[iB,ie] = xd1.Vind_dyn_p[iB,ie]
-                   xd1.Vind_p[iB,ie,0] = xd1.Vind_dyn_p[iB,ie,0] * (1 + yawCorrFactor*r_p[iB,ie]/R_p * np.tan(chi/2)*np.sin(SkewAzimuth[iB])) #* np.cos(psiB0[iB]+psi - psi0))
-                   xd1.Vind_g[iB,ie] = R_p2g.dot(xd1.Vind_p[iB,ie]) # global
-                   # AeroDyn:
-                   #chi = (0.6_ReKi*a + 1.0_ReKi)*chi0
-                   #a = a * (1.0 +  yawCorrFactor * yawCorr_tan * (tipRatio) * sin(azimuth))
-
-
+           xd1.Vind_p[:] = xd1.Vind_dyn_p
+           xd1.Vind_p[...,0] = xd1.Vind_dyn_p[...,0] * (1 + yawCorrFactor*r_p/R_p_ * np.tan(chi/2)[...,None,None]*np.sin(SkewAzimuth[...,None])) #* np.cos(psiB0[iB]+psi - psi0))
+           np.einsum('...bij,...bnj->...bni', R_p2g, xd1.Vind_p, out=xd1.Vind_g) # global
+           # AeroDyn:
+           #chi = (0.6_ReKi*a + 1.0_ReKi)*chi0
+           #a = a * (1.0 +  yawCorrFactor * yawCorr_tan * (tipRatio) * sin(azimuth))
         else:
-           xd1.Vind_g = xd1.Vind_dyn_g.copy()
-           xd1.Vind_p = xd1.Vind_dyn_p.copy()
+           xd1.Vind_g[:] = xd1.Vind_dyn_g
+           xd1.Vind_p[:] = xd1.Vind_dyn_p
         # --------------------------------------------------------------------------------
         # --- Step 6: Outputs
         # --------------------------------------------------------------------------------
@@ -807,37 +771,37 @@ class UnsteadyBEM():
         self.Cl[it]   = Cl
         self.Cd[it]   = Cd
         self.Cm[it]   = Cm
-        self.cn[it]   = C_p[:,:,0]
-        self.ct[it]   = C_p[:,:,1]
+        self.cn[it]   = C_p[...,0]
+        self.ct[it]   = C_p[...,1]
         # C_g also available
         # --- Loads
         q_dyn = 0.5 * p.rho * Vrel_norm_a**2 * p.chord # dynamic pressure
         self.L[it]    = q_dyn * Cl
         self.D[it]    = q_dyn * Cd
         self.Mm[it]   = q_dyn * Cm * p.chord
-        self.Fn[it]   = q_dyn * C_p[:,:,0]
-        self.Ft[it]   = q_dyn * C_p[:,:,1]
-        self.F_a[it,:,:,0] = q_dyn * C_xa
-        self.F_a[it,:,:,1] = q_dyn * C_ya
+        self.Fn[it]   = q_dyn * C_p[...,0]
+        self.Ft[it]   = q_dyn * C_p[...,1]
+        self.F_a[it][...,0] = q_dyn * C_xa
+        self.F_a[it][...,1] = q_dyn * C_ya
         # --- Velocities
-        a_dyn      =-xd1.Vind_p[:,:,0]/Vflw_p[:,:,0] 
-        aprime_dyn = xd1.Vind_p[:,:,1]/Vflw_p[:,:,1]
+        a_dyn      =-xd1.Vind_p[...,0]/Vflw_p[...,0] 
+        aprime_dyn = xd1.Vind_p[...,1]/Vflw_p[...,1]
         self.AxInd[it] = a_dyn      
         self.TnInd[it] = aprime_dyn 
         self.Vrel[it]  = Vrel_norm_a
         # polar system (missing Vind)
-        self.Vrel_p[it]  = Vrel_p[:,:,:] # NOTE: Vrel is using previous inductions..
-        self.Vstr_p[it]  = Vstr_p[:,:,:]
-        self.Vwnd_p[it]  = Vwnd_p[:,:,:]
-        self.Vflw_p[it]  = Vflw_p[:,:,:]
-        self.Vind_qs_p[it] = xd1.Vind_qs_p[:,:,:]
-        self.RtVAvg[it]  = (R_r2g.T).dot(Vflw_avg_g) # in Hub/rotor coordinate
+        self.Vrel_p[it]  = Vrel_p # NOTE: Vrel is using previous inductions..
+        self.Vstr_p[it]  = Vstr_p
+        self.Vwnd_p[it]  = Vwnd_p
+        self.Vflw_p[it]  = Vflw_p
+        self.Vind_qs_p[it] = xd1.Vind_qs_p
+        self.RtVAvg[it]  = np.einsum('...ji,...j->...i', R_r2g, Vflw_avg_g) # in Hub/rotor coordinate
         self.SkewAzimuth[it]  = SkewAzimuth*180/pi
         self.chi0[it]  = chi0*180/pi
         # airfoil system
-        self.Vrel_xa[it] = Vrel_a[:,:,0]
-        self.Vrel_ya[it] = Vrel_a[:,:,1]
-        self.Vrel_za[it] = Vrel_a[:,:,2]
+        self.Vrel_xa[it] = Vrel_a[...,0]
+        self.Vrel_ya[it] = Vrel_a[...,1]
+        self.Vrel_za[it] = Vrel_a[...,2]
         # --- Misc
         self.alpha[it] = alpha*180./pi
         self.phi[it]   = phi*180./pi
@@ -846,41 +810,26 @@ class UnsteadyBEM():
         self.Omega[it]  = Omega*60/(2*np.pi) # [rpm]
         self.RtArea[it]  = pi*R_p**2
 
-        for iB in np.arange(nB):
-            R_p2g = R_ntr2g[iB]
-            for ie in np.arange(nr):
-                Vind_g = xd1.Vind_g[iB,ie] # dynamic inductions at current time step
-                Vind_s = (R_s2g[iB,ie].T).dot(Vind_g) # Induced velocity in section coordinates
-                #Vind_a = (R_a2g[iB,ie].T).dot(Vind_g) # Induced velocity in airfoil coordinates
-                Vind_p = (R_p2g       .T).dot(Vind_g) # Induced velocity in polar coordinates
-                self.Vind_p[it,iB,ie,:] =Vind_p
-                self.Vind_s[it,iB,ie,:] =Vind_s
-                ## Wind
-                Vwnd_g = Vwnd_gl[iB,ie]
-                Vwnd_s = (R_s2g[iB,ie].T).dot(Vwnd_g) # Wind Velocity in section coordinates
-                #Vwnd_a = (R_a2g[iB,ie].T).dot(Vwnd_gl) # Wind Velocity in airfoil coordinates
-                self.Vwnd_s[it,iB,ie,:]=Vwnd_s
-                ## Structural velocity
-                Vstr_g = Vstr_gl[iB,ie]
-                #Vstr_a = (R_a2g[iB,ie].T).dot(Vstr_g) # Structural velocity in airfoil coordinates
-                self.Vstr_s[it,iB,ie,:]=(R_s2g[iB,ie].T).dot(Vstr_g)
-                # --- Loads
-                F_g = q_dyn[iB,ie] * C_g[iB,ie]
-                self.F_s[it,iB,ie] = (R_s2g[iB,ie].T).dot(F_g)
+        # Induced velocity, wind, structural velocity and loads in section coordinates
+        np.einsum('...bnji,...bnj->...bni', R_s2g, xd1.Vind_g, out=self.Vind_s[it])
+        np.einsum('...bji,...bnj->...bni' , R_p2g, xd1.Vind_g, out=self.Vind_p[it])
+        np.einsum('...bnji,...bnj->...bni', R_s2g, Vwnd_gl   , out=self.Vwnd_s[it])
+        np.einsum('...bnji,...bnj->...bni', R_s2g, Vstr_gl   , out=self.Vstr_s[it])
+        np.einsum('...bnji,...bnj->...bni', R_s2g, q_dyn[...,None]*C_g, out=self.F_s[it])
 
         # --- Integral quantities for rotor
         if self.bUseCm:
-            Mz  = np.trapz(self.Mm[it,0], r_p) # TODO TODO TODO first blade
+            Mz  = np.trapz(self.Mm[it][...,0:1,:], r_p) # TODO TODO TODO first blade
             QMz = Mz * np.sin(kappa*np.pi/180) # Contribution for one blade TODO TODO TODO
         else:
             QMz = 0
 
         # --- Integral quantities for rotor
         # TODO integration should be with r_b and using forces on airfoil
-        self.BladeThrust[it,:] = np.trapz(self.Fn[it,:]    , r_p)       # Normal to rotor plane
-        self.BladeTorque[it,:] = np.trapz(self.Ft[it,:]*r_p, r_p) +QMz  # About shaft 
-        self.Thrust[it] = np.sum(self.BladeThrust[it,:])            # Normal to rotor plane
-        self.Torque[it] = np.sum(self.BladeTorque[it,:])
+        self.BladeThrust[it] = np.trapz(self.Fn[it]    , r_p)       # Normal to rotor plane
+        self.BladeTorque[it] = np.trapz(self.Ft[it]*r_p, r_p) +QMz  # About shaft 
+        self.Thrust[it] = np.sum(self.BladeThrust[it], axis=-1)            # Normal to rotor plane
+        self.Torque[it] = np.sum(self.BladeTorque[it], axis=-1)
         self.Power[it]  = Omega*self.Torque[it]
             # TODO TODO
             #self.BladeEdge   = np.zeros((nt,nB))
@@ -942,7 +891,7 @@ class UnsteadyBEM():
         self.timeStepInit(time[0],time[-1],dt) 
         for it,t in enumerate(self.time):
             motion.update(t)
-            u,v,w = windFunction(motion.pos_gl[:,:,0], motion.pos_gl[:,:,1], motion.pos_gl[:,:,2], t)  
+            u,v,w = windFunction(motion.pos_gl[...,0], motion.pos_gl[...,1], motion.pos_gl[...,2], t)  
             Vwnd_g = np.moveaxis(np.array([u,v,w]),0,-1) # nB x nr x 3
             xdBEM = self.timeStep(t, dt, xdBEM, motion.psi, motion.psi_B0,
                     motion.origin_pos_gl, motion.omega_gl, motion.R_b2g, 
@@ -959,6 +908,110 @@ class UnsteadyBEM():
         df = self.toDataFrame()
         return df
 
+    def simulationEnsemble(self, time, RPM, windSpeed=None, windExponent=None, windRefH=None, windFunction=None, nCases=None,
+            cone=0, tilt=0, hubHeight=None, firstCallEquilibrium=True, nProcs=1, longFormat=False):
+        """ 
+        Perform nCases simulations at constant RPM simultaneously (e.g. different turbulent seeds).
+        The cases are advanced together in one time loop, with a leading "case" dimension for all quantities.
+
+        INPUTS:
+          - RPM: scalar or array of length nCases
+        Different ways to specify wind:
+          - windSpeed: scalar or array of length nCases, wind speed (at hub height) along x
+          - windExponent power law exponent speed for wind speed (None=uniform wind)
+          - windRefH reference height for power law
+        OR
+          - windFunction: 
+             - list of nCases functions with interface: f(x,y,z,t)=u,v,w (same as simulationConstantRPM)
+             - or one function with the same interface, where x,y,z,u,v,w have shape nCases x nB x nr
+        - nCases: number of cases, only needed if it cannot be inferred from the inputs above
+        - nProcs: number of processes. If >1, blocks of cases are distributed to a pool of processes, 
+                  in which case windFunction needs to be a list of picklable functions (no lambdas)
+        - longFormat: if True, return one dataframe with a column "Case", otherwise a list of dataframes
+        - see simulationConstantRPM for the other inputs
+
+        """
+        # --- Number of cases
+        if isinstance(windFunction, (list, tuple)):
+            nCases = len(windFunction)
+        elif nCases is None:
+            nCases = max(np.size(RPM), np.size(windSpeed) if windSpeed is not None else 1)
+        RPM = np.broadcast_to(RPM, (nCases,))
+        if windSpeed is not None:
+            windSpeed = np.broadcast_to(windSpeed, (nCases,))
+
+        if nProcs>1 and nCases>1:
+            # --- Distribute blocks of cases to a pool of processes
+            from concurrent.futures import ProcessPoolExecutor
+            if windFunction is not None and not isinstance(windFunction, (list, tuple)):
+                raise Exception('When using nProcs>1, windFunction must be a list of functions (one per case)')
+            blocks = [I for I in np.array_split(np.arange(nCases), nProcs) if len(I)>0]
+            kwargs = dict(windExponent=windExponent, windRefH=windRefH, cone=cone, tilt=tilt, hubHeight=hubHeight, firstCallEquilibrium=firstCallEquilibrium)
+            with ProcessPoolExecutor(max_workers=len(blocks)) as executor:
+                futures = [executor.submit(_simulationEnsembleBlock, self, time, RPM[I],
+                    windSpeed = None if windSpeed is None else windSpeed[I],
+                    windFunction = None if windFunction is None else [windFunction[i] for i in I],
+                    **kwargs) for I in blocks]
+                dfs = [df for fut in futures for df in fut.result()]
+        else:
+            # --- Define motion
+            motion = PrescribedRotorMotion()
+            motion.init_from_BEM(self, tilt=tilt, cone=cone, psi0=0, nCases=nCases)
+            motion.setType('constantRPM', RPM=RPM)
+            if hubHeight is not None:
+                motion.origin_pos_gl0=np.array([0,0,hubHeight])
+
+            # --- Define wind function, vectorized over cases
+            if windFunction is None:
+                if windExponent is None:
+                    fWind = lambda x,y,z,t : (np.ones(x.shape)*windSpeed[:,None,None], np.zeros(x.shape), np.zeros(y.shape))
+                else:
+                    if windRefH is None:
+                        raise Exception('Hub height needs to be provided')
+                    fWind = lambda x,y,z,t : (np.ones(x.shape)*windSpeed[:,None,None]*(z/windRefH)**windExponent, np.zeros(x.shape), np.zeros(x.shape))
+            elif isinstance(windFunction, (list, tuple)):
+                def fWind(x,y,z,t):
+                    UVW = [f(x[i],y[i],z[i],t) for i,f in enumerate(windFunction)]
+                    return tuple(np.array([uvw[j] for uvw in UVW]) for j in range(3))
+            else:
+                fWind = windFunction
+
+            # --- Perform time loop
+            dt=time[1]-time[0]
+            xdBEM = self.getInitStates(nCases=nCases)
+            self.timeStepInit(time[0],time[-1],dt, nCases=nCases) 
+            for it,t in enumerate(self.time):
+                motion.update(t)
+                u,v,w = fWind(motion.pos_gl[...,0], motion.pos_gl[...,1], motion.pos_gl[...,2], t)  
+                Vwnd_g = np.moveaxis(np.array([u,v,w]),0,-1) # nCases x nB x nr x 3
+                xdBEM = self.timeStep(t, dt, xdBEM, motion.psi, motion.psi_B0,
+                        motion.origin_pos_gl, motion.omega_gl, motion.R_b2g, 
+                        motion.R_ntr2g,
+                        motion.R_bld2b, # From blades 2 rotor/shaft
+                        motion.pos_gl, motion.vel_gl, motion.R_s2g, motion.R_a2g,
+                        Vwnd_g,
+                        firstCallEquilibrium= it==0 and firstCallEquilibrium,
+                        kappa=cone # TODO TODO TODO get rid of me!
+                        )
+            dfs = [self._caseView(i).toDataFrame() for i in range(nCases)]
+        if longFormat:
+            return pd.concat([df.assign(Case=i) for i,df in enumerate(dfs)], ignore_index=True)
+        return dfs
+
+    def _caseView(self, iCase):
+        """ Return a shallow copy of self where the time series of an ensemble simulation are restricted to one case """
+        BEM = copy.copy(self)
+        nt = len(self.time)
+        for k, v in self.__dict__.items():
+            if isinstance(v, np.ndarray) and v.ndim>=2 and v.shape[:2]==(nt, self.nCases):
+                setattr(BEM, k, v[:,iCase])
+        BEM.nCases = None
+        return BEM
+
+def _simulationEnsembleBlock(BEM, time, RPM, **kwargs):
+    """ Simulate a block of cases, used by simulationEnsemble to distribute cases to processes """
+    return BEM.simulationEnsemble(time, RPM, nProcs=1, **kwargs)
+
 # --------------------------------------------------------------------------------}
 # --- Utils common between steady and unsteady BEM
 # --------------------------------------------------------------------------------{
@@ -1062,6 +1115,19 @@ def _fInductionCoefficients(Vrel_norm, V0, F, cnForAI, ctForTI,
 # --- Helper class to prescribe a motion
 # --------------------------------------------------------------------------------{
 from welib.yams.utils import R_x, R_y, R_z
+
+def _R_x(t):
+    """ Rotation matrices about x for an array of angles t, returns an array of shape t.shape+(3,3) """
+    t = np.asarray(t)
+    c, s = np.cos(t), np.sin(t)
+    R = np.zeros(t.shape+(3,3))
+    R[...,0,0] = 1
+    R[...,1,1] = c
+    R[...,1,2] =-s
+    R[...,2,1] = s
+    R[...,2,2] = c
+    return R
+
 class PrescribedRotorMotion():
     """ 
     Class to return:
@@ -1083,9 +1149,13 @@ class PrescribedRotorMotion():
         # Blades 
         self.R_bld2b=None # rotation matrices from blades to body (i.e. rotor), contains azimuth and cone
 
-    def init_from_inputs(self,  nB, r, twist, rotorOrigin, tilt, cone, psi0=0):
+    def init_from_inputs(self,  nB, r, twist, rotorOrigin, tilt, cone, psi0=0, nCases=None):
+        """ 
+        nCases: if provided, all kinematic quantities have a leading dimension of size nCases (ensemble simulations)
+        """
         # TODO TODO Pitch!
         self.nB   =  nB
+        self.nCases = nCases
         self.cone = cone*np.pi/180
         self.tilt = -tilt*np.pi/180 
         self.r     = r               # spanwise position, from hub center (typically r= HubRad->TipRad)
@@ -1119,12 +1189,13 @@ class PrescribedRotorMotion():
                 self.R_a02b[iB,ir,:,:] = self.R_bld2b[iB].dot(R_a2bld)   # TODO curvature
                 self.R_s02b[iB,ir,:,:] = self.R_bld2b[iB]                # TODO curvature
 
-    def init_from_BEM(self, BEM, tilt=None, cone=None, psi0=0):
+    def init_from_BEM(self, BEM, tilt=None, cone=None, psi0=0, nCases=None):
         """ 
         Initializes motion from a BEM class
         Possibility to override the tilt and cone geometry:
         tilt: tilt angle in deg, with OpenFAST convention
         cone: cone angle in deg, with OpenFAST convention
+        nCases: number of cases simulated simultaneously (None: single case)
         
         """
         if tilt is None:
@@ -1133,7 +1204,7 @@ class PrescribedRotorMotion():
             cone=BEM.cone0
 
         rotorOrigin =[BEM.OverHang*np.cos(-tilt*np.pi/180), 0, BEM.TowerHt+BEM.Twr2Shft-BEM.OverHang*np.sin(-tilt*np.pi/180)]
-        self.init_from_inputs(BEM.nB, BEM.r, BEM.twist, rotorOrigin, tilt=tilt, cone=cone, psi0=0)
+        self.init_from_inputs(BEM.nB, BEM.r, BEM.twist, rotorOrigin, tilt=tilt, cone=cone, psi0=0, nCases=nCases)
 
     def allocate(self):
         nr = len(self.r)
@@ -1141,10 +1212,11 @@ class PrescribedRotorMotion():
         self.pos0    = np.zeros((self.nB,nr,3))   # position of nodes at t= 0 in body coordinates 
         self.R_s02b  = np.zeros((self.nB,nr,3,3)) # Orientation section to body at t=0
         self.R_a02b  = np.zeros((self.nB,nr,3,3)) # Orientation airfoil to body at t=0
-        self.pos_gl = np.zeros((self.nB,nr,3))   # position of all nodes
-        self.vel_gl = np.zeros((self.nB,nr,3))   # linear velocities
-        self.R_s2g  = np.zeros((self.nB,nr,3,3)) # Orientation section to global
-        self.R_a2g  = np.zeros((self.nB,nr,3,3)) # Orientation airfoil to global
+        lead = () if self.nCases is None else (self.nCases,)
+        self.pos_gl = np.zeros(lead+(self.nB,nr,3))   # position of all nodes
+        self.vel_gl = np.zeros(lead+(self.nB,nr,3))   # linear velocities
+        self.R_s2g  = np.zeros(lead+(self.nB,nr,3,3)) # Orientation section to global
+        self.R_a2g  = np.zeros(lead+(self.nB,nr,3,3)) # Orientation airfoil to global
         self.R_ntr2g = [np.eye(3)]*self.nB
 
     def setType(self, sType, **kwargs):
@@ -1155,59 +1227,64 @@ class PrescribedRotorMotion():
         """
         Update position, velocities, orientations of nodes assuming a rigid body motion
         of the origin given as input
+        For ensemble simulations, the inputs have a leading dimension nCases
         """
         self.origin_pos_gl = P_gl
         self.origin_vel_gl = vel_gl
         self.omega_gl      = omega_gl
         self.R_b2g         = R_b2g
 
-        # Update of positions
-        for iB in np.arange(self.nB):
-            self.R_ntr2g[iB] = R_b2g.dot(self.R_ntr2b[iB])
-            for ir in np.arange(len(self.r)):
-                s_OP =  R_b2g.dot(self.pos0[iB,ir,:])
-                self.pos_gl[iB,ir,:] = P_gl   + s_OP
-                self.vel_gl[iB,ir,:] = vel_gl + np.cross(omega_gl, s_OP)
-                self.R_s2g[iB,ir,:,:] = R_b2g.dot(self.R_s02b[iB,ir,:])
-                self.R_a2g[iB,ir,:,:] = R_b2g.dot(self.R_a02b[iB,ir,:])
+        # Update of positions, for all blades and nodes
+        self.R_ntr2g = np.einsum('...ij,bjk->...bik', R_b2g, np.asarray(self.R_ntr2b))
+        s_OP = np.einsum('...ij,bnj->...bni', R_b2g, self.pos0)
+        self.pos_gl[:] = np.asarray(P_gl)  [...,None,None,:] + s_OP
+        self.vel_gl[:] = np.asarray(vel_gl)[...,None,None,:] + np.cross(np.asarray(omega_gl)[...,None,None,:], s_OP)
+        np.einsum('...ij,bnjk->...bnik', R_b2g, self.R_s02b, out=self.R_s2g)
+        np.einsum('...ij,bnjk->...bnik', R_b2g, self.R_a02b, out=self.R_a2g)
 
     def update(self, t):
+        """ 
+        Update the motion at time t.
+        For ensemble simulations, the options (RPM, amplitude, frequency) may be arrays of length nCases
+        """
+        lead = () if self.nCases is None else (self.nCases,)
+        zeros = np.zeros(lead)
         if self.sType=='constantRPM':
-            omega = self.opts['RPM']*2.*np.pi/(60.)
+            omega = self.opts['RPM']*2.*np.pi/(60.) + zeros
             psi = t*omega
-            pos = self.origin_pos_gl0
-            vel = np.array([0,0,0])
-            ome = self.R_b2g0.dot(np.array([omega,0,0]))
-            R_b2g = self.R_b2g0.dot(R_x(psi))
-            self.rigidbodyKinUpdate(pos, vel, ome, R_b2g)
+            pos = self.origin_pos_gl0 + zeros[...,None]
+            vel = np.zeros(lead+(3,))
+            ome = self.R_b2g0.dot(np.array([omega,zeros,zeros]))
+            R_b2g = np.matmul(self.R_b2g0, _R_x(psi))
+            self.rigidbodyKinUpdate(pos, vel, np.moveaxis(ome,0,-1), R_b2g)
             self.psi=psi # hack
 
         elif self.sType=='x-oscillation':
             omega = self.opts['frequency']*2.*np.pi
             A = self.opts['amplitude']
-            x    = A*np.sin(omega*t)
-            xdot = A*omega*np.cos(omega*t)
-            pos = self.origin_pos_gl0+np.array([x,0,0])
-            vel = np.array([xdot,0,0])
-            ome = np.array([0,0,0])
-            R_b2g =self.R_b2g0
+            x    = A*np.sin(omega*t)        + zeros
+            xdot = A*omega*np.cos(omega*t) + zeros
+            pos = self.origin_pos_gl0+np.moveaxis(np.array([x,zeros,zeros]),0,-1)
+            vel = np.moveaxis(np.array([xdot,zeros,zeros]),0,-1)
+            ome = np.zeros(lead+(3,))
+            R_b2g = self.R_b2g0 + zeros[...,None,None]
             self.rigidbodyKinUpdate(pos, vel, ome, R_b2g)
 
         elif self.sType=='constantRPM x-oscillation':
             omega = self.opts['frequency']*2.*np.pi
             A = self.opts['amplitude']
-            x    = A*np.sin(omega*t)
-            xdot = A*omega*np.cos(omega*t)
-            omegapsi = self.opts['RPM']*2.*np.pi/(60.)
+            x    = A*np.sin(omega*t)        + zeros
+            xdot = A*omega*np.cos(omega*t) + zeros
+            omegapsi = self.opts['RPM']*2.*np.pi/(60.) + zeros
             psi = t*omegapsi
-            pos = self.origin_pos_gl0+np.array([x,0,0])
-            vel = np.array([xdot,0,0])
-            ome = self.R_b2g0.dot(np.array([omegapsi,0,0]))
-            R_b2g = self.R_b2g0.dot(R_x(psi))
-            self.rigidbodyKinUpdate(pos, vel, ome, R_b2g)
+            pos = self.origin_pos_gl0+np.moveaxis(np.array([x,zeros,zeros]),0,-1)
+            vel = np.moveaxis(np.array([xdot,zeros,zeros]),0,-1)
+            ome = self.R_b2g0.dot(np.array([omegapsi,zeros,zeros]))
+            R_b2g = np.matmul(self.R_b2g0, _R_x(psi))
+            self.rigidbodyKinUpdate(pos, vel, np.moveaxis(ome,0,-1), R_b2g)
             self.psi=psi # hack
         else:
-            raise NotImplementedError(sType)
+            raise NotImplementedError(self.sType)
 
     def plotCurrent(self, ax=None, fig=None, lines=None):
         """ Plot current blade positions """
@@ -162,7 +162,7 @@ def RAElimination(self, RA):
         #print('Rigid transformation from ref point',P1,' to ',Pi, T_r)
     return Tc, INodesID
 
-def buildTMatrix(self, RA):
+def buildTMatrix(self, RA, sparse=False):
     """ 
      Build transformation matrix T, such that x= T.x~ where x~ is the reduced vector of DOF
      Variables set by this routine
@@ -174,12 +174,16 @@ def buildTMatrix(self, RA):
     
     Variables returned:
     - T_red: retuction matrix such that x= T_red.x~ where x~ is the reduced vector of DOF
+             (scipy.sparse CSR matrix if `sparse` is True)
     """
 #    ! --- Misc inits
     nDOF_red = nDOF_c(self, RA)
     nDOF     = self.nDOF
     print('   Number of reduced DOF',nDOF_red, '/',nDOF)
-    T_c = np.zeros((nDOF, nDOF_red)) 
+    # Triplets (row, col, value) of the non-zero blocks of T_c
+    I_T = []
+    J_T = []
+    V_T = []
     IRA = list(np.arange(len(RA)))
     # --- For each node:
     #  - create list of indices I      in the assembled vector of DOF
@@ -246,7 +250,9 @@ def buildTMatrix(self, RA):
         #print('NID',idNodeSel,'I ',node.data['DOFs'])
         #print('NID',idNodeSel,'It',node.data['DOFs_c'])
         #print('NID',idNodeSel,'Ia',IDOFOld)
-        T_c[np.ix_(IDOFOld, node.data['DOFs_c'])] = Tc
+        I_T.append(np.repeat(IDOFOld, nc))
+        J_T.append(np.tile(node.data['DOFs_c'], len(IDOFOld)))
+        V_T.append(np.asarray(Tc).ravel())
         iPrev = iPrev + nc
     #print('--- End of BuildTMatrix')
     #print('   - p%nDOF_red', nDOF_red)
@@ -258,4 +264,13 @@ def buildTMatrix(self, RA):
         raise Exception('Not all rigid assemblies were processed')
     if iPrev != nDOF_red :
         raise Exception('Inconsistency in number of reduced DOF')
+    I_T = np.concatenate(I_T).astype(int)
+    J_T = np.concatenate(J_T).astype(int)
+    V_T = np.concatenate(V_T)
+    if sparse:
+        from scipy.sparse import csr_matrix
+        T_c = csr_matrix((V_T, (I_T, J_T)), shape=(nDOF, nDOF_red))
+    else:
+        T_c = np.zeros((nDOF, nDOF_red)) 
+        T_c[I_T, J_T] = V_T
     return T_c
@@ -0,0 +1,66 @@
+"""
+Benchmark of the sparse assembly and shift-invert eigenvalue solver of the FEM model
+(FEMModel.assembly(sparse=True), FEMModel.eig(nModes=...)), compared to the dense path,
+for the SubDyn test models. The number of element subdivisions is increased to 
+obtain larger models.
+"""
+import os
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from welib.fast.subdyn import SubDyn
+from welib.FEM.fem_model import FEMModel
+
+MyDir=os.path.dirname(__file__)
+
+def fixedBCModes(graph, sparse, nModes=None):
+    """ Assemble FEM model from a graph, apply constraints and BC, and compute modes"""
+    model = FEMModel.from_graph(graph, mainElementType='frame3d', refPoint=(0,0,0), gravity=9.81)
+    t0 = time.time()
+    model.assembly(sparse=sparse)
+    model.applyInternalConstraints()
+    model.partition()
+    model.applyFixedBC()
+    t1 = time.time()
+    Q, freq = model.eig(normQ='byMax', nModes=nModes)
+    t2 = time.time()
+    return model, freq, t1-t0, t2-t1
+
+def main(models=['TwrSmall', 'Twr', 'Jacket', 'JacketTwr'], vDiv=[1,2,4], nModes=10, nDenseMax=1000, verbose=True):
+    nDOF, T_dense, T_sparse, Err = [], [], [], []
+    for name in models:
+        sd = SubDyn(os.path.join(MyDir, '../../../data/SubDyn/{}.dat'.format(name)))
+        for nDiv in vDiv:
+            graph = sd.getGraph(nDiv=nDiv)
+            model, f_s, t_as, t_es = fixedBCModes(graph, sparse=True, nModes=nModes)
+            if model.nDOF<=nDenseMax:
+                _, f_d, t_ad, t_ed = fixedBCModes(graph, sparse=False)
+                err = np.max(np.abs(f_s-f_d[:nModes])/np.maximum(f_d[:nModes],1e-3))
+            else:
+                t_ad, t_ed, err = np.nan, np.nan, np.nan
+            nDOF.append(model.nDOF)
+            T_dense .append(t_ad+t_ed)
+            T_sparse.append(t_as+t_es)
+            Err.append(err)
+            if verbose:
+                print('{:10s} nDiv={:d} nDOF={:6d} - dense: {:7.3f}s (assembly+BC {:7.3f}s, eig {:7.3f}s) - sparse: {:7.3f}s (assembly+BC {:7.3f}s, eig {:7.3f}s) - freq. rel. error {:.1e}'.format(
+                    name, nDiv, model.nDOF, t_ad+t_ed, t_ad, t_ed, t_as+t_es, t_as, t_es, err))
+
+    fig,ax = plt.subplots(1, 1, sharey=False, figsize=(6.4,4.8)) # (6.4,4.8)
+    fig.subplots_adjust(left=0.12, right=0.95, top=0.95, bottom=0.11, hspace=0.20, wspace=0.20)
+    I = np.argsort(nDOF)
+    ax.loglog(np.array(nDOF)[I], np.array(T_dense )[I], 'ko-' , label='Dense')
+    ax.loglog(np.array(nDOF)[I], np.array(T_sparse)[I], 'o--' , label='Sparse, {} modes'.format(nModes))
+    ax.set_xlabel('Number of DOF [-]')
+    ax.set_ylabel('Computational time [s]')
+    ax.legend()
+    ax.set_title('FEM - Sparse assembly and eigenvalue analysis')
+    return nDOF, T_dense, T_sparse, Err
+
+
+if __name__ == '__main__':
+    main()
+    plt.show()
+if __name__=="__test__":
+    nDOF, T_dense, T_sparse, Err = main(models=['TwrSmall', 'JacketTwr'], vDiv=[1], verbose=False)
+    np.testing.assert_array_less(Err, 1e-6)
@@ -7,6 +7,7 @@ import numpy as np
 import pandas as pd
 import copy
 from scipy.optimize import OptimizeResult as OdeResultsClass 
+import scipy.sparse as sp
 
 from welib.FEM.utils import DCM, rigidTransformationMatrix
 from welib.FEM.fem_elements import *   # Elements used
@@ -130,6 +131,7 @@ class FEMModel(GraphModel):
         self.gravity         = gravity
         self.main_axis       = main_axis
         self.mainElementType = mainElementType
+        self.sparse          = False # If True, matrices are stored as scipy.sparse matrices (see assembly)
         # Main data generated
         self.MM_init  = None # Initial mass matrix, before internal constaints
         self.KK_init  = None # Initial stiffness matrix, before internal constaints
@@ -240,18 +242,27 @@ class FEMModel(GraphModel):
     # --------------------------------------------------------------------------------}
     # --- FEM
     # --------------------------------------------------------------------------------{
-    def assembly(self,  gravity=None, Elements=None,):
+    def assembly(self,  gravity=None, Elements=None, sparse=False):
+        """ 
+        Assemble the global mass and stiffness matrices and load vector (before internal constraints)
+
+        The element matrices are scattered in one go using COO triplets (row, column, value),
+        duplicated entries being summed.
+         - sparse: if True, the matrices are stored as scipy.sparse CSR matrices, 
+                   recommended for large models. The format is kept by applyInternalConstraints and applyFixedBC.
+        """
         if Elements is None:
             Elements = self.Elements
         if gravity is None:
             gravity=self.gravity
 
         nDOF=self.nDOF # np.max(self.Nodes[-1].data['DOFs'])+1
-        MM = np.zeros((nDOF,nDOF))
-        KK = np.zeros((nDOF,nDOF))
         FF = np.zeros(nDOF)
+        IDOFs = [] # DOF indices of each block (element or node)
+        Kb    = [] # Stiffness blocks
+        Mb    = [] # Mass blocks
         
-        # loop over all elements, compute element matrices and assemble into global matrices
+        # loop over all elements, compute element matrices
         for e in Elements:
             # --- Element mass, stiffness, gravity force and other force
             Ke   = e.Ke()
@@ -260,19 +271,34 @@ class FEMModel(GraphModel):
             Fe_o = e.Fe_o()
             IDOF = e.data['DOFs']
 
-            # --- Assembly in global unconstrained system
-            IDOF = e.data['DOFs']
-            KK[np.ix_(IDOF,IDOF)] += Ke
-            MM[np.ix_(IDOF,IDOF)] += Me
+            IDOFs.append(IDOF)
+            Kb.append(Ke)
+            Mb.append(Me)
             FF[IDOF] += Fe_g + Fe_o
 
         # Add concentrated masses to Mass matrix and gravity vector
+        IDOFs_m = []
+        Mb_m    = []
         for n in self.Nodes:
             if 'addedMassMatrix' in n.data.keys():
                 IDOF = n.data['DOFs']
-                MM[np.ix_(IDOF,IDOF)] += n.data['addedMassMatrix']
+                IDOFs_m.append(IDOF)
+                Mb_m.append(n.data['addedMassMatrix'])
                 FF[IDOF[2]] -= n.data['addedMassMatrix'][0,0]*gravity # gravity along z DOF index "2"
 
+        # --- Assembly in global unconstrained system
+        IK, JK, VK = blockTriplets(IDOFs, Kb)
+        IM, JM, VM = blockTriplets(IDOFs+IDOFs_m, Mb+Mb_m)
+        KK = sp.coo_matrix((VK, (IK, JK)), shape=(nDOF, nDOF))
+        MM = sp.coo_matrix((VM, (IM, JM)), shape=(nDOF, nDOF))
+        if sparse:
+            KK = KK.tocsr()
+            MM = MM.tocsr()
+        else:
+            KK = KK.toarray()
+            MM = MM.toarray()
+
+        self.sparse = sparse
         self.KK_init= KK
         self.MM_init= MM 
         self.FF_init= FF
@@ -305,10 +331,13 @@ class FEMModel(GraphModel):
             print('Number of Rigid Links      :',len(rigidLinks))
             from .direct_elimination import nDOF_c, buildTMatrix, rigidLinkAssemblies
             RA = rigidLinkAssemblies(self)
-            self.T_c = buildTMatrix(self, RA)
+            self.T_c = buildTMatrix(self, RA, sparse=self.sparse)
 
         else:
-            self.T_c = np.eye(self.MM_init.shape[0])
+            if self.sparse:
+                self.T_c = sp.identity(self.MM_init.shape[0], format='csr')
+            else:
+                self.T_c = np.eye(self.MM_init.shape[0])
             # Store new DOF indices
             for n in self.Nodes:
                 n.data['DOFs_c'] = list(n.data['DOFs'])
@@ -319,9 +348,18 @@ class FEMModel(GraphModel):
             for n in e.nodes:
                 e.data['DOFs_c'] +=n.data['DOFs_c']
 
-        self.MM = (self.T_c.T).dot(self.MM_init).dot(self.T_c)
-        self.KK = (self.T_c.T).dot(self.KK_init).dot(self.T_c)
-        self.FF = (self.T_c.T).dot(self.FF_init)  # TODO verify order
+        if len(rotJoints)>0 or len(rigidLinks)>0:
+            self.MM = (self.T_c.T).dot(self.MM_init).dot(self.T_c)
+            self.KK = (self.T_c.T).dot(self.KK_init).dot(self.T_c)
+            self.FF = (self.T_c.T).dot(self.FF_init)  # TODO verify order
+            if self.sparse:
+                self.MM = self.MM.tocsr()
+                self.KK = self.KK.tocsr()
+        else:
+            # T_c is the identity, no need for the triple products
+            self.MM = self.MM_init.copy()
+            self.KK = self.KK_init.copy()
+            self.FF = self.FF_init.copy()
 
         # --- Creating a convenient Map from DOF to Nodes
         #p%DOFred2Nodes=-999
@@ -424,43 +462,38 @@ class FEMModel(GraphModel):
         #IDOF_root = Nodes2DOF[Elem2Nodes[0,:][0] ,:]
         #IDOF_tip  = Nodes2DOF[Elem2Nodes[-1,:][1],:]
 
-        # --- Boundary condition transformation matrix (removes row/columns)
-        Tr=np.eye(nDOF_tot)
-        
         # Root and Tip BC
         if IFixed is None:
             IFixed=[]
             for n in self.reactionNodes:
                 I = n.data['RBC'][:6]
                 IFixed += [n.data['DOFs_c'][ii] for ii,i in enumerate(I) if int(i)==idDOF_Fixed]
+        IDOF_BC = np.setdiff1d(IDOF_All, np.asarray(IFixed, dtype=int))
 
-        Tr = np.delete(Tr, IFixed, axis=1) # removing columns
+        # --- Boundary condition transformation matrix (removes columns of identity)
+        # NOTE: Mr = Tr' MM Tr is obtained by selecting rows/columns of MM
+        if self.sparse:
+            Tr = sp.identity(nDOF_tot, format='csc')[:, IDOF_BC].tocsr()
+        else:
+            Tr = np.eye(nDOF_tot)[:, IDOF_BC]
 
-        Mr = (Tr.T).dot(MM).dot(Tr)
-        Kr = (Tr.T).dot(KK).dot(Tr)
+        Mr = subMatrix(MM, IDOF_BC)
+        Kr = subMatrix(KK, IDOF_BC)
         if CC is not None:
-            Cr = (Tr.T).dot(CC).dot(Tr)
+            Cr = subMatrix(CC, IDOF_BC)
         else:
             Cr = None
 
         # --- Create mapping from M to Mr
-        nDOF_r = Mr.shape[0]
-        IDOF_BC = list(np.setdiff1d(IDOF_All, IFixed))
-        IFull2BC = np.zeros(nDOF_tot,dtype=int)
-        IBC2Full = np.zeros(nDOF_r,dtype=int)
-        k=0
-        for i in IDOF_All:
-            if i in IFixed:
-                IFull2BC[i]=-1
-            else:
-                IFull2BC[i]=k
-                IBC2Full[k]=i
-                k+=1
+        nDOF_r = len(IDOF_BC)
+        IFull2BC = -np.ones(nDOF_tot,dtype=int)
+        IFull2BC[IDOF_BC] = np.arange(nDOF_r)
+        IBC2Full = IDOF_BC.astype(int)
 
         self.MM_BC = Mr
         self.KK_BC = Kr
         self.CC_BC = Cr
-        self.FF_BC = Tr.T.dot(self.FF)
+        self.FF_BC = self.FF[IDOF_BC]
         self.T_BC  = Tr
         self.T_Full2BC  = Tr.T.dot(self.T_c.T)
         #
@@ -473,13 +506,26 @@ class FEMModel(GraphModel):
         return Mr, Kr, Tr, IFull2BC, IBC2Full
 
 
-    def eig(self, normQ='byMax'):
-        from welib.system.eva import eig
+    def eig(self, normQ='byMax', nModes=None, sigma=-0.1):
+        """ 
+        Compute the modes and frequencies of the system with fixed boundary conditions
+
+         - nModes: number of modes to compute. If None, all modes are computed with a dense solver, 
+                   unless the matrices are sparse, in which case 30 modes are computed.
+                   Otherwise, only the lowest nModes are computed with a sparse shift-invert solver.
+         - sigma: shift used by the sparse solver [rad^2/s^2], see welib.system.eva.eigsh
+        """
+        from welib.system.eva import eig, eigsh
         KK = self.KK_BC
         MM = self.MM_BC
 
         # --- Compute modes and frequencies
-        [Q, freq]= eig(KK, MM, freq_out=True, normQ=normQ, discardIm=True)
+        if nModes is None and not sp.issparse(KK):
+            [Q, freq]= eig(KK, MM, freq_out=True, normQ=normQ, discardIm=True)
+        else:
+            if nModes is None:
+                nModes = 30
+            [Q, freq]= eigsh(KK, MM, nModes=nModes, sigma=sigma, freq_out=True, normQ=normQ)
 
         Q   = insertFixedBCinModes(Q, self.T_BC)
         self.freq = freq
@@ -512,6 +558,8 @@ class FEMModel(GraphModel):
         nModesCB: number of CB modes to retain
         zeta :  damping ratios for CB modes 
         BC_before_CB: if true, using the matrices where the fixed BC have been applied 
+
+        NOTE: for sparse matrices, only the nModesCB lowest CB modes are computed (see reduction.CraigBamptonSparse)
         """
         from welib.FEM.reduction import CraigBampton
         if BC_before_CB:
@@ -519,8 +567,9 @@ class FEMModel(GraphModel):
             Ileader, Ifollow = self.DOFr_Leader, self.DOFr_Follower
             if nModesCB is None:
                 nModesCB=M.shape[0] - len(Ileader)
-            # NOTE: we return all CB modes at first
-            Mr, Kr, Phi_G, Phi_CB, f_G, f_CB, I1, I2 = CraigBampton(M, K, Ileader=Ileader, Ifollow=Ifollow, nModesCB=None, discardIm=True)
+            # NOTE: we return all CB modes at first, unless matrices are sparse
+            nModesCB_ = nModesCB if sp.issparse(M) else None
+            Mr, Kr, Phi_G, Phi_CB, f_G, f_CB, I1, I2 = CraigBampton(M, K, Ileader=Ileader, Ifollow=Ifollow, nModesCB=nModesCB_, discardIm=True)
             # Small cleanup
             Phi_G [np.abs(Phi_G )<1e-11] = 0
             Phi_CB[np.abs(Phi_CB)<1e-11] = 0
@@ -731,6 +780,8 @@ class FEMModel(GraphModel):
 
         """
         def yaml_array(var, M, Fmt='{:15.6e}', comment=''):
+            if hasattr(M, 'toarray'):
+                M = M.toarray() # sparse matrices
             M = np.atleast_2d(M)
             if len(comment)>0:
                 s='{}: # {} x {} {}\n'.format(var, M.shape[0], M.shape[1], comment)
@@ -752,15 +803,12 @@ class FEMModel(GraphModel):
         # --- Helper functions
         def nodeID(nodeID):
             if hasattr(nodeID,'__len__'):
-                return [model.Nodes.index(model.getNode(n))+ioff for n in nodeID]
+                return [model.getNodeIndex(n)+ioff for n in nodeID]
             else:
-                return model.Nodes.index(model.getNode(nodeID))+ioff
+                return model.getNodeIndex(nodeID)+ioff
 
         def elemID(elemID):
-            #e=model.getElement(elemID)
-            for ie,e in enumerate(model.Elements):
-                if e.ID==elemID:
-                    return ie+ioff
+            return model.getElementIndex(elemID)+ioff
         def elemType(elemType):
             from welib.FEM.fem_elements import idMemberBeam, idMemberCable, idMemberRigid
             return {'SubDynBeam3d':idMemberBeam, 'SubDynFrame3d':idMemberBeam, 'Beam':idMemberBeam, 'Frame3d':idMemberBeam,
@@ -1011,7 +1059,11 @@ class FEMModel(GraphModel):
         F_BC = self.loadVector_BC(F, internal=internal)
 
         # Solve for displacements
-        U_BC = np.linalg.solve(self.KK_BC, F_BC)
+        if sp.issparse(self.KK_BC):
+            from scipy.sparse.linalg import spsolve
+            U_BC = spsolve(self.KK_BC.tocsc(), F_BC)
+        else:
+            U_BC = np.linalg.solve(self.KK_BC, F_BC)
 
         U_c = self.T_BC.dot(U_BC)
         U   = self.T_c.dot(U_c)
@@ -1138,6 +1190,36 @@ class FEMModel(GraphModel):
 # --------------------------------------------------------------------------------}
 # --- Helper functions 
 # --------------------------------------------------------------------------------{
+def blockTriplets(IDOFs, blocks):
+    """ 
+    Returns the COO triplets (row indices, column indices, values) of a list of square blocks
+    to be scattered at the DOF indices `IDOFs` of a global matrix.
+    Blocks of the same size are processed together.
+    """
+    I = []
+    J = []
+    V = []
+    nb = np.array([len(IDOF) for IDOF in IDOFs], dtype=int)
+    for n in np.unique(nb):
+        Ib = np.where(nb==n)[0]
+        IE = np.array([IDOFs[i] for i in Ib], dtype=int)   # nBlocks x n
+        BE = np.array([blocks[i] for i in Ib], dtype=float) # nBlocks x n x n
+        I.append(np.repeat(IE, n, axis=1).ravel())
+        J.append(np.tile  (IE, (1, n)).ravel())
+        V.append(BE.ravel())
+    if len(V)==0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(I), np.concatenate(J), np.concatenate(V)
+
+
+def subMatrix(A, I):
+    """ Returns the square sub matrix A[I,I] of a dense or sparse matrix """
+    if sp.issparse(A):
+        return A.tocsr()[I,:][:,I]
+    else:
+        return A[np.ix_(I,I)]
+
+
 def distributeDOF(g, mainElementType='frame3d'):
     """ 
     Given a list of Nodes and Elements, distribute degrees of freedom (DOFs) 
@@ -30,6 +30,9 @@ NodePropertySets: dictionary of NodeProperties
 
 ElemPropertySets: dictionary of ElemProperties
 
+Lookups by ID (getNode, getElement, getMember, get*Property) use cached indexes (ID -> position in list).
+The indexes are validated at each lookup, and rebuilt if the lists were modified directly.
+
 """
 
 import numpy as np
@@ -509,14 +512,19 @@ class GraphModel(object):
         self.Modes   = []
         self.TimeSeries = []
         # Optimization variables
-        self._nodeIDs2Elements   = {} # dictionary with key NodeID and value list of ElementID
+        self._nodeIDs2ElementIDs = {} # dictionary with key NodeID and value list of ElementID
         self._nodeIDs2Elements   = {} # dictionary with key NodeID and value list of elements
         self._elementIDs2NodeIDs = {} # dictionary with key ElemID and value list of nodes IDs
         self._connectivity =[]# 
+        self._indexes = {} # dictionary with key a list name (e.g. 'Nodes') and value a dictionary ID -> index in list
 
     # --- Main setters
     def addNode(self,node):
         self.Nodes.append(node)
+        self._addToIndex('Nodes', self.Nodes)
+        if len(self._nodeIDs2Elements)>0:
+            self._nodeIDs2Elements  .setdefault(node.ID, [])
+            self._nodeIDs2ElementIDs.setdefault(node.ID, [])
 
     def addElement(self,elem):
         # Giving nodes to element if these were not provided
@@ -525,25 +533,76 @@ class GraphModel(object):
         if elem.propIDs is not None:
             elem.nodeProps=[self.getNodeProperty(elem.propset, i) for i in elem.propIDs]
         self.Elements.append(elem)
+        self._addToIndex('Elements', self.Elements)
+        # Update adjacency if already computed
+        if len(self._nodeIDs2Elements)>0:
+            for nID in dict.fromkeys(elem.nodeIDs):
+                self._nodeIDs2Elements  .setdefault(nID, []).append(elem)
+                self._nodeIDs2ElementIDs.setdefault(nID, []).append(elem.ID)
+        if len(self._elementIDs2NodeIDs)>0:
+            self._elementIDs2NodeIDs[elem.ID] = [n.ID for n in elem.nodes]
+        self._connectivity = []
+
+    # --- Indexes
+    def _indexOf(self, key, objects, ID):
+        """ 
+        Returns the index of the object with a given ID in a list of objects, or None.
+        Uses a cached dictionary ID -> index, which is rebuilt if it is outdated
+        (e.g. objects added, replaced or reordered, or IDs changed, without using the graph methods).
+        """
+        index = self._indexes.get(key, None)
+        if index is not None:
+            i = index.get(ID, None)
+            if i is not None and i<len(objects) and objects[i].ID==ID:
+                return i
+        # Index missing or outdated, rebuilding it
+        index = dict()
+        for i, o in enumerate(objects):
+            index.setdefault(o.ID, i) # NOTE: first occurrence, like a linear search
+        self._indexes[key] = index
+        return index.get(ID, None)
+
+    def _addToIndex(self, key, objects):
+        """ Update the index of a list of objects after the last object was appended """
+        index = self._indexes.get(key, None)
+        if index is not None:
+            ID = objects[-1].ID
+            i  = index.get(ID, None)
+            if i is None or i>=len(objects) or objects[i].ID!=ID:
+                index[ID] = len(objects)-1
 
     # --- Getters
     def getNode(self, nodeID):
-        for n in self.Nodes:
-            if n.ID==nodeID:
-                return n
-        raise KeyError('NodeID {} not found in Nodes'.format(nodeID))
+        i = self._indexOf('Nodes', self.Nodes, nodeID)
+        if i is None:
+            raise KeyError('NodeID {} not found in Nodes'.format(nodeID))
+        return self.Nodes[i]
+
+    def getNodeIndex(self, nodeID):
+        """ Return index of a node in the list of Nodes"""
+        i = self._indexOf('Nodes', self.Nodes, nodeID)
+        if i is None:
+            raise KeyError('NodeID {} not found in Nodes'.format(nodeID))
+        return i
 
     def getElement(self, elemID):
-        for e in self.Elements:
-            if e.ID==elemID:
-                return e
-        raise KeyError('ElemID {} not found in Elements'.format(elemID))
+        i = self._indexOf('Elements', self.Elements, elemID)
+        if i is None:
+            raise KeyError('ElemID {} not found in Elements'.format(elemID))
+        return self.Elements[i]
+
+    def getElementIndex(self, elemID):
+        """ Return index of an element in the list of Elements"""
+        i = self._indexOf('Elements', self.Elements, elemID)
+        if i is None:
+            raise KeyError('ElemID {} not found in Elements'.format(elemID))
+        return i
 
     def getMember(self, membID):
-        for m in self.Members:
-            if m.ID==membID:
-                return m
-        raise KeyError('MemberID {} not found in Members'.format(membID))
+        i = self._indexOf('Members', self.Members, membID)
+        if i is None:
+            raise KeyError('MemberID {} not found in Members'.format(membID))
+        return self.Members[i]
 
     def getMemberElements(self, membID):
         m = self.getMember(membID)
@@ -554,56 +613,62 @@ class GraphModel(object):
         return m.getNodes(graph=self)
 
     def getNodeProperty(self, setname, propID):
-        for p in self.NodePropertySets[setname]:
-            if p.ID==propID:
-                return p
-        raise KeyError('PropID {} not found for Node propset {}'.format(propID,setname))
+        props = self.NodePropertySets[setname]
+        i = self._indexOf(('NodeProp', setname), props, propID)
+        if i is None:
+            raise KeyError('PropID {} not found for Node propset {}'.format(propID,setname))
+        return props[i]
 
     def getElementProperty(self, setname, propID):
-        for p in self.ElemPropertySets[setname]:
-            if p.ID==propID:
-                return p
-        raise KeyError('PropID {} not found for Element propset {}'.format(propID,setname))
+        props = self.ElemPropertySets[setname]
+        i = self._indexOf(('ElemProp', setname), props, propID)
+        if i is None:
+            raise KeyError('PropID {} not found for Element propset {}'.format(propID,setname))
+        return props[i]
 
     def getMiscProperty(self, setname, propID):
-        for p in self.MiscPropertySets[setname]:
-            if p.ID==propID:
-                return p
-        raise KeyError('PropID {} not found for Misc propset {}'.format(propID,setname))
+        props = self.MiscPropertySets[setname]
+        i = self._indexOf(('MiscProp', setname), props, propID)
+        if i is None:
+            raise KeyError('PropID {} not found for Misc propset {}'.format(propID,setname))
+        return props[i]
 
     # --- Useful connectivity 
     def node2Elements(self, node):
-        return [e for e in self.Elements if node.ID in e.nodeIDs]
+        return list(self.nodeIDs2Elements.get(node.ID, []))
 
     def elements2nodes(self, elements):
         """ Return unique list of nodes involved in a list of elements"""
-        nodeIDs=[]
+        nodeIDs=set()
         for e in elements:
-            for nID in e.nodeIDs:
-                if nID not in nodeIDs:
-                    nodeIDs.append(nID)
+            nodeIDs.update(e.nodeIDs)
         nodes = [n for n in self.Nodes if n.ID in nodeIDs]
         return nodes
 
+    def _computeAdjacency(self):
+        """ Compute list of connected elements for each node, in one loop on the elements"""
+        self._nodeIDs2Elements   = dict()
+        self._nodeIDs2ElementIDs = dict()
+        for n in self.Nodes:
+            self._nodeIDs2Elements  [n.ID] = []
+            self._nodeIDs2ElementIDs[n.ID] = []
+        for e in self.Elements:
+            for nID in dict.fromkeys(e.nodeIDs): # unique, keeping order
+                self._nodeIDs2Elements  .setdefault(nID, []).append(e)
+                self._nodeIDs2ElementIDs.setdefault(nID, []).append(e.ID)
 
     @property
     def nodeIDs2ElementIDs(self):
         """ Return list of elements IDs connected to each node"""
         if len(self._nodeIDs2ElementIDs) == 0:
-            # Compute list of connected elements for each node
-            self._nodeIDs2ElementIDs=dict()
-            for i,n in enumerate(self.Nodes):
-                self._nodeIDs2ElementIDs[n.ID] = [e.ID for e in self.Elements if n.ID in e.nodeIDs]
+            self._computeAdjacency()
         return self._nodeIDs2ElementIDs
 
     @property
     def nodeIDs2Elements(self):
         """ Return list of elements connected to each node"""
         if len(self._nodeIDs2Elements) == 0:
-            # Compute list of connected elements for each node
-            self._nodeIDs2Elements
-            for i,n in enumerate(self.Nodes):
-                self._nodeIDs2Elements[n.ID] = [e for e in self.Elements if n.ID in e.nodeIDs]
+            self._computeAdjacency()
         return self._nodeIDs2Elements
 
     @property
@@ -621,7 +686,8 @@ class GraphModel(object):
         NOTE: this is basically element2Nodes but reindexed
         """
         if len(self._connectivity) ==0:
-            self._connectivity = [[self.Nodes.index(n)  for n in e.nodes] for e in self.Elements]
+            INodes = {id(n):i for i,n in enumerate(self.Nodes)}
+            self._connectivity = [[INodes[id(n)]  for n in e.nodes] for e in self.Elements]
         return self._connectivity
 
     def areElementsConnected(self,e1,e2):
@@ -761,6 +827,7 @@ class GraphModel(object):
         self._nodeIDs2Elements   = dict()
         self._elementIDs2NodeIDs = dict()
         self._connectivity=[]
+        self._indexes = dict()
 
     def updateConnectivity(self):
         for e in self.Elements:
@@ -783,6 +850,8 @@ class GraphModel(object):
         """
         for e in self.Elements:
             e.nodeIDs=[n.ID for n in e.nodes]
+        # Trigger, remove precomputed values based on node IDs
+        self.connecticityHasChanged()
 
     def sortNodesBy(self,key):
         """ Sort nodes, will affect the connectivity, but node IDs remain the same"""
@@ -813,7 +882,7 @@ class GraphModel(object):
         return self
 
 
-    def _divideElement(self, elemID, nPerElement, maxElemId, keysNotToCopy=None):
+    def _divideElement(self, elemID, nPerElement, maxElemId, keysNotToCopy=None, maxNodeId=None):
         """ divide a given element by nPerElement (add nodes and elements to graph) """ 
         if len(self.Modes)>0:
             raise Exception('Cannot divide graph when mode data is present')
@@ -821,7 +890,8 @@ class GraphModel(object):
             raise Exception('Cannot divide graph when motion data is present')
         keysNotToCopy = [] if keysNotToCopy is None else keysNotToCopy
 
-        maxNodeId=np.max([n.ID for n in self.Nodes])
+        if maxNodeId is None:
+            maxNodeId=np.max([n.ID for n in self.Nodes])
         e = self.getElement(elemID)
         newElems = []
         if len(e.nodes)==2:
@@ -905,8 +975,10 @@ class GraphModel(object):
             if method=='insert':
                 newElements+=[self.getElement(elemID)] # newElements contains
             if (len(excludeDataKey)>0 and E.data[excludeDataKey] not in excludeDataList) or len(excludeDataKey)==0:
-                elems = self._divideElement(elemID, nPerElement, maxElemId, keysNotToCopy)
+                elems = self._divideElement(elemID, nPerElement, maxElemId, keysNotToCopy, maxNodeId=maxNodeId)
                 maxElemId+=len(elems)
+                if len(elems)>0:
+                    maxNodeId = max(maxNodeId, elems[-1].nodeIDs[0]) # Last new element starts at the last new node
                 newElements+=elems
                 memberElemIDs+= [e.ID for e in elems]
             else:
@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse as sp
 
 from welib.system.eva import eig
 
@@ -22,9 +23,13 @@ def CraigBampton(MM, KK, Ileader, nModesCB=None, Ifollow=None, F=None, DD=None,
     OUTPUTS
       fc: critical frequency
       Mr,Kr,Fr,Dr: reduced mass, stiffness, force and damping  matrices
+
+    NOTE: if MM or KK are scipy.sparse matrices, CraigBamptonSparse is used
         
     AUTHOR: E. Branlard
     """
+    if sp.issparse(MM) or sp.issparse(KK):
+        return CraigBamptonSparse(MM, KK, Ileader, nModesCB=nModesCB, Ifollow=Ifollow, F=F, DD=DD, fullModesOut=fullModesOut, discardIm=discardIm)
     
     # --- Input cleanup
     Ileader = np.asarray(Ileader).ravel()
@@ -98,7 +103,96 @@ def CraigBampton(MM, KK, Ileader, nModesCB=None, Ifollow=None, F=None, DD=None,
         raise NotImplementedError('Not done')
 
     I_G  = list(np.arange(len(Ileader)))
-    I_CB = list(np.arange(len(Ifollow)) + len(I_G))
+    I_CB = list(np.arange(nModesCB) + len(I_G))
+
+    return Mr, Kr, Phi_G, Phi_CB, f_G, f_CB, I_G, I_CB
+
+
+def CraigBamptonSparse(MM, KK, Ileader, nModesCB=None, Ifollow=None, F=None, DD=None, fullModesOut=False, discardIm=True): 
+    """
+    Performs the CraigBampton (CB) reduction of a system with sparse mass and stiffness matrices.
+    Same inputs and outputs as `CraigBampton`.
+
+    The follower stiffness matrix Kff is factorized once (sparse LU). The factorization is used 
+    for the Guyan modes and for the shift-invert Lanczos solver (ARPACK) that computes only 
+    the `nModesCB` lowest fixed-interface modes.
+    The follower matrices are never densified, only the reduced matrices are dense.
+    """
+    from scipy.sparse.linalg import splu, eigsh, LinearOperator
+    # --- Input cleanup
+    MM = sp.csr_matrix(MM)
+    KK = sp.csr_matrix(KK)
+    Ileader = np.asarray(Ileader, dtype=int).ravel()
+    if Ifollow is None:
+        Ifollow = np.setdiff1d(np.arange(MM.shape[0]), Ileader)
+    else:
+        Ifollow = np.asarray(Ifollow, dtype=int).ravel()
+    nf = len(Ifollow)
+    if nModesCB is None:
+        nModesCB=nf
+
+    # Partitioning - NOTE: leaders will be first in reduced matrix Mr and Kr
+    Mll= MM[Ileader,:][:,Ileader].toarray()
+    Kll= KK[Ileader,:][:,Ileader].toarray()
+    Mlf= MM[Ileader,:][:,Ifollow]
+    Klf= KK[Ileader,:][:,Ifollow]
+    Mff= MM[Ifollow,:][:,Ifollow].tocsc()
+    Kff= KK[Ifollow,:][:,Ifollow].tocsc()
+
+    # --- Factorization of Kff, and Guyan modes
+    Kff_lu = splu(Kff)
+    Phi_G = - Kff_lu.solve(Klf.T.toarray())
+
+    # --- Solve EVP for constrained system, lowest modes only
+    if nModesCB==0:
+        Phi_CB    = np.zeros((nf, 0))
+        Lambda_CB = np.zeros(0)
+    elif nModesCB < nf-1:
+        # Shift-invert with sigma=0, the operator (K-sigma M)^-1 is given by the factorization of Kff
+        OPinv = LinearOperator((nf, nf), matvec=Kff_lu.solve, dtype=float)
+        Lambda_CB, Phi_CB = eigsh(Kff, k=nModesCB, M=Mff, sigma=0, OPinv=OPinv, which='LM')
+        I = np.argsort(Lambda_CB)
+        Lambda_CB = Lambda_CB[I]
+        Phi_CB    = Phi_CB[:,I]
+        Phi_CB    = Phi_CB/np.sqrt(np.sum(Phi_CB*Mff.dot(Phi_CB), axis=0)) # Mass normalization
+    else:
+        # ARPACK cannot compute all the modes, dense solve
+        Phi_CB, Lambda_CB = eig(Kff.toarray(), Mff.toarray(), discardIm=discardIm)
+        Phi_CB    = Phi_CB[:,:nModesCB]
+        Lambda_CB = np.diag(Lambda_CB)[:nModesCB]
+    Omega2 = Lambda_CB.copy()
+    Omega2[Omega2<0]=0.0
+    f_CB  = np.sqrt(Omega2)/(2*np.pi)
+
+    # --- Building reduced matrices (Kff1Kfl = -Phi_G)
+    MlfPhi_G = Mlf.dot(Phi_G)
+    MffPhi_G = Mff.dot(Phi_G)
+    Mr11 = Mll + MlfPhi_G + MlfPhi_G.T + (Phi_G.T).dot(MffPhi_G)
+    Kr11 = Kll + Klf.dot(Phi_G)
+    Mr12 = Mlf.dot(Phi_CB) + (MffPhi_G.T).dot(Phi_CB)
+    ZZ   = np.zeros((len(Ileader),nModesCB))
+
+    # --- Guyan frequencies
+    Phi_G2, Lambda_G = eig(Kr11,Mr11, discardIm=discardIm)
+    Omega2 = np.diag(Lambda_G).copy()
+    Omega2[Omega2<0]=0.0
+    f_G  = np.sqrt(Omega2)/(2*np.pi)
+
+    # Building reduced matrix 
+    Mr = np.block( [ [Mr11 , Mr12 ], [ Mr12.T, np.eye(nModesCB)   ] ])
+    Kr = np.block( [ [Kr11  , ZZ  ], [ ZZ.T  ,  np.diag(Lambda_CB)] ])
+
+    # --- Augmenting modes so that they have the same dimension as MM
+    if fullModesOut:
+        Phi_G, Phi_CB = augmentModes(Ileader, Phi_G, Phi_CB, Ifollow=Ifollow)
+
+    if DD is not None:
+        raise NotImplementedError('Not done')
+    if F is not None:
+        raise NotImplementedError('Not done')
+
+    I_G  = list(np.arange(len(Ileader)))
+    I_CB = list(np.arange(nModesCB) + len(I_G))
 
     return Mr, Kr, Phi_G, Phi_CB, f_G, f_CB, I_G, I_CB
 
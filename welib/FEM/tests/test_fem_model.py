@@ -0,0 +1,49 @@
+import unittest
+import os
+import numpy as np
+import scipy.sparse as sp
+from welib.FEM.fem_model import *
+from welib.fast.subdyn import SubDyn
+
+MyDir=os.path.dirname(__file__)
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class Test(unittest.TestCase):
+
+    def test_sparse_assembly_eig(self):
+        # Sparse vs dense assembly, constraints, BC and eigenvalue analysis, on a jacket with rigid links
+        sd = SubDyn(os.path.join(MyDir,'../../../data/SubDyn/JacketTwr.dat'))
+        models=[]
+        for sparse in [False, True]:
+            model = FEMModel.from_graph(sd.graph, mainElementType='frame3d', refPoint=(0,0,0), gravity=9.81)
+            model.assembly(sparse=sparse)
+            model.applyInternalConstraints()
+            model.partition()
+            model.applyFixedBC()
+            models.append(model)
+        dense, sparse = models
+        self.assertTrue(sp.issparse(sparse.KK_BC))
+        np.testing.assert_allclose(sparse.MM_init.toarray(), dense.MM_init, rtol=1e-12, atol=1e-8)
+        np.testing.assert_allclose(sparse.T_c.toarray()    , dense.T_c)
+        np.testing.assert_allclose(sparse.KK_BC.toarray()  , dense.KK_BC  , rtol=1e-12, atol=1e-6)
+        np.testing.assert_allclose(sparse.MM_BC.toarray()  , dense.MM_BC  , rtol=1e-12, atol=1e-8)
+        np.testing.assert_allclose(sparse.FF_BC            , dense.FF_BC)
+        np.testing.assert_equal(sparse.IFull2BC, dense.IFull2BC)
+        # Lowest modes, shift-invert solver vs dense solver
+        Q , freq  = dense.eig(normQ='byMax')
+        Qs, freqs = sparse.eig(normQ='byMax', nModes=10)
+        self.assertEqual(Qs.shape, (dense.nDOFc, 10))
+        np.testing.assert_allclose(freqs, freq[:10], rtol=1e-8)
+        # Non-degenerate mode, up to a sign
+        i = 6 # NOTE: modes 0-5 are pairs
+        np.testing.assert_allclose(np.abs(Qs[:,i]), np.abs(Q[:,i]), atol=1e-6)
+        # Static displacements
+        U , _, _ = dense.staticDisplacements()
+        Us, _, _ = sparse.staticDisplacements()
+        np.testing.assert_allclose(Us, U, rtol=1e-8, atol=1e-12)
+
+
+if __name__=='__main__':
+    unittest.main()
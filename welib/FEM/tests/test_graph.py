@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from welib.FEM.graph import *
+
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class Test(unittest.TestCase):
+    def get_graph(self, nE=4):
+        g = GraphModel()
+        g.addNodePropertySet('Beam')
+        g.addNodeProperty('Beam', NodeProperty(ID=1, D=1))
+        g.addNodeProperty('Beam', NodeProperty(ID=2, D=2))
+        for i in range(nE+1):
+            g.addNode(Node(10+i, 0, 0, -i))
+        for i in range(nE):
+            g.addElement(Element(100+i, [10+i, 11+i], propset='Beam', propIDs=np.array([1,1]), Type='Beam'))
+        return g
+
+    def test_lookups(self):
+        g = self.get_graph()
+        self.assertIs(g.getNode(12), g.Nodes[2])
+        self.assertEqual(g.getNodeIndex(12), 2)
+        self.assertIs(g.getElement(103), g.Elements[3])
+        self.assertEqual(g.getElementIndex(103), 3)
+        self.assertEqual(g.getNodeProperty('Beam', 2)['D'], 2)
+        with self.assertRaises(KeyError):
+            g.getNode(99)
+        # Lists modified directly: nodes replaced and reordered
+        n = Node(12, 1, 1, 1)
+        g.Nodes[2] = n
+        self.assertIs(g.getNode(12), n)
+        g.Nodes = g.Nodes[-1::-1]
+        self.assertEqual(g.getNodeIndex(12), 2)
+        self.assertEqual(g.getNodeIndex(10), 4)
+        # Reindexing
+        g.reindexNodes(offset=1)
+        self.assertEqual(g.getNode(1).z, -4)
+        self.assertEqual(g.getElement(100).nodeIDs, [5, 4])
+        with self.assertRaises(KeyError):
+            g.getNode(10)
+
+    def test_adjacency(self):
+        g = self.get_graph()
+        self.assertEqual(g.nodeIDs2ElementIDs[11], [100, 101])
+        self.assertEqual(g.nodeIDs2ElementIDs[10], [100])
+        # Incremental update when adding nodes and elements
+        g.addNode(Node(20, 1, 0, -1))
+        g.addElement(Element(200, [11, 20]))
+        self.assertEqual(g.nodeIDs2ElementIDs[11], [100, 101, 200])
+        self.assertEqual([e.ID for e in g.node2Elements(g.getNode(20))], [200])
+        self.assertEqual(g.connectivity[-1], [1, 5])
+        # Division
+        g.divideElements(2, method='insert')
+        self.assertEqual(len(g.Elements), 10)
+        self.assertEqual(len(g.Nodes), 11)
+        for n in g.Nodes:
+            self.assertEqual(g.nodeIDs2ElementIDs[n.ID], [e.ID for e in g.Elements if n.ID in e.nodeIDs])
+        for e in g.Elements:
+            self.assertIs(g.getElement(e.ID), e)
+            self.assertEqual([n.ID for n in e.nodes], e.nodeIDs)
+        self.assertEqual(g.getMember(200).elemIDs, [200, 205])
+        self.assertEqual(len(set(n.ID for n in g.Nodes)), 11)
+
+
+if __name__=='__main__':
+    unittest.main()
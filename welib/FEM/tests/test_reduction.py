@@ -59,6 +59,35 @@ class Test(unittest.TestCase):
         np.testing.assert_almost_equal(f_G, [0, 5.304894],4)
         np.testing.assert_almost_equal(f_CB, [4.74484],5)
 
+    def test_sparse(self):
+        # --- Sparse vs dense reduction on a clamped 2d beam with 20 elements, interface at the top
+        import scipy.sparse as sp
+        L, EI, m, nel = 100, 1868211939147.334, 8828.201296825122, 20
+        l = L/nel
+        Ke = EI / (l ** 3) * np.array([[12,6 * l,- 12,6 * l],[6 * l,4 * l ** 2,- 6 * l,2 * l ** 2],[- 12,- 6 * l,12,- 6 * l],[6 * l,2 * l ** 2,- 6 * l,4 * l ** 2]])
+        Me = m*l / 420 * np.array([[156,22 * l,54,- 13 * l],[22 * l,4 * l ** 2,13 * l,- 3 * l ** 2],[54,13 * l,156,- 22 * l],[- 13 * l,- 3 * l ** 2,- 22 * l,4 * l ** 2]])
+        nDOF = 2*(nel+1)
+        MM = np.zeros((nDOF,nDOF))
+        KK = np.zeros((nDOF,nDOF))
+        for ie in range(nel):
+            IDOF = np.arange(2*ie, 2*ie+4)
+            MM[np.ix_(IDOF,IDOF)] += Me
+            KK[np.ix_(IDOF,IDOF)] += Ke
+        MM = MM[2:,2:] # Clamped at the bottom
+        KK = KK[2:,2:]
+        Ileader = [nDOF-4, nDOF-3]
+        Mr ,Kr ,Phi_G ,Phi_CB ,f_G ,f_CB ,I_G ,I_CB  = CraigBampton(MM, KK, Ileader, nModesCB=3)
+        Mrs,Krs,Phi_Gs,Phi_CBs,f_Gs,f_CBs,I_Gs,I_CBs = CraigBampton(sp.csr_matrix(MM), sp.csr_matrix(KK), Ileader, nModesCB=3)
+        np.testing.assert_allclose(f_CBs, f_CB, rtol=1e-10)
+        np.testing.assert_allclose(f_Gs , f_G , rtol=1e-10)
+        np.testing.assert_allclose(Phi_Gs, Phi_G, rtol=1e-10, atol=1e-12)
+        # CB modes are defined up to a sign
+        np.testing.assert_allclose(np.abs(Phi_CBs), np.abs(Phi_CB), rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(np.abs(Mrs), np.abs(Mr), rtol=1e-8, atol=1e-6)
+        np.testing.assert_allclose(Krs, Kr, rtol=1e-8, atol=1e-3)
+        self.assertEqual(I_CBs, [2,3,4])
+        self.assertEqual(I_CB , [2,3,4])
+
 
 
 
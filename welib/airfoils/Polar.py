@@ -2,6 +2,7 @@
   - Polar: class to represent a polar (computes steady/unsteady parameters, corrections etc.)
   - blend: function to blend two polars
   - thicknessinterp_from_one_set: interpolate polars at different thickeness based on one set of polars 
+  - PolarTable: polars of multiple sections resampled on one alpha grid, for vectorized lookups
 """
 
 import os
@@ -1242,6 +1243,114 @@ def thicknessinterp_from_one_set(thickness, polarList, polarThickness):
     return polars
 
 
+class PolarTable(object):
+    """ 
+    Polar data (Cl, Cd, Cm) of multiple sections, resampled once on a shared uniform alpha grid,
+    such that the coefficients of all sections are obtained with one vectorized lookup.
+
+    Sections sharing the same polar (same object) share the same table entry.
+      - alpha  : uniform alpha grid, (nAlpha) [rad or deg, see `radians`]
+      - data   : contiguous table of Cl, Cd, Cm, (nPolars x nAlpha x 3)
+      - iPolar : index of the table entry used by each section, (nSections)
+
+    Example:
+        pt = PolarTable(polars)        # polars: list of Polar or arrays (alpha[deg], cl, cd, cm)
+        Cl, Cd, Cm = pt(alpha)         # alpha: array of shape (..., nSections) [rad]
+    """
+    def __init__(self, polars, dalpha=None, radians=True, nAlphaMax=36001, boundsError=True):
+        """ 
+        INPUTS:
+         - polars: list of Polar objects, or of arrays with columns (alpha, cl, cd, cm), alpha in degrees.
+                   One polar per section.
+         - dalpha: spacing of the alpha grid [deg]. If None, the largest spacing such that all the 
+                   input alpha values lie on the grid is used (linear interpolation is then 
+                   unchanged by the resampling), limited by nAlphaMax. If no such spacing exists, 
+                   a warning is printed and the polars are resampled.
+                   If dalpha is provided, the polars are resampled on this grid.
+         - radians: if True, the lookup angles of attack are in radians, otherwise in degrees
+         - boundsError: if True, an exception is raised when looking up an angle of attack outside of 
+                   the alpha range of the polar of a section (as interp1d). Otherwise values are clamped.
+        """
+        # --- Unique polars, in degrees
+        ids = [id(p) for p in polars]
+        uniqueIds = list(dict.fromkeys(ids))
+        self.iPolar = np.array([uniqueIds.index(i) for i in ids], dtype=int)
+        M = []
+        for i in uniqueIds:
+            p = polars[ids.index(i)]
+            if hasattr(p, 'cl'):
+                alpha = np.asarray(p.alpha, dtype=float)
+                if p._radians:
+                    alpha = alpha*180/np.pi
+                M.append(np.column_stack((alpha, p.cl, p.cd, p.cm)))
+            else:
+                M.append(np.asarray(p, dtype=float)[:, :4])
+        alphaAll = np.concatenate([m[:,0] for m in M])
+        aMin, aMax = np.min(alphaAll), np.max(alphaAll)
+        alphaRange = np.array([[np.min(m[:,0]), np.max(m[:,0])] for m in M])
+        # --- Uniform alpha grid
+        if dalpha is None:
+            dalpha = None
+            for da in [1, 0.5, 0.25, 0.2, 0.1, 0.05, 0.02, 0.01]:
+                if (aMax-aMin)/da+1 > nAlphaMax:
+                    break
+                ratio = (alphaAll-aMin)/da
+                if np.all(np.abs(ratio-np.round(ratio))<1e-6):
+                    dalpha = da
+                    break
+            if dalpha is None:
+                dalpha = max((aMax-aMin)/(nAlphaMax-1), 1e-2)
+                print('[WARN] PolarTable: the alpha values of the polars do not lie on a uniform grid, the polars are resampled with dalpha={:.4g} deg'.format(dalpha))
+        nAlpha = int(np.ceil((aMax-aMin)/dalpha-1e-9))+1
+        alpha  = aMin + np.arange(nAlpha)*dalpha
+        # --- Contiguous table
+        self.data = np.zeros((len(M), nAlpha, 3))
+        for i, m in enumerate(M):
+            for j in range(3):
+                self.data[i,:,j] = np.interp(alpha, m[:,0], m[:,j+1])
+        self.radians = radians
+        if radians:
+            alpha      = alpha*np.pi/180
+            dalpha     = dalpha*np.pi/180
+            alphaRange = alphaRange*np.pi/180
+        self.alpha      = alpha
+        self.dalpha     = dalpha
+        self.alphaRange = alphaRange # alpha range of each table entry, (nPolars x 2)
+        self.boundsError = boundsError
+
+    def __repr__(self):
+        s='<{} object>:\n'.format(type(self).__name__)
+        s+=' - nSections : {}\n'.format(len(self.iPolar))
+        s+=' - nPolars   : {}\n'.format(self.data.shape[0])
+        s+=' - nAlpha    : {}\n'.format(len(self.alpha))
+        s+=' - dalpha    : {} [{}]\n'.format(self.dalpha, 'rad' if self.radians else 'deg')
+        return s
+
+    def __call__(self, alpha, iSec=None):
+        """ 
+        Returns Cl, Cd, Cm at the angles of attack alpha, using linear interpolation.
+        Outside of the alpha range of the polar of a section, an exception is raised if `boundsError`
+        is True, otherwise values are clamped.
+        INPUTS:
+         - alpha: angles of attack, array of shape (..., nSections)
+         - iSec: section indices, broadcastable to alpha. Default: last dimension of alpha are all sections.
+        """
+        alpha = np.asarray(alpha)
+        if iSec is None:
+            iSec = np.arange(len(self.iPolar))
+        x = (alpha - self.alpha[0])/self.dalpha
+        i = np.clip(np.floor(x).astype(int), 0, len(self.alpha)-2)
+        w = np.clip(x - i, 0, 1)[...,None]
+        ip = self.iPolar[iSec]
+        if self.boundsError:
+            tol = 1e-9*self.dalpha
+            bOut = (alpha < self.alphaRange[ip,0]-tol) | (alpha > self.alphaRange[ip,1]+tol)
+            if np.any(bOut):
+                raise ValueError('PolarTable: {} angle(s) of attack outside of the alpha range of the polars, alpha in [{}, {}]'.format(np.sum(bOut), np.min(alpha), np.max(alpha)))
+        ClCdCm = self.data[ip, i]*(1-w) + self.data[ip, i+1]*w
+        return ClCdCm[...,0], ClCdCm[...,1], ClCdCm[...,2]
+
+
 def _alpha_window_in_bounds(alpha, window):
     """Ensures that the window of alpha values is within the bounds of alpha
     Example: alpha in [-30,30], window=[-20,20] => window=[-20,20]
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import os
+MyDir=os.path.dirname(__file__)
+from welib.airfoils.Polar import * 
+
+# --------------------------------------------------------------------------------}
+# ---  
+# --------------------------------------------------------------------------------{
+class TestPolarTable(unittest.TestCase):
+
+    def test_table_lookup(self):
+        # --- Lookup in table is the same as linear interpolation of each polar
+        P1 = Polar(os.path.join(MyDir,'../data/FFA-W3-241-Re12M.dat'))
+        M2 = np.column_stack((P1.alpha, P1.cl*0.5, P1.cd+0.1, P1.cm-0.1))
+        polars = [P1, M2, P1]
+        pt = PolarTable(polars)
+        np.testing.assert_equal(pt.data.shape[0], 2) # sections 0 and 2 share the same polar
+        np.testing.assert_equal(pt.data.shape[2], 3)
+
+        alpha_deg = np.array([[-30.3, 2.23, 15.1], [0, 7.77, 179]])
+        Cl, Cd, Cm = pt(alpha_deg*np.pi/180)
+        np.testing.assert_equal(Cl.shape, (2,3))
+        for ie, (p, fact, dcd) in enumerate(zip(polars, [1, 0.5, 1], [0, 0.1, 0])):
+            np.testing.assert_almost_equal(Cl[:,ie], np.interp(alpha_deg[:,ie], P1.alpha, P1.cl)*fact, 10)
+            np.testing.assert_almost_equal(Cd[:,ie], np.interp(alpha_deg[:,ie], P1.alpha, P1.cd)+dcd, 10)
+
+        # --- Lookup in degrees, with explicit section indices
+        pt = PolarTable(polars, radians=False)
+        Cl, Cd, Cm = pt(np.array([5.5, 5.5]), iSec=np.array([0, 1]))
+        np.testing.assert_almost_equal(Cl[1], Cl[0]*0.5, 10)
+
+    def test_table_bounds(self):
+        # --- Out of range alpha raise by default, or are clamped
+        M1 = np.array([[-10, -1, 0.1, 0], [0, 0, 0.01, 0], [10, 1, 0.1, 0]])
+        M2 = np.array([[-20, -2, 0.2, 0], [20, 2, 0.2, 0]])
+        pt = PolarTable([M1, M2], radians=False)
+        Cl, Cd, Cm = pt(np.array([5, 15]))
+        np.testing.assert_almost_equal(Cl, [0.5, 1.5])
+        with self.assertRaises(ValueError):
+            pt(np.array([15, 15])) # outside of range of first polar
+        pt = PolarTable([M1, M2], radians=True, boundsError=False)
+        Cl, Cd, Cm = pt(np.array([15, 25])*np.pi/180)
+        np.testing.assert_almost_equal(Cl, [1, 2])
+
+    def test_table_inexact_grid(self):
+        # --- Alpha values that do not lie on a uniform grid are resampled with a warning
+        M = np.array([[-10, -1, 0.1, 0], [0.003, 0, 0.01, 0], [10, 1, 0.1, 0]])
+        import io, contextlib
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            pt = PolarTable([M], radians=False)
+        self.assertIn('[WARN]', out.getvalue())
+        with contextlib.redirect_stdout(out):
+            pt = PolarTable([M[[0,2]]], radians=False)
+        self.assertEqual(out.getvalue().count('[WARN]'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import os
+import copy
 import collections
+import hashlib
 import glob
 import pandas as pd
 import numpy as np
@@ -76,7 +78,8 @@ def copyTree(src, dst):
                 forceMergeFlatDir(s, d)
 
 
-def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False):
+def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False, 
+        shareSubFiles=False, nCores=1):
     """ Generate inputs files by replacing different parameters from a template file.
     The generated files are placed in the output directory `outputDir` 
     The files are read and written using the library `weio`. 
@@ -97,6 +100,14 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                       before doing the parametric substitution
 
       outputDir  : directory where files will be generated. 
+
+      shareSubFiles: if True, sub-files that are identical between simulations (same content, same 
+                     directory) are written once, and the parent files of the other simulations refer to it.
+                     The main files are always written for each simulation.
+
+      nCores     : number of threads used to write the files
+
+    NOTE: each template file is parsed once, the files of each simulation are copies of the parsed templates.
     """
     # --- Helper functions
     def rebase_rel(wd,s,sid):
@@ -122,7 +133,7 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
             new_filename      = os.path.relpath(new_filename_full,workDir).replace('\\','/')
             return new_filename, new_filename_full
 
-    def replaceRecurse(templatename_or_newname, FileKey, ParamKey, ParamValue, Files, strID, workDir, TemplateFiles):
+    def replaceRecurse(templatename_or_newname, FileKey, ParamKey, ParamValue, Files, strID, workDir, TemplateFiles, Parents):
         """ 
         FileKey: a single key defining which file we are currently modifying e.g. :'AeroFile', 'EDFile','FVWInputFileName'
         ParamKey: the address key of the parameter to be changed, relative to the current FileKey
@@ -130,6 +141,7 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                        'IntMethod' (if FileKey is 'EDFile') 
         ParamValue: the value to be used
         Files: dict of files, as returned by weio, keys are "FileKeys" 
+        Parents: dict of the "FileKey" of the parent of each file
         """
         # --- Special handling for the root
         if FileKey=='':
@@ -161,8 +173,8 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
             #print('TemplateFileFull:', templatefilename_full)
             #print('NewFile         :', newfilename)
             #print('NewFileFull     :', newfilename_full)
-            shutil.copyfile(templatefilename_full, newfilename_full)
-            f= fi.FASTInputFile(newfilename_full) # open the template file for that filekey 
+            f = copy.deepcopy(parsedTemplate(templatefilename_full)) # copy of the template file for that filekey 
+            f.fixedfile.filename = newfilename_full
             Files[FileKey]=f # store it
 
         # --- Changing parameters in that file
@@ -191,12 +203,31 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
             workDir = os.path.join(workDir, baseparent)
 
             #  
-            newchildFilename, Files = replaceRecurse(child_templatefilename, NewFileKey, ChildrenKey, ParamValue, Files, strID, workDir, TemplateFiles)
+            newchildFilename, Files = replaceRecurse(child_templatefilename, NewFileKey, ChildrenKey, ParamValue, Files, strID, workDir, TemplateFiles, Parents)
             #print('Setting', FileKey, '|',NewFileKey, 'to',newchildFilename)
             f[NewFileKey] = '"'+newchildFilename+'"'
+            Parents[NewFileKey] = FileKey
 
         return newfilename, Files
 
+    Templates = {}
+    def parsedTemplate(templatefilename_full):
+        """ Parse a template file once, and store it """
+        key = os.path.normpath(templatefilename_full)
+        if key not in Templates:
+            f = fi.FASTInputFile(templatefilename_full)
+            f.fixedfile # trigger the detection of the file format before copies are made
+            Templates[key] = f
+        return Templates[key]
+
+    def fileDepth(Parents, FileKey):
+        """ Number of parents of a file, the root file has a depth of 0 """
+        depth = 0
+        while FileKey in Parents:
+            FileKey = Parents[FileKey]
+            depth += 1
+        return depth
+
 
     # --- Safety checks
     if templateDir is None and outputDir is None:
@@ -245,29 +276,57 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
     TemplateFiles=[]
     files=[]
     nTot=len(PARAMS)
-    for ip,(wd,p) in enumerate(zip(workDirS,PARAMS)):
-        if np.mod(ip+1,1000)==0:
-            print('File {:d}/{:d}'.format(ip,nTot))
-        if '__index__' not in p.keys():
-            p['__index__']=ip
-
-        main_file_base = os.path.basename(main_file)
-        strID          = get_strID(p)
-        # --- Setting up files for this simulation
-        Files=dict()
-        for k,v in p.items():
-            if k =='__index__' or k=='__name__':
-                continue
-            new_mainFile, Files = replaceRecurse(main_file_base, '', k, v, Files, strID, wd, TemplateFiles)
-            if dryRun:
-                break
-
-        # --- Writting files
-        for k,f in Files.items():
-            if k=='Root':
-                files.append(f.filename)
-            if not dryRun:
-                f.write()
+    Written = {} # (directory, hash of content) -> filename, for shareSubFiles
+    executor = None
+    if nCores>1 and not dryRun:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=nCores)
+    futures = []
+    try:
+        for ip,(wd,p) in enumerate(zip(workDirS,PARAMS)):
+            if np.mod(ip+1,1000)==0:
+                print('File {:d}/{:d}'.format(ip,nTot))
+            if '__index__' not in p.keys():
+                p['__index__']=ip
+
+            main_file_base = os.path.basename(main_file)
+            strID          = get_strID(p)
+            # --- Setting up files for this simulation
+            Files=dict()
+            Parents=dict()
+            for k,v in p.items():
+                if k =='__index__' or k=='__name__':
+                    continue
+                new_mainFile, Files = replaceRecurse(main_file_base, '', k, v, Files, strID, wd, TemplateFiles, Parents)
+                if dryRun:
+                    break
+
+            # --- Writting files, children first so that parents can refer to shared files
+            for k in sorted(Files.keys(), key=lambda k: -fileDepth(Parents, k)):
+                f = Files[k]
+                if k=='Root':
+                    files.append(f.filename)
+                if dryRun:
+                    continue
+                content = f.toStringForWrite()
+                if shareSubFiles and k!='Root':
+                    key = (os.path.dirname(f.filename), hashlib.sha1(content.encode('utf-8')).hexdigest())
+                    if key in Written:
+                        # An identical file was already written, the parent refers to it
+                        parent = Files[Parents[k]]
+                        parent[k] = '"'+os.path.relpath(Written[key], os.path.dirname(parent.filename)).replace('\\','/')+'"'
+                        continue
+                    Written[key] = f.filename
+                if executor is not None:
+                    futures.append(executor.submit(writeFileContent, f.filename, content))
+                else:
+                    writeFileContent(f.filename, content)
+
+        for fut in futures:
+            fut.result() # raise exceptions if any
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     # --- Remove extra files at the end
     if removeRefSubFiles:
@@ -283,8 +342,13 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                 pass
     return files
 
+def writeFileContent(filename, content):
+    with open(filename, 'w') as fid:
+        fid.write(content)
+
 # def templateReplace(PARAMS, *args, **kwargs):
-def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False):
+def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False, 
+        shareSubFiles=False, nCores=1):
     """ 
     see templateReplaceGeneral
 
@@ -300,7 +364,8 @@ def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeA
     
 #     return templateReplaceGeneral(PARAMS, *args, **kwargs)
     return templateReplaceGeneral(PARAMS, templateDir, outputDir=outputDir, main_file=main_file, 
-            removeAllowed=removeAllowed, removeRefSubFiles=removeRefSubFiles, oneSimPerDir=oneSimPerDir, dryRun=dryRun)
+            removeAllowed=removeAllowed, removeRefSubFiles=removeRefSubFiles, oneSimPerDir=oneSimPerDir, dryRun=dryRun,
+            shareSubFiles=shareSubFiles, nCores=nCores)
 
 
 def addToOutlist(OutList, Signals):
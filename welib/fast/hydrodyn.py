@@ -212,9 +212,15 @@ class HydroDyn:
             RefPointMotion=None, RefPointMapping=None,
             RefPointMappingMotion='translate',
             optsM=None, saveFile=None,
-            around=None
+            around=None, sparse=True, nProcs=1
             ):
         """ 
+        Jacobian of the Morison loads at all nodes with respect to the displacements of all nodes
+
+        - sparse: if True, the displacement of a node is assumed to only affect the loads of the 
+                  nodes of the elements it belongs to. Independent nodes are perturbed together, 
+                  the number of evaluations of the loads is then independent of the number of nodes.
+        - nProcs: number of processes used to evaluate the perturbations (see numerical_jacobian)
         """
         from welib.system.linearization import numerical_jacobian
         uMesh = self.u['Morison']['Mesh']
@@ -224,21 +230,6 @@ class HydroDyn:
 
         FthenM=True
 
-        # --- Define a function that returns outputs
-        def fh(q,p=None):
-            iNode = p['MotionNode']
-            # Set uMesh to operating point values
-            uMesh.restoreValues()
-            # Perturb
-            uMesh.perturbNode(iNode, q)
-            #print('Translation\n',uMesh.TranslationDisp)
-            #print('Rotation\n',uMesh.Orientation)
-            # Calculate hydrodynamic loads at every nodes 
-            self.calcOutput(t=0, u=self.u, y=self.y, optsM=p)
-            # Pack loads
-            fh = self.y['Morison']['Mesh'].packLoads(FthenM=FthenM)
-            return fh
-
         # --- Operating point and perturbation sizes
         if q0 is None:
             q0  = np.zeros(6)
@@ -248,12 +239,22 @@ class HydroDyn:
         # --- Save operating point value
         uMesh.rigidBodyMotion(q=q0, qd=qd0, qdd=qdd0, RefPoint=RefPointMotion)
         uMesh.backupValues()
-
-        # --- Linearization
-        optsM['MotionNode']=0
-        f0 = fh(q0, optsM)
-        K=[]
         nNodes = uMesh.nNodes 
+        Q0 = np.tile(q0, nNodes)
+
+        # --- Define a function that returns outputs for the displacements of all nodes
+        def fh(Q,p=None):
+            # Set uMesh to operating point values
+            uMesh.restoreValues()
+            # Perturb nodes that are away from the operating point
+            dQ = (np.asarray(Q)-Q0).reshape(nNodes,6)
+            for iNode in np.where(np.any(dQ!=0, axis=1))[0]:
+                uMesh.perturbNode(iNode, Q[6*iNode:6*iNode+6])
+            # Calculate hydrodynamic loads at every nodes 
+            self.calcOutput(t=0, u=self.u, y=self.y, optsM=p)
+            # Pack loads
+            fh = self.y['Morison']['Mesh'].packLoads(FthenM=FthenM)
+            return fh
 
         su=[]
         for i in range(1,nNodes+1):
@@ -269,20 +270,23 @@ class HydroDyn:
                 sy+=['HDMorisonLoadsFxN{}_[N]'.format(i) , 'HDMorisonLoadsFyN{}_[N]'.format(i), 'HDMorisonLoadsFzN{}_[N]'.format(i)]
                 sy+=['HDMorisonLoadsMxN{}_[Nm]'.format(i), 'HDMorisonLoadsMyN{}_[Nm]'.format(i), 'HDMorisonLoadsMzN{}_[Nm]'.format(i)]
 
-        D=np.zeros((6*nNodes,6*nNodes)) 
-        for iNode in range(uMesh.nNodes):
-            if np.mod(iNode,10)==0:
-                print('{:5d}/{:5d}'.format(iNode,nNodes))
-
-            optsM['MotionNode']=iNode
-            dfNode = numerical_jacobian(fh, (q0,), 0, dq  , optsM)
-            #print('')
-            #print('K for node{}\n'.format(iNode+1),dfNode)
-            D[:,iNode*6:iNode*6+6] = dfNode
+        # --- Linearization
+        S = self.loadsSparsity() if sparse else None
+        D = numerical_jacobian(fh, (Q0,), 0, np.tile(dq, nNodes), optsM, sparsity=S, nProcs=nProcs)
+        uMesh.restoreValues()
 
         D= pd.DataFrame(columns=su, index=sy, data=D)
         return D
 
+    def loadsSparsity(self):
+        """ 
+        Sparsity pattern of the jacobian of the Morison loads (forces then moments for all nodes)
+        with respect to the displacements of all nodes (see Morison.nodeCoupling)
+        """
+        import scipy.sparse as sp
+        SF = sp.kron(self.morison.nodeCoupling(), np.ones((3,6), dtype=bool))
+        return sp.vstack((SF, SF)).tocsc()
+
 
     def linearize_RigidMotion2Loads(self, q0=None, qd0=None, qdd0=None, dq=None, dqd=None, dqdd=None, 
             RefPointMotion=None, RefPointMapping=None,
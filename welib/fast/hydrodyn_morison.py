@@ -94,8 +94,8 @@ class Morison:
         for e in graph.Elements:
             n1 = e.nodes[0]
             n2 = e.nodes[1]
-            i1 = graph.Nodes.index(n1)
-            i2 = graph.Nodes.index(n2)
+            i1 = graph.getNodeIndex(n1.ID)
+            i2 = graph.getNodeIndex(n2.ID)
             mem      = e.MorisonData
             idx      = mem['nodeIDs']
             if len(idx)>2:
@@ -226,6 +226,9 @@ class Morison:
         #    END IF
         # END IF  
 
+        # Structure-of-arrays representation used by calcOutput
+        self._setupArrays(u['Mesh'])
+
         # We call CalcOutput to compute the loads for the initial reference position
         # Then we can use the computed load components in the Summary File
         # NOTE: Morison module has no states, otherwise we could not do this.
@@ -631,12 +634,146 @@ class Morison:
             self._setMemberProperties(member, m)
 
 
-    def calcOutput(self, t, x=None, xd=None, xo=None, u=None, y=None, opts=None):
-        """ NOTE: Morison has no state
-        u:
+    def _setupArrays(self, umesh):
+        """ 
+        Structure-of-arrays representation of the Morison members, used by calcOutput.
+        All quantities that do not depend on the motion are precomputed here, at the level of:
+          - elements   ('SoA_Elem'): concatenation of the elements of all members
+          - member nodes ('SoA_Node'): concatenation of the nodes of all members (NElements+1 per member)
+          - members    ('SoA_Mem')
+        The member loads (member['Loads']) become views into arrays of dimension (6 x nMemberNodes) stored in m['Loads'].
+        """
+        p       = self.p
+        rho     = p['WtrDens']
+        members = [e.MorisonData for e in self.graph.Elements]
+        Pot     = np.array([e.data['Pot'] for e in self.graph.Elements], dtype=bool)
+        NE      = np.array([mem['NElements'] for mem in members], dtype=int)
+        nMem    = len(members)
+        offN    = np.concatenate(([0], np.cumsum(NE+1)[:-1])) # offset of member nodes
+        offE    = np.concatenate(([0], np.cumsum(NE)[:-1]))   # offset of elements
+        nMN     = np.sum(NE+1)
+        def catE(key): # element values
+            return np.concatenate([np.asarray(mem[key], dtype=float)[:N] for mem,N in zip(members, NE)])
+        def repE(key): # member value repeated for each element
+            return np.repeat([mem[key] for mem in members], NE)
+
+        # --- Elements
+        E = {}
+        E['i']   = np.concatenate([np.arange(N) for N in NE])
+        E['N']   = np.repeat(NE, NE)
+        E['g']   = np.repeat(offN, NE) + E['i']  # member node index of lower node
+        E['Pot'] = np.repeat(Pot, NE)
+        E['n1']  = np.concatenate([mem['nodeIDs'][:-1] for mem in members]).astype(int) # mesh node indices
+        E['n2']  = np.concatenate([mem['nodeIDs'][1: ] for mem in members]).astype(int)
+        for k in ['RMG', 'Rin', 'dRdl_mg', 'dRdl_in', 'alpha', 'floodstatus', 'alpha_fb_star', 'Cfl_fb', 'Cfr_fb', 'CM0_fb',
+                  'm_mg_l', 'm_mg_u', 'h_cmg_l', 'h_cmg_u', 'I_lmg_l', 'I_lmg_u', 'I_rmg_l', 'I_rmg_u',
+                  'm_fb_l', 'm_fb_u', 'h_cfb_l', 'h_cfb_u', 'I_lfb_l', 'I_lfb_u', 'I_rfb_l', 'I_rfb_u']:
+            E[k] = catE(k)
+        for k in ['dl', 'FillDens', 'z_overfill', 'l_fill', 'memfloodstatus']:
+            E[k] = repE(k)
+
+        # --- Member nodes
+        NM = {}
+        NM['i']    = np.concatenate([np.arange(N+1) for N in NE])
+        NM['Pot']  = np.repeat(Pot, NE+1)
+        NM['mesh'] = np.concatenate([mem['nodeIDs'] for mem in members]).astype(int)
+        NM['k']    = np.repeat([mem['k'] for mem in members], NE+1, axis=0)
+        NM['Ak']   = np.repeat([mem['Ak'] for mem in members], NE+1, axis=0)
+        NM['kkt']  = np.repeat([mem['kkt'] for mem in members], NE+1, axis=0)
+        NM['active'] = np.zeros(nMN, dtype=bool)
+        NM['deltal'] = np.zeros(nMN)
+        NM['h_c']    = np.zeros(nMN)
+        dRdl_p       = np.zeros(nMN)
+        dRdl_pp      = np.zeros(nMN)
+        zRef = umesh.Position[:,2] - p['MSL2SWL']
+        for im, mem in enumerate(members):
+            N, dl, idx = NE[im], mem['dl'], mem['nodeIDs']
+            for i in range(N+1):
+                ig = offN[im]+i
+                # see table in Section 7.1.1
+                NM['active'][ig] = i > mem['i_floor'] and zRef[idx[i]] <= 0.0
+                if i == 0:
+                    deltal, h_c = dl/2.0, dl/4.0
+                elif i == N:
+                    deltal, h_c = dl/2.0, -dl/4.0
+                elif mem['i_floor'] == i+1 :
+                    deltal = dl/2.0 - mem['h_floor']
+                    h_c    = 0.5*(dl/2.0 + mem['h_floor'])
+                elif zRef[idx[i]] <= 0.0 and 0.0 < zRef[idx[i+1]]:
+                    h      = zRef[idx[i]] / mem['cosPhi_ref']
+                    deltal = dl/2.0 + h
+                    h_c    = 0.5*(h-dl/2.0)
+                else:
+                    deltal, h_c = dl, 0.0
+                NM['deltal'][ig], NM['h_c'][ig] = deltal, h_c
+                if i == 0:
+                    dRdl_p [ig] = abs(mem['dRdl_mg'][i])
+                    dRdl_pp[ig] = mem['dRdl_mg'][i]   
+                elif i<N:
+                    dRdl_p [ig] = 0.5*( abs(mem['dRdl_mg'][i-1]) + abs(mem['dRdl_mg'][i]) )
+                    dRdl_pp[ig] = 0.5*( mem['dRdl_mg'][i-1] + mem['dRdl_mg'][i] )
+                else:
+                    dRdl_p [ig] = abs(mem['dRdl_mg'][-1])
+                    dRdl_pp[ig] = mem['dRdl_mg'][-1]
+        RMG  = np.concatenate([mem['RMG']  for mem in members])
+        Cd   = np.concatenate([mem['Cd']   for mem in members])
+        Ca   = np.concatenate([mem['Ca']   for mem in members])
+        Cp   = np.concatenate([mem['Cp']   for mem in members])
+        AxCd = np.concatenate([mem['AxCd'] for mem in members])
+        AxCa = np.concatenate([mem['AxCa'] for mem in members])
+        AxCp = np.concatenate([mem['AxCp'] for mem in members])
+        # Drag, added mass and inertia coefficients, see Sections 7.1.2-7.1.4
+        NM['CdR']  = Cd*rho*RMG
+        NM['CAxD'] = 0.5*AxCd*rho*np.pi*RMG*dRdl_p
+        c = rho*np.pi*RMG*RMG
+        NM['Am'] = (Ca*c)[:,None,None]*NM['Ak'] + (2.0*AxCa*c*dRdl_p)[:,None,None]*NM['kkt']
+        NM['Ai'] = ((Ca+Cp)*c)[:,None,None]*NM['Ak'] + (2.0*AxCa*c*dRdl_p)[:,None,None]*NM['kkt']
+        NM['cP'] = (2.0*AxCp*np.pi*RMG*dRdl_pp)[:,None]*NM['k']
+
+        # --- Members
+        M = {}
+        M['Pot'] = Pot
+        M['N']   = NE
+        M['e0']  = offE         # first element
+        M['e1']  = offE + NE-1  # last element
+        M['n0']  = np.array([mem['nodeIDs'][0]  for mem in members], dtype=int)
+        M['nN']  = np.array([mem['nodeIDs'][-1] for mem in members], dtype=int)
+        for k in ['i_floor', 'doEndBuoyancy', 'memfloodstatus', 'l_fill', 'z_overfill', 'FillDens']:
+            M[k] = np.array([mem[k] for mem in members])
+        for k in ['RMG', 'Rin']:
+            M[k+'0'] = np.array([mem[k][0]  for mem in members])
+            M[k+'N'] = np.array([mem[k][-1] for mem in members])
+
+        p['SoA_Elem'] = E
+        p['SoA_Node'] = NM
+        p['SoA_Mem']  = M
+        # --- Member loads, as views into global arrays
+        self.m['Loads'] = {}
+        for k in ['F_D','F_A','F_B','F_BF','F_I','F_If','F_WMG','F_IMG']:
+            self.m['Loads'][k] = np.zeros((6, nMN))
+            for im, mem in enumerate(members):
+                mem['Loads'][k] = self.m['Loads'][k][:, offN[im]:offN[im]+NE[im]+1]
 
+    def _waveTimeIndex(self, t):
+        """ Index of the wave kinematics time step for time t (last time step before t) """
+        iTime = np.searchsorted(self.p['WaveTime'], t + 1e-8, side='right') - 1
+        return int(min(max(iTime, 0), len(self.p['WaveTime'])-1))
 
+    def calcOutput(self, t, x=None, xd=None, xo=None, u=None, y=None, opts=None):
+        """ NOTE: Morison has no state
+        Loads are computed with array operations over all nodes, elements and members (see _setupArrays).
+        The loop implementation, closer to Morison.f90, is used if opts['vectorized'] is False 
+        or if opts['verbose'] is True.
+        u: inputs, with key 'Mesh'
+        y: outputs, with key 'Mesh', loads are set on this mesh
         """
+        if opts is not None and (not opts.get('vectorized', True) or opts.get('verbose', False)):
+            return self._calcOutputLoop(t, u=u, y=y, opts=opts)
+        else:
+            return self._calcOutputVectorized(t, u=u, y=y, opts=opts)
+
+    def _calcOutputLoop(self, t, x=None, xd=None, xo=None, u=None, y=None, opts=None):
+        """ Loop implementation of calcOutput, node by node and member by member, as in Morison.f90 """
 
 
         graph = self.graph
@@ -647,7 +784,7 @@ class Morison:
         g = p['Gravity']
 
         # Calculation options
-        defaultOpts ={'verbose':False, 'MG':True, 'Buoyancy':True, 'Ballast':True, 'HydroD':True, 'HydroA':True, 'HydroI':True, 'End':True}
+        defaultOpts ={'verbose':False, 'vectorized':True, 'MG':True, 'Buoyancy':True, 'Ballast':True, 'HydroD':True, 'HydroA':True, 'HydroI':True, 'End':True}
         if opts is not None:
             defaultOpts.update(opts)
         bVerbose = defaultOpts['verbose'] 
@@ -677,7 +814,7 @@ class Morison:
         #===============================================================================================
         # Calculate the fluid kinematics at all mesh nodes and store for use in the equations below
         #    InterpolationSlope = GetInterpolationSlope(Time, p, m, IntWrapIndx)
-        iTime = 0 # TODO TODO interpolate wave kinematics at time
+        iTime = self._waveTimeIndex(t) # TODO interpolate wave kinematics at time
         myprint('---------------------------FLUID KINEMATICS')
         for j, pos in enumerate(self.NodesBeforeSwap):    
             m['nodeInWater'][j] = p['nodeInWater'][iTime,j]
@@ -788,6 +925,7 @@ class Morison:
                         ymesh.Force [idx[i], :] +=F_IMG[:3]
                         ymesh.Moment[idx[i], :] +=F_IMG[3:]
                         # upper node
+                        Imat      = np.zeros((3,3)) # NOTE: the lower node matrix was rotated
                         Ioffset   = mem['h_cmg_u'][i]*mem['h_cmg_u'][i]*mem['m_mg_u'][i]
                         Imat[0,0] = mem['I_rmg_u'][i] - Ioffset
                         Imat[1,1] = mem['I_rmg_u'][i] - Ioffset
@@ -990,14 +1128,14 @@ class Morison:
                         h_c    = 0.5*(mem['dl']/2.0 + mem['h_floor'])
                     else:
                         # We need to subtract the MSL2SWL offset to place this  in the SWL reference system
-                        pos1    = umesh.Position[idx[i], :]
+                        pos1    = umesh.Position[idx[i], :].copy()
                         pos1[2] = pos1[2] - p['MSL2SWL']
-                        pos2    = umesh.Position[idx[i+1],:]
+                        pos2    = umesh.Position[idx[i+1],:].copy()
                         pos2[2] = pos2[2] - p['MSL2SWL']
                         if pos1[2] <= 0.0 and 0.0 < pos2[2]: # This node is just below the free surface #TODO: Needs to be augmented for wave stretching
                             # We need to subtract the MSL2SWL offset to place this  in the SWL reference system
                             #TODO: Fix this one
-                            pos1    = umesh.Position[idx[i],:] # use reference position for following equation
+                            pos1    = umesh.Position[idx[i],:].copy() # use reference position for following equation
                             pos1[2] = pos1[2] - p['MSL2SWL']
                             h       = ( pos1[2] ) / mem['cosPhi_ref'] #TODO: Needs to be augmented for wave stretching
                             deltal  = mem['dl']/2.0 + h
@@ -1226,6 +1364,306 @@ class Morison:
         return y
 
 
+    def _calcOutputVectorized(self, t, u=None, y=None, opts=None):
+        """ 
+        Vectorized implementation of calcOutput: loads are computed for all elements, member nodes, 
+        members and joints at once using the arrays precomputed in _setupArrays.
+        """
+        p  = self.p
+        m  = self.m
+        E  = p['SoA_Elem']
+        NM = p['SoA_Node']
+        M  = p['SoA_Mem']
+        umesh = u['Mesh']
+        ymesh = y['Mesh']
+        g   = p['Gravity']
+        rho = p['WtrDens']
+
+        # Calculation options
+        defaultOpts ={'MG':True, 'Buoyancy':True, 'Ballast':True, 'HydroD':True, 'HydroA':True, 'HydroI':True, 'End':True}
+        if opts is not None:
+            defaultOpts.update(opts)
+        bMG      = defaultOpts['MG']
+        bBuoy    = defaultOpts['Buoyancy']
+        bBallast = defaultOpts['Ballast']
+        bHydroD  = defaultOpts['HydroD']
+        bHydroA  = defaultOpts['HydroA']
+        bHydroI  = defaultOpts['HydroI']
+        bEnd     = defaultOpts['End']
+
+        # --- Fluid kinematics at all mesh nodes
+        iTime = self._waveTimeIndex(t)
+        m['nodeInWater'][:] = p['nodeInWater'][iTime,:]
+        m['FDynP'][:]       = p['WaveDynP'   ][iTime,:]
+        m['FA'][:]          = p['WaveAcc'    ][iTime,:,:].T
+        m['FV'][:]          = p['WaveVel'    ][iTime,:,:].T
+        m['vrel'][:]        = m['FV'] - umesh.TranslationVel.T
+
+        # Zero out previous time-steps loads
+        m['F_BF_End'] *= 0
+        m['F_B_End']  *= 0
+        ymesh.Force  *= 0
+        ymesh.Moment *= 0
+        # Very important transfer disp/rot
+        umesh.transferMotion2IdenticalMesh(ymesh)
+        L = m['Loads']
+        for k in L.keys():
+            L[k] *= 0
+        def addLoads(key, ig, F, b):
+            """ Add loads F (6 x n) to member nodes ig (n) where b is True """
+            if np.any(b):
+                np.add.at(L[key], (slice(None), ig[b]), F[:, b])
+
+        # --- Element orientations 
+        pos = umesh.TranslationDisp + umesh.Position
+        pos[:,2] -= p['MSL2SWL']
+        P1  = pos[E['n1'],:]
+        P2  = pos[E['n2'],:]
+        phi, sinPhi, cosPhi, tanPhi, sinBeta, cosBeta, k_hat = getOrientationAngles(P1, P2)
+        g1, g2 = E['g'], E['g']+1
+        a_s1, alpha_s1, omega_s1 = umesh.TranslationAcc[E['n1'],:], umesh.RotationAcc[E['n1'],:], umesh.RotationVel[E['n1'],:]
+        a_s2, alpha_s2, omega_s2 = umesh.TranslationAcc[E['n2'],:], umesh.RotationAcc[E['n2'],:], umesh.RotationVel[E['n2'],:]
+        dl      = E['dl']
+        z1      = P1[:,2]
+        z2      = P2[:,2]
+        r1      = E['RMG']
+        dRdl_mg = E['dRdl_mg']
+        notPot  = ~E['Pot']
+
+        # --------------------------------------------------------------------------------}
+        # --- Marine growth 
+        # --------------------------------------------------------------------------------{
+        if bMG and np.any(notPot):
+            CMatrix = Morison_DirCosMtrx(P1, P2)
+            for (ig, ml, hl, Irl, Ill, a_s, alpha_s, omega_s) in [
+                    (g1, E['m_mg_l'], E['h_cmg_l'], E['I_rmg_l'], E['I_lmg_l'], a_s1, alpha_s1, omega_s1),
+                    (g2, E['m_mg_u'], E['h_cmg_u'], E['I_rmg_u'], E['I_lmg_u'], a_s2, alpha_s2, omega_s2)]:
+                F_WMG = np.zeros((6, len(ig)))
+                F_WMG[2] = - ml*g  # weight force  : Note: this is a constant
+                F_WMG[3] = - ml*g * hl* sinPhi * sinBeta
+                F_WMG[4] =   ml*g * hl* sinPhi * cosBeta
+                addLoads('F_WMG', ig, F_WMG, notPot)
+                F_IMG = lumpedInertiaLoads(ml, hl, Irl, Ill, k_hat, a_s, alpha_s, omega_s, CMatrix)
+                addLoads('F_IMG', ig, F_IMG, notPot)
+
+        # --------------------------------------------------------------------------------}
+        # --- Buoyancy loads, sides: Sections 3.1 and 3.2
+        # --------------------------------------------------------------------------------{
+        if bBuoy:
+            bSub  = notPot & (z1 < 0)     # segment is at least partially submerged
+            bPart = bSub & (z1*z2 <= 0)   # partially submerged
+            bFull = bSub & ~bPart
+            if np.any(bPart & (E['i']==0)):
+                raise Exception('The lowest element of a Morison member has become partially submerged!  This is not allowed.  Please review your model and create a discretization such that even with displacements, the lowest element of a member does not become partially submerged.')
+            if np.any(bPart):
+                I = np.where(bPart)[0]
+                r1_, dR, z1_, z2_  = r1[I], dRdl_mg[I], z1[I], z2[I]
+                sP, cP, tP, dl_, a0 = sinPhi[I], cosPhi[I], tanPhi[I], dl[I], E['alpha'][I]
+                h0 = -z1_/cP                 # distances along element centerline from point 1 to the waterplane
+                Vs = np.zeros(len(I))
+                cx = np.zeros(len(I))
+                bU = np.abs(dR) < 0.0001     # untapered cylinder case
+                Vs[bU] = np.pi*r1_[bU]**2*h0[bU]
+                bV = bU & (Vs!=0)
+                cr = 0.25*r1_[bV]**2*tP[bV]/h0[bV]
+                cl = 0.5*h0[bV] + 0.125*r1_[bV]**2*tP[bV]**2/h0[bV]
+                cx[bV] = cr*cP[bV] + cl*sP[bV]
+                bT = ~bU                     # inclined tapered cylinder case
+                if np.any(bT):
+                    r, d, c, s, t_ = r1_[bT], dR[bT], cP[bT], sP[bT], tP[bT]
+                    rh   = r + h0[bT]*d      # radius of element at point where its centerline crosses the waterplane
+                    C_1  = 1.0 - d**2 * t_**2
+                    b0   = rh/np.sqrt(C_1)
+                    a_h  = rh/((C_1)*c)    # semi-axis of the waterplane ellipse (not the element alpha)
+                    a_hb0 = a_h*b0
+                    C_2  = a_hb0*rh*c - r**3
+                    cl   = -(-0.75*a_hb0*rh**2*c + 0.75*r**4*C_1 + r*C_1*C_2) / (d*C_1*C_2)
+                    cr   = (0.75*a_hb0*d*rh**2*s)/(C_1*C_2)
+                    cx[bT] = cr*c + cl*s
+                    Vs[bT] = np.pi*(a_hb0*rh*c - r**3)/(3.0*d)
+                alpha  = (1.0-a0)*z1_**3/(-a0*z2_**3 + (1.0-a0)*z1_**3)
+                Fb     = Vs*rho*g        # buoyant force
+                Fr     = -Fb*sP          # radial component of buoyant force
+                Fl     = Fb*cP           # axial component of buoyant force
+                Moment = -Fb*cx          # moment induced about the center of the cylinder's bottom face
+                # calculate (imaginary) bottom plate forces/moment to subtract from displacement-based values
+                Fl     = Fl + rho*g*z1_* np.pi *r1_*r1_
+                Moment = Moment + rho*g* sP * np.pi/4.0*r1_**4
+                # reduce taper-based moment to remove (not double count) radial force distribution to each node 
+                Moment = Moment + Fr*(1.0-alpha)*dl_
+                F_B1, F_B2 = DistributeElementLoads(Fl, Fr, Moment, sP, cP, sinBeta[I], cosBeta[I], alpha)
+                b = np.ones(len(I), dtype=bool)
+                addLoads('F_B', g1[I]  , F_B1, b)  # alpha
+                addLoads('F_B', g1[I]-1, F_B2, b)  # 1-alpha
+            if np.any(bFull):
+                I = np.where(bFull)[0]
+                r1_, dR, z1_, z2_  = r1[I], dRdl_mg[I], z1[I], z2[I]
+                sP, cP, dl_, a0 = sinPhi[I], cosPhi[I], dl[I], E['alpha'][I]
+                Fl = -2.0*np.pi*dR*rho*g*dl_*( z1_*r1_ + 0.5*(z1_*dR + r1_*cP)*dl_ + 1.0/3.0*(dR*cP*dl_*dl_) )
+                Fr = -np.pi*rho*g*dl_*(r1_*r1_ + dR*r1_*dl_ + (dR**2*dl_**2)/3.0)*sP
+                Moment = -np.pi*dl_*g*rho*(3.0*dl_**3*dR**4 + 3.0*dl_**3*dR**2 + 12.0*dl_**2*dR**3*r1_ + 8.0*dl_**2*dR*r1_ + 18.0*dl_*dR**2*r1_*r1_ + 6.0*dl_*r1_*r1_ + 12.0*dR*r1_**3)*sP/12.0
+                z1d = -np.minimum(0.0, z1_)
+                z2d = -np.minimum(0.0, z2_)
+                alpha = a0*z2d**3/(a0*z2d**3+(1-a0)*z1d**3)
+                # reduce moment to remove (not double count) radial force distribution to each node
+                Moment = Moment - Fr*alpha*dl_
+                F_B1, F_B2 = DistributeElementLoads(Fl, Fr, Moment, sP, cP, sinBeta[I], cosBeta[I], alpha)
+                b = np.ones(len(I), dtype=bool)
+                addLoads('F_B', g2[I], F_B1, b)  # alpha
+                addLoads('F_B', g1[I], F_B2, b)  # 1-alpha
+
+        # --------------------------------------------------------------------------------}
+        # --- Flooded ballast (for Pot or not Pot)
+        # --------------------------------------------------------------------------------{
+        if bBallast:
+            # Inertia Section 6.1.1 
+            b = np.ones(len(g1), dtype=bool)
+            F_If = lumpedInertiaLoads(E['m_fb_l'], E['h_cfb_l'], E['I_rfb_l'], E['I_lfb_l'], k_hat, a_s1, alpha_s1, omega_s1)
+            addLoads('F_If', g1, F_If, b)
+            F_If = lumpedInertiaLoads(E['m_fb_u'], E['h_cfb_u'], E['I_rfb_u'], E['I_lfb_u'], k_hat, a_s2, alpha_s2, omega_s2)
+            addLoads('F_If', g2, F_If, b)
+            # Flooded ballast weight : sides : Section 5.1.2 & 5.2.2
+            afs = E['alpha_fb_star']
+            b1  = E['floodstatus']==1 # fully filled elements
+            if np.any(b1):
+                lstar = np.where(E['memfloodstatus']==2, dl*(E['i']-1) - E['l_fill'], np.where(cosPhi>=0.0, dl*(E['i']-E['N']-1), dl*(E['i']-1)))
+                Rin, dRdl_in = E['Rin'], E['dRdl_in']
+                Fl = 2*np.pi * dRdl_in * E['FillDens'] * g * dl *( -( Rin + 0.5* dRdl_in*dl )*E['z_overfill'] + ( lstar*Rin + 0.5*(lstar*dRdl_in + Rin )*dl + dRdl_in*dl**2/3.0 )*cosPhi )
+                Fr = E['Cfr_fb']*sinPhi     
+                Moment = E['CM0_fb']*sinPhi - Fr*afs*dl
+                F_B1, F_B2 = DistributeElementLoads(Fl, Fr, Moment, sinPhi, cosPhi, sinBeta, cosBeta, (1-afs))
+                addLoads('F_BF', g1, F_B2, b1) # 1-alpha
+                addLoads('F_BF', g2, F_B1, b1) # alpha
+            b2  = E['floodstatus']==2 # partially filled elements
+            if np.any(b2):
+                Fl     = E['Cfl_fb']*cosPhi
+                Fr     = E['Cfr_fb']*sinPhi
+                Moment = E['CM0_fb']*sinPhi + Fr*(1 - afs)*dl
+                F_B1, F_B2 = DistributeElementLoads(Fl, Fr, Moment, sinPhi, cosPhi, sinBeta, cosBeta, afs)
+                addLoads('F_BF', g1  , F_B1, b2) # alpha
+                addLoads('F_BF', g1-1, F_B2, b2) # 1-alpha
+
+        # --------------------------------------------------------------------------------}
+        # --- Hydrodynamic loads on sides, Section 7.1
+        # --------------------------------------------------------------------------------{
+        # NOTE: All geometry-related calculations are based on the undisplaced configuration of the structure
+        bN   = NM['active']
+        idx  = NM['mesh']
+        kN   = NM['k']
+        if bHydroD and np.any(bN):
+            vrel = m['vrel'][:, idx].T
+            vec  = np.einsum('nij,nj->ni', NM['Ak'], vrel)
+            dotp = np.einsum('ni,ni->n', kN, vrel)
+            vec2 = dotp[:,None]*np.einsum('nij,nj->ni', NM['kkt'], vrel)
+            f_hydro = (NM['CdR']*np.sqrt(np.einsum('ni,ni->n', vec, vec)))[:,None]*vec + NM['CAxD'][:,None]*vec2
+            F_D = LumpDistrHydroLoads(f_hydro, kN, NM['deltal'], NM['h_c']).T
+            L['F_D'][:, bN] = F_D[:, bN]
+        bN = bN & ~NM['Pot']
+        if bHydroA and np.any(bN):
+            f_hydro = - np.einsum('nij,nj->ni', NM['Am'], umesh.TranslationAcc[idx,:])
+            F_A = LumpDistrHydroLoads(f_hydro, kN, NM['deltal'], NM['h_c']).T
+            L['F_A'][:, bN] = F_A[:, bN]
+        if bHydroI and np.any(bN):
+            f_hydro = np.einsum('nij,jn->ni', NM['Ai'], m['FA'][:, idx]) + m['FDynP'][idx][:,None]*NM['cP']
+            F_I = LumpDistrHydroLoads(f_hydro, kN, NM['deltal'], NM['h_c']).T
+            L['F_I'][:, bN] = F_I[:, bN]
+
+        # --- Transfer of member loads to the mesh
+        F_mem = np.zeros((6, len(idx)))
+        for k in L.keys():
+            F_mem += L[k]
+        np.add.at(ymesh.Force , idx, F_mem[:3,:].T)
+        np.add.at(ymesh.Moment, idx, F_mem[3:,:].T)
+
+        if bEnd:
+            # --------------------------------------------------------------------------------}
+            # --- End plate loads, per member
+            # --------------------------------------------------------------------------------{
+            e0, e1 = M['e0'], M['e1']
+            n0, nN = M['n0'], M['nN']
+            sinPhi1, cosPhi1, sinBeta1, cosBeta1 = sinPhi[e0], cosPhi[e0], sinBeta[e0], cosBeta[e0]
+            sinPhi2, cosPhi2, sinBeta2, cosBeta2 = sinPhi[e1], cosPhi[e1], sinBeta[e1], cosBeta[e1]
+            sinPhiL, cosPhiL = sinPhi2, cosPhi2 # Angles of the last element of the member
+            z1 = pos[n0, 2]
+            z2 = pos[nN, 2]
+            mPot = M['Pot']
+            # Check the member does not exhibit any of the following conditions
+            for im in np.where(~mPot & (np.abs(z2) < np.abs(M['RMGN']*sinPhi2)))[0]:
+                raise Exception('The upper end-plate of a member must not cross the water plane.  This is not true for Member ID ',self.graph.Elements[im])
+            for im in np.where(~mPot & (np.abs(z1) < np.abs(M['RMG0']*sinPhi1)))[0]:
+                raise Exception('The lower end-plate of a member must not cross the water plane.  This is not true for Member ID ',self.graph.Elements[im])
+            def addEndLoads(key, nodes, F, b):
+                if np.any(b):
+                    np.add.at(m[key], (slice(None), nodes[b]), F[:, b])
+            # --- Water ballast buoyancy
+            bAbove = M['i_floor'] == -1  # both ends are above seabed
+            bUpper = ~bAbove & (M['i_floor'] < M['N']) # upper node is still above the seabed, but lower node is below seabed
+            bFlood = M['memfloodstatus'] == 1
+            cF = M['FillDens'] * g * np.pi
+            Fl      = -cF *     M['Rin0']**2* (M['z_overfill'] + np.maximum(z2-z1, 0.0))
+            Moment  =  cF *0.25*M['Rin0']**4*sinPhiL
+            addEndLoads('F_BF_End', n0, endLoad(Fl, Moment, sinPhi1, cosPhi1, sinBeta1, cosBeta1), bAbove & bFlood)
+            Fl      =  cF *     M['RinN']**2* (M['z_overfill'] + np.maximum(z1-z2, 0.0))
+            Moment  = -cF *0.25*M['RinN']**4*sinPhiL
+            addEndLoads('F_BF_End', nN, endLoad(Fl, Moment, sinPhi2, cosPhi2, sinBeta2, cosBeta2), (bAbove|bUpper) & bFlood)
+            bPartFlood = bAbove & ~bFlood & (M['l_fill'] > 0)
+            Fl      = -cF *     M['Rin0']**2*M['l_fill']*cosPhiL
+            Moment  =  cF *0.25*M['Rin0']**4*sinPhiL
+            addEndLoads('F_BF_End', n0, endLoad(Fl, Moment, sinPhi1, cosPhi1, sinBeta1, cosBeta1), bPartFlood)
+            # --- External buoyancy loads: ends
+            cB = rho * g * np.pi
+            bLower = ~mPot & bAbove & ((z2 <= 0.0) | (z1 < 0.0))
+            bUpper = ~mPot & ( (bAbove & (z2 <= 0.0)) | (~bAbove & M['doEndBuoyancy'] & (z2 <= 0.0)) )
+            Fl      = -cB *     M['RMG0']**2*z1
+            Moment  = -cB *0.25*M['RMG0']**4*sinPhiL
+            addEndLoads('F_B_End', n0, endLoad(Fl, Moment, sinPhi1, cosPhi1, sinBeta1, cosBeta1), bLower)
+            Fl      =  cB *     M['RMGN']**2*z2
+            Moment  =  cB *0.25*M['RMGN']**4*sinPhiL
+            addEndLoads('F_B_End', nN, endLoad(Fl, Moment, sinPhi2, cosPhi2, sinBeta2, cosBeta2), bUpper)
+
+            # --------------------------------------------------------------------------------}
+            # --- Joint loads
+            # --------------------------------------------------------------------------------{
+            NJoints = len(self.graph.Nodes)
+            J   = slice(0, NJoints)
+            nIW = m['nodeInWater'][J]
+            vmag = nIW * np.sum(m['vrel'][:,J]*p['An_End'], axis=0)
+            qdotdot_t = umesh.TranslationAcc[J,:]
+            qdotdot_r = umesh.RotationAcc   [J,:]
+            omega     = umesh.RotationVel   [J,:]
+            m['F_A_End'][:]     = nIW * np.einsum('ijn,nj->in', p['AM_End'], -qdotdot_t)
+            m['F_I_End'][:]     = p['DP_Const_End'] * m['FDynP'][J] + np.einsum('ijn,jn->in', p['AM_End'], m['FA'][:,J])
+            m['F_IMG_End'][:3]  = -nIW * p['Mass_MG_End']*qdotdot_t.T
+            Iw = np.einsum('ijn,nj->ni', p['I_MG_End'], omega)
+            m['F_IMG_End'][3:]  = -nIW * ( np.einsum('ijn,nj->in', p['I_MG_End'], qdotdot_r) - np.cross(omega, Iw).T )
+            m['F_D_End'][:]     = p['An_End']*p['DragConst_End']*np.abs(vmag)*vmag  # Note: vmag is zero if node is not in the water
+            F_end = np.zeros((6, NJoints))
+            F_end[:3] = m['F_D_End'] + m['F_I_End'] + p['F_WMG_End'] + m['F_B_End'][:3] + m['F_BF_End'][:3] + m['F_A_End'] + m['F_IMG_End'][:3]
+            F_end[3:] = m['F_B_End'][3:] + m['F_BF_End'][3:] + m['F_IMG_End'][3:]
+            ymesh.Force [J, :] += F_end[:3].T
+            ymesh.Moment[J, :] += F_end[3:].T
+        return y
+
+    def nodeCoupling(self):
+        """ 
+        Boolean (sparse) matrix nNodes x nNodes, True if the loads at node i depend on the motion of node j:
+          - element loads are distributed to the element nodes and to the node below a partially 
+            submerged element (two nodes away along the member)
+          - end plate loads depend on both ends and on the end elements of the member
+        """
+        import scipy.sparse as sp
+        E = self.p['SoA_Elem']
+        M = self.p['SoA_Mem']
+        nNodes = len(self.m['nodeInWater'])
+        I = np.concatenate((E['n1'], E['n2']))
+        J = np.concatenate((E['n2'], E['n1']))
+        A = sp.identity(nNodes, dtype=bool, format='csr') + sp.csr_matrix((np.ones(len(I), dtype=bool), (I, J)), shape=(nNodes, nNodes))
+        A = A.dot(A)
+        C = np.column_stack((E['n1'][M['e0']], E['n2'][M['e0']], E['n1'][M['e1']], E['n2'][M['e1']]))
+        I = np.repeat(C, 4, axis=1).ravel()
+        J = np.tile(C, (1, 4)).ravel()
+        return (A + sp.csr_matrix((np.ones(len(I), dtype=bool), (I, J)), shape=(nNodes, nNodes))).tocsr()
+
     # --------------------------------------------------------------------------------}
     # --- Useful properties
     # --------------------------------------------------------------------------------{
@@ -1258,10 +1696,16 @@ class Morison:
         return p
 
 def LumpDistrHydroLoads(f_hydro, k_hat, dl, h_c):
-    """ """
-    lumpedLoad = np.zeros(6)
-    lumpedLoad[:3] = f_hydro*dl
-    lumpedLoad[3:] = np.cross(k_hat*h_c, f_hydro)*dl
+    """ 
+    Lumped force and moment from a distributed load
+    INPUTS: f_hydro, k_hat: (3) or (n x 3), dl, h_c: scalars or (n)
+    OUTPUTS: lumpedLoad: (6) or (n x 6)
+    """
+    dl  = np.asarray(dl )[..., None]
+    h_c = np.asarray(h_c)[..., None]
+    lumpedLoad = np.zeros(np.shape(f_hydro)[:-1]+(6,))
+    lumpedLoad[...,:3] = f_hydro*dl
+    lumpedLoad[...,3:] = np.cross(k_hat*h_c, f_hydro)*dl
     return lumpedLoad
 
 def endLoad(Fl, M, sinPhi, cosPhi, sinBeta, cosBeta):
@@ -1275,8 +1719,9 @@ def endLoad(Fl, M, sinPhi, cosPhi, sinBeta, cosBeta):
     - cosBeta  
     OUTPUT:
     - Fi(6)     : (N, Nm) force/moment vector for end node i
+    NOTE: inputs may be arrays of dimension n, Fi is then (6 x n)
     """
-    Fi=np.zeros(6)
+    Fi=np.zeros((6,)+np.broadcast(Fl, M, sinPhi, cosPhi, sinBeta, cosBeta).shape)
     Fi[0] =  + Fl*sinPhi*cosBeta
     Fi[1] =  + Fl*sinPhi*sinBeta
     Fi[2] =  + Fl*cosPhi
@@ -1512,24 +1957,47 @@ def morisonToSum(mor, filename=None, fid=None, more=False):
 
 
 
+def lumpedInertiaLoads(mass, h_c, I_r, I_l, k_hat, a_s, alpha_s, omega_s, CMatrix=None):
+    """ 
+    Inertial loads of lumped masses (e.g. marine growth or flooded ballast) at n nodes, see Sections 4.1.2 and 6.1.1
+    INPUTS:
+    - mass, h_c : (n) mass and distance of center of mass along k_hat
+    - I_r, I_l  : (n) radial and axial moments of inertia
+    - k_hat     : (n x 3) member axis
+    - a_s, alpha_s, omega_s: (n x 3) translational acceleration, rotational acceleration and velocity of the nodes 
+    - CMatrix   : (n x 3 x 3) direction cosine matrices used to rotate the inertia matrices
+    OUTPUTS:
+    - F: (6 x n) force/moment vectors
+    """
+    Ioffset = h_c*h_c*mass
+    Imat = np.zeros((len(mass),3,3))
+    Imat[:,0,0] = I_r - Ioffset
+    Imat[:,1,1] = I_r - Ioffset
+    Imat[:,2,2] = I_l - Ioffset
+    if CMatrix is not None:
+        Imat = np.matmul(np.matmul(CMatrix, Imat), np.transpose(CMatrix, (0,2,1)))
+    iArm = h_c[:,None] * k_hat
+    F = np.zeros((6, len(mass)))
+    F[:3] = (( -a_s - np.cross(omega_s, np.cross(omega_s, iArm)) - np.cross(alpha_s, iArm) ) * mass[:,None]).T
+    F[3:] = (- np.cross(a_s * mass[:,None], iArm) + np.einsum('nij,nj->ni', Imat, alpha_s) - np.cross(omega_s, np.einsum('nij,nj->ni', Imat, omega_s))).T
+    return F
+
+
 def getOrientationAngles(p1, p2):
     """ 
-    p1: Point 1
-    p2: Point 2
+    p1: Point 1, (3) or (n x 3)
+    p2: Point 2, (3) or (n x 3)
     """
     # calculate instantaneous incline angle and heading, and related trig values
     # the first and last NodeIndx values point to the corresponding Joint nodes idices which are at the start of the Mesh
     vec      = np.asarray(p2) - np.asarray(p1)
-    vecLen   = np.sqrt(vec.dot(vec))
-    vecLen2D = np.sqrt(vec[0]**2+vec[1]**2)
-    if vecLen < 0.000001:
+    vecLen   = np.sqrt(np.einsum('...i,...i', vec, vec))
+    vecLen2D = np.sqrt(vec[...,0]**2+vec[...,1]**2)
+    if np.any(vecLen < 0.000001):
         raise Exception('An element of the Morison structure has co-located endpoints!  This should never occur.  Please review your model.')
-    k_hat = vec / vecLen 
-    phi   = np.arctan2(vecLen2D, vec[2])  # incline angle   
-    if phi==0:
-        beta = 0
-    else:
-        beta = np.arctan2(vec[1], vec[0])# heading of incline     
+    k_hat = vec / vecLen[...,None]
+    phi   = np.arctan2(vecLen2D, vec[...,2])  # incline angle   
+    beta  = np.where(phi==0, 0, np.arctan2(vec[...,1], vec[...,0])) # heading of incline     
     sinPhi  = np.sin(phi)
     cosPhi  = np.cos(phi)  
     tanPhi  = np.tan(phi)     
@@ -1542,7 +2010,29 @@ def Morison_DirCosMtrx(pos0, pos1):
     """  Compute the direction cosine matrix given two points along the axis of a cylinder
     TODO TODO Merge with DCM of FEM.
     Main axis is x????
+    NOTE: if pos0 and pos1 are (n x 3) arrays, DirCos is (n x 3 x 3)
     """
+    if np.asarray(pos0).ndim>1:
+        d   = np.asarray(pos1) - np.asarray(pos0)
+        dx, dy, dz = d[:,0], d[:,1], d[:,2]
+        xz  = np.sqrt(dx*dx+dz*dz)
+        xyz = np.sqrt(dx*dx+dy*dy+dz*dz)
+        DirCos = np.zeros((len(d),3,3))
+        b  = xz!=0
+        dx, dy, dz, xz, xyz = dx[b], dy[b], dz[b], xz[b], xyz[b]
+        DirCos[b,0,0] = dz/xz
+        DirCos[b,0,1] = -dx*dy/(xz*xyz)
+        DirCos[b,0,2] = dx/xyz
+        DirCos[b,1,1] = xz/xyz
+        DirCos[b,1,2] = dy/xyz
+        DirCos[b,2,0] = -dx/xz
+        DirCos[b,2,1] = -dy*dz/(xz*xyz)
+        DirCos[b,2,2] = dz/xyz
+        bn = ~b
+        DirCos[bn,0,0] = 1
+        DirCos[bn,1,2] = np.where(d[bn,1]<0, -1, 1)
+        DirCos[bn,2,1] = -DirCos[bn,1,2]
+        return DirCos
     x0 = pos0[0]
     y0 = pos0[1]
     z0 = pos0[2]
@@ -1585,8 +2075,10 @@ def DistributeElementLoads(Fl, Fr, M, sinPhi, cosPhi, sinBeta, cosBeta, alpha):
     OUTPUS:
     - F1(6): (N, Nm) force/moment vector for node i
     - F2(6): (N, Nm) force/moment vector for the other node (whether i+1, or i-1)
+    NOTE: inputs may be arrays of dimension n, F1 and F2 are then (6 x n)
     """
-    F1=np.zeros(6)
+    shape = (6,)+np.broadcast(Fl, Fr, M, sinPhi, cosPhi, sinBeta, cosBeta, alpha).shape
+    F1=np.zeros(shape)
     F1[0] =  cosBeta*(Fl*sinPhi + Fr*cosPhi)*alpha
     F1[1] =  sinBeta*(Fl*sinPhi + Fr*cosPhi)*alpha
     F1[2] =         (Fl*cosPhi - Fr*sinPhi)*alpha
@@ -1594,7 +2086,7 @@ def DistributeElementLoads(Fl, Fr, M, sinPhi, cosPhi, sinBeta, cosBeta, alpha):
     F1[4] =  cosBeta * M                    *alpha
     F1[5] =  0.0
        
-    F2=np.zeros(6)
+    F2=np.zeros(shape)
     F2[0] =  cosBeta*(Fl*sinPhi + Fr*cosPhi)*(1-alpha)
     F2[1] =  sinBeta*(Fl*sinPhi + Fr*cosPhi)*(1-alpha)
     F2[2] =          (Fl*cosPhi - Fr*sinPhi)*(1-alpha)
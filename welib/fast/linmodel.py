@@ -614,11 +614,13 @@ class FASTLinModel(LinearStateSpace):
         return dfLI
 
 
-    def simulate(self, sys_sim=None, out=False, prefix='', calc='', renameStates=False, **options):
+    def simulate(self, sys_sim=None, out=False, prefix='', calc='', renameStates=False, method='RK45', **options):
         """
         Simulate based on a 
 
         - calc: string comma separated, e.g. 'u,y,qd' : compute inputs, outputs, and "accelerations"
+        - method: integration method, see LinearStateSpace.integrate.
+                  'foh' is exact for the (linearly interpolated) input time series, but requires regular time steps
         """
         # TODO: harmonize with yams.models.simulator
         if sys_sim is None:
@@ -628,7 +630,7 @@ class FASTLinModel(LinearStateSpace):
                 sys_sim = self.sys_sim
 
         # TODO TODO TODO WHY U IS NONE?????
-        self.res, self.df =  sys_sim.integrate(self.time, method='RK45', y0=sys_sim.q0, u=None, calc=calc, xoffset=self.qop_sim, uoffset=self.uop_sim, yoffset=self.yop_sim, **options)
+        self.res, self.df =  sys_sim.integrate(self.time, method=method, y0=sys_sim.q0, u=None, calc=calc, xoffset=self.qop_sim, uoffset=self.uop_sim, yoffset=self.yop_sim, **options)
         #self.WT_sim.FASTDOFScales, 
         # NOTE: this is a duplication, res2DataFrame is already called in integrate...
         # --- Using OpenFAST DOF names
@@ -1422,7 +1422,16 @@ def azimuthal_average_DF(df, psiBin=None, colPsi='Azimuth_[deg]', tStart=None, c
     return dfPsi
 
 
-def averageDF(df,avgMethod='periods',avgParam=None,ColMap=None,ColKeep=None,ColSort=None,stats=['mean'], filename=''):
+def _statColumnName(c, stat):
+    """ Column name for a given statistic, inserted before the unit: 'RotSpeed_[rpm]' -> 'RotSpeed_std_[rpm]' """
+    if stat=='mean':
+        return c
+    iu = c.rfind('_[')
+    if iu>0 and c.endswith(']'):
+        return c[:iu]+'_'+stat+c[iu:]
+    return c+'_'+stat
+
+def averageDF(df,avgMethod='periods',avgParam=None,ColMap=None,ColKeep=None,ColSort=None,stats=['mean'], filename='', DELparams=None):
     """
     See average PostPro for documentation, same interface, just does it for one dataframe
     """
@@ -1514,20 +1523,66 @@ def averageDF(df,avgMethod='periods',avgParam=None,ColMap=None,ColKeep=None,ColS
     ## Stats values during window
     # MeanValues = df[IWindow].mean()
     # StdValues  = df[IWindow].std()
-    if 'mean' in stats:
-        MeanValues = pd.DataFrame(df.iloc[IWindow].mean()).transpose()
-    else:
-        raise NotImplementedError()
-    return MeanValues
+    dfWin = df.iloc[IWindow]
+    if list(stats)==['mean']:
+        MeanValues = pd.DataFrame(dfWin.mean()).transpose()
+        return MeanValues
+    values = dfWin.values.astype(float)
+    cols   = dfWin.columns
+    DELparams = {} if DELparams is None else DELparams
+    allStats={}
+    for stat in stats:
+        sl = stat.lower()
+        if sl=='mean':
+            v = np.nanmean(values, axis=0)
+        elif sl=='std':
+            v = np.nanstd(values, axis=0, ddof=1)
+        elif sl=='min':
+            v = np.nanmin(values, axis=0)
+        elif sl=='max':
+            v = np.nanmax(values, axis=0)
+        elif re.match(r'^p\d+(\.\d*)?$', sl):
+            v = np.nanpercentile(values, float(sl[1:]), axis=0)
+        elif re.match(r'^del(m\d+(\.\d*)?)?$', sl):
+            from welib.tools.fatigue import equivalent_load
+            kw = dict(DELparams)
+            if len(sl)>3:
+                kw['m'] = float(sl[4:])
+            v = np.zeros(len(cols))
+            for j in range(len(cols)):
+                try:
+                    v[j] = equivalent_load(time[IWindow], values[:,j], **kw)
+                except:
+                    v[j] = np.nan
+        else:
+            raise NotImplementedError('Statistic `{}`, supported: mean, std, min, max, p<percentile>, DEL, DELm<m>'.format(stat))
+        for c, vc in zip(cols, v):
+            allStats[_statColumnName(c, stat)] = [vc]
+    return pd.DataFrame(allStats)
 
 
 
+def _averagePostProFile(f, channels=None, **kwargs):
+    """ Read one file (or use the dataframe `f`) and return its statistics, or None if the file cannot be read. 
+    Used by averagePostPro, possibly in a separate process """
+    if isinstance(f, pd.DataFrame):
+        df = f
+    else:
+        try:
+            if channels is not None and os.path.splitext(f)[1].lower() in FASTOutputFile.defaultExtensions():
+                df=FASTOutputFile(f, channels=channels).toDataFrame()
+            else:
+                df=weio.read(f).toDataFrame()
+            #df=FASTOutputFile(f).toDataFrame()A # For pyFAST
+        except:
+            return None
+    return averageDF(df, filename=f if isinstance(f, str) else '', **kwargs)
+
 def averagePostPro(outFiles_or_DFs,avgMethod='periods',avgParam=None,
         ColMap=None,ColKeep=None,ColSort=None,stats=['mean'],
-        skipIfWrongCol=False):
-    """ Opens a list of FAST output files, perform average of its signals and return a panda dataframe
-    For now, the scripts only computes the mean within a time window which may be a constant or a time that is a function of the rotational speed (see `avgMethod`).
-    The script only computes the mean for now. Other stats will be added
+        skipIfWrongCol=False, nProcs=1, DELparams=None):
+    """ Opens a list of FAST output files, perform statistics of its signals and return a panda dataframe
+    The statistics are computed within a time window which may be a constant or a time that is a function of the rotational speed (see `avgMethod`).
     INPUTS:
 
      outFiles_or_DFs: list of fst filenames or dataframes
@@ -1549,25 +1604,42 @@ def averagePostPro(outFiles_or_DFs,avgMethod='periods',avgParam=None,
                    Default: None, as many period as possible are used
                 - for 'constantwindow': the number of seconds for the window
                    Default: None, full simulation length is used
+    `stats`   : list of statistics to compute within the window, among:
+                 'mean', 'std', 'min', 'max', 'p<q>' (percentile q, e.g. 'p95'), 
+                 'DEL' (damage equivalent load, see `welib.tools.fatigue.equivalent_load`), 'DELm<m>' (DEL for Wohler exponent m, e.g. 'DELm10').
+                The columns of the means keep their names, the other statistics are named e.g. 'RotSpeed_std_[rpm]'.
+                Default: ['mean']
+    `DELparams`: dictionary of additional arguments for `equivalent_load`, e.g. {'Teq':1, 'nBins':100}
+    `nProcs`  : number of processes used to read and process the files in parallel (Default: 1, serial)
     """
     result=None
     if len(outFiles_or_DFs)==0:
         raise Exception('No outFiles or DFs provided')
 
+    # When ColKeep is provided, only the needed channels are read from FAST output files
+    channels = None
+    if ColKeep is not None:
+        ColMap_ = {} if ColMap is None else ColMap
+        channels = [ColMap_.get(c, c) for c in ColKeep] + list(ColMap_.values()) + ['Time_[s]', 'Azimuth_[deg]', 'RotSpeed_[rpm]']
+        channels = [re.escape(c) for c in channels]
+
+    # Statistics for each file, computed in parallel if requested
+    kwargs = dict(channels=channels, avgMethod=avgMethod, avgParam=avgParam, ColMap=ColMap, ColKeep=ColKeep, ColSort=ColSort, stats=stats, DELparams=DELparams)
+    if nProcs>1 and len(outFiles_or_DFs)>1:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+        chunksize = max(1, int(len(outFiles_or_DFs)/(4*nProcs)))
+        with ProcessPoolExecutor(max_workers=nProcs) as executor:
+            allStats = list(executor.map(partial(_averagePostProFile, **kwargs), outFiles_or_DFs, chunksize=chunksize))
+    else:
+        allStats = [_averagePostProFile(f, **kwargs) for f in outFiles_or_DFs]
+
     invalidFiles =[]
     # Loop trough files and populate result
-    for i,f in enumerate(outFiles_or_DFs):
-        if isinstance(f, pd.DataFrame):
-            df = f
-        else:
-            try:
-                df=weio.read(f).toDataFrame()
-                #df=FASTOutputFile(f).toDataFrame()A # For pyFAST
-            except:
-                invalidFiles.append(f)
-                continue
-        postpro=averageDF(df, avgMethod=avgMethod, avgParam=avgParam, ColMap=ColMap, ColKeep=ColKeep,ColSort=ColSort,stats=stats, filename=f)
-        MeanValues=postpro # todo
+    for i,(f,MeanValues) in enumerate(zip(outFiles_or_DFs, allStats)):
+        if MeanValues is None:
+            invalidFiles.append(f)
+            continue
         if result is None:
             # We create a dataframe here, now that we know the colums
             columns = MeanValues.columns
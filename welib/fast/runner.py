@@ -21,13 +21,26 @@ FAST_EXE='openfast'
 # --- Tools for executing FAST
 # --------------------------------------------------------------------------------{
 # --- START cmd.py
-def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, showCommand=True, flags=[], verbose=True): 
+def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, showCommand=True, flags=[], verbose=True,
+        timeout=None, nRetries=0, logFiles=False, manifest=None): 
     """ Run a set of simple commands of the form `exe input_file`
-    By default, the commands are run in "parallel" (though the method needs to be improved)
-    The stdout and stderr may be displayed on screen (`showOutputs`) or hidden. 
-    A better handling is yet required.
+    By default, the commands are run in parallel, using a pool of `nCores` slots: 
+    a new command is started as soon as a slot is freed.
+
+    INPUTS:
+     - showOutputs: if True, the stdout and stderr are displayed on screen, otherwise they are hidden
+     - timeout: maximum duration (in seconds) of each command, after which the command is killed and considered failed
+     - nRetries: number of times a failed command is run again
+     - logFiles: if True, the stdout and stderr of each command are written to `input_file.log` (instead of the screen)
+     - manifest: path to a json file where the status of each command is stored and updated as commands complete.
+                 See `read_manifest`, and `run_fastfiles(reRun=False)` that uses it to skip successful simulations.
     """
+    import time
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    lock = threading.Lock()
     Failed=[]
+    status = read_manifest(manifest) if manifest is not None else {}
     def _report(p):
         if p.returncode==0:
             if verbose:
@@ -38,37 +51,37 @@ def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, show
                 print('[FAIL] Input    : ',p.input_file)
                 print('       Directory: '+os.getcwd())
                 print('       Command  : '+p.cmd)
+                if p.timedOut:
+                    print('       Timeout  : {}s'.format(timeout))
                 print('       Use `showOutputs=True` to debug, or run the command above.')
-            #out, err = p.communicate()
-            #print('StdOut:\n'+out)
-            #print('StdErr:\n'+err)
-    ps=[]
-    iProcess=0
+    def _run(f):
+        input_file = f
+        if len(flags)>0:
+            f=flags + [f]
+        for attempt in range(nRetries+1):
+            t0 = time.time()
+            p = run_cmd(f, exe, wait=True, showOutputs=showOutputs, showCommand=showCommand, timeout=timeout, 
+                    logFile = os.path.splitext(input_file)[0]+'.log' if logFiles else None)
+            p.attempts = attempt+1
+            p.duration = time.time()-t0
+            if p.returncode==0:
+                break
+        with lock:
+            _report(p)
+            if manifest is not None:
+                status[input_file] = {'status': 'success' if p.returncode==0 else ('timeout' if p.timedOut else 'failed'),
+                        'returncode':p.returncode, 'attempts':p.attempts, 'duration':p.duration}
+                _write_manifest(manifest, status)
+        return p
+
     if nCores is None:
         nCores=multiprocessing.cpu_count()
     if nCores<0:
         nCores=len(inputfiles)+1
-    for i,f in enumerate(inputfiles):
-        if len(flags)>0:
-            f=flags + [f]
-        #print('Process {}/{}: {}'.format(i+1,len(inputfiles),f))
-        ps.append(run_cmd(f, exe, wait=(not parallel), showOutputs=showOutputs, showCommand=showCommand))
-        iProcess += 1
-        # waiting once we've filled the number of cores
-        # TODO: smarter method with proper queue, here processes are run by chunks
-        if parallel:
-            if iProcess==nCores:
-                for p in ps:
-                    p.wait()
-                for p in ps:
-                    _report(p)
-                ps=[]
-                iProcess=0
-    # Extra process if not multiptle of nCores (TODO, smarter method)
-    for p in ps:
-        p.wait()
-    for p in ps:
-        _report(p)
+    if not parallel:
+        nCores=1
+    with ThreadPoolExecutor(max_workers=max(nCores,1)) as executor:
+        ps = list(executor.map(_run, inputfiles))
     # --- Giving a summary
     if len(Failed)==0:
         if verbose:
@@ -80,8 +93,27 @@ def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, show
             print('      ',p.input_file)
         return False, Failed
 
-def run_cmd(input_file_or_arglist, exe, wait=True, showOutputs=False, showCommand=True):
-    """ Run a simple command of the form `exe input_file` or `exe arg1 arg2`  """
+def read_manifest(manifest):
+    """ Read a status manifest written by `run_cmds`, returns a dictionary {input_file: {'status':...}} """
+    import json
+    if manifest is None or not os.path.exists(manifest):
+        return {}
+    with open(manifest, 'r') as fid:
+        return json.load(fid)
+
+def _write_manifest(manifest, status):
+    """ Write the status manifest, using a temporary file so that the manifest is never partially written """
+    import json
+    tmp = manifest+'.tmp'
+    with open(tmp, 'w') as fid:
+        json.dump(status, fid, indent=1)
+    os.replace(tmp, manifest)
+
+def run_cmd(input_file_or_arglist, exe, wait=True, showOutputs=False, showCommand=True, timeout=None, logFile=None):
+    """ Run a simple command of the form `exe input_file` or `exe arg1 arg2`  
+     - timeout: if wait is True, the command is killed after `timeout` seconds, and p.timedOut is set to True
+     - logFile: if provided, stdout and stderr are written to this file
+    """
     # TODO Better capture STDOUT
     if not os.path.exists(exe):
         raise Exception('Executable not found: {}'.format(exe))
@@ -93,20 +125,30 @@ def run_cmd(input_file_or_arglist, exe, wait=True, showOutputs=False, showComman
         args= [exe,input_file]
     args = [a.strip() for a in args] # No surounding spaces, could cause issue
     shell=False
-    if showOutputs:
+    if logFile is not None:
+        STDOut= open(logFile, 'w') 
+    elif showOutputs:
         STDOut= None
     else:
         STDOut= open(os.devnull, 'w') 
     if showCommand:
         print('Running: '+' '.join(args))
+    timedOut = False
     if wait:
         class Dummy():
             pass
         p=Dummy()
-        p.returncode=subprocess.call(args , stdout=STDOut, stderr=subprocess.STDOUT, shell=shell)
+        try:
+            p.returncode=subprocess.call(args , stdout=STDOut, stderr=subprocess.STDOUT, shell=shell, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            p.returncode=-1
+            timedOut = True
+        if STDOut is not None:
+            STDOut.close()
     else:
         p=subprocess.Popen(args, stdout=STDOut, stderr=subprocess.STDOUT, shell=shell)
     # Storing some info into the process
+    p.timedOut       = timedOut
     p.cmd            = ' '.join(args)
     p.args           = args
     p.input_file     = input_file
@@ -172,22 +214,44 @@ def runBatch(batchfiles, showOutputs=True, showCommand=True, verbose=True):
 
 # --- END cmd.py
 
-def run_fastfiles(fastfiles, fastExe=None, parallel=True, showOutputs=True, nCores=None, showCommand=True, reRun=True, verbose=True):
+def run_fastfiles(fastfiles, fastExe=None, parallel=True, showOutputs=True, nCores=None, showCommand=True, reRun=True, verbose=True,
+        timeout=None, nRetries=0, logFiles=False, manifest=None, longestFirst=False):
+    """ 
+    Run a set of OpenFAST input files, see `run_cmds` for the arguments.
+     - reRun: if False, skip the simulations that were successful according to the `manifest`.
+              If no manifest is given, or if a simulation is not in the manifest, 
+              it is skipped if an output file (.outb or .out) exists.
+     - longestFirst: if True, the simulations are started in order of decreasing TMax
+    """
     if fastExe is None:
         fastExe=FAST_EXE
     if not reRun:
         # Figure out which files exist
+        status = read_manifest(manifest)
         newfiles=[]
         for f in fastfiles:
             base=os.path.splitext(f)[0]
-            if os.path.exists(base+'.outb') or os.path.exists(base+'.out'):
+            if f in status:
+                if status[f]['status']=='success':
+                    print('>>> Skipping successful simulation for: ',f)
+                else:
+                    newfiles.append(f)
+            elif os.path.exists(base+'.outb') or os.path.exists(base+'.out'):
                 print('>>> Skipping existing simulation for: ',f)
                 pass
             else:
                 newfiles.append(f)
         fastfiles=newfiles
-
-    return run_cmds(fastfiles, fastExe, parallel=parallel, showOutputs=showOutputs, nCores=nCores, showCommand=showCommand, verbose=verbose)
+    if longestFirst:
+        def TMax(f):
+            try:
+                return float(FASTInputFile(f)['TMax'])
+            except:
+                return 0
+        fastfiles = sorted(fastfiles, key=TMax, reverse=True)
+
+    return run_cmds(fastfiles, fastExe, parallel=parallel, showOutputs=showOutputs, nCores=nCores, showCommand=showCommand, verbose=verbose,
+            timeout=timeout, nRetries=nRetries, logFiles=logFiles, manifest=manifest)
 
 def run_fast(input_file, fastExe=None, wait=True, showOutputs=False, showCommand=True):
     if fastExe is None:
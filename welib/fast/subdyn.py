@@ -63,12 +63,14 @@ class SubDyn:
     # --------------------------------------------------------------------------------}
     # --- Functions for general FEM model (jacket, flexible floaters)
     # --------------------------------------------------------------------------------{
-    def init(self, TP=(0,0,0), gravity = 9.81):
+    def init(self, TP=(0,0,0), gravity = 9.81, sparse=False):
         """
         Initialize SubDyn FEM model 
 
         TP: position of transition point
         gravity: position of transition point
+        sparse: if True, use sparse matrices, recommended for large models. 
+                Only the lowest 30 FEM modes and the retained CB modes are then computed.
         """
         import welib.FEM.fem_beam as femb
         import welib.FEM.fem_model as femm
@@ -93,7 +95,7 @@ class SubDyn:
             FEM = femm.FEMModel.from_graph(self.graph, mainElementType=mainElementType, refPoint=TP, gravity=gravity)
         #model.toJSON('_MODEL.json')
         with Timer('Assembly'):
-            FEM.assembly()
+            FEM.assembly(sparse=sparse)
         with Timer('Internal constraints'):
             FEM.applyInternalConstraints()
             FEM.partition()
@@ -574,6 +576,8 @@ class SubDyn:
 # --- Export of summary file and Misc FEM variables used by SubDyn
 # --------------------------------------------------------------------------------{
 def yaml_array(var, M, Fmt='{:15.6e}', comment=''):
+    if hasattr(M, 'toarray'):
+        M = M.toarray() # sparse matrices
     M = np.atleast_2d(M)
     if len(comment)>0:
         s='{}: # {} x {} {}\n'.format(var, M.shape[0], M.shape[1], comment)
@@ -683,15 +687,12 @@ def subdyntoYAMLSum(model, filename, more=False):
     # --- Helper functions
     def nodeID(nodeID):
         if hasattr(nodeID,'__len__'):
-            return [model.Nodes.index(model.getNode(n))+1 for n in nodeID]
+            return [model.getNodeIndex(n)+1 for n in nodeID]
         else:
-            return model.Nodes.index(model.getNode(nodeID))+1
+            return model.getNodeIndex(nodeID)+1
 
     def elemID(elemID):
-        #e=model.getElement(elemID)
-        for ie,e in enumerate(model.Elements):
-            if e.ID==elemID:
-                return ie+1
+        return model.getElementIndex(elemID)+1
     def elemType(elemType):
         from welib.FEM.fem_elements import idMemberBeam, idMemberCable, idMemberRigid
         return {'SubDynBeam3d':idMemberBeam, 'SubDynFrame3d':idMemberBeam, 'Beam':idMemberBeam, 'Frame3d':idMemberBeam,
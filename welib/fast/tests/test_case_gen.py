@@ -0,0 +1,39 @@
+import unittest
+import os
+import shutil
+import numpy as np
+from welib.fast.case_gen import *
+from welib.weio.fast_input_file import FASTInputFile
+
+MyDir=os.path.dirname(__file__)
+
+class Test(unittest.TestCase):
+
+    def test_templateReplace_shared(self):
+        # Generate files with shared sub-files and compare to the default generation
+        ref_dir = os.path.join(MyDir, '../../../data/NREL5MW/')
+        PARAMS=[]
+        for i in range(4):
+            PARAMS.append({'TMax':10+i, 'InflowFile|HWindSpeed':[5,8][i%2], 'EDFile|RotSpeed':5, '__name__':'case{}'.format(i)})
+        outDirs = [os.path.join(MyDir, '_case_gen{}'.format(i)) for i in range(2)]
+        files0 = templateReplace([p.copy() for p in PARAMS], ref_dir, outputDir=outDirs[0], main_file='Main_Onshore.fst')
+        files1 = templateReplace([p.copy() for p in PARAMS], ref_dir, outputDir=outDirs[1], main_file='Main_Onshore.fst', shareSubFiles=True, nCores=2)
+        self.assertEqual([os.path.basename(f) for f in files0], [os.path.basename(f) for f in files1])
+        IWFiles = set()
+        for i,(f0, f1) in enumerate(zip(files0, files1)):
+            fst0 = FASTInputFile(f0)
+            fst1 = FASTInputFile(f1)
+            self.assertEqual(fst1['TMax'], 10+i)
+            for key in ['EDFile', 'InflowFile']:
+                sub0 = FASTInputFile(os.path.join(outDirs[0], fst0[key].strip('"')))
+                sub1 = FASTInputFile(os.path.join(outDirs[1], fst1[key].strip('"')))
+                self.assertEqual(sub0.toString(), sub1.toString())
+            IWFiles.add(fst1['InflowFile'])
+        # Identical inflow files are shared
+        self.assertEqual(len(IWFiles), 2)
+        self.assertEqual(FASTInputFile(os.path.join(outDirs[1], fst1['EDFile'].strip('"')))['RotSpeed'], 5)
+        for d in outDirs:
+            shutil.rmtree(d)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -66,6 +66,52 @@ class TestSpar(unittest.TestCase):
         np.testing.assert_almost_equal(Mh/1e6, np.array([-29284711118.606, -5247122545.815,  5351864809.826])/1e6)
 
 
+    def test_hydro_loads_vectorized(self):
+        # Vectorized and loop implementations of Morison.calcOutput, with wave kinematics
+        hd, u, y = getHDSpar()
+        mor   = hd.morison
+        umesh = u['Morison']['Mesh']
+        ymesh = y['Morison']['Mesh']
+        np.random.seed(0)
+        for k in ['WaveVel','WaveAcc','WaveDynP']:
+            mor.p[k] = np.random.normal(0, 1, mor.p[k].shape)
+        q = np.array([0.5, -0.3, 0.2, 0.03, -0.02, 0.01])
+        umesh.rigidBodyMotion(q=q, qd=q, qdd=2*q)
+        # Partially submerged element of the displaced structure (last member)
+        E   = mor.p['SoA_Elem']
+        pos = umesh.Position + umesh.TranslationDisp
+        iE  = np.where(pos[E['n1'],2]*pos[E['n2'],2] <= 0)[0]
+        self.assertEqual(len(iE), 1)
+        mem = mor.graph.Elements[2].MorisonData
+        for tapered in [False, True]:
+            if tapered:
+                # Tapered waterline element, the element alpha is used for the load distribution
+                mem['dRdl_mg'][E['i'][iE[0]]] = 0.02
+                mor._setupArrays(umesh)
+            y = hd.calcOutput(t=1, u=u, y=y, optsM={'vectorized':False})
+            F_ref, M_ref = ymesh.Force.copy(), ymesh.Moment.copy()
+            F_B_ref = mem['Loads']['F_B'].copy()
+            y = hd.calcOutput(t=1, u=u, y=y)
+            np.testing.assert_allclose(ymesh.Force , F_ref, rtol=1e-12, atol=1e-6)
+            np.testing.assert_allclose(ymesh.Moment, M_ref, rtol=1e-12, atol=1e-6)
+            np.testing.assert_allclose(mem['Loads']['F_B'], F_B_ref, rtol=1e-12, atol=1e-6)
+
+    def test_linearize_sparse(self):
+        # Jacobian using node coupling and column coloring vs perturbation of one node at a time
+        from welib.system.linearization import numerical_jacobian
+        hd, u, y = getHDSpar()
+        umesh = u['Morison']['Mesh']
+        q0 = np.array([1, 0.5, -0.2, 0.02, 0.01, 0.03])
+        D = hd.linearize(q0=q0, sparse=True).values
+        def fh(q, iNode):
+            umesh.restoreValues()
+            umesh.perturbNode(iNode, q)
+            hd.calcOutput(t=0, u=u, y=y, optsM={})
+            return y['Morison']['Mesh'].packLoads(FthenM=True)
+        for iNode in [0, 1, 120]: # member ends and node near the free surface
+            D_ref = numerical_jacobian(fh, (q0,), 0, [0.01]*6, iNode)
+            np.testing.assert_allclose(D[:, 6*iNode:6*iNode+6], D_ref, rtol=1e-10, atol=1e-6*np.abs(D_ref).max())
+
 
 if __name__ == '__main__':
     #TestSpar().test_hydro_loads()
@@ -0,0 +1,29 @@
+# --- Common libraries 
+import os
+import unittest
+import numpy as np
+from welib.fast.postpro import averagePostPro
+
+MyDir=os.path.dirname(__file__)
+
+class TestPostPro(unittest.TestCase):
+
+    def test_averagePostPro_stats(self):
+        outFile = os.path.join(MyDir,'../../../data/example_files/fastout_allnodes.outb')
+        ColKeep = ['RotSpeed_[rpm]','RootMxc1_[kN-m]']
+        stats   = ['mean','std','min','max','p50','DEL']
+        res  = averagePostPro([outFile, outFile], avgMethod='constantwindow', avgParam=None, ColKeep=ColKeep, stats=stats)
+        self.assertEqual(res.shape, (2, len(stats)*len(ColKeep)))
+        for c in ['RotSpeed_[rpm]', 'RotSpeed_std_[rpm]', 'RootMxc1_p50_[kN-m]', 'RootMxc1_DEL_[kN-m]']:
+            self.assertTrue(c in res.columns)
+        # Consistency of stats and with default mean
+        mean = averagePostPro([outFile], avgMethod='constantwindow', avgParam=None, ColKeep=ColKeep)
+        np.testing.assert_almost_equal(res['RootMxc1_[kN-m]'].values[0], mean['RootMxc1_[kN-m]'].values[0])
+        self.assertTrue(res['RootMxc1_min_[kN-m]'].values[0] <= res['RootMxc1_p50_[kN-m]'].values[0] <= res['RootMxc1_max_[kN-m]'].values[0])
+        # Parallel processing gives the same results
+        res2 = averagePostPro([outFile, outFile], avgMethod='constantwindow', avgParam=None, ColKeep=ColKeep, stats=stats, nProcs=2)
+        np.testing.assert_equal(res2.values, res.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import shutil
+import stat
+from welib.fast.runner import *
+
+MyDir=os.path.dirname(__file__)
+
+# Dummy executable, its behavior is defined by the content of the input file
+DUMMY_EXE="""#!{}
+import sys, os, time
+with open(sys.argv[1]) as f:
+    cmd = f.read().split()
+if cmd[0]=='sleep':
+    time.sleep(float(cmd[1]))
+elif cmd[0]=='fail':
+    sys.exit(2)
+elif cmd[0]=='flaky': # fails the first time only
+    counter = sys.argv[1]+'.count'
+    n = int(open(counter).read()) if os.path.exists(counter) else 0
+    with open(counter, 'w') as f:
+        f.write(str(n+1))
+    if n==0:
+        sys.exit(1)
+print('done')
+"""
+
+@unittest.skipIf(os.name=='nt', 'Dummy executable relies on a shebang')
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.workDir = os.path.join(MyDir, '_runner')
+        os.makedirs(self.workDir, exist_ok=True)
+        self.exe = os.path.join(self.workDir, 'dummy.py')
+        with open(self.exe, 'w') as f:
+            f.write(DUMMY_EXE.format(sys.executable))
+        os.chmod(self.exe, os.stat(self.exe).st_mode | stat.S_IXUSR)
+        self.files = {}
+        for name, cmd in [('ok','ok'), ('fail','fail'), ('flaky','flaky'), ('slow','sleep 30')]:
+            self.files[name] = os.path.join(self.workDir, name+'.fst')
+            with open(self.files[name], 'w') as f:
+                f.write(cmd)
+        self.manifest = os.path.join(self.workDir, 'manifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.workDir)
+
+    def test_retry_timeout_manifest(self):
+        files = list(self.files.values())
+        success, Failed = run_cmds(files, self.exe, nCores=4, showOutputs=False, showCommand=False, verbose=False,
+                timeout=1, nRetries=1, logFiles=True, manifest=self.manifest)
+        self.assertFalse(success)
+        self.assertEqual(sorted([p.input_file for p in Failed]), sorted([self.files['fail'], self.files['slow']]))
+        status = read_manifest(self.manifest)
+        self.assertEqual(sorted(status.keys()), sorted(files))
+        S = {k: status[f] for k,f in self.files.items()}
+        self.assertEqual((S['ok'   ]['status'], S['ok'   ]['attempts']), ('success', 1))
+        self.assertEqual((S['flaky']['status'], S['flaky']['attempts']), ('success', 2))
+        self.assertEqual((S['fail' ]['status'], S['fail' ]['attempts'], S['fail']['returncode']), ('failed', 2, 2))
+        self.assertEqual((S['slow' ]['status'], S['slow' ]['attempts']), ('timeout', 2))
+        self.assertTrue(S['slow']['duration']>=1)
+        with open(os.path.splitext(self.files['ok'])[0]+'.log') as f:
+            self.assertEqual(f.read().strip(), 'done')
+
+        # Only the simulations that were not successful are run again
+        with open(self.files['slow'], 'w') as f:
+            f.write('ok')
+        success, Failed = run_fastfiles(files, fastExe=self.exe, reRun=False, manifest=self.manifest, showOutputs=False, showCommand=False, verbose=False, timeout=1)
+        self.assertEqual([p.input_file for p in Failed], [self.files['fail']])
+        status = read_manifest(self.manifest)
+        self.assertEqual(status[self.files['slow']]['status'], 'success')
+        self.assertEqual(status[self.files['fail']]['attempts'], 1)
+        with open(self.files['flaky']+'.count') as f:
+            self.assertEqual(f.read(), '2') # not run again
+
+if __name__ == '__main__':
+    unittest.main()
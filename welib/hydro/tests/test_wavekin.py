@@ -85,6 +85,36 @@ class Test(unittest.TestCase):
         np.testing.assert_almost_equal(np.max(vel[-1,1,:]), 2*np.pi*f*a      * np.cosh(k*(vz[-1]+h)) / np.sinh(k*h), 4)
         np.testing.assert_almost_equal(np.max(acc[-1,1,:]), (2*np.pi*f)**2 *a* np.cosh(k*(vz[-1]+h)) / np.sinh(k*h), 4)
 
+    def test_kinematics_fft(self):
+        # FFT synthesis vs sum over components
+        h, nt, dt = 30., 400, 0.5
+        f, a, k, eps = jonswap_components(6, 10, h, nt, dt, seed=3)
+        nodes = np.array([[0,0,-30],[5,2,-3],[0,0,2],[0,0,-40]], dtype=float)
+        d = kinematics_fft(a, f, k, eps, h, nt, nodes, WaveDir=30, Wheeler=False, dtype=np.float64)
+        t  = d['WaveTime']
+        xp = nodes[1,0]*np.cos(np.pi/6) + nodes[1,1]*np.sin(np.pi/6)
+        eta = elevation2d(a, f, k, eps, t, xp)
+        vel, acc = kinematics2d(a[1:], f[1:], k[1:], eps[1:], h, t, nodes[1,2], xp)
+        np.testing.assert_allclose(d['WaveElev'][:,1], eta, atol=1e-10)
+        np.testing.assert_allclose(d['WaveVel'][:,1,0], vel*np.cos(np.pi/6), atol=1e-10)
+        np.testing.assert_allclose(d['WaveAcc'][:,1,1], acc*np.sin(np.pi/6), atol=1e-10)
+        np.testing.assert_array_equal(d['nodeInWater'][0], [1,1,0,0])
+        self.assertEqual(d['WaveVel'].shape, (nt, 4, 3))
+        # Wheeler stretching
+        d = kinematics_fft(a, f, k, eps, h, nt, nodes, Wheeler=True)
+        self.assertEqual(d['WaveVel'].dtype, np.float32)
+        for it in [0, 123]:
+            eta = d['WaveElev'][it,1]
+            vel, acc = kinematics2d(a[1:], f[1:], k[1:], eps[1:], h, t[it], nodes[1:2,2], nodes[1:2,0], Wheeler=True, eta=eta)
+            np.testing.assert_allclose(d['WaveVel'][it,1,0], vel[0], rtol=1e-3)
+            np.testing.assert_allclose(d['WaveAcc'][it,1,0], acc[0], rtol=1e-3)
+        np.testing.assert_array_equal(d['nodeInWater'][:,2], d['WaveElev'][:,2]>=2)
+        np.testing.assert_array_equal(d['WaveVel'][:,3,:], 0)
+        # Processing one node at a time
+        d1 = kinematics_fft(a, f, k, eps, h, nt, nodes, Wheeler=True, nMax=nt)
+        for key in ['WaveElev', 'WaveVel', 'WaveAcc', 'WaveDynP', 'nodeInWater']:
+            np.testing.assert_array_equal(d1[key], d[key])
+
 if __name__ == '__main__':
     MyDir=os.path.dirname(__file__)
     unittest.main()
@@ -1,24 +1,32 @@
+import os
 import numpy as np
 import pandas as pd
-from scipy.optimize import fsolve
 
 
 def wavenumber(f, h, g=9.81):   
     """ solves the dispersion relation, returns the wave number k
+    Newton iterations are performed on all frequencies at once.
     INPUTS:
-      omega: wave cyclic frequency [rad/s], scalar or array-like
+      f: wave frequency [Hz], scalar or array-like
       h : water depth [m]
       g: gravity [m/s^2]
     OUTPUTS:
       k: wavenumber
     """
-    omega = 2*np.pi*f
-    if hasattr(omega, '__len__'): 
-        k = np.array([fsolve(lambda k: om**2/g - k*np.tanh(k*h), (om**2)/g)[0] for om in omega])
-    else:
-        func = lambda k: omega**2/g - k*np.tanh(k*h)
-        k_guess = (omega**2)/g 
-        k = fsolve(func, k_guess)[0]
+    omega = 2*np.pi*np.asarray(f, dtype=float)
+    k0    = omega**2/g  # deep water wavenumber
+    k     = np.zeros(omega.shape)
+    b     = k0>0
+    # Initial guess from the shallow/deep water approximation, then Newton on F(k)=omega^2/g-k tanh(kh)
+    k[b] = k0[b]/np.sqrt(np.tanh(k0[b]*h))
+    for it in range(50):
+        th = np.tanh(k[b]*h)
+        dk = (k0[b] - k[b]*th)/(th + k[b]*h*(1-th**2))
+        k[b] += dk
+        if np.all(np.abs(dk)<=1e-14*k[b]):
+            break
+    if k.ndim==0:
+        k = float(k)
     return k
 
 # Functions 
@@ -125,6 +133,219 @@ def kinematics2d(a, f, k, eps, h, t, z, x=None, Wheeler=False, eta=None):
 
 
 
+# --------------------------------------------------------------------------------}
+# --- Irregular waves, FFT synthesis
+# --------------------------------------------------------------------------------{
+def jonswap_components(Hs, Tp, h, nt, dt, g=9.81, seed=None, fCutHigh=None):
+    """ 
+    Wave components of an irregular sea state (Jonswap spectrum) on the frequency grid
+    of the discrete Fourier transform, f_n = n/(nt dt), n=0..nt//2, such that the time series
+    can be synthesized by inverse FFT (see kinematics_fft). The mean and Nyquist components are set to 0.
+
+    INPUTS:
+      Hs, Tp : significant wave height [m] and peak period [s]
+      h  : water depth [m]
+      nt : number of time steps
+      dt : time step [s]
+      seed: seed for the random phases
+      fCutHigh: frequency above which the amplitudes are set to 0 [Hz]
+    OUTPUTS:
+      f  : frequencies [Hz] (nt//2+1)
+      a  : amplitudes [m], a=sqrt(2 S df)
+      k  : wavenumbers [1/m]
+      eps: random phases [rad]
+    """
+    from welib.hydro.spectra import jonswap
+    df = 1/(nt*dt)
+    f  = np.arange(nt//2+1)*df
+    S  = np.zeros(f.shape)
+    S[1:] = jonswap(f[1:], Hs, Tp=Tp, g=g)
+    if nt%2==0:
+        S[-1] = 0 # Nyquist
+    if fCutHigh is not None:
+        S[f>fCutHigh] = 0
+    a   = np.sqrt(2*S*df)
+    k   = wavenumber(f, h, g)
+    eps = np.random.RandomState(seed).uniform(0, 2*np.pi, len(f))
+    return f, a, k, eps
+
+
+def _depthTransfer(k, z, h):
+    """ 
+    Depth attenuation functions of linear wave theory, written with exponentials to avoid overflows
+    INPUTS:
+      k: wavenumbers, array (nf), >0
+      z: vertical positions (z=0 sea level, z=-h sea floor), array (nz)
+    OUTPUTS: arrays (nz x nf)
+      Tc = cosh(k(z+h))/sinh(kh), Ts = sinh(k(z+h))/sinh(kh), Tp = cosh(k(z+h))/cosh(kh)
+    """
+    kz  = np.outer(z, k)
+    e1  = np.exp(kz)
+    e2  = np.exp(-kz-2*k*h)
+    e2h = np.exp(-2*k*h)
+    Tc  = (e1+e2)/(1-e2h)
+    Ts  = (e1-e2)/(1-e2h)
+    Tp  = (e1+e2)/(1+e2h)
+    return Tc, Ts, Tp
+
+
+def kinematics_fft(a, f, k, eps, h, nt, nodes, WaveDir=0, Wheeler=True, rho=1025, g=9.81, 
+        dzMax=0.5, dtype=np.float32, folder=None, nMax=2**20):
+    """ 
+    Irregular wave kinematics at a set of nodes, synthesized by inverse FFT.
+    Returns the wave elevation, velocity, acceleration and dynamic pressure at each node and time step, 
+    in the format used by welib.fast.hydrodyn_morison.Morison.init.
+
+    The components need to be on the frequency grid of the FFT: f_n = n df, n=0..nt//2, with df=1/(nt dt)
+    (see jonswap_components). The time series are periodic with period nt dt.
+
+    With Wheeler stretching, the kinematics at z are evaluated at z'=(z-eta)h/(h+eta), where eta is the 
+    instantaneous wave elevation. For each node, the kinematics are synthesized on a set of levels spanning 
+    the range of z' (spacing <= dzMax), and interpolated (cubic) at z'(t) for all time steps at once.
+
+    INPUTS:
+      a, f, k, eps: amplitudes [m], frequencies [Hz], wavenumbers [1/m] and phases [rad], arrays (nt//2+1)
+      h    : water depth [m]
+      nt   : number of time steps
+      nodes: node positions, array (nNodes x 3), z=0 at sea level
+      WaveDir: wave propagation direction [deg] 
+      Wheeler: if True, Wheeler stretching, otherwise, the kinematics are computed up to z=0 only
+      dtype: data type of the outputs
+      folder: if provided, the outputs are written to numpy memory-maps in this folder 
+              ("WaveVel.npy", etc.), which can be reopened with np.load(..., mmap_mode='r')
+      nMax : maximum number of elements of the temporary arrays (nodes are processed by chunks)
+    OUTPUTS:
+      d: dictionary with keys:
+         - WaveTime   : time vector (nt)
+         - WaveElev   : wave elevation above each node (nt x nNodes)
+         - WaveVel    : wave velocity                   (nt x nNodes x 3)
+         - WaveAcc    : wave acceleration               (nt x nNodes x 3)
+         - WaveDynP   : wave dynamic pressure           (nt x nNodes)
+         - nodeInWater: 1 if the node is in the water   (nt x nNodes)
+    """
+    f     = np.asarray(f)
+    a     = np.asarray(a)*np.ones(f.shape)
+    k     = np.asarray(k)*np.ones(f.shape)
+    eps   = np.asarray(eps)*np.ones(f.shape)
+    nodes = np.atleast_2d(nodes)
+    nN    = nodes.shape[0]
+    if len(f)!=nt//2+1 or f[0]!=0 or not np.allclose(np.diff(f), f[1]):
+        raise Exception('Frequencies should be on the FFT grid: f=np.arange(nt//2+1)*df')
+    dt = 1/(nt*f[1])
+    omega = 2*np.pi*f
+    beta  = WaveDir*np.pi/180
+
+    # --- Complex amplitudes, scaled for irfft. Mean and Nyquist components are ignored
+    A = a*np.exp(1j*eps)*nt/2
+    A[0] = 0
+    if nt%2==0:
+        A[-1] = 0
+    valid = np.abs(A)>0
+    A, omega, k = A[valid], omega[valid], k[valid]
+    def irfft(X):
+        Xf = np.zeros((X.shape[0], nt//2+1), dtype=complex)
+        Xf[:, valid] = X
+        return np.fft.irfft(Xf, nt, axis=1)
+
+    # --- Outputs
+    shapes = {'WaveElev':(nt,nN), 'WaveVel':(nt,nN,3), 'WaveAcc':(nt,nN,3), 'WaveDynP':(nt,nN), 'nodeInWater':(nt,nN)}
+    d = {}
+    for key, shape in shapes.items():
+        dt_ = np.int8 if key=='nodeInWater' else dtype
+        if folder is not None:
+            d[key] = np.lib.format.open_memmap(os.path.join(folder, key+'.npy'), mode='w+', dtype=dt_, shape=shape)
+            d[key][:] = 0
+        else:
+            d[key] = np.zeros(shape, dtype=dt_)
+    d['WaveTime'] = np.arange(nt)*dt
+
+    # --- Wave elevation and stretched vertical position, computed by chunks of nodes
+    x   = nodes[:,0]*np.cos(beta) + nodes[:,1]*np.sin(beta)
+    z   = nodes[:,2]
+    def elevation(J):
+        # Elevation is computed once per distinct horizontal position
+        xu, iu = np.unique(x[J], return_inverse=True)
+        return irfft(A*np.exp(-1j*np.outer(xu, k)))[iu]
+    def stretching(J, eta):
+        inWater = (z[J,None]>=-h) & (z[J,None]<=eta)
+        zs      = np.clip((z[J,None]-eta)*h/(h+eta), -h, 0)
+        return inWater, zs
+
+    # --- Levels where kinematics are synthesized
+    nChunk = max(1, int(nMax/nt))
+    if Wheeler:
+        zMin = np.zeros(nN)
+        zMax = np.zeros(nN)
+        b    = np.zeros(nN, dtype=bool)
+        for i0 in np.arange(0, nN, nChunk):
+            J = np.arange(i0, min(i0+nChunk, nN))
+            eta = elevation(J)
+            inWater, zs = stretching(J, eta)
+            d['WaveElev'][:, J]    = eta.T
+            d['nodeInWater'][:, J] = inWater.T
+            zMin[J] = np.where(inWater, zs,  np.inf).min(axis=1)
+            zMax[J] = np.where(inWater, zs, -np.inf).max(axis=1)
+            b[J]    = inWater.any(axis=1)
+        nL   = np.zeros(nN, dtype=int)
+        nL[b] = np.maximum(4, np.ceil((zMax[b]-zMin[b])/dzMax).astype(int)+1)
+        dz    = np.ones(nN)
+        dz[b] = np.maximum((zMax[b]-zMin[b])/(nL[b]-1), 1e-6)
+    else:
+        for i0 in np.arange(0, nN, nChunk):
+            J = np.arange(i0, min(i0+nChunk, nN))
+            d['WaveElev'][:, J] = elevation(J).T
+        bInWater = (z>=-h) & (z<=0)
+        d['nodeInWater'][:] = bInWater[None,:]
+        zMin = z
+        nL   = bInWater.astype(int)
+        dz   = np.ones(nN)
+
+    # --- Loop on chunks of nodes
+    nodesLeft = list(np.where(nL>0)[0])
+    while len(nodesLeft)>0:
+        J = [nodesLeft.pop(0)]
+        while len(nodesLeft)>0 and (np.sum(nL[J])+nL[nodesLeft[0]])*nt<=nMax:
+            J.append(nodesLeft.pop(0))
+        J     = np.asarray(J)
+        off   = np.concatenate(([0], np.cumsum(nL[J])[:-1]))
+        owner = np.repeat(np.arange(len(J)), nL[J])
+        zL    = zMin[J][owner] + dz[J][owner]*(np.arange(len(owner))-off[owner])
+        # Kinematics on levels, horizontal velocity/acceleration along the wave direction
+        Tc, Ts, Tp = _depthTransfer(k, zL, h)
+        X  = A*np.exp(-1j*np.outer(x[J], k))[owner]
+        K = np.zeros((5, len(zL), nt))
+        K[0] = irfft(X*omega*Tc)              # u
+        K[1] = irfft(1j*X*omega*Ts)           # w
+        K[2] = irfft(1j*X*omega**2*Tc)        # du/dt
+        K[3] = irfft(-X*omega**2*Ts)          # dw/dt
+        K[4] = irfft(X*rho*g*Tp)              # p
+        if Wheeler:
+            # Cubic interpolation at z'(t) based on the 4 levels surrounding z'
+            inWater, zs = stretching(J, elevation(J))
+            s  = (zs-zMin[J][:,None])/dz[J][:,None]
+            i  = np.clip(np.floor(s).astype(int), 1, nL[J][:,None]-3)
+            u  = s-i
+            W  = [-u*(u-1)*(u-2)/6, (u+1)*(u-1)*(u-2)/2, -(u+1)*u*(u-2)/2, (u+1)*u*(u-1)/6]
+            it = np.arange(nt)[None,:]
+            Kn = np.zeros((5, len(J), nt))
+            for di, w in zip([-1,0,1,2], W):
+                Kn += w*K[:, off[:,None]+i+di, it]
+            Kn *= inWater
+        else:
+            Kn = K[:, off, :]
+        d['WaveVel'][:, J, 0] = (Kn[0]*np.cos(beta)).T
+        d['WaveVel'][:, J, 1] = (Kn[0]*np.sin(beta)).T
+        d['WaveVel'][:, J, 2] = Kn[1].T
+        d['WaveAcc'][:, J, 0] = (Kn[2]*np.cos(beta)).T
+        d['WaveAcc'][:, J, 1] = (Kn[2]*np.sin(beta)).T
+        d['WaveAcc'][:, J, 2] = Kn[3].T
+        d['WaveDynP'][:, J]   = Kn[4].T
+    if folder is not None:
+        for key in shapes.keys():
+            d[key].flush()
+    return d
+
+
 def fcalc(f, h, g, D, ap, CD, CM , rho, t, z, x, k, eps, phi, u_struct): 
     t = np.atleast_1d(t)                                                 
     f = np.asarray([f])
@@ -32,6 +32,121 @@ def EstimateKFTimeStep(u1,y1,z0,Xxd,Xud,Yx,Yu,P0,Q,R):
     return z1,P1,Kk
 
 
+def KFSteadyStateGain(Xxd,Yx,Q,R):
+    """ Steady state Kalman gain, obtained by solving the discrete algebraic Riccati equation once
+
+        P = Xxd P Xxd' - Xxd P Yx' (Yx P Yx' + R)^-1 Yx P Xxd' + Q
+
+    INPUTS:
+      Xxd, Yx: discrete state matrix and output matrix
+      Q, R   : process and measurement covariances
+    OUTPUTS:
+      Kk: steady state Kalman gain (nx x ny)
+      P : steady state (a posteriori) process covariance (nx x nx)
+    """
+    from scipy.linalg import solve_discrete_are
+    P1m = solve_discrete_are(Xxd.T, Yx.T, Q, R) # a priori covariance
+    S   = (Yx.dot(P1m)).dot(Yx.T) + R
+    Kk  = np.linalg.solve(S, Yx.dot(P1m)).T    # S is symmetric
+    P   = (np.eye(Xxd.shape[0]) - Kk.dot(Yx) ).dot(P1m)
+    return Kk, P
+
+
+def EstimateKFTimeStepSteadyState(u1,y1,z0,Xxd,Xud,Yx,Yu,Kk):
+    """ Performs one time step of Kalman filter estimation with a constant (steady state) gain
+    See EstimateKFTimeStep and KFSteadyStateGain
+    """
+    z1m   = Xxd.dot(z0)  + Xud.dot(u1)
+    y1hat = Yx.dot(z1m)  + Yu.dot(u1)
+    return z1m + Kk.dot(y1 - y1hat)
+
+
+def EstimateKFTimeStepSqrt(u1,y1,z0,Xxd,Xud,Yx,Yu,S0,SQ,SR):
+    """ Performs one time step of a square-root Kalman filter estimation.
+    The covariances are propagated through their (lower) Cholesky factors, P=S S', using
+    QR decompositions, which ensures that P remains symmetric positive definite.
+
+    INPUTS:
+      u1: inputs at time n
+      y1: measurements at time n
+      z0: Kalman state estimate at time n-1
+      S0: Cholesky factor of the process covariance at time n-1
+      SQ, SR: Cholesky factors of Q and R
+    OUTPUTS:
+      z1: States at time n
+      S1: Cholesky factor of the process covariance at time n  (nx x nx)
+      Kk: Kalman gain
+    """
+    nx = Xxd.shape[0]
+    ny = Yx.shape[0]
+    # estimate next step
+    z1m   = Xxd.dot(z0)  + Xud.dot(u1)
+    y1hat = Yx.dot(z1m)  + Yu.dot(u1)
+    # Time update:  P1m = [Xxd S0, SQ] [Xxd S0, SQ]'
+    S1m = np.linalg.qr(np.vstack(((Xxd.dot(S0)).T, SQ.T)), mode='r').T
+    # Measurement update, lower triangular form of the pre-array:
+    #   [SR  Yx S1m]  = [Sy  0 ] Q
+    #   [0   S1m   ]    [Kb  S1]
+    M = np.zeros((ny+nx, ny+nx))
+    M[:ny,:ny] = SR
+    M[:ny,ny:] = Yx.dot(S1m)
+    M[ny:,ny:] = S1m
+    L = np.linalg.qr(M.T, mode='r').T
+    Sy = L[:ny,:ny]
+    Kb = L[ny:,:ny]
+    S1 = L[ny:,ny:]
+    Kk = np.linalg.solve(Sy.T, Kb.T).T # Kk = Kb Sy^-1
+    # update estimate with measurement
+    z1 = z1m + Kk.dot(y1 - y1hat)
+    return z1,S1,Kk
+
+
+def KFBatch(U,Y,z0,Xxd,Xud,Yx,Yu,P0,Q,R,method='standard'):
+    """ Performs the Kalman filter estimation for all time steps (offline), with preallocated storage
+
+    INPUTS:
+      U : inputs, array (nt x nu)
+      Y : measurements, array (nt x ny)
+      z0: initial state estimate (nx)
+      P0: initial process covariance (nx x nx), not used for 'steady'
+      method: 'standard': covariance propagated at each step (see EstimateKFTimeStep)
+              'steady'  : constant gain from the Riccati equation (see KFSteadyStateGain)
+              'sqrt'    : square-root covariance propagation (see EstimateKFTimeStepSqrt)
+    OUTPUTS:
+      Z: state estimates (nt x nx), Z[k+1] is estimated from Z[k] using U[k] and Y[k]
+      P: process covariance at the last time step
+    """
+    nt = len(Y)
+    nx = Xxd.shape[0]
+    U  = np.asarray(U).reshape(nt, Xud.shape[1])
+    Y  = np.asarray(Y).reshape(nt, Yx.shape[0])
+    Z  = np.zeros((nt, nx))
+    Z[0,:] = z0
+    P = P0
+    if method=='standard':
+        for it in range(nt-1):
+            Z[it+1], P, _ = EstimateKFTimeStep(U[it],Y[it],Z[it],Xxd,Xud,Yx,Yu,P,Q,R)
+    elif method=='steady':
+        Kk, P = KFSteadyStateGain(Xxd,Yx,Q,R)
+        # Linear recursion  z_{k+1} = F z_k + W_k
+        IKC = np.eye(nx) - Kk.dot(Yx)
+        F   = IKC.dot(Xxd)
+        W   = U.dot((IKC.dot(Xud) - Kk.dot(Yu)).T) + Y.dot(Kk.T)
+        for it in range(nt-1):
+            np.dot(F, Z[it], out=Z[it+1])
+            Z[it+1] += W[it]
+    elif method=='sqrt':
+        S  = np.linalg.cholesky(P0)
+        SQ = np.linalg.cholesky(Q)
+        SR = np.linalg.cholesky(R)
+        for it in range(nt-1):
+            Z[it+1], S, _ = EstimateKFTimeStepSqrt(U[it],Y[it],Z[it],Xxd,Xud,Yx,Yu,S,SQ,SR)
+        P = S.dot(S.T)
+    else:
+        raise NotImplementedError('Kalman filter method {}'.format(method))
+    return Z, P
+
+
 def KFDiscretize(Xx,Xu,dt,method='exponential'):
     """ Discretize the continuous states matrices Xx, Xu
     
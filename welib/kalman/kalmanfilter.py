@@ -34,6 +34,12 @@ class KalmanFilter(object):
         self.P = None
         self.Q = None
         self.R = None
+        # Estimation mode: 'standard', 'steady' (constant gain), 'sqrt' (square-root covariance)
+        self.mode = 'standard'
+        self.Kss  = None
+        self._KssQR = None # (Q, R) used to compute Kss
+        self._SQR = None
+        self._S   = None # Cholesky factor of P, for 'sqrt' mode, stored as (P, S)
 
     @property
     def nX(self):
@@ -137,12 +143,68 @@ class KalmanFilter(object):
 
     def estimateTimeStep(self,u,y,x,P,Q,R):
         """
+        Perform one time step of the estimation, according to `self.mode`:
+          - 'standard': see EstimateKFTimeStep
+          - 'steady'  : constant gain `self.Kss` (see setSteadyStateGain), P is returned unchanged
+                        The gain is recomputed when Q or R are not the ones used to compute it
+          - 'sqrt'    : the Cholesky factor of P is propagated (see EstimateKFTimeStepSqrt) and stored
+                        in `self._S`, it is only recomputed when P is not the covariance returned at the previous step
         OUTPUTS:
           z1: States at time n
           P1: Process covariance at time n
           Kk: Kalman gain
         """
-        return EstimateKFTimeStep(u,y,x,self.Xxd,self.Xud,self.Yx.values,self.Yu.values,P,Q,R)
+        if self.mode=='standard':
+            return EstimateKFTimeStep(u,y,x,self.Xxd,self.Xud,self.Yx.values,self.Yu.values,P,Q,R)
+        elif self.mode=='steady':
+            if self.Kss is None or self._KssQR is None or self._KssQR[0] is not Q or self._KssQR[1] is not R:
+                self.setSteadyStateGain(Q,R)
+            x = EstimateKFTimeStepSteadyState(u,y,x,self.Xxd,self.Xud,self.Yx.values,self.Yu.values,self.Kss)
+            return x,P,self.Kss
+        elif self.mode=='sqrt':
+            # Cholesky factors of Q and R are computed once
+            if self._SQR is None or self._SQR[0] is not Q or self._SQR[1] is not R:
+                self._SQR = (Q, R, np.linalg.cholesky(Q), np.linalg.cholesky(R))
+            if self._S is None or self._S[0] is not P:
+                self._S = (P, np.linalg.cholesky(P))
+            x, S, Kk = EstimateKFTimeStepSqrt(u,y,x,self.Xxd,self.Xud,self.Yx.values,self.Yu.values,self._S[1],self._SQR[2],self._SQR[3])
+            P = S.dot(S.T)
+            self._S = (P, S)
+            return x, P, Kk
+        else:
+            raise ValueError('Kalman filter mode {}'.format(self.mode))
+
+    def setSteadyStateGain(self,Q=None,R=None):
+        """ Compute the steady state Kalman gain (discrete algebraic Riccati equation) """
+        Q = self.Q if Q is None else Q
+        R = self.R if R is None else R
+        self.Kss, Pss = KFSteadyStateGain(self.Xxd,self.Yx.values,Q,R)
+        self._KssQR = (Q, R)
+        return self.Kss, Pss
+
+    def estimateBatch(self,U,Y,x0,P0=None,Q=None,R=None,method=None):
+        """
+        Perform the estimation for all time steps (offline), see KFBatch
+        INPUTS:
+          U : inputs, array (nt x nU)
+          Y : measurements, array (nt x nY)
+          x0: initial states
+          method: 'standard', 'steady' or 'sqrt', default to `self.mode`
+        OUTPUTS:
+          X_hat: estimated states (nt x nX)
+          Y_hat: estimated measurements (nt x nY)
+          P    : process covariance at the last time step
+        """
+        P0 = self.P if P0 is None else P0
+        Q  = self.Q if Q  is None else Q
+        R  = self.R if R  is None else R
+        method = self.mode if method is None else method
+        if P0 is None:
+            P0 = np.eye(self.nX)
+        U = np.asarray(U)
+        X_hat, P = KFBatch(U,np.asarray(Y),x0,self.Xxd,self.Xud,self.Yx.values,self.Yu.values,P0,Q,R,method=method)
+        Y_hat = X_hat.dot(self.Yx.values.T) + U.reshape(len(X_hat), self.nU).dot(self.Yu.values.T)
+        return X_hat, Y_hat, P
 
     def covariancesFromSig(self):
         if not hasattr(self,'sigX'):
@@ -298,6 +360,9 @@ class KalmanFilter(object):
     def prepareTimeStepping(KF):
         # --- Process and measurement covariances
         KF.P, KF.Q, KF.R = KF.covariancesFromSig()
+        if KF.mode=='steady':
+            _, KF.P = KF.setSteadyStateGain()
+        KF._S = None
         # --- Storage for plot
         KF.initTimeStorage()
 
@@ -132,5 +132,101 @@ class Test(unittest.TestCase):
 #         print('Xu\n',Xu)
 #         print('Yx\n',Yx)
 #         print('Yu\n',Yu)
+
+    def test_batch_modes(self):
+        # Steady state and square-root estimators compared to the standard estimator
+        np.random.seed(0)
+        M = np.diag([3.,2]); K = np.array([[5,-1],[-1,4.]]); C = 0.1*K
+        Xx,Xu,Yx,Yu = BuildSystem_Linear_MechOnly(M,C,K,nP=1,nU=1,nY=2)
+        Xu[3,0] = 1
+        Yx[0,0] = 1
+        Yx[1,3] = 1
+        Yx[1,4] = 0.5
+        Xxd,Xud = KFDiscretize(Xx,Xu,0.02,method='forward_euler')
+        nt = 2000
+        U  = np.random.randn(nt,1)
+        Y  = np.random.randn(nt,2)
+        Q  = np.diag([1e-3,1e-3,1e-2,1e-2,1e-1])
+        R  = np.diag([1e-2,1e-1])
+        P0 = np.eye(5)
+        # Standard batch is the same as the time step loop
+        z = np.zeros(5)
+        P = P0
+        for it in range(nt-1):
+            z,P,Kk = EstimateKFTimeStep(U[it],Y[it],z,Xxd,Xud,Yx,Yu,P,Q,R)
+        Z_ref, P_ref = KFBatch(U,Y,np.zeros(5),Xxd,Xud,Yx,Yu,P0,Q,R,method='standard')
+        np.testing.assert_allclose(Z_ref[-1], z, rtol=1e-12, atol=1e-14)
+        # Square root filter, same results to round-off
+        Z, P = KFBatch(U,Y,np.zeros(5),Xxd,Xud,Yx,Yu,P0,Q,R,method='sqrt')
+        np.testing.assert_allclose(Z, Z_ref, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(P, P_ref, rtol=1e-8, atol=1e-12)
+        # Steady state filter, same results once the covariance has converged
+        Kss, Pss = KFSteadyStateGain(Xxd,Yx,Q,R)
+        np.testing.assert_allclose(Kss, Kk , rtol=1e-6, atol=1e-10)
+        np.testing.assert_allclose(Pss, P_ref, rtol=1e-6, atol=1e-10)
+        Z, P = KFBatch(U,Y,np.zeros(5),Xxd,Xud,Yx,Yu,P0,Q,R,method='steady')
+        np.testing.assert_allclose(Z[1000:], Z_ref[1000:], rtol=1e-3, atol=1e-3)
+
+    def test_kalmanfilter_sqrt(self):
+        # KalmanFilter in 'sqrt' mode: P remains the covariance, batch and time steps as the standard filter
+        from welib.kalman.kalmanfilter import KalmanFilter
+        np.random.seed(0)
+        M = np.diag([3.,2]); K = np.array([[5,-1],[-1,4.]]); C = 0.1*K
+        Xx,Xu,Yx,Yu = BuildSystem_Linear_MechOnly(M,C,K,nP=1,nU=1,nY=2)
+        Yx[0,0] = 1
+        Yx[1,4] = 1
+        KF = KalmanFilter(sX0=['x1','x2','v1','v2'], sXa=['p'], sU=['u'], sY=['y1','y2'])
+        KF.setMat(Xx, Xu, Yx, Yu)
+        KF.discretize(0.02, method='forward_euler')
+        KF.sigX = dict(zip(KF.sX, [0.03, 0.03, 0.1, 0.1, 0.3]))
+        KF.sigY = {'y1':0.1, 'y2':0.3}
+        KF.setTimeVec(np.arange(300)*0.02)
+        U  = np.random.randn(KF.nt,1)
+        Y  = np.random.randn(KF.nt,2)
+        KF.mode='sqrt'
+        KF.prepareTimeStepping()
+        P0, Q, R = KF.covariancesFromSig()
+        np.testing.assert_allclose(KF.P, P0)
+        Z_ref, _, P_ref = KF.estimateBatch(U, Y, np.zeros(5), method='standard')
+        Z    , _, P     = KF.estimateBatch(U, Y, np.zeros(5), method='sqrt')
+        np.testing.assert_allclose(Z, Z_ref, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(P, P_ref, rtol=1e-8, atol=1e-12)
+        # Non identity initial covariance, time stepping
+        KF.P = np.diag([4,1,2,3,5])+0.5
+        Z_ref, _, P_ref = KF.estimateBatch(U, Y, np.zeros(5), method='standard')
+        Z    , _, P     = KF.estimateBatch(U, Y, np.zeros(5), method='sqrt')
+        np.testing.assert_allclose(Z, Z_ref, rtol=1e-8, atol=1e-10)
+        x, P = np.zeros(5), KF.P
+        for it in range(KF.nt-1):
+            x, P, _ = KF.estimateTimeStep(U[it], Y[it], x, P, KF.Q, KF.R)
+        np.testing.assert_allclose(x, Z_ref[-1], rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(P, P_ref, rtol=1e-8, atol=1e-12)
+
+    def test_kalmanfilter_steady(self):
+        # KalmanFilter in 'steady' mode: the gain follows the covariances Q and R
+        from welib.kalman.kalmanfilter import KalmanFilter
+        M = np.diag([3.,2]); K = np.array([[5,-1],[-1,4.]]); C = 0.1*K
+        Xx,Xu,Yx,Yu = BuildSystem_Linear_MechOnly(M,C,K,nP=1,nU=1,nY=2)
+        Yx[0,0] = 1
+        Yx[1,4] = 1
+        KF = KalmanFilter(sX0=['x1','x2','v1','v2'], sXa=['p'], sU=['u'], sY=['y1','y2'])
+        KF.setMat(Xx, Xu, Yx, Yu)
+        KF.discretize(0.02, method='forward_euler')
+        KF.sigX = dict(zip(KF.sX, [0.03, 0.03, 0.1, 0.1, 0.3]))
+        KF.sigY = {'y1':0.1, 'y2':0.3}
+        KF.setTimeVec(np.arange(10)*0.02)
+        KF.mode='steady'
+        KF.prepareTimeStepping()
+        u, y, x = np.zeros(1), np.ones(2), np.zeros(5)
+        _, _, K1 = KF.estimateTimeStep(u, y, x, KF.P, KF.Q, KF.R)
+        np.testing.assert_allclose(K1, KFSteadyStateGain(KF.Xxd,KF.Yx.values,KF.Q,KF.R)[0])
+        # New covariances
+        Q2, R2 = 4*KF.Q, KF.R/4
+        _, _, K2 = KF.estimateTimeStep(u, y, x, KF.P, Q2, R2)
+        np.testing.assert_allclose(K2, KFSteadyStateGain(KF.Xxd,KF.Yx.values,Q2,R2)[0])
+        self.assertFalse(np.allclose(K1, K2))
+        KF.mode='unknown'
+        self.assertRaises(ValueError, KF.estimateTimeStep, u, y, x, KF.P, Q2, R2)
+
 if __name__=='__main__':
     unittest.main()
@@ -12,10 +12,10 @@ class Mesh():
             o.v2 = []
             o.v3 = []
             o.dCell     = np.array([v1[1]-v1[0]])
-            o.xMesh_min = np.array([v1(1)])
-            o.xMesh_max = np.array([v1(end())])
+            o.xMesh_min = np.array([v1[0]])
+            o.xMesh_max = np.array([v1[-1]])
             o.n = np.array([len(v1)])
-            o.bRegular = np.mean(np.diff(v1)) == v1(2) - v1(1)
+            o.bRegular = sum(np.abs(np.diff(v1,2)))< 1e-12
             if not o.bRegular :
                 o.dCell = []
         elif v3 is None:
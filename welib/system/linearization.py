@@ -2,7 +2,9 @@
 Tools for linearizing functions.
 
 Generic functions:
-- numerical_jacobian(f, op, arg_number, deltas, *f_args):
+- numerical_jacobian(f, op, arg_number, deltas, *f_args, sparsity=None, nProcs=1):
+- jacobian_sparsity(f, op, arg_number, deltas, *f_args): sparsity pattern detection
+- column_coloring(sparsity): groups of structurally independent columns
 
 -  df/dx        = linearize_Fx(F, x0, dx, *p)             where F = F(x, p)
 -  df/dx, df/du = linearize_Fxu(F, x0, u0, dx, du, *p)    where F = F(x, u, p)
@@ -14,7 +16,7 @@ import copy
 # --------------------------------------------------------------------------------}
 # --- Generic functions 
 # --------------------------------------------------------------------------------{
-def numerical_jacobian(f, op, arg_number, deltas, *f_args):
+def numerical_jacobian(f, op, arg_number, deltas, *f_args, sparsity=None, nProcs=1):
     """
     Compute the jacobian of the function `f` at the operating point `op`
     with respect to its argument `arg_number` using the symmetric difference quotient method.
@@ -31,18 +33,115 @@ def numerical_jacobian(f, op, arg_number, deltas, *f_args):
         arg_number: index of the argument of f (starting at 0) about which the jacobian needs to be computed
         deltas: array of numerical delta to be used to perform perturbations of the argument `arg_number` of the function. This array should have the same length as the input argument being perturbed
         *f_args: list of additional arguments required for the function f
+        sparsity: optional boolean array (or scipy.sparse matrix) of shape nx x nj, True where the
+                  jacobian may be non-zero (see `jacobian_sparsity`). Structurally independent 
+                  columns are perturbed together (see `column_coloring`), so that the number of 
+                  function evaluations is 2*nColors instead of 2*nj.
+        nProcs: number of processes. If >1, the perturbed evaluations are distributed to a pool 
+                of processes. The function and arguments are inherited by the processes on 
+                platforms supporting "fork", otherwise they need to be picklable (no lambdas)
 
     OUTPUTS:
        jac: jacobian, partial f/partial arg at op
     
     """
+    op, f_args, nx, nj, deltas = _jacobianSetup(f, op, arg_number, deltas, f_args)
+
+    # --- Groups of columns perturbed at once
+    if sparsity is None:
+        colors = np.arange(nj)
+        S = None
+    else:
+        S = _sparsityMatrix(sparsity, nx, nj)
+        colors = column_coloring(S)
+    nColors = colors.max()+1 if nj>0 else 0
+
+    # --- Perturbations, positive and negative for each color
+    DV = np.zeros((2*nColors, nj))
+    for c in range(nColors):
+        IC = colors==c
+        DV[2*c  , IC] =  deltas[IC]
+        DV[2*c+1, IC] = -deltas[IC]
+    F = _evaluatePerturbations(f, op, arg_number, f_args, DV, nProcs=nProcs)
+
+    # --- Partial derivatives using symmetric difference quotient
+    jac = np.zeros((nx,nj))
+    for j in range(nj):
+        c = colors[j]
+        df = (F[2*c]-F[2*c+1]) / (2*deltas[j])
+        if S is None:
+            jac[:,j] = df
+        else:
+            I = S.indices[S.indptr[j]:S.indptr[j+1]]
+            jac[I,j] = df[I]
+    return jac
+
+
+def jacobian_sparsity(f, op, arg_number, deltas, *f_args, nProcs=1):
+    """
+    Detect the sparsity pattern of the jacobian of `f` at `op` with respect to argument `arg_number`.
+    One forward perturbation is performed per column (nj+1 evaluations), the pattern can then be 
+    reused for subsequent calls to `numerical_jacobian` (e.g. at different operating points).
+    NOTE: entries that vanish at this operating point are considered structurally zero.
+
+    INPUTS: see `numerical_jacobian`
+    OUTPUTS:
+       sparsity: boolean array of shape nx x nj, True where the jacobian is non-zero
+    """
+    op, f_args, nx, nj, deltas = _jacobianSetup(f, op, arg_number, deltas, f_args)
+    DV = np.vstack((np.zeros(nj), np.diag(deltas)))
+    F = _evaluatePerturbations(f, op, arg_number, f_args, DV, nProcs=nProcs)
+    return (F[1:]!=F[0]).T
+
+
+def column_coloring(sparsity):
+    """
+    Greedy coloring of the columns of a sparsity pattern: two columns sharing a non-zero row 
+    have different colors. Columns of the same color can be perturbed simultaneously.
+    Columns are processed from the densest to the sparsest (largest-first ordering).
+
+    INPUTS:
+       sparsity: boolean array (or scipy.sparse matrix) of shape nx x nj
+    OUTPUTS:
+       colors: integer array of length nj, color of each column, from 0 to nColors-1
+    """
+    S = _sparsityMatrix(sparsity)
+    nx, nj = S.shape
+    colors = -np.ones(nj, dtype=int)
+    rowColors = [set() for i in range(nx)] # colors already used in each row
+    nnz = np.diff(S.indptr)
+    for j in np.argsort(-nnz, kind='stable'):
+        I = S.indices[S.indptr[j]:S.indptr[j+1]]
+        used = set().union(*[rowColors[i] for i in I])
+        c = 0
+        while c in used:
+            c += 1
+        colors[j] = c
+        for i in I:
+            rowColors[i].add(c)
+    return colors
+
+
+def _sparsityMatrix(sparsity, nx=None, nj=None):
+    """ Return a sparsity pattern as a boolean CSC matrix, and check its dimensions """
+    import scipy.sparse as sp
+    S = sp.csc_matrix(sparsity, dtype=bool)
+    S.eliminate_zeros()
+    S.sort_indices()
+    if nx is not None and S.shape!=(nx,nj):
+        raise Exception('Shape of sparsity pattern {} different from jacobian shape ({},{})'.format(S.shape, nx, nj))
+    return S
+
+
+def _jacobianSetup(f, op, arg_number, deltas, f_args):
+    """ Check the inputs of numerical_jacobian and determine the jacobian dimensions from a call at the operating point """
     if not isinstance(op,tuple):
         raise Exception('Operating point needs to be specified as a tuple')
     op     = list(op)
     f_args = list(f_args)
 
     # Convert op[arg_number] to array of floats
-    deltas = np.asarray(deltas)
+    deltas = np.asarray(deltas).flatten()
     op = copy.deepcopy(op)
     op[arg_number] = np.asarray(op[arg_number]).astype(float)
     #dtype_op   = op[arg_number].dtype
@@ -73,23 +172,43 @@ def numerical_jacobian(f, op, arg_number, deltas, *f_args):
     nj = len(op[arg_number])
     if nj!=len(deltas):
         raise Exception('Number of deltas ({}) different from dimension of operating point number {} ({}) '.format(len(deltas), arg_number, len(op[arg_number])))
-
-    jac = np.zeros((nx,nj))
-
-
-    for j in range(nj):
-        # Positive and negative perturbation of operating point for arg
-        op_p = copy.deepcopy(op)
-        op_m = copy.deepcopy(op)
-        op_p[arg_number][j] += deltas[j]
-        op_m[arg_number][j] -= deltas[j]
-        # Evaluation of the function at these points
-        f_j_p= np.asarray(f(*(op_p+f_args))).flatten()
-        f_j_m= np.asarray(f(*(op_m+f_args))).flatten()
-        # Partial derivative using symmetric difference quotient
-        jac[:,j] = (f_j_p-f_j_m) / (2*deltas[j])
-
-    return jac
+    return op, f_args, nx, nj, deltas
+
+
+# Function call shared with the worker processes, see _evaluatePerturbations
+_JAC_CALL = None
+
+def _setJacobianCall(call):
+    global _JAC_CALL
+    _JAC_CALL = call
+
+def _evaluatePerturbation(f, op, arg_number, f_args, dv):
+    """ Evaluate f with the argument `arg_number` of the operating point perturbed by dv """
+    op_ = copy.deepcopy(op)
+    op_[arg_number] = op[arg_number] + dv.reshape(op[arg_number].shape)
+    return np.asarray(f(*(op_+f_args)), dtype=float).flatten()
+
+def _evaluatePerturbationBlock(DV):
+    """ Evaluate a block of perturbations, in a worker process """
+    return [_evaluatePerturbation(*_JAC_CALL, dv) for dv in DV]
+
+def _evaluatePerturbations(f, op, arg_number, f_args, DV, nProcs=1):
+    """ Evaluate f for each perturbation (rows of DV), possibly using a pool of processes """
+    nEval = DV.shape[0]
+    if nProcs>1 and nEval>1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        try:
+            ctx = multiprocessing.get_context('fork')
+        except ValueError:
+            ctx = None
+        blocks = [I for I in np.array_split(np.arange(nEval), nProcs) if len(I)>0]
+        with ProcessPoolExecutor(max_workers=len(blocks), mp_context=ctx, initializer=_setJacobianCall, initargs=((f, op, arg_number, f_args),)) as executor:
+            futures = [executor.submit(_evaluatePerturbationBlock, DV[I]) for I in blocks]
+            F = [fj for fut in futures for fj in fut.result()]
+    else:
+        F = [_evaluatePerturbation(f, op, arg_number, f_args, dv) for dv in DV]
+    return np.array(F).reshape(nEval, -1)
 
 
 def linearize_function(F, xop, Iargs, delta_args,  *p):
@@ -90,6 +90,111 @@ def integrate(t_eval, q0, A, B, fU, method='LSODA', **options):
     return res
 
 
+def discretize(A, B, dt, method='zoh'):
+    """
+    Exact discretization of a LTI state space system for a given time step, assuming
+    piecewise constant inputs (zoh, zero order hold) or piecewise linear inputs (foh, first order hold)
+
+       zoh:  x_{k+1} = Phi x_k + Gamma u_k
+       foh:  x_{k+1} = Phi x_k + Gamma u_k + Gamma1 (u_{k+1}-u_k)
+
+    The matrices are obtained with one matrix exponential of an augmented matrix, see e.g.
+       Franklin, Powell, Workman - Digital control of dynamic systems, section 6.3
+
+    INPUTS:
+     - A: state matrix (nStates x nStates)
+     - B: input matrix (nStates x nInputs)
+     - dt: time step
+     - method: 'zoh' or 'foh'
+    OUTPUTS:
+     - Phi   : discrete state matrix (nStates x nStates),  Phi = exp(A dt)
+     - Gamma : discrete input matrix (nStates x nInputs)
+     - Gamma1: discrete input matrix for the input increments (nStates x nInputs), only for 'foh'
+    """
+    A = np.asarray(A)
+    B = np.asarray(B).reshape(A.shape[0], -1)
+    nx, nu = B.shape
+    method = method.lower()
+    if method=='zoh':
+        M = np.zeros((nx+nu, nx+nu))
+        M[:nx,:nx] = A*dt
+        M[:nx,nx:] = B*dt
+        E = expm(M)
+        return E[:nx,:nx], E[:nx,nx:]
+    elif method=='foh':
+        M = np.zeros((nx+2*nu, nx+2*nu))
+        M[:nx,:nx]          = A*dt
+        M[:nx,nx:nx+nu]     = B*dt
+        M[nx:nx+nu,nx+nu:]  = np.eye(nu)
+        E = expm(M)
+        return E[:nx,:nx], E[:nx,nx:nx+nu], E[:nx,nx+nu:]
+    else:
+        raise NotImplementedError('Discretization method {}'.format(method))
+
+
+def integrate_discrete(time, q0, A, B, U, method='foh'):
+    """
+    Perform time integration of a LTI state space system using its exact discretization.
+    The discrete matrices are computed once, the recursion is then a matrix product per time step.
+    Several input cases can be integrated at once.
+
+    INPUTS:
+     - time: array of regular time values (nt)
+     - q0: initial states, array of length nStates, or, array nCases x nStates
+     - A: state matrix (nStates x nStates)
+     - B: input matrix (nStates x nInputs)
+     - U: inputs at each time step, array nInputs x nt, or, array nCases x nInputs x nt
+     - method: 'zoh': inputs are constant over a time step
+               'foh': inputs are linear over a time step (exact for linearly interpolated inputs)
+    OUTPUTS:
+     - x: states, array nStates x nt, or, array nCases x nStates x nt
+
+    """
+    time = np.asarray(time)
+    A    = np.asarray(A)
+    B    = np.asarray(B).reshape(A.shape[0], -1)
+    nx, nu = B.shape
+    nt   = len(time)
+    U    = np.asarray(U, dtype=float)
+    q0   = np.asarray(q0, dtype=float)
+    bCases = U.ndim==3 or q0.ndim==2
+    # --- Inputs and initial conditions as nCases x ... arrays
+    if U.ndim<=2:
+        U = U.reshape(1, nu, nt)
+    if q0.ndim==1:
+        q0 = q0.reshape(1, nx)
+    nCases = max(U.shape[0], q0.shape[0])
+    U  = np.broadcast_to(U,  (nCases, nu, nt))
+    q0 = np.broadcast_to(q0, (nCases, nx))
+    if U.shape[2]!=nt:
+        raise Exception('Last dimension of inputs ({}) does not match number of time steps ({})'.format(U.shape[2], nt))
+
+    x = np.zeros((nt, nx, nCases))
+    x[0] = q0.T
+    if nt>1:
+        dt = np.diff(time)
+        if np.max(np.abs(dt-dt[0]))>1e-6*abs(dt[0]):
+            raise Exception('Discrete integration requires regular time steps')
+        dt = dt[0]
+        # --- Forcing term for all time steps:  W_k = Gamma u_k (+ Gamma1 (u_{k+1}-u_k))
+        UT = np.transpose(U, (2,1,0)) # nt x nu x nCases
+        if method.lower()=='zoh':
+            Phi, Gamma = discretize(A, B, dt, method='zoh')
+            W = np.matmul(Gamma, UT[:-1])
+        else:
+            Phi, Gamma, Gamma1 = discretize(A, B, dt, method=method)
+            W = np.matmul(Gamma-Gamma1, UT[:-1]) + np.matmul(Gamma1, UT[1:])
+        # --- Recursion
+        xk = x[0]
+        for k in range(nt-1):
+            xk = Phi.dot(xk) + W[k]
+            x[k+1] = xk
+    x = np.transpose(x, (2,1,0)) # nCases x nx x nt
+    if bCases:
+        return x
+    return x[0]
+
+
 def integrate_convolution(time, A, B, fU=None, C=None, U=None):
     """ 
     Perform time integration of a LTI state space system using convolution method
@@ -144,12 +249,23 @@ def impulse_response_matrix(time, A, B, C=None, outputBoth=False):
     Return the impulse response matrix for all time steps defined by `time`
         H_x(t) =   exp(At) B   array of shape nx x nu x nt
         H_y(t) = C exp(At) B   array of shape ny x nu x nt
-        see e.g. 
+        see e.g.
            Friedland p 76
+    For regular time steps, exp(A t_{k+1}) = exp(A dt) exp(A t_k), a single matrix exponential is needed.
     """
+    time = np.asarray(time)
     H_x = np.zeros((A.shape[0], B.shape[1], len(time)))
-    for it, t in enumerate(time):
-        H_x[:,:, it] = expm(A*t).dot(B)
+    dt = np.diff(time)
+    if len(dt)>0 and np.max(np.abs(dt-dt[0]))<=1e-6*abs(dt[0]):
+        Phi = expm(A*dt[0])
+        H = expm(A*time[0]).dot(B)
+        H_x[:,:,0] = H
+        for it in range(1, len(time)):
+            H = Phi.dot(H)
+            H_x[:,:, it] = H
+    else:
+        for it, t in enumerate(time):
+            H_x[:,:, it] = expm(A*t).dot(B)
 
     if outputBoth:
         raise NotImplementedError()
@@ -160,6 +276,80 @@ def impulse_response_matrix(time, A, B, C=None, outputBoth=False):
     else:
         return H_x
 
+
+def transfer_function(s, A, B, C, D=None, method='auto', nMax=2**22, condMax=1e8):
+    """
+    Evaluate the transfer function of a LTI state space system for complex variables s
+
+        H(s) = C [sI-A]^-1 B + D
+
+    A is reduced once, the evaluation is then vectorized over all values of s:
+      - 'eig'  : A = V diag(lambda) V^-1,  H(s) = (C V) diag(1/(s-lambda)) (V^-1 B) + D
+      - 'schur': A = Z T Z^H (T upper triangular), back substitution on (sI-T) for all s at once
+                 (robust, for non-diagonalizable A)
+      - 'auto' : 'eig', or 'schur' if the condition number of the eigenvectors is above `condMax`
+      - 'solve': one dense solve per value of s (reference)
+    Only the rows of C and columns of B provided are computed, so a subset of outputs/inputs
+    can be obtained by providing C[I,:] and B[:,J].
+
+    INPUTS:
+     - s: array of complex variables (ns), e.g. s=1j*omega
+     - A: state matrix (nx x nx)
+     - B: input matrix (nx x nu)
+     - C: output matrix (ny x nx)
+     - D: feedthrough matrix (ny x nu), or None
+     - nMax: maximum number of elements of the temporary arrays, the frequencies are processed by chunks
+    OUTPUTS:
+     - H: array ny x nu x ns
+    """
+    s = np.atleast_1d(np.asarray(s)).ravel().astype(np.complex128)
+    A = np.asarray(A)
+    B = np.asarray(B).reshape(A.shape[0], -1)
+    C = np.asarray(C).reshape(-1, A.shape[0])
+    nx, nu = B.shape
+    ny = C.shape[0]
+    ns = len(s)
+    H = np.zeros((ny, nu, ns), dtype=np.complex128)
+    method = method.lower()
+
+    if method in ['auto', 'eig']:
+        lambd, V = np.linalg.eig(A)
+        if method=='auto' and np.linalg.cond(V)>condMax:
+            method = 'schur'
+        else:
+            CV = C.dot(V)                        # ny x nx
+            VB = solve(V, B)                     # nx x nu
+            P  = (CV[:,None,:]*VB.T[None,:,:]).reshape(ny*nu, nx)
+            nChunk = max(1, int(nMax/max(nx,1)))
+            for k0 in range(0, ns, nChunk):
+                sk = s[k0:k0+nChunk]
+                G = 1/(sk[None,:]-lambd[:,None]) # nx x nChunk
+                H[:,:,k0:k0+nChunk] = P.dot(G).reshape(ny, nu, -1)
+    if method=='schur':
+        from scipy.linalg import schur
+        T, Z = schur(A.astype(np.complex128), output='complex')
+        CZ = C.dot(Z)                            # ny x nx
+        ZB = Z.conj().T.dot(B)                   # nx x nu
+        dT = np.diag(T)
+        nChunk = max(1, int(nMax/max(nx*nu,1)))
+        for k0 in range(0, ns, nChunk):
+            sk = s[k0:k0+nChunk]
+            # Back substitution:  (s-T_ii) X_i = ZB_i + sum_{j>i} T_ij X_j
+            X = np.zeros((nx, nu, len(sk)), dtype=np.complex128)
+            for i in range(nx-1, -1, -1):
+                r = ZB[i][:,None] + np.tensordot(T[i,i+1:], X[i+1:], axes=1)
+                X[i] = r/(sk[None,:]-dT[i])
+            H[:,:,k0:k0+nChunk] = np.tensordot(CZ, X, axes=1)
+    elif method=='solve':
+        I = np.eye(nx)
+        for k,sk in enumerate(s):
+            H[:,:,k] = np.dot(C, solve(sk*I - A, B))
+    elif method not in ['auto', 'eig']:
+        raise NotImplementedError('Transfer function method {}'.format(method))
+    if D is not None:
+        H += np.asarray(D).reshape(ny, nu)[:,:,None]
+    return H
+
 # --------------------------------------------------------------------------------}
 # --- Linear State Space system
 # --------------------------------------------------------------------------------{
@@ -351,6 +541,20 @@ class LinearStateSpace(StateSpace):
     # See statespace.py
     #def Inputs(self, t, q=None, qd=None):
 
+    def calc_input_array(self, time):
+        """ Return the inputs as an array nInputs x nt at the given time steps, inputs cannot depend on the states """
+        time = np.asarray(time)
+        if self._inputs_ts is not None and len(time)==len(self._time_ts) and np.allclose(time, self._time_ts):
+            return self._inputs_ts
+        if self.nInputs==0:
+            return np.zeros((0, len(time)))
+        if not self.uDependsOnTOnly():
+            raise Exception('Inputs depending on the states cannot be evaluated as a time series, use an ODE integration method.')
+        U = np.zeros((self.nInputs, len(time)))
+        for it, t in enumerate(time):
+            U[:,it] = self.Inputs(t)
+        return U
+
     # --------------------------------------------------------------------------------}
     # --- State equation
     # --------------------------------------------------------------------------------{
@@ -383,6 +587,13 @@ class LinearStateSpace(StateSpace):
     # --- Time integration 
     # --------------------------------------------------------------------------------{
     def integrate(self, t_eval, method='RK45', y0=None, u=None, calc='', xoffset=None, uoffset=None, yoffset=None, **options):
+        """
+        Perform time integration of the system
+         - method: 'zoh', 'foh': exact discrete time integration (see integrate_discrete),
+                                 t_eval needs to be regular, inputs cannot depend on the states
+                   'impulse'   : convolution with the impulse response
+                   otherwise   : method of solve_ivp (e.g. 'RK45', 'LSODA')
+        """
         #dfLI = sysLI.res2DataFrame(self.channels, self.FASTDOFScales, q0=qop, xd0=qdop, acc=acc, forcing=forcing, sAcc=self.acc_channels)
         #
         if y0 is not None:
@@ -414,6 +625,12 @@ class LinearStateSpace(StateSpace):
 
             res = OdeResultsClass(t=t_eval, y=x) # To mimic result class of solve_ivp
 
+        elif method.lower() in ['zoh', 'foh']:
+            if len(options)>0:
+                raise Exception('Solver options ({}) are not supported by the discrete integration method {}'.format(', '.join(options.keys()), method))
+            x = integrate_discrete(t_eval, self.q0_, self.A, self.B, self.calc_input_array(t_eval), method=method)
+            res = OdeResultsClass(t=t_eval, y=x) # To mimic result class of solve_ivp
+
         else:
             res = integrate(t_eval, self.q0_, self.A, self.B, self.Inputs, method=method, **options)
 
@@ -488,9 +705,8 @@ class LinearStateSpace(StateSpace):
         # --- Calc impuse response matrix
         if self.verbose:
             print('Calc impulse response...')
-        for i,t in enumerate(time):
-            H = expm(self.A*t).dot(self.B) # nx x nu
-            data[i,:] = H.flatten()
+        H = impulse_response_matrix(time, self.A, self.B) # nx x nu x nt
+        data[:,:] = H.reshape(nx*nu, -1).T
 
         df = pd.DataFrame(data=data, columns=cols)
 
@@ -502,32 +718,37 @@ class LinearStateSpace(StateSpace):
     # --------------------------------------------------------------------------------}
     # --- Frequency domain and transfer function
     # --------------------------------------------------------------------------------{
-    def transferFunction(self, s):
+    def transferFunction(self, s, method='auto', outputs=None, inputs=None, **kwargs):
         """Evaluate the systems's transfer function for a complex variable
 
         H(s) = C [sI-A]^-1 B + D
 
         Returns a matrix of values evaluated at complex variable s.
+        For an array of s, A is reduced once and the evaluation is vectorized, see `transfer_function`.
 
-        A more efficient function may be found in TB05Ad from Slycot
-        from slycot import tb05ad
-        see control.statesp.horner
+        INPUTS:
+         - s: complex scalar, or array of complex values (ns)
+         - method: 'auto', 'eig', 'schur' or 'solve', see `transfer_function`
+         - outputs: list of output names or indices to compute (default: all)
+         - inputs : list of input names or indices to compute (default: all)
+        OUTPUTS:
+         - H: array (ny x nu) for a scalar s, or, array (ny x nu x ns)
         """
-        if hasattr(s, '__len__'):
-            nu = self.nInputs
-            ny = self.nOutputs
-            ns = len(s)
-            H = np.empty((ny, nu, ns), dtype=np.complex128)
-            # Loop on frequencies
-            for k,sk in enumerate(s.ravel()):
-                H[:,:,k] =np.dot(self.C, solve(sk* np.eye(self.nStates) - self.A, self.B)) + self.D
-            #H = np.array([np.dot(self.C, solve(sk* np.eye(self.nStates) - self.A, self.B)) + self.D  for sk in s.ravel()])
-            #H=H.reshape([ny,nu]+list(s.shape))
-        else:
-            H =           np.dot(self.C, solve(s * np.eye(self.nStates) - self.A, self.B)) + self.D
-
+        I = self._channelIndices(outputs, self.sY, self.nOutputs)
+        J = self._channelIndices(inputs , self.sU, self.nInputs)
+        H = transfer_function(s, self.A, self.B[:,J], self.C[I,:], self.D[np.ix_(I,J)], method=method, **kwargs)
+        if not hasattr(s, '__len__'):
+            H = H[:,:,0]
         return H
 
+    @staticmethod
+    def _channelIndices(channels, names, n):
+        """ Indices of a list of channels given by names or indices """
+        if channels is None:
+            return np.arange(n)
+        names = list(names) if names is not None else []
+        return np.array([names.index(c) if isinstance(c, str) else c for c in channels], dtype=int)
+
 
     def frequency_response(self, omega, deg=False, method='transferFunction', **kwargs):
         """Evaluate the system's transfer function at a list of frequencies
@@ -545,6 +766,9 @@ class LinearStateSpace(StateSpace):
         omega : array_like
             A list of frequencies in radians/sec at which the system should be
             evaluated. The list can be either a python list or a numpy array
+        method : 'transferFunction' (or 'auto', 'eig', 'schur', 'solve', see `transfer_function`),
+            or 'numerical' (time integrations)
+        kwargs : for the transfer function: `outputs` and `inputs` subsets, see transferFunction
 
         Returns
         -------
@@ -564,9 +788,9 @@ class LinearStateSpace(StateSpace):
         #    if max(np.abs(omega)) * dt > math.pi:
         #        warn("freqresp: frequency evaluation above Nyquist frequency")
         #else:
-        if method=='transferFunction':
+        if method in ['transferFunction', 'auto', 'eig', 'schur', 'solve']:
             s = omega * 1.j
-            H = self.transferFunction(s)
+            H = self.transferFunction(s, method='auto' if method=='transferFunction' else method, **kwargs)
             if deg:
                 return np.abs(H), np.angle(H)*180/np.pi
             else:
@@ -89,6 +89,27 @@ class Test(unittest.TestCase):
         A0 = linearize_Fx(F, x0, dx)
         np.testing.assert_almost_equal(A,A0, 4)
 
+    def test_sparse_jacobian(self):
+        # Banded function, jacobian with sparsity pattern and column coloring
+        n = 20
+        def F(x, p):
+            y = p*x**2
+            y[1:]  += np.sin(x[:-1])
+            y[:-1] += x[1:]**3
+            return y
+        x0 = np.linspace(0.1, 1, n)
+        dx = [1e-4]*n
+        J_ref = numerical_jacobian(F, (x0,), 0, dx, 2.)
+        S = jacobian_sparsity(F, (x0,), 0, dx, 2.)
+        np.testing.assert_equal(S, np.abs(J_ref)>0)
+        colors = column_coloring(S)
+        self.assertEqual(colors.max()+1, 3)
+        J = numerical_jacobian(F, (x0,), 0, dx, 2., sparsity=S)
+        np.testing.assert_allclose(J, J_ref, rtol=1e-10, atol=1e-12)
+        # Evaluations on a pool of processes
+        J = numerical_jacobian(F, (x0,), 0, dx, 2., sparsity=S, nProcs=2)
+        np.testing.assert_allclose(J, J_ref, rtol=1e-10, atol=1e-12)
+
 
 
 
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from scipy.linalg import expm
+from welib.system.statespacelinear import *
+
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class Test(unittest.TestCase):
+    def get_LTI(self, nx=4, nu=2):
+        np.random.seed(0)
+        A = np.random.normal(0, 1, (nx, nx)) - 4*np.eye(nx)
+        B = np.random.normal(0, 1, (nx, nu))
+        return A, B
+
+    def test_discrete_vs_ode(self):
+        # Discrete integration with linearly interpolated inputs vs ODE integration
+        A, B = self.get_LTI()
+        time = np.linspace(0, 5, 501)
+        U    = np.array([np.sin(2*time), np.cos(3*time)**2])
+        q0   = np.array([1, 0, -1, 0.5])
+        sys = LinearStateSpace(A, B)
+        sys.setStateInitialConditions(q0)
+        sys.setInputTimeSeries(time, U)
+        res_ref, _ = sys.integrate(time, method='LSODA', rtol=1e-10, atol=1e-12)
+        res_foh, _ = sys.integrate(time, method='foh')
+        res_zoh, _ = sys.integrate(time, method='zoh')
+        np.testing.assert_allclose(res_foh.y, res_ref.y, atol=1e-4)
+        np.testing.assert_allclose(res_zoh.y, res_ref.y, atol=5e-2)
+        # FOH is exact for piecewise linear inputs, more accurate than ZOH
+        self.assertTrue(np.abs(res_foh.y-res_ref.y).max() < np.abs(res_zoh.y-res_ref.y).max()/10)
+        # Solver options are not used by discrete methods
+        with self.assertRaises(Exception):
+            sys.integrate(time, method='foh', rtol=1e-10)
+        # Inputs as a function of time, inputs depending on the states cannot be tabulated
+        sys.setInputFunction(lambda t: 2*np.array([np.sin(2*t), np.cos(3*t)**2]), signature_u='t')
+        np.testing.assert_allclose(sys.calc_input_array(time), 2*U)
+        sys.setInputFunction(lambda t, q: -q[:2], signature_u='t,q')
+        with self.assertRaises(Exception):
+            sys.calc_input_array(time)
+
+    def test_discrete_cases(self):
+        # Several input cases at once
+        A, B = self.get_LTI()
+        time = np.linspace(0, 2, 101)
+        np.random.seed(1)
+        U  = np.random.normal(0, 1, (3, 2, len(time)))
+        q0 = np.zeros(4)
+        X = integrate_discrete(time, q0, A, B, U, method='zoh')
+        self.assertEqual(X.shape, (3, 4, len(time)))
+        for i in range(3):
+            x = integrate_discrete(time, q0, A, B, U[i], method='zoh')
+            np.testing.assert_allclose(X[i], x, rtol=1e-12, atol=1e-14)
+        # ZOH recursion
+        Phi, Gamma = discretize(A, B, time[1]-time[0], method='zoh')
+        np.testing.assert_allclose(X[0][:,1], Gamma.dot(U[0][:,0]), rtol=1e-12)
+
+    def test_impulse_response(self):
+        A, B = self.get_LTI()
+        time = np.linspace(0.5, 3, 26)
+        H = impulse_response_matrix(time, A, B)
+        for it in [0, 10, 25]:
+            np.testing.assert_allclose(H[:,:,it], expm(A*time[it]).dot(B), rtol=1e-10, atol=1e-14)
+
+    def test_transfer_function(self):
+        # Reduced evaluations vs dense solve, on a diagonalizable and a defective matrix
+        A, B = self.get_LTI()
+        C = np.random.normal(0, 1, (3, 4))
+        D = np.random.normal(0, 1, (3, 2))
+        s = 1j*np.linspace(0, 10, 50)
+        H_ref = transfer_function(s, A, B, C, D, method='solve')
+        for method in ['eig', 'schur', 'auto']:
+            H = transfer_function(s, A, B, C, D, method=method, nMax=100)
+            np.testing.assert_allclose(H, H_ref, rtol=1e-10, atol=1e-12)
+        A = np.array([[-1, 1, 0], [0, -1, 1], [0, 0, -1.]]) # Jordan block
+        B = np.array([[0],[0],[1]])
+        H = transfer_function(s, A, B, np.eye(3), method='auto')
+        np.testing.assert_allclose(H[0,0,:], 1/(s+1)**3, rtol=1e-12)
+        # Subset of outputs and inputs
+        sys = LinearStateSpace(A, B, np.eye(3), sY=['y1','y2','y3'])
+        H = sys.transferFunction(s, outputs=['y3', 1])
+        np.testing.assert_allclose(H[0,0,:], 1/(s+1), rtol=1e-12)
+        np.testing.assert_allclose(H[1,0,:], 1/(s+1)**2, rtol=1e-12)
+        self.assertEqual(sys.transferFunction(1j).shape, (3,1))
+
+
+if __name__=='__main__':
+    unittest.main()
@@ -89,10 +89,8 @@ def eig(K, M=None, freq_out=False, sort=True, normQ=None, discardIm=False, massS
         # TODO, this can be made smarter
         # TODO this should be a normQ
         if massScaling:
-            for j in range(M.shape[1]):
-                q_j = Q[:,j]
-                modalmass_j = np.dot(q_j.T,M).dot(q_j)
-                Q[:,j]= Q[:,j]/np.sqrt(modalmass_j)
+            modalmass = np.sum(Q*M.dot(Q), axis=0)
+            Q = Q/np.sqrt(modalmass)
         Lambda=np.dot(Q.T,K).dot(Q)
     else:
         D,Q = linalg.eig(K)
@@ -111,11 +109,7 @@ def eig(K, M=None, freq_out=False, sort=True, normQ=None, discardIm=False, massS
 
     # --- Renormalize modes if users wants to
     if normQ == 'byMax':
-        for j in range(Q.shape[1]):
-            q_j = Q[:,j]
-            iMax = np.argmax(np.abs(q_j))
-            scale = q_j[iMax] # not using abs to normalize to "1" and not "+/-1"
-            Q[:,j]= Q[:,j]/scale
+        Q = normalizeByMax(Q)
 
     # --- Sanitization, ensure real values
     if discardIm:
@@ -131,6 +125,55 @@ def eig(K, M=None, freq_out=False, sort=True, normQ=None, discardIm=False, massS
     return Q,Lambda
 
 
+def eigsh(K, M, nModes=10, sigma=-0.1, freq_out=False, normQ=None, massScaling=True):
+    """ 
+    Lowest eigenvalues and eigenvectors of the symmetric generalized problem K.q = lambda M.q
+    using the shift-invert mode of ARPACK (scipy.sparse.linalg.eigsh).
+    Suitable for large sparse matrices when only the first modes are needed.
+    Returns the same values as `eig`, restricted to the `nModes` lowest modes.
+
+    INPUTS:
+     - K, M  : stiffness and mass matrices, dense arrays or scipy.sparse matrices
+     - nModes: number of modes returned
+     - sigma : shift [rad^2/s^2], eigenvalues closest to sigma are returned.
+               A small negative value is used so that K-sigma M can be factorized
+               even when K is singular (free-free structures)
+    OUTPUTS:
+     - Q     : matrix of column eigenvectors (nDOF x nModes)
+     - Lambda: diagonal matrix of eigenvalues, or frequencies [Hz] if freq_out is True
+    """
+    from scipy.sparse import issparse, csc_matrix
+    from scipy.sparse.linalg import eigsh as sp_eigsh
+    n = K.shape[0]
+    nModes = min(nModes, n-1) # ARPACK requirement
+    if issparse(K):
+        K = csc_matrix(K)
+        M = csc_matrix(M)
+    D, Q = sp_eigsh(K, k=nModes, M=M, sigma=sigma, which='LM')
+    # --- Sort
+    I = np.argsort(D)
+    D = D[I]
+    Q = Q[:,I]
+    # --- Mass normalization (ARPACK already returns M-orthonormal vectors, enforcing it)
+    if massScaling:
+        modalmass = np.sum(Q*M.dot(Q), axis=0)
+        Q = Q/np.sqrt(modalmass)
+    if freq_out:
+        Lambda = np.sqrt(np.maximum(D, 0))/(2*np.pi) # frequencies [Hz], spurious negative values set to 0
+    else:
+        Lambda = np.diag(D)
+    if normQ == 'byMax':
+        Q = normalizeByMax(Q)
+    return Q, Lambda
+
+
+def normalizeByMax(Q):
+    """ Normalize column vectors such that their maximum absolute component is 1 (keeping its sign)"""
+    iMax  = np.argmax(np.abs(Q), axis=0)
+    scale = Q[iMax, np.arange(Q.shape[1])] # not using abs to normalize to "1" and not "+/-1"
+    return Q/scale
+
+
 def eigA(A, nq=None, nq1=None, fullEV=False, normQ=None, sort=True):
     """
     Perform eigenvalue analysis on a "state" matrix A
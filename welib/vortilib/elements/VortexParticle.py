@@ -53,12 +53,61 @@ def vp_u(CPs, Pv, Alpha, RegFunction=0, RegParam=0):
     OUTPUTS:
         u: (n x 3) velocity, shape of Xcp
     """
-    u = np.zeros(CPs.shape)
-    # TODO perform numpy vectorization
-    for i,CP in enumerate(CPs):
-        u[i,:] = vp_u_raw(CP, Pv, Alpha, RegFunction, RegParam)
+    CPs = np.asarray(CPs)
+    return vps_u(CPs, Pv, Alpha, RegFunction=RegFunction, RegParam=RegParam).reshape(CPs.shape)
+
+
+def vps_u(CPs, Pv, Alpha, RegFunction=0, RegParam=0, nPairsMax=2**18):
+    """ Induced velocity from nP vortex particles on nCP control points, direct summation.
+    Vectorized version of vp_u_raw, the nCP x nP interactions are evaluated by tiles of
+    at most nPairsMax pairs to bound memory.
+
+    CPs   : nCP x 3
+    Pv    : nP x 3 Position of vortex particles
+    Alpha : nP x 3 Intensity of vortex particles
+    RegParam: scalar or (nP) regularization parameter
+
+    OUTPUTS:
+        u: (nCP x 3) velocity
+    """
+    CPs   = np.asarray(CPs, dtype=float).reshape(-1,3)
+    Pv    = np.asarray(Pv, dtype=float).reshape(-1,3)
+    Alpha = np.asarray(Alpha, dtype=float).reshape(-1,3)
+    RegParam = np.broadcast_to(np.asarray(RegParam, dtype=float), (Pv.shape[0],))
+    if RegFunction not in [0,1,2]:
+        raise Exception('Wrong regularization function for particles {}'.format(RegFunction))
+    nCP, nP = CPs.shape[0], Pv.shape[0]
+    u = np.zeros((nCP,3))
+    if nCP==0 or nP==0:
+        return u
+    nPTile  = min(nP, nPairsMax)
+    nCPTile = max(1, nPairsMax//nPTile)
+    for i in range(0, nCP, nCPTile):
+        for j in range(0, nP, nPTile):
+            u[i:i+nCPTile] += _vps_u_tile(CPs[i:i+nCPTile], Pv[j:j+nPTile], Alpha[j:j+nPTile], RegFunction, RegParam[j:j+nPTile])
     return u
 
+
+def _vps_u_tile(CPs, Pv, Alpha, RegFunction, RegParam):
+    """ Induced velocity from nP particles on nCP points, using (nCP x nP) broadcasting, see vps_u """
+    fourpi_inv=1/(4*np.pi)
+    DP = CPs[:,None,:] - Pv[None,:,:]
+    rDeltaP = np.sqrt(DP[:,:,0]**2 + DP[:,:,1]**2 + DP[:,:,2]**2) # norm
+    bSing = rDeltaP<__MINNORM # Exactly on the Singularity
+    rDeltaP[bSing] = 1.0
+    if RegFunction==0:# No mollification
+        ScalarPart = fourpi_inv/(rDeltaP**3)
+    elif RegFunction==1: # Exponential mollifier
+        E          = np.exp(-rDeltaP**3/RegParam**3)
+        ScalarPart = (1.-E)/(rDeltaP**3)*fourpi_inv
+    elif RegFunction==2: # Compact support
+        ScalarPart = fourpi_inv/np.sqrt(RegParam**6+rDeltaP**6)
+    ScalarPart[bSing] = 0.0
+    Cx = Alpha[None,:,1] * DP[:,:,2] - Alpha[None,:,2] * DP[:,:,1]
+    Cy = Alpha[None,:,2] * DP[:,:,0] - Alpha[None,:,0] * DP[:,:,2]
+    Cz = Alpha[None,:,0] * DP[:,:,1] - Alpha[None,:,1] * DP[:,:,0]
+    return np.column_stack(((Cx*ScalarPart).sum(axis=1), (Cy*ScalarPart).sum(axis=1), (Cz*ScalarPart).sum(axis=1)))
+
 # --------------------------------------------------------------------------------}
 # --- TESTS
 # --------------------------------------------------------------------------------{
@@ -77,6 +126,21 @@ class TestVortexParticles(unittest.TestCase):
         U  = vp_u_raw(PPart, PPart, Alpha, RegFunction = 2, RegParam = 0)
         np.testing.assert_equal(U.ravel(), np.zeros(3))
 
+    def test_VP_vectorized(self):
+        # --- Several particles on several points, vectorized vs loop on vp_u_raw
+        np.random.seed(5)
+        Pv    = np.random.uniform(-1,1,(20,3))
+        Alpha = np.random.uniform(-1,1,(20,3))
+        CPs   = np.random.uniform(-1,1,(30,3))
+        CPs[0] = Pv[3]
+        for RegFunction in [0,1,2]:
+            u_ref = np.zeros(CPs.shape)
+            for i,CP in enumerate(CPs):
+                for P,A in zip(Pv,Alpha):
+                    u_ref[i] += vp_u_raw(CP, P, A, RegFunction, 0.2)
+            u = vps_u(CPs, Pv, Alpha, RegFunction=RegFunction, RegParam=0.2, nPairsMax=7)
+            np.testing.assert_allclose(u, u_ref, rtol=1e-12, atol=1e-14)
+
 if __name__ == "__main__":
     unittest.main()
 
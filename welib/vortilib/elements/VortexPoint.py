@@ -4,6 +4,7 @@ For 3D see VortexParticles
 
 """
 import numpy as np
+import unittest
 
 
 def vp_u(CP,Pv,Gamma=1,rcore=0,bViscous=False): 
@@ -24,7 +25,7 @@ def vp_u(CP,Pv,Gamma=1,rcore=0,bViscous=False):
     return U,V
 
 
-def vps_u(CP,XV,Gammas,SmoothModel=0,KernelOrder=2,SmoothParam=None):
+def vps_u(CP,XV,Gammas,SmoothModel=0,KernelOrder=2,SmoothParam=None,nPairsMax=2**18):
     """
     low level interface, for N (2D?) point Vortices
 
@@ -34,29 +35,31 @@ def vps_u(CP,XV,Gammas,SmoothModel=0,KernelOrder=2,SmoothParam=None):
 # XV: location of point vortex
 
     [Ui]= fUi_PointVortex2DN([1 0],[0 0],2*np.pi,[],0),[Ui]= fUi_PointVortex2DN([0 1],[0 0],2*np.pi,[],0)
+
+    Gammas     : (nv) intensities
+    SmoothParam: scalar or (nv) smoothing parameter of each vortex
+    nPairsMax  : maximum number of control point/vortex pairs evaluated at once
     """
 
+    CP     = np.asarray(CP)
+    XV     = np.asarray(XV)
     ncp    = CP.shape[0]
     nv     = XV.shape[0]
     ndim   = XV.shape[1]
-    ndimCP = XV.shape[1]
+    ndimCP = CP.shape[1]
     if ndim != ndimCP:
         raise Exception('Your control points and vortex point do not have the same dimension.')
+    if ndim != 2:
+        raise NotImplementedError()
+    Gammas = np.broadcast_to(np.asarray(Gammas, dtype=float).ravel(), (nv,))
     if SmoothParam is not None:
-        if not hasattr(SmoothParam,'__len__'):
-            SmoothParam=np.ones(CP.shape[0])*SmoothParam
-
-
-
-    Ui = np.zeros((ncp,ndim))
+        SmoothParam = np.broadcast_to(np.asarray(SmoothParam, dtype=float).ravel(), (nv,))
 
     # ---Setting up Kernel/smooth param and Exp functions for Smooth model
     if SmoothModel==0:
         fKernel = None
         fE      = None
-        frho2   = None
     elif SmoothModel==1:
-        frho2 = lambda r2, iv: r2/ SmoothParam[iv]**2
         fE = lambda rho2 : np.exp(- rho2)
         if KernelOrder==2:
             fKernel = lambda rho2 :  1
@@ -66,10 +69,11 @@ def vps_u(CP,XV,Gammas,SmoothModel=0,KernelOrder=2,SmoothParam=None):
             fKernel = lambda rho2 :  1 - 2 * rho2 + rho2 ** 2 / 2
         elif KernelOrder==8:
             fKernel = lambda rho2 : 1 - 3 * rho2 + 3 * rho2 ** 2 / 2 - rho2 ** 3 / 6
+        elif KernelOrder==0:
+            fKernel = None
         else:
             raise Exception('fKernel order not implemented for Majda model')
     elif SmoothModel==2:
-        frho2 = lambda r2, iv: r2/ SmoothParam[iv]**2
         fE = lambda rho2 : np.exp(- rho2/2) # NOTE divided by 2
         if KernelOrder==2:
             fKernel = lambda rho2 :  1
@@ -82,41 +86,67 @@ def vps_u(CP,XV,Gammas,SmoothModel=0,KernelOrder=2,SmoothParam=None):
             fKernel = lambda rho2 : 1 - 3 / 2 * rho2 + 3 / 8 * rho2 ** 2 - 1 / 48 * rho2 ** 3
         elif KernelOrder==10:
             fKernel = lambda rho2 : 1 - 2 * rho2 + 3 / 4 * rho2 ** 2 - 1 / 12 * rho2 ** 3 + 1 / 384 * rho2 ** 4
+        elif KernelOrder==0:
+            fKernel = None
         else:
             raise Exception('Kernel order not implemented for Gaussian2')
     else:
         raise Exception('Unknown smooth model')
 
-
-    # loop on control point
-    if ndim==2:
-        for icp in np.arange(ncp):
-            x0 = CP[icp,:]
-            # Loop on vortex
-            for iv in np.arange(nv):
-                xv = XV[iv,:]
-                X0XV = x0 - xv
-                r2 = X0XV[0] * X0XV[0] + X0XV[1] * X0XV[1]
-                if r2 < 1e-15:
-                    # We escape No matter the smooth model and order
-                    pass
-                else:
-                    t = np.array([-X0XV[1],X0XV[0]])
-                    ## Viscous Model
-                    if (SmoothModel == 0 or KernelOrder == 0):
-                        Ui[icp,:] = Ui[icp,:] + Gammas[iv] / (2 * np.pi) * t / r2
-                    else:
-                        Qm = 0
-                        if SmoothModel==0:
-                            Ui[icp,:] = Ui[icp,:] + Gammas[iv] / (2 * np.pi) * t / r2
-                        else:
-                            # Smooth model 1 or 2
-                            rho2 = frho2(r2,iv)
-                            E    = fE(rho2)
-                            Qm   = fKernel(rho2)
-                            Ui[icp,:] = Ui[icp,:] + Gammas[iv]/(2*np.pi)*t*(1-Qm*E)/r2
-    else:
-        raise NotImplementedError()
-    # fprintf('\n');
-    
+    # --- Blocks of control points x vortices, to bound memory
+    Ui = np.zeros((ncp,ndim))
+    if ncp==0 or nv==0:
+        return Ui
+    nvTile  = min(nv, nPairsMax)
+    ncpTile = max(1, nPairsMax//nvTile)
+    for i0 in range(0, ncp, ncpTile):
+        for j0 in range(0, nv, nvTile):
+            I = slice(i0, i0+ncpTile)
+            J = slice(j0, j0+nvTile)
+            DX = CP[I,0][:,None] - XV[J,0][None,:]
+            DY = CP[I,1][:,None] - XV[J,1][None,:]
+            r2 = DX * DX + DY * DY
+            # We escape No matter the smooth model and order
+            bSing = r2 < 1e-15
+            r2[bSing] = 1
+            if fKernel is None:
+                K = Gammas[J] / (2 * np.pi) / r2
+            else:
+                # Smooth model 1 or 2
+                rho2 = r2 / SmoothParam[J]**2
+                K = Gammas[J] / (2*np.pi) * (1 - fKernel(rho2) * fE(rho2)) / r2
+            K[bSing] = 0
+            Ui[I,0] += np.sum(-DY * K, axis=1)
+            Ui[I,1] += np.sum( DX * K, axis=1)
     return Ui
+
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class TestVortexPoint(unittest.TestCase):
+    def test_vps_vs_vp(self):
+        # Sum of point vortices, compared to a loop on vp_u
+        np.random.seed(1)
+        CP = np.random.uniform(-1,1,(40,2))
+        XV = np.random.uniform(-1,1,(15,2))
+        CP[0] = XV[0]
+        G  = np.random.uniform(-1,1,15)
+        for bViscous, SmoothModel in [(False, 0), (True, 2)]:
+            U_ref = np.zeros(CP.shape)
+            for xv, g in zip(XV, G):
+                for icp, cp in enumerate(CP):
+                    if np.sum((cp-xv)**2)>1e-15:
+                        U_ref[icp] += vp_u(cp, xv, g, rcore=0.2, bViscous=bViscous)
+            U = vps_u(CP, XV, G, SmoothModel=SmoothModel, KernelOrder=2, SmoothParam=0.2, nPairsMax=32)
+            np.testing.assert_allclose(U, U_ref, rtol=1e-12, atol=1e-14)
+        # Higher order kernels are close to singular kernel far from vortex
+        U0 = vps_u(CP+3, XV, G)
+        for SmoothModel, KernelOrders in [(1,[2,4,6,8]), (2,[2,4,6,8,10])]:
+            for KernelOrder in KernelOrders:
+                U = vps_u(CP+3, XV, G, SmoothModel=SmoothModel, KernelOrder=KernelOrder, SmoothParam=0.2)
+                np.testing.assert_allclose(U, U0, rtol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -160,12 +160,14 @@ def ring_u(Xcp,Ycp,Zcp,Gamma=-1,R=1,polar_out=True,epsilon=0):
         uy=ur*np.sin(psi)
         return ux,uy,uz
 
-def rings_u(Xcp,Ycp,Zcp,Gamma_r,Rr,Xr,Yr,Zr,polar_out=True,epsilon=0):
+def rings_u(Xcp,Ycp,Zcp,Gamma_r,Rr,Xr,Yr,Zr,polar_out=True,epsilon=0,nPairsMax=2**14):
     """ 
     Compute the induced velocity from nRings vortex rings
         nRings: number of main rings
     TODO: angles
 
+    The control points x rings interactions are evaluated by blocks of at most nPairsMax pairs.
+
     INPUTS: 
         Xcp,Ycp,Zcp: cartesian coordinates of control points where the velocity field is not be computed
         Gamma_t : array of size (nRings), intensity of each rings
@@ -175,27 +177,74 @@ def rings_u(Xcp,Ycp,Zcp,Gamma_r,Rr,Xr,Yr,Zr,polar_out=True,epsilon=0):
     Xcp=np.asarray(Xcp)
     Ycp=np.asarray(Ycp)
     Zcp=np.asarray(Zcp)
+    shape_in = Xcp.shape
+    Gamma_r, Rr, Xr, Yr, Zr = [np.atleast_1d(np.asarray(v, dtype=float)).ravel() for v in (Gamma_r, Rr, Xr, Yr, Zr)]
+    bNZ = np.abs(Gamma_r) > 0
+    Gamma_r, Rr, Xr, Yr, Zr = Gamma_r[bNZ], Rr[bNZ], Xr[bNZ], Yr[bNZ], Zr[bNZ]
+    x = Xcp.ravel()
+    y = Ycp.ravel()
+    z = Zcp.ravel()
+    nCP, nR = len(x), len(Gamma_r)
+    nComp = 2 if polar_out else 3
+    u = np.zeros((nComp, nCP))
+    if nR>0:
+        nRTile  = min(nR, nPairsMax)
+        nCPTile = max(1, nPairsMax//nRTile)
+        for i0 in range(0, nCP, nCPTile):
+            for j0 in range(0, nR, nRTile):
+                I = slice(i0, i0+nCPTile)
+                J = slice(j0, j0+nRTile)
+                u[:,I] += _rings_u_tile(x[I], y[I], z[I], Gamma_r[J], Rr[J], Xr[J], Yr[J], Zr[J], polar_out, epsilon)
+    return tuple(uu.reshape(shape_in) for uu in u)
+
+
+def _rings_u_tile(Xcp, Ycp, Zcp, Gamma, R, Xr, Yr, Zr, polar_out, epsilon):
+    """ Velocity from nR rings on nCP points (summed over rings), using (nCP x nR) broadcasting.
+    Same formulation as ring_u, with the ring centered on (Xr,Yr,Zr). """
+    EPSILON = 1e-07
+    X = Xcp[:,None] - Xr[None,:]
+    Y = Ycp[:,None] - Yr[None,:]
+    z = Zcp[:,None] - Zr[None,:]
+    R = R[None,:]
+    r = np.sqrt(X**2 + Y**2)
+    # Axis and neighborhood of the ring itself, see ring_u
+    Iz = r < (EPSILON * R)
+    Ir = np.logical_and(np.abs(r-R)<(EPSILON*R), np.abs(z)<EPSILON)
+    bSpecial = np.logical_or(Iz, Ir)
+    bAnySpecial = np.any(bSpecial)
+    if bAnySpecial:
+        # Dummy values on special points
+        r = np.where(bSpecial, R/2, r)
+        z = np.where(bSpecial, R, z)
+
+    # Formulation uses Formula from Yoon 2004, with B=-2rR
+    a2 = (r+R)**2 + z**2
+    a  = np.sqrt(a2)
+    m  = 4 * r * R / a2
+    A  = z**2 + r**2 + R**2
+    I1 = 4.0 / a * ellipk(m)
+    I2 = 4.0 / (a * a2) * ellipe(m) / (1 - m)
+    c  = Gamma[None,:]/(4*np.pi)*R
+    ur = - c * z / (2*r*R) * (I1 - A*I2)
+    uz = c * ((R - A/(2*R))*I2 + I1/(2*R))
+    if bAnySpecial:
+        Gb = np.broadcast_to(Gamma[None,:], bSpecial.shape)
+        Rb = np.broadcast_to(R, bSpecial.shape)
+        ur[bSpecial] = 0
+        # Enforcing  Axis formula : v_z=-Gamma/(2R) *1 / (1+(z/R)^2)^(3/2)  
+        zz = Zcp[:,None] - Zr[None,:]
+        uz[Iz] = Gb[Iz]/(2*Rb[Iz])*(1.0/((1 +(zz[Iz]/Rb[Iz])**2)**(3.0/2.0)))
+        if epsilon==0:
+            uz[Ir]=Gb[Ir]/(4*Rb[Ir]) # NOTE: this is arbitrary
+        else:
+            uz[Ir]=Gb[Ir]/(4*np.pi*Rb[Ir])*(np.log(8*Rb[Ir]/epsilon)-1/4) # Eq 35.36 from [1]
+
     if polar_out:
-        ur = np.zeros(Xcp.shape)
-        uz = np.zeros(Xcp.shape)
-        for ir,(Gamma,R,xr,yr,zr) in enumerate(zip(Gamma_r,Rr,Xr,Yr,Zr)):
-            if np.abs(Gamma) > 0:
-                #print('Gamma',Gamma,'xr',xr,yr,zr,R)
-                u1 = ring_u(Xcp-xr,Ycp-yr,Zcp-zr,Gamma,R,polar_out=polar_out,epsilon=epsilon)
-                ur = ur + u1[0]
-                uz = uz + u1[1]
-        return ur,uz
+        return np.sum(ur, axis=1), np.sum(uz, axis=1)
     else:
-        ux = np.zeros(Xcp.shape)
-        uy = np.zeros(Xcp.shape)
-        uz = np.zeros(Xcp.shape)
-        for ir,(Gamma,R,xr,yr,zr) in enumerate(zip(Gamma_r,Rr,Xr,Yr,Zr)):
-            if np.abs(Gamma) > 0:
-                u1 = ring_u(Xcp-xr,Ycp-yr,Zcp-zr,Gamma,R,polar_out=polar_out,epsilon=epsilon)
-                ux = ux + u1[0]
-                uy = uy + u1[1]
-                uz = uz + u1[2]
-        return ux,uy,uz
+        # cos(psi)=X/r, sin(psi)=Y/r (ur=0 on the axis)
+        ur = ur / r
+        return np.sum(ur*X, axis=1), np.sum(ur*Y, axis=1), np.sum(uz, axis=1)
 
 # --------------------------------------------------------------------------------}
 # --- TEST 
@@ -320,6 +369,27 @@ class TestRing(unittest.TestCase):
         #ax.legend()
         #plt.show()
 # 
+    def test_Rings_vectorized(self):
+        # Sum of rings, compared to a loop on ring_u
+        np.random.seed(1)
+        nR = 20
+        Gamma_r = np.random.uniform(-1,1,nR)
+        Rr = np.random.uniform(0.5,2,nR)
+        Xr = np.random.uniform(-0.1,0.1,nR)
+        Yr = np.random.uniform(-0.1,0.1,nR)
+        Zr = np.linspace(0,5,nR)
+        X, Y, Z = np.meshgrid(np.linspace(-2,2,9), np.linspace(-1,1,5), np.linspace(-1,6,11))
+        X[0,0,0], Y[0,0,0] = Xr[0], Yr[0] # on axis
+        X[0,0,1], Y[0,0,1], Z[0,0,1] = Xr[0]+Rr[0], Yr[0], Zr[0] # on ring
+        for polar_out in [True, False]:
+            u_ref = [np.zeros(X.shape) for i in range(2 if polar_out else 3)]
+            for G,R,xr,yr,zr in zip(Gamma_r,Rr,Xr,Yr,Zr):
+                u1 = ring_u(X-xr, Y-yr, Z-zr, G, R, polar_out=polar_out, epsilon=0.1)
+                u_ref = [uu+u for uu,u in zip(u_ref, u1)]
+            u = rings_u(X, Y, Z, Gamma_r, Rr, Xr, Yr, Zr, polar_out=polar_out, epsilon=0.1, nPairsMax=100)
+            for uu, ur in zip(u, u_ref):
+                np.testing.assert_allclose(uu, ur, rtol=1e-9, atol=1e-12)
+
     def test_Ring_rotor(self):
         pass
         # Test that induction on the rotor is constant, equal to gamma/2, see [1]
@@ -18,7 +18,8 @@ def vs_u_raw(CP, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=No
                  1: Rankine
                  2: Lamb-Oseen
                  3: Vatistas
-                 4: Denominator offset
+                 4: Denominator offset, relative to segment length
+                 5: Denominator offset, fixed
     """
     DPa = CP.ravel()-Pa.ravel()
     DPb = CP.ravel()-Pb.ravel()
@@ -58,6 +59,9 @@ def vs_u_raw(CP, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=No
         elif RegFunction==4:
             Kv = 1.0
             denominator = denominator + RegParam**2 * norm2_r0
+        elif RegFunction==5:
+            Kv = 1.0
+            denominator = denominator + RegParam**2
         else:
             raise NotImplementedError('Regularization for segments {}'.format(RegFunction))
     else:
@@ -87,42 +91,146 @@ def vs_u_raw(CP, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=No
 
     return Kv * crossprod
 
-def vs_u(Xcp, Ycp, Zcp, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=None):
-    """ Induced velocity from a vortex segment on several control point
+def vs_u(Xcp, Ycp, Zcp, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=None, **kwargs):
+    """ Induced velocity from one or several vortex segments on several control point
     See fUi_VortexSegment11_smooth
 
-    CPs : n x 3
+    Pa, Pb: (3) or (nS x 3) extremities of the segments
+    Gamma : scalar or (nS) intensities of the segments
 
     RegFunction: Regularization function:
                  0: None
                  1: Rankine
                  2: Lamb-Oseen
                  3: Vatistas
-                 4: Denominator offset
+                 4: Denominator offset, relative to segment length
+                 5: Denominator offset, fixed
+    kwargs: passed to vss_u (nPairsMax, nThreads)
     OUTPUTS:
         ux, uy, uz: velocity, shape of Xcp
     """
     Xcp = np.asarray(Xcp)
     shape_in = Xcp.shape
-    Xcp = Xcp.ravel()
-    Ycp = np.asarray(Ycp).ravel()
-    Zcp = np.asarray(Zcp).ravel()
-    ux  = np.zeros(Xcp.shape)
-    uy  = np.zeros(Xcp.shape)
-    uz  = np.zeros(Xcp.shape)
-    for i,(x,y,z) in enumerate(zip(Xcp,Ycp,Zcp)):
-        CP=np.array([[x,y,z]])
-        u = vs_u_raw(CP,Pa,Pb, Gamma, RegFunction, RegParam, nt, RegParamW)
-        ux[i] = u[0,0]
-        uy[i] = u[0,1]
-        uz[i] = u[0,2]
-        
-    ux = ux.reshape(shape_in)
-    uy = uy.reshape(shape_in)
-    uz = uz.reshape(shape_in)
+    CPs = np.column_stack((Xcp.ravel(), np.asarray(Ycp).ravel(), np.asarray(Zcp).ravel()))
+    u = vss_u(CPs, Pa, Pb, Gamma, RegFunction=RegFunction, RegParam=RegParam, nt=nt, RegParamW=RegParamW, **kwargs)
+    ux = u[:,0].reshape(shape_in)
+    uy = u[:,1].reshape(shape_in)
+    uz = u[:,2].reshape(shape_in)
     return ux,uy,uz
 
 
+def vss_u(CPs, Pa, Pb, Gamma, RegFunction=0, RegParam=0, nt=None, RegParamW=None, nPairsMax=2**18, nThreads=1):
+    """ Induced velocity from nS vortex segments on nCP control points (summed over segments)
+    Vectorized version of vs_u_raw, same semantics as fUi_SegmentCst_11 in fortran/UISegments.f90
+    with one intensity and regularization parameter per segment.
+
+    The nCP x nS interactions are evaluated by tiles of at most nPairsMax pairs, to bound memory.
+
+    INPUTS:
+      CPs      : (nCP x 3) control points
+      Pa, Pb   : (nS x 3) extremities of the segments
+      Gamma    : scalar or (nS) intensities of the segments
+      RegParam : scalar or (nS) regularization parameter of the segments
+      nt       : (3) or (nS x 3), normal vector for 2D Gaussian regularization (see vs_u_raw)
+      RegParamW: scalar or (nS) regularization parameter along the "wake" direction (2D Gaussian)
+      nPairsMax: maximum number of control point/segment pairs evaluated at once
+      nThreads : number of threads used to evaluate the tiles of control points
+    OUTPUTS:
+        u: (nCP x 3) velocity
+    """
+    CPs   = np.asarray(CPs, dtype=float).reshape(-1,3)
+    Pa    = np.asarray(Pa, dtype=float).reshape(-1,3)
+    Pb    = np.asarray(Pb, dtype=float).reshape(-1,3)
+    nS    = Pa.shape[0]
+    Gamma    = np.broadcast_to(np.asarray(Gamma, dtype=float), (nS,))
+    RegParam = np.broadcast_to(np.asarray(RegParam, dtype=float), (nS,))
+    if nt is not None:
+        nt = np.broadcast_to(np.asarray(nt, dtype=float).reshape(-1,3), (nS,3))
+        RegParamW = np.broadcast_to(np.asarray(RegParamW, dtype=float), (nS,))
+    if RegFunction not in [0,1,2,3,4,5] or (nt is not None and RegFunction not in [0,2,3]):
+        raise NotImplementedError('Regularization for segments {} (nt: {})'.format(RegFunction, nt is not None))
+
+    nCP = CPs.shape[0]
+    u   = np.zeros((nCP,3))
+    if nCP==0 or nS==0:
+        return u
+    # --- Tiles: segments are split only if there are more than nPairsMax of them
+    nSTile  = min(nS, nPairsMax)
+    nCPTile = max(1, nPairsMax//nSTile)
+    STiles  = [slice(i, i+nSTile) for i in range(0, nS, nSTile)]
+    CPTiles = [slice(i, i+nCPTile) for i in range(0, nCP, nCPTile)]
+
+    def evalTile(I):
+        for J in STiles:
+            u[I] += _vss_u_tile(CPs[I], Pa[J], Pb[J], Gamma[J], RegFunction, RegParam[J],
+                    None if nt is None else nt[J], None if nt is None else RegParamW[J])
+
+    if nThreads>1 and len(CPTiles)>1:
+        # Numpy releases the GIL on large array operations. Each thread writes to its own rows.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=nThreads) as executor:
+            list(executor.map(evalTile, CPTiles))
+    else:
+        for I in CPTiles:
+            evalTile(I)
+    return u
+
+
+def _vss_u_tile(CPs, Pa, Pb, Gamma, RegFunction, RegParam, nt, RegParamW):
+    """ Induced velocity from nS segments on nCP points, using (nCP x nS) broadcasting, see vss_u """
+    DPa = CPs[:,None,:] - Pa[None,:,:]
+    DPb = CPs[:,None,:] - Pb[None,:,:]
+    xa, ya, za = DPa[:,:,0], DPa[:,:,1], DPa[:,:,2]
+    xb, yb, zb = DPb[:,:,0], DPb[:,:,1], DPb[:,:,2]
+
+    norm_a      = np.sqrt(xa * xa + ya * ya + za * za)
+    norm_b      = np.sqrt(xb * xb + yb * yb + zb * zb)
+    denominator = norm_a * norm_b * (norm_a * norm_b + xa * xb + ya * yb + za * zb)
+    # Singularities: on the segment line or on the extremities, velocity is zero
+    bSing = (denominator < 1e-17) | (norm_a < 1e-08) | (norm_b < 1e-08)
+    denominator[bSing] = 1.0
+
+    cx = ya * zb - za * yb
+    cy = za * xb - xa * zb
+    cz = xa * yb - ya * xb
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if RegFunction==0:
+            Kv = 1.0
+        elif nt is None:
+            # Regularization models, based on orthogonal distance to segment h2
+            norm2_r0 = (xa - xb)**2 + (ya - yb)**2 + (za - zb)**2
+            if RegFunction in [1,2,3]:
+                h2   = (cx**2 + cy**2 + cz**2)/norm2_r0 # Orthogonal distance (r1 x r2)/r0
+                eps2 = h2/RegParam**2
+                if RegFunction==1:
+                    Kv = np.where(eps2 < 1, eps2, 1.0)
+                elif RegFunction==2:
+                    Kv = 1.0 - np.exp(-1.25643 * eps2)
+                else:
+                    Kv = eps2 / np.sqrt(1 + eps2**2)
+            elif RegFunction==4:
+                Kv = 1.0
+                denominator = denominator + RegParam**2 * norm2_r0
+            else:
+                Kv = 1.0
+                denominator = denominator + RegParam**2
+        else:
+            # --- Using 2D Gaussian
+            es = DPa - DPb
+            nw = np.cross(es, nt[None,:,:])
+            nw = nw/np.linalg.norm(nw, axis=2)[:,:,None]
+            rt = np.einsum('ijk,jk->ij', DPa, nt) # distance along nt component
+            rw = np.einsum('ijk,ijk->ij', DPa, nw) # distance along nw component
+            eps2 = rt**2/RegParam**2 + rw**2/RegParamW**2
+            if RegFunction==2:
+                Kv = 1.0 - np.exp(-1.25643 * eps2 )
+            else:
+                Kv = eps2 / np.sqrt(1 + eps2**2)
+        Kv = Gamma * Kv / (4.0 * np.pi) * (norm_a + norm_b) / denominator
+    Kv = np.where(bSing, 0.0, Kv)
+    return np.column_stack(((Kv * cx).sum(axis=1), (Kv * cy).sum(axis=1), (Kv * cz).sum(axis=1)))
+
+
 
 # --------------------------------------------------------------------------------}
 # --- TESTS
@@ -132,6 +240,7 @@ class TestVortexSegment(unittest.TestCase):
         import warnings
 #         warnings.filterwarnings('error')
         # --- One vortex segment
+        z0 = 1
         Pa = np.array([[ 0, 0, -z0]])
         Pb = np.array([[ 0, 0,  z0]])
         # --- test, 0 on singularity
@@ -142,6 +251,33 @@ class TestVortexSegment(unittest.TestCase):
         U  = vs_u_raw(Pb, Pa, Pb, Gamma = 1, RegFunction = 0, RegParam = 0)
         np.testing.assert_equal(U, np.zeros((1,3)))
 
+    def test_VS_vectorized(self):
+        # --- Several segments on several points, vectorized vs loop on vs_u_raw
+        np.random.seed(3)
+        nS  = 7
+        Pa  = np.random.uniform(-1,1,(nS,3))
+        Pb  = np.random.uniform(-1,1,(nS,3))
+        Gam = np.random.uniform(-1,1,nS)
+        CPs = np.random.uniform(-2,2,(50,3))
+        CPs[0] = Pa[0]   # extremity
+        CPs[1] = (Pa[1]+Pb[1])/2 # on segment
+        for RegFunction in [0,1,2,3,4,5]:
+            u_ref = np.zeros(CPs.shape)
+            for i,CP in enumerate(CPs):
+                for j in range(nS):
+                    u_ref[i] += vs_u_raw(CP, Pa[j], Pb[j], Gam[j], RegFunction=RegFunction, RegParam=0.3)[0]
+            u = vss_u(CPs, Pa, Pb, Gam, RegFunction=RegFunction, RegParam=0.3)
+            np.testing.assert_allclose(u, u_ref, rtol=1e-12, atol=1e-14)
+            # Small tiles and threads
+            u = vss_u(CPs, Pa, Pb, Gam, RegFunction=RegFunction, RegParam=0.3, nPairsMax=3, nThreads=2)
+            np.testing.assert_allclose(u, u_ref, rtol=1e-12, atol=1e-14)
+        # --- 2D Gaussian, vs_u interface
+        nt = np.array([1,0,0])
+        for RegFunction in [2,3]:
+            ux,uy,uz = vs_u(CPs[:,0], CPs[:,1], CPs[:,2], Pa[2], Pb[2], Gam[2], RegFunction=RegFunction, RegParam=0.3, nt=nt, RegParamW=0.1)
+            u_ref = np.array([vs_u_raw(CP, Pa[2], Pb[2], Gam[2], RegFunction=RegFunction, RegParam=0.3, nt=nt, RegParamW=0.1)[0] for CP in CPs])
+            np.testing.assert_allclose(np.column_stack((ux,uy,uz)), u_ref, rtol=1e-12, atol=1e-14)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -6,5 +6,6 @@ from welib.vortilib.elements.VortexCylinder       import *
 from welib.vortilib.elements.VortexCylinderSkewed import *
 from welib.vortilib.elements.VortexHelix          import *
 from welib.vortilib.elements.VortexRing           import *
+from welib.vortilib.elements.VortexSegment        import *
 from welib.vortilib.elements.VortexParticle       import *
 from welib.vortilib.elements.SourceEllipsoid      import *
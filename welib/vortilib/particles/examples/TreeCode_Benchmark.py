@@ -0,0 +1,60 @@
+"""
+Benchmark of the tree code for the velocity induced by vortex particles, compared to
+the direct summation and to the loop over particles using `vp_u`.
+"""
+import numpy as np
+import time
+import matplotlib.pyplot as plt
+from welib.vortilib.elements.VortexParticle import vp_u, vps_u
+from welib.vortilib.particles.treecode import ParticleOctree
+
+def main(vnP=[500, 1000, 2000, 4000, 8000], vTheta=[0.8, 0.5, 0.3], RegFunction=1, RegParam=0.05, nLoopMax=1000, verbose=True):
+    np.random.seed(0)
+    T_loop, T_direct = [], []
+    T_tree   = np.zeros((len(vnP),len(vTheta)))
+    Err_tree = np.zeros((len(vnP),len(vTheta)))
+    for inP, nP in enumerate(vnP):
+        Pv    = np.random.normal(0, 1, (nP,3))
+        Alpha = np.random.normal(0, 1, (nP,3))/nP
+        # --- Loop on particles with vp_u (one particle on all points)
+        if nP<=nLoopMax:
+            t0 = time.time()
+            u_loop = np.zeros(Pv.shape)
+            for P, A in zip(Pv, Alpha):
+                u_loop += vp_u(Pv, P, A, RegFunction=RegFunction, RegParam=RegParam)
+            T_loop.append(time.time()-t0)
+        else:
+            T_loop.append(np.nan)
+        # --- Direct summation
+        t0 = time.time()
+        u_ref = vps_u(Pv, Pv, Alpha, RegFunction=RegFunction, RegParam=RegParam)
+        T_direct.append(time.time()-t0)
+        # --- Tree code
+        for it, theta in enumerate(vTheta):
+            t0 = time.time()
+            tree = ParticleOctree(Pv, Alpha)
+            u = tree.u(Pv, RegFunction=RegFunction, RegParam=RegParam, theta=theta)
+            T_tree[inP,it]   = time.time()-t0
+            Err_tree[inP,it] = np.linalg.norm(u-u_ref)/np.linalg.norm(u_ref)
+        if verbose:
+            print('nP={:7d} - loop: {:8.3f}s - direct: {:8.3f}s - tree: '.format(nP, T_loop[-1], T_direct[-1])
+                  + ' '.join(['{:8.3f}s ({:.1e})'.format(t,e) for t,e in zip(T_tree[inP], Err_tree[inP])]))
+
+    fig,ax = plt.subplots(1, 1, sharey=False, figsize=(6.4,4.8)) # (6.4,4.8)
+    fig.subplots_adjust(left=0.12, right=0.95, top=0.95, bottom=0.11, hspace=0.20, wspace=0.20)
+    ax.loglog(vnP, T_loop  , 'k:' , label='Loop vp_u')
+    ax.loglog(vnP, T_direct, 'k-' , label='Direct')
+    for it, theta in enumerate(vTheta):
+        ax.loglog(vnP, T_tree[:,it], '--', label=r'Tree $\theta$={}'.format(theta))
+    ax.set_xlabel('Number of particles [-]')
+    ax.set_ylabel('Computational time [s]')
+    ax.legend()
+    ax.set_title('Vortilib - Vortex particles tree code')
+    return T_loop, T_direct, T_tree, Err_tree
+
+
+if __name__ == '__main__':
+    main()
+    plt.show()
+if __name__=="__test__":
+    main(vnP=[200, 400], vTheta=[0.5], nLoopMax=200, verbose=False)
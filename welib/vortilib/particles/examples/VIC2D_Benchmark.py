@@ -0,0 +1,64 @@
+"""
+Benchmark of the 2D Vortex-In-Cell solver against the direct summation (vortex points),
+for a Lamb-Oseen vortex and a 2D Gaussian vortex patch.
+The velocity on the particles is compared to the analytical velocity.
+"""
+import numpy as np
+import time
+import matplotlib.pyplot as plt
+from welib.mesh.mesh import Mesh
+from welib.vortilib.particles.vic import VIC2D
+from welib.vortilib.elements.VortexPoint import vps_u
+from welib.vortilib.elements.LambOseen import lo_omega, lo_u
+from welib.vortilib.elements.VortexPatch2DGaussian import vpg_omega, vpg_u
+
+def main(vn=[21, 41, 81, 161], nDirectMax=100000, verbose=True):
+    cases = {
+        'Lamb-Oseen'    : (lambda X,Y: lo_omega(X, Y, Gamma=1, t=0.02, nu=1), lambda X,Y: lo_u(X, Y, Gamma=1, t=0.02, nu=1)),
+        'Gaussian patch': (lambda X,Y: vpg_omega(X, Y, Gamma=1, sigma=1)    , lambda X,Y: vpg_u(X, Y, Gamma=1, sigma=1)),
+        }
+    L = {'Lamb-Oseen':1.5, 'Gaussian patch':5}
+    fig,axes = plt.subplots(1, 2, sharey=False, figsize=(12.8,4.8)) # (6.4,4.8)
+    fig.subplots_adjust(left=0.08, right=0.97, top=0.93, bottom=0.11, hspace=0.20, wspace=0.25)
+    for (name, (fOmega, fU)), c in zip(cases.items(), ['k','b']):
+        nPart, T_vic, T_dir, E_vic, E_dir = [], [], [], [], []
+        for n in vn:
+            v    = np.linspace(-L[name], L[name], n)
+            vic  = VIC2D(Mesh(v, v), bc='freespace')
+            Part = vic.init_from_fun(fOmega)
+            ut, vt = fU(Part.P[:,0], Part.P[:,1])
+            Umax = np.max(np.sqrt(ut**2+vt**2))
+            nPart.append(Part.nPart)
+            # --- VIC
+            t0 = time.time()
+            U  = vic.velocity(Part.P, Part.Intensity)
+            T_vic.append(time.time()-t0)
+            E_vic.append(np.sqrt(np.mean((U[:,0]-ut)**2 + (U[:,1]-vt)**2))/Umax)
+            # --- Direct summation, smoothed with the grid spacing
+            if Part.nPart<=nDirectMax:
+                t0 = time.time()
+                U  = vps_u(Part.P, Part.P, Part.Intensity, SmoothModel=2, KernelOrder=2, SmoothParam=v[1]-v[0])
+                T_dir.append(time.time()-t0)
+                E_dir.append(np.sqrt(np.mean((U[:,0]-ut)**2 + (U[:,1]-vt)**2))/Umax)
+            else:
+                T_dir.append(np.nan)
+                E_dir.append(np.nan)
+            if verbose:
+                print('{:15s} nPart={:7d} - VIC: {:8.3f}s ({:.1e}) - Direct: {:8.3f}s ({:.1e})'.format(name, nPart[-1], T_vic[-1], E_vic[-1], T_dir[-1], E_dir[-1]))
+        axes[0].loglog(nPart, T_vic, '-' , color=c, label='VIC - '+name)
+        axes[0].loglog(nPart, T_dir, '--', color=c, label='Direct - '+name)
+        axes[1].loglog(nPart, E_vic, '-' , color=c, label='VIC - '+name)
+        axes[1].loglog(nPart, E_dir, '--', color=c, label='Direct - '+name)
+    axes[0].set_xlabel('Number of particles [-]')
+    axes[0].set_ylabel('Computational time [s]')
+    axes[1].set_xlabel('Number of particles [-]')
+    axes[1].set_ylabel('Relative velocity error [-]')
+    axes[0].legend()
+    axes[0].set_title('Vortilib - VIC vs direct summation')
+
+
+if __name__ == '__main__':
+    main()
+    plt.show()
+if __name__=="__test__":
+    main(vn=[11, 21], verbose=False)
@@ -102,6 +102,141 @@ def interp_coeff_lambda3(i2,dx2,nx):
     return ax1,ax2,ax3,ax4,i1-1,i2-1,i3-1,i4-1
 
 
+# --------------------------------------------------------------------------------}
+# --- Vectorized projections, 1D/2D/3D
+# --------------------------------------------------------------------------------{
+def fCoordGrid(x0, v, bRegular=True):
+    """ Vectorized version of fCoordRegularGrid, for regular or rectilinear grids
+    INPUTS:
+      x0: array (nPart) of coordinates
+      v : grid vector
+    OUTPUTS:
+      ic: array of index of the nearest left grid point (from 0 to nx-1, -1 if left of the grid)
+      dc: array of normalized distance to the nearest left grid point
+    """
+    x0 = np.asarray(x0, dtype=float)
+    v  = np.asarray(v, dtype=float)
+    if bRegular:
+        C  = (x0 - v[0]) / (v[1]-v[0])
+        ic = np.floor(C).astype(int) + 1
+        dc = C + 1 - ic
+        return ic-1, dc
+    else:
+        ic  = np.searchsorted(v, x0, side='right') - 1
+        icc = np.clip(ic, 0, len(v)-2)
+        dc  = (x0 - v[icc]) / (v[icc+1] - v[icc])
+        return ic, dc
+
+def interp_coeffs(ic, dc, nx, kernel='mp4'):
+    """ Vectorized version of interp_coeff_mp4 and interp_coeff_lambda3
+    INPUTS:
+      ic, dc: arrays (nPart) of index of nearest left grid point (from 0) and normalized distance
+      nx    : number of grid points
+    OUTPUTS:
+      a: (nPart x 4) kernel coefficients
+      i: (nPart x 4) indices of the grid points (from 0 to nx-1)
+    NOTE: as for the scalar versions, coefficients are zero when the kernel support is not within the grid
+    """
+    ic  = np.asarray(ic)
+    dx2 = np.asarray(dc, dtype=float)
+    # Normalized distance to other cells
+    dx1 = dx2 + 1.0
+    dx3 = 1.0 - dx2
+    dx4 = 2.0 - dx2
+    if kernel=='mp4':
+        a = np.column_stack((0.5 * (2.0 - dx1) ** 2 * (1.0 - dx1),
+                             1.0 - 2.5 * dx2 ** 2 + 1.5 * dx2 ** 3,
+                             1.0 - 2.5 * dx3 ** 2 + 1.5 * dx3 ** 3,
+                             0.5 * (2.0 - dx4) ** 2 * (1.0 - dx4)))
+    elif kernel=='lambda3':
+        a = np.column_stack((1.0 / 6.0 * (1.0 - dx1) * (2.0 - dx1) * (3.0 - dx1),
+                             1.0 / 2.0 * (1 - dx2 ** 2) * (2 - dx2),
+                             1.0 / 2.0 * (1 - dx3 ** 2) * (2 - dx3),
+                             1.0 / 6.0 * (1.0 - dx4) * (2.0 - dx4) * (3.0 - dx4)))
+    else:
+        raise Exception('Unknown Interpolation kernel {}'.format(kernel))
+    i = ic[:,None] + np.arange(-1,3)[None,:]
+    # Kernel support outside of the grid, or first/last interval
+    bOut = (ic < 1) | (ic > nx-3)
+    a[bOut,:] = 0.
+    i[bOut,:] = 0
+    return a, i
+
+def _interp_weights(Part, v, kernel, bRegular):
+    """ Flat indices and weights (nPart x 4**nDim) of the grid points affected by each particle """
+    nDim = Part.shape[1]
+    n    = [len(vv) for vv in v[:nDim]]
+    W = np.ones((Part.shape[0],1))
+    I = np.zeros((Part.shape[0],1), dtype=int)
+    for iDim in range(nDim):
+        ic, dc = fCoordGrid(Part[:,iDim], v[iDim], bRegular)
+        a, i = interp_coeffs(ic, dc, n[iDim], kernel)
+        # Combine 1D kernels into the nD kernel (C-order flat index)
+        W = (W[:,:,None] * a[:,None,:]).reshape(Part.shape[0],-1)
+        I = (I[:,:,None] * n[iDim] + i[:,None,:]).reshape(Part.shape[0],-1)
+    return I, W
+
+def interp_p2m_nd(Part, part_values, v, kernel='mp4', bRegular=True, nPartMax=2**16):
+    """ Particle to mesh projection (scatter), for 1D, 2D and 3D grids
+
+    INPUTS:
+      Part       : (nPart x nDim) particle positions
+      part_values: (nPart x nVal) particle values
+      v          : list of grid vectors [v1, v2, v3], of length nDim
+      kernel     : 'mp4' or 'lambda3'
+      bRegular   : True if the grid is regular, otherwise rectilinear
+      nPartMax   : number of particles processed at once, to bound memory
+    OUTPUTS:
+      mesh: (nVal x n1 [x n2 [x n3]]) mesh values
+    """
+    Part        = np.asarray(Part, dtype=float)
+    part_values = np.asarray(part_values, dtype=float)
+    Part        = Part.reshape(Part.shape[0], -1)
+    part_values = part_values.reshape(Part.shape[0], -1)
+    nDim = Part.shape[1]
+    n    = [len(vv) for vv in v[:nDim]]
+    if any([nn < 4 for nn in n]):
+        print('No guarantee with tiny grid ')
+    nVal = part_values.shape[1]
+    nGrid = int(np.prod(n))
+    mesh = np.zeros((nVal, nGrid))
+    for i0 in range(0, Part.shape[0], nPartMax):
+        I, W = _interp_weights(Part[i0:i0+nPartMax], v, kernel, bRegular)
+        for iVal in range(nVal):
+            mesh[iVal] += np.bincount(I.ravel(), weights=(W*part_values[i0:i0+nPartMax,iVal][:,None]).ravel(), minlength=nGrid)
+    return mesh.reshape([nVal]+n)
+
+def interp_m2p_nd(Part, mesh, v, kernel='mp4', bRegular=True, nPartMax=2**16):
+    """ Mesh to particle interpolation (gather), for 1D, 2D and 3D grids
+
+    INPUTS:
+      Part    : (nPart x nDim) particle positions
+      mesh    : (nVal x n1 [x n2 [x n3]]) mesh values
+      v       : list of grid vectors [v1, v2, v3], of length nDim
+      kernel  : 'mp4' or 'lambda3'
+      bRegular: True if the grid is regular, otherwise rectilinear
+      nPartMax: number of particles processed at once, to bound memory
+    OUTPUTS:
+      part_values: (nPart x nVal) particle values
+    """
+    Part = np.asarray(Part, dtype=float)
+    Part = Part.reshape(Part.shape[0], -1)
+    nDim = Part.shape[1]
+    nVal = mesh.shape[0]
+    if mesh.ndim!=nDim+1:
+        raise Exception('Mesh has wrong size')
+    mesh_flat = np.asarray(mesh).reshape(nVal, -1)
+    part_values = np.zeros((Part.shape[0], nVal))
+    for i0 in range(0, Part.shape[0], nPartMax):
+        I, W = _interp_weights(Part[i0:i0+nPartMax], v, kernel, bRegular)
+        for iVal in range(nVal):
+            part_values[i0:i0+nPartMax, iVal] = (W * mesh_flat[iVal][I]).sum(axis=1)
+    return part_values
+
+
+# --------------------------------------------------------------------------------}
+# --- Low level functions, fixed dimension and kernel
+# --------------------------------------------------------------------------------{
 def interp_p2m_mp4_1d(Part,nPart,part_values,nval,v1,n1,bRegular=None): 
     """
     xBox: Origin of the grid
@@ -114,45 +249,8 @@ def interp_p2m_mp4_1d(Part,nPart,part_values,nval,v1,n1,bRegular=None):
      i1   i2   i3   i4
       |    | .  |    |
     """
-    Part = np.transpose(Part) # TODO
-    part_values = np.transpose(part_values)
-    
-    if (part_values.shape[0] != nval):
-        pass
-    
-    if (Part.shape[1] != nPart):
-        raise Exception('Part has wrong size')
-    
-    if (n1 < 4):
-        print('No guarantee with tiny grid ')
-    
-    mesh = np.zeros((nval,n1,n2))
-    ic   = np.array([0,0])
-    dc   = np.zeros(2)
-    xBox = np.zeros(2)
-    dBox = np.zeros(2)
-    xBox[0] = v1[0]
-    xBox[1] = v2[0]
-    dBox[0] = v1[1] - v1[0]
-    dBox[1] = v2[1] - v2[0]
-
-    if bRegular == 1:
-        fIndexX= lambda x: fCoordRegularGrid(x,xBox[0],dBox[0])
-    else:
-        fIndexX = lambda x: fCoordRectilinearGrid(x,v1)
-
-    for i in np.arange(nPart):
-        # Coordinates and distance in grid index space (to nearest left grid point)
-        ic[0],dc[0] = fIndexX(Part[0,i])
-        # Getting the M'4 kernel coefficients
-        ax1,ax2,ax3,ax4,i1,i2,i3,i4 = interp_coeff_mp4(ic[0],dc[0],n1)
-        # Project to field
-        mesh[:nval,i1] +=  ax1 * part_values[:nval,i]
-        mesh[:nval,i2] +=  ax2 * part_values[:nval,i]
-        mesh[:nval,i3] +=  ax3 * part_values[:nval,i]
-        mesh[:nval,i4] +=  ax4 * part_values[:nval,i]
-    
-    return mesh
+    Part = np.asarray(Part).reshape(nPart,1)
+    return interp_p2m_nd(Part, np.asarray(part_values)[:,:nval], [v1[:n1]], kernel='mp4', bRegular=bRegular)
 
 def interp_p2m_lambda3_2d(Part,nPart,part_values,nval,v1,v2,n1,n2,bRegular=None): 
     """
@@ -166,64 +264,9 @@ def interp_p2m_lambda3_2d(Part,nPart,part_values,nval,v1,v2,n1,n2,bRegular=None)
      i1   i2   i3   i4
       |    | .  |    |
     """
-    Part = np.transpose(Part) # TODO
-    part_values = np.transpose(part_values)
-    
-    if (part_values.shape[0] != nval):
-        pass
-    
-    if (Part.shape[1] != nPart):
+    if (Part.shape[0] != nPart):
         raise Exception('Part has wrong size')
-    
-    if (n1 < 4):
-        print('No guarantee with tiny grid ')
-    
-    if (n2 < 4):
-        print('No guarantee with tiny grid ')
-    
-    mesh = np.zeros((nval,n1,n2))
-    ic   = np.array([0,0])
-    dc   = np.zeros(2)
-    xBox = np.zeros(2)
-    dBox = np.zeros(2)
-    xBox[0] = v1[0]
-    xBox[1] = v2[0]
-    dBox[0] = v1[1] - v1[0]
-    dBox[1] = v2[1] - v2[0]
-
-    if bRegular == 1:
-        fIndexX= lambda x: fCoordRegularGrid(x,xBox[0],dBox[0])
-        fIndexY= lambda y: fCoordRegularGrid(y,xBox[1],dBox[1])
-    else:
-        fIndexX = lambda x: fCoordRectilinearGrid(x,v1)
-        fIndexY = lambda x: fCoordRectilinearGrid(y,v2)
-
-    for i in np.arange(nPart):
-        # Coordinates and distance in grid index space (to nearest left grid point)
-        ic[0],dc[0] = fIndexX(Part[0,i])
-        ic[1],dc[1] = fIndexY(Part[1,i])
-        # Getting the M'4 kernel coefficients
-        ax1,ax2,ax3,ax4,i1,i2,i3,i4 = interp_coeff_lambda3(ic[0],dc[0],n1)
-        ay1,ay2,ay3,ay4,j1,j2,j3,j4 = interp_coeff_lambda3(ic[1],dc[1],n2)
-        # Combine 1D kernels into the 2D kernel and apply to the field
-        mesh[:nval,i1,j1] +=  ax1 * ay1 * part_values[:nval,i]
-        mesh[:nval,i2,j1] +=  ax2 * ay1 * part_values[:nval,i]
-        mesh[:nval,i3,j1] +=  ax3 * ay1 * part_values[:nval,i]
-        mesh[:nval,i4,j1] +=  ax4 * ay1 * part_values[:nval,i]
-        mesh[:nval,i1,j2] +=  ax1 * ay2 * part_values[:nval,i]
-        mesh[:nval,i2,j2] +=  ax2 * ay2 * part_values[:nval,i]
-        mesh[:nval,i3,j2] +=  ax3 * ay2 * part_values[:nval,i]
-        mesh[:nval,i4,j2] +=  ax4 * ay2 * part_values[:nval,i]
-        mesh[:nval,i1,j3] +=  ax1 * ay3 * part_values[:nval,i]
-        mesh[:nval,i2,j3] +=  ax2 * ay3 * part_values[:nval,i]
-        mesh[:nval,i3,j3] +=  ax3 * ay3 * part_values[:nval,i]
-        mesh[:nval,i4,j3] +=  ax4 * ay3 * part_values[:nval,i]
-        mesh[:nval,i1,j4] +=  ax1 * ay4 * part_values[:nval,i]
-        mesh[:nval,i2,j4] +=  ax2 * ay4 * part_values[:nval,i]
-        mesh[:nval,i3,j4] +=  ax3 * ay4 * part_values[:nval,i]
-        mesh[:nval,i4,j4] +=  ax4 * ay4 * part_values[:nval,i]
-    
-    return mesh
+    return interp_p2m_nd(Part, np.asarray(part_values)[:,:nval], [v1[:n1], v2[:n2]], kernel='lambda3', bRegular=bRegular)
 
 
 def interp_p2m_mp4_2d(Part,nPart,part_values,nval,v1,v2,n1,n2,bRegular=None): 
@@ -238,64 +281,9 @@ def interp_p2m_mp4_2d(Part,nPart,part_values,nval,v1,v2,n1,n2,bRegular=None):
      i1   i2   i3   i4
       |    | .  |    |
     """
-    Part = np.transpose(Part) # TODO
-    part_values = np.transpose(part_values)
-    
-    if (part_values.shape[0] != nval):
-        pass
-    
-    if (Part.shape[1] != nPart):
+    if (Part.shape[0] != nPart):
         raise Exception('Part has wrong size')
-    
-    if (n1 < 4):
-        print('No guarantee with tiny grid ')
-    
-    if (n2 < 4):
-        print('No guarantee with tiny grid ')
-    
-    mesh = np.zeros((nval,n1,n2))
-    ic   = np.array([0,0])
-    dc   = np.zeros(2)
-    xBox = np.zeros(2)
-    dBox = np.zeros(2)
-    xBox[0] = v1[0]
-    xBox[1] = v2[0]
-    dBox[0] = v1[1] - v1[0]
-    dBox[1] = v2[1] - v2[0]
-
-    if bRegular == 1:
-        fIndexX= lambda x: fCoordRegularGrid(x,xBox[0],dBox[0])
-        fIndexY= lambda y: fCoordRegularGrid(y,xBox[1],dBox[1])
-    else:
-        fIndexX = lambda x: fCoordRectilinearGrid(x,v1)
-        fIndexY = lambda x: fCoordRectilinearGrid(y,v2)
-
-    for i in np.arange(nPart):
-        # Coordinates and distance in grid index space (to nearest left grid point)
-        ic[0],dc[0] = fIndexX(Part[0,i])
-        ic[1],dc[1] = fIndexY(Part[1,i])
-        # Getting the M'4 kernel coefficients
-        ax1,ax2,ax3,ax4,i1,i2,i3,i4 = interp_coeff_mp4(ic[0],dc[0],n1)
-        ay1,ay2,ay3,ay4,j1,j2,j3,j4 = interp_coeff_mp4(ic[1],dc[1],n2)
-        # Combine 1D kernels into the 2D kernel and apply to the field
-        mesh[:nval,i1,j1] +=  ax1 * ay1 * part_values[:nval,i]
-        mesh[:nval,i2,j1] +=  ax2 * ay1 * part_values[:nval,i]
-        mesh[:nval,i3,j1] +=  ax3 * ay1 * part_values[:nval,i]
-        mesh[:nval,i4,j1] +=  ax4 * ay1 * part_values[:nval,i]
-        mesh[:nval,i1,j2] +=  ax1 * ay2 * part_values[:nval,i]
-        mesh[:nval,i2,j2] +=  ax2 * ay2 * part_values[:nval,i]
-        mesh[:nval,i3,j2] +=  ax3 * ay2 * part_values[:nval,i]
-        mesh[:nval,i4,j2] +=  ax4 * ay2 * part_values[:nval,i]
-        mesh[:nval,i1,j3] +=  ax1 * ay3 * part_values[:nval,i]
-        mesh[:nval,i2,j3] +=  ax2 * ay3 * part_values[:nval,i]
-        mesh[:nval,i3,j3] +=  ax3 * ay3 * part_values[:nval,i]
-        mesh[:nval,i4,j3] +=  ax4 * ay3 * part_values[:nval,i]
-        mesh[:nval,i1,j4] +=  ax1 * ay4 * part_values[:nval,i]
-        mesh[:nval,i2,j4] +=  ax2 * ay4 * part_values[:nval,i]
-        mesh[:nval,i3,j4] +=  ax3 * ay4 * part_values[:nval,i]
-        mesh[:nval,i4,j4] +=  ax4 * ay4 * part_values[:nval,i]
-    
-    return mesh
+    return interp_p2m_nd(Part, np.asarray(part_values)[:,:nval], [v1[:n1], v2[:n2]], kernel='mp4', bRegular=bRegular)
 
 
 def interp_m2p_mp4_2d(Part,nPart,mesh,nval,v1,v2,n1,n2,bRegular = None): 
@@ -310,59 +298,9 @@ def interp_m2p_mp4_2d(Part,nPart,mesh,nval,v1,v2,n1,n2,bRegular = None):
     i1   i2   i3   i4
      |    | .  |    |
     """
-    Part = np.transpose(Part)
-
     if (mesh.shape[0] != nval):
         raise Exception('Mesh has wrong size')
-    
-    if (Part.shape[1] != nPart):
-        print('Part has wrong size')
-    
-    part_values = np.zeros((nval,nPart))
-
-    ic   = np.array([0,0])
-    dc   = np.zeros(2)
-    xBox = np.zeros(2)
-    dBox = np.zeros(2)
-    xBox[0] = v1[0]
-    xBox[1] = v2[0]
-    dBox[0] = v1[1] - v1[0]
-    dBox[1] = v2[1] - v2[0]
-
-    if bRegular == 1:
-        fIndexX= lambda x: fCoordRegularGrid(x,xBox[0],dBox[0])
-        fIndexY= lambda y: fCoordRegularGrid(y,xBox[1],dBox[1])
-    else:
-        fIndexX = lambda x: fCoordRectilinearGrid(x,v1)
-        fIndexY = lambda x: fCoordRectilinearGrid(y,v2)
-
-    for i in np.arange(nPart):
-        # Coordinates and distance in grid index space (to nearest left grid point)
-        ic[0],dc[0] = fIndexX(Part[0,i])
-        ic[1],dc[1] = fIndexY(Part[1,i])
-        # Getting the M'4 kernel coefficients
-        ax1,ax2,ax3,ax4,i1,i2,i3,i4 = interp_coeff_mp4(ic[0],dc[0],n1)
-        ay1,ay2,ay3,ay4,j1,j2,j3,j4 = interp_coeff_mp4(ic[1],dc[1],n2)
-        # Combine 1D kernels into the 2D kernel and apply to the part
-        part_values[:nval,i] = ax1 * ay1 * mesh[:nval,i1,j1] +\
-                               ax2 * ay1 * mesh[:nval,i2,j1] +\
-                               ax3 * ay1 * mesh[:nval,i3,j1] +\
-                               ax4 * ay1 * mesh[:nval,i4,j1] +\
-                               ax1 * ay2 * mesh[:nval,i1,j2] +\
-                               ax2 * ay2 * mesh[:nval,i2,j2] +\
-                               ax3 * ay2 * mesh[:nval,i3,j2] +\
-                               ax4 * ay2 * mesh[:nval,i4,j2] +\
-                               ax1 * ay3 * mesh[:nval,i1,j3] +\
-                               ax2 * ay3 * mesh[:nval,i2,j3] +\
-                               ax3 * ay3 * mesh[:nval,i3,j3] +\
-                               ax4 * ay3 * mesh[:nval,i4,j3] +\
-                               ax1 * ay4 * mesh[:nval,i1,j4] +\
-                               ax2 * ay4 * mesh[:nval,i2,j4] +\
-                               ax3 * ay4 * mesh[:nval,i3,j4] +\
-                               ax4 * ay4 * mesh[:nval,i4,j4]
-
-    part_values = np.transpose(part_values)
-    return part_values
+    return interp_m2p_nd(Part, mesh, [v1[:n1], v2[:n2]], kernel='mp4', bRegular=bRegular)
 
 def interp_m2p_lambda3_2d(Part,nPart,mesh,nval,v1,v2,n1,n2,bRegular = None): 
     """
@@ -372,97 +310,34 @@ def interp_m2p_lambda3_2d(Part,nPart,mesh,nval,v1,v2,n1,n2,bRegular = None):
     part_values(npart, 1:nval)
     mesh(1:nval,n1,n2)
     """
-    Part = np.transpose(Part)
-
     if (mesh.shape[0] != nval):
         raise Exception('Mesh has wrong size')
-    
-    if (Part.shape[1] != nPart):
-        print('Part has wrong size')
-    
-    part_values = np.zeros((nval,nPart))
-
-    ic   = np.array([0,0])
-    dc   = np.zeros(2)
-    xBox = np.zeros(2)
-    dBox = np.zeros(2)
-    xBox[0] = v1[0]
-    xBox[1] = v2[0]
-    dBox[0] = v1[1] - v1[0]
-    dBox[1] = v2[1] - v2[0]
-
-    if bRegular == 1:
-        fIndexX= lambda x: fCoordRegularGrid(x,xBox[0],dBox[0])
-        fIndexY= lambda y: fCoordRegularGrid(y,xBox[1],dBox[1])
-    else:
-        fIndexX = lambda x: fCoordRectilinearGrid(x,v1)
-        fIndexY = lambda x: fCoordRectilinearGrid(y,v2)
-
-    for i in np.arange(nPart):
-        # Coordinates and distance in grid index space (to nearest left grid point)
-        ic[0],dc[0] = fIndexX(Part[0,i])
-        ic[1],dc[1] = fIndexY(Part[1,i])
-        # Getting the M'4 kernel coefficients
-        ax1,ax2,ax3,ax4,i1,i2,i3,i4 = interp_coeff_lambda3(ic[0],dc[0],n1)
-        ay1,ay2,ay3,ay4,j1,j2,j3,j4 = interp_coeff_lambda3(ic[1],dc[1],n2)
-        # Combine 1D kernels into the 2D kernel and apply to the part
-        part_values[:nval,i] = ax1 * ay1 * mesh[:nval,i1,j1] +\
-                               ax2 * ay1 * mesh[:nval,i2,j1] +\
-                               ax3 * ay1 * mesh[:nval,i3,j1] +\
-                               ax4 * ay1 * mesh[:nval,i4,j1] +\
-                               ax1 * ay2 * mesh[:nval,i1,j2] +\
-                               ax2 * ay2 * mesh[:nval,i2,j2] +\
-                               ax3 * ay2 * mesh[:nval,i3,j2] +\
-                               ax4 * ay2 * mesh[:nval,i4,j2] +\
-                               ax1 * ay3 * mesh[:nval,i1,j3] +\
-                               ax2 * ay3 * mesh[:nval,i2,j3] +\
-                               ax3 * ay3 * mesh[:nval,i3,j3] +\
-                               ax4 * ay3 * mesh[:nval,i4,j3] +\
-                               ax1 * ay4 * mesh[:nval,i1,j4] +\
-                               ax2 * ay4 * mesh[:nval,i2,j4] +\
-                               ax3 * ay4 * mesh[:nval,i3,j4] +\
-                               ax4 * ay4 * mesh[:nval,i4,j4]
-
-    part_values = np.transpose(part_values)
-    return part_values
+    return interp_m2p_nd(Part, mesh, [v1[:n1], v2[:n2]], kernel='lambda3', bRegular=bRegular)
 
 
 # --------------------------------------------------------------------------------}
 # --- High level functions 
 # --------------------------------------------------------------------------------{
 def interp_p2m(Part,nPart,n,v_p,nDim,v1,v2=None, v3=None, kernel='mp4', bRegular=None): 
-    nVal = v_p.shape[1]
-    if kernel=='mp4':
-        if nDim==2:
-            MeshValues = interp_p2m_mp4_2d(Part,nPart,v_p,nVal,v1,v2,n[0],n[1],bRegular)
-        else:
-            raise NotImplementedError('3d')
-    elif kernel=='lambda3':
-        if nDim==2:
-            raise NotImplementedError('p2m lambda3')
-            MeshValues = interp_p2m_lambda3_2d(Part,nPart,v_p,nVal,v1,v2,n[0],n[1],bRegular)
-        else:
-            raise NotImplementedError('3d')
-    else:
+    """ Particle to mesh projection, for 1D, 2D and 3D grids, mp4 or lambda3 kernels
+    Part: (nPart x nDim), v_p: (nPart x nVal), returns MeshValues: (nVal x n1 [x n2 [x n3]])
+    """
+    if kernel not in ['mp4', 'lambda3']:
         raise Exception('Unknown Interpolation kernel')
-    
+    v = [v1, v2, v3][:nDim]
+    v = [np.asarray(vv)[:nn] for vv,nn in zip(v, n)]
+    MeshValues = interp_p2m_nd(np.asarray(Part)[:nPart,:nDim], np.asarray(v_p)[:nPart], v, kernel=kernel, bRegular=bRegular)
     return MeshValues
 
 def interp_m2p(PartP,nPart,n,MeshValues,nDim,v1,v2=None,v3=None,kernel='mp4',bRegular=True):
-    nVal = MeshValues.shape[0]
-    if kernel=='mp4':
-        if nDim==2:
-            v_p = interp_m2p_mp4_2d(PartP,nPart,MeshValues,nVal,v1,v2,n[0],n[1],bRegular)
-        else:
-            raise NotImplementedError('3d')
-    elif kernel=='lambda3':
-        if nDim==2:
-            v_p = interp_m2p_lambda3_2d(PartP,nPart,MeshValues,nVal,v1,v2,n[0],n[1],bRegular)
-        else:
-            raise NotImplementedError('3d')
-    else:
+    """ Mesh to particle interpolation, for 1D, 2D and 3D grids, mp4 or lambda3 kernels
+    PartP: (nPart x nDim), MeshValues: (nVal x n1 [x n2 [x n3]]), returns v_p: (nPart x nVal)
+    """
+    if kernel not in ['mp4', 'lambda3']:
         raise Exception('Unknown Interpolation kernel')
-    
+    v = [v1, v2, v3][:nDim]
+    v = [np.asarray(vv)[:nn] for vv,nn in zip(v, n)]
+    v_p = interp_m2p_nd(np.asarray(PartP)[:nPart,:nDim], MeshValues, v, kernel=kernel, bRegular=bRegular)
     return v_p
 
 
@@ -474,11 +349,11 @@ def part2mesh(Part,mesh,kernel='mp4'):
     """ Project particles into a grid 
     NOTE: comes from fParticleProjection
     """
-    if mesh.nDim == 2:
+    if mesh.nDim <= 2:
         v_p = np.zeros((Part.nPart,2))
         v_p[:,0] = Part.Intensity
         v_p[:,1] = Part.Volume
-    elif mesh.nDim == 2:
+    elif mesh.nDim == 3:
         v_p = np.zeros((Part.nPart,4))
         v_p[:,:3] = Part.Intensity
         v_p[:, 3] = Part.Volume
@@ -587,6 +462,33 @@ class TestProjection(unittest.TestCase):
         v_p= interp_m2p_lambda3_2d(Part,nPart,mesh,nVal,v1,v2,n1,n2,bRegular)
         np.testing.assert_almost_equal(v_p, v_p_ref)
 
+    def test_nd(self):
+        # Vectorized coefficients same as scalar ones
+        a, i = interp_coeffs(np.array([2,0,3]), np.array([0.1,0.1,0.1]), 5, kernel='mp4')
+        np.testing.assert_almost_equal(a[0], interp_coeff_mp4(2,0.1,5)[:4])
+        np.testing.assert_equal(i[0], interp_coeff_mp4(2,0.1,5)[4:])
+        np.testing.assert_equal(a[1:], 0)
+        # Linear fields are interpolated exactly in 1D, 2D, 3D, on regular and rectilinear grids
+        np.random.seed(0)
+        v1 = np.linspace(0,1,10)
+        v2 = np.linspace(-1,1,12)
+        v3 = np.concatenate((np.linspace(0,1,6), [1.3,1.7,2.2,2.8]))
+        v  = [v1, v2, v3]
+        for nDim in [1,2,3]:
+            bRegular = nDim<3
+            X = np.meshgrid(*v[:nDim], indexing='ij')
+            mesh = np.stack([1+0*X[0], sum([(iDim+1)*X[iDim] for iDim in range(nDim)])])
+            Part = np.column_stack([np.random.uniform(vv[2], vv[-4], 50) for vv in v[:nDim]])
+            for kernel in ['mp4', 'lambda3']:
+                v_p = interp_m2p(Part, 50, mesh.shape[1:], mesh, nDim, *v[:nDim], kernel=kernel, bRegular=bRegular)
+                np.testing.assert_almost_equal(v_p[:,0], 1)
+                if bRegular:
+                    np.testing.assert_almost_equal(v_p[:,1], sum([(iDim+1)*Part[:,iDim] for iDim in range(nDim)]))
+                # Projection conserves the total
+                MeshValues = interp_p2m(Part, 50, mesh.shape[1:], np.ones((50,1)), nDim, *v[:nDim], kernel=kernel, bRegular=bRegular)
+                self.assertEqual(MeshValues.shape, (1,)+mesh.shape[1:])
+                np.testing.assert_almost_equal(MeshValues.sum(), 50)
+
     def test_m2p_p2m(self):
         # test mesh2p and then p2m should give the same
         # NOTE: still sound boundary effects
@@ -1,3 +1,5 @@
 from welib.vortilib.particles.projection          import *
 from welib.vortilib.particles.initialization      import *
 from welib.vortilib.particles.particles           import *
+from welib.vortilib.particles.treecode            import *
+from welib.vortilib.particles.vic                 import *
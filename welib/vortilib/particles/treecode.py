@@ -0,0 +1,210 @@
+"""
+Tree-code (Barnes-Hut) evaluation of the velocity induced by 3D vortex particles
+
+The particles are sorted in an octree. For each cell, the monopole (sum of intensities) and
+dipole moments are stored, relative to the cell center.
+A cell is used through its multipole expansion when it is seen from the control point
+under an "angle" smaller than theta:
+      radius_cell / distance < theta
+otherwise its children are visited, down to the leaves, where a direct summation is performed.
+The cost scales as O(N log N) instead of O(N^2), theta=0 is equivalent to the direct summation.
+
+Reference:
+    [1] J. Barnes, P. Hut - A hierarchical O(N log N) force-calculation algorithm, Nature, 1986
+"""
+import numpy as np
+import unittest
+from welib.vortilib.elements.VortexParticle import vps_u
+
+fourpi_inv = 1/(4*np.pi)
+
+# --------------------------------------------------------------------------------}
+# --- Octree
+# --------------------------------------------------------------------------------{
+class ParticleOctree():
+    """
+    Octree of vortex particles, with monopole and dipole moments for each cell.
+
+    The particles of a given cell are contiguous in the array `perm`:  perm[iStart[i]:iEnd[i]]
+    """
+    def __init__(self, Pv, Alpha, nLeafMax=32, maxDepth=30):
+        """
+        INPUTS:
+          Pv      : nP x 3 Position of vortex particles
+          Alpha   : nP x 3 Intensity of vortex particles
+          nLeafMax: maximum number of particles in a leaf cell
+          maxDepth: maximum depth of the tree (e.g. for coincident particles)
+        """
+        self.Pv    = np.asarray(Pv, dtype=float).reshape(-1,3)
+        self.Alpha = np.asarray(Alpha, dtype=float).reshape(-1,3)
+        self.nLeafMax = nLeafMax
+        self.maxDepth = maxDepth
+        self.build()
+
+    def build(self):
+        P = self.Pv
+        nP = P.shape[0]
+        self.perm = np.arange(nP)
+        center, radius, iStart, iEnd, children, A, D = [], [], [], [], [], [], []
+
+        def addNode(s, e, c, half, depth):
+            iNode = len(center)
+            I  = self.perm[s:e]
+            dP = P[I] - c
+            center.append(c)
+            radius.append(np.sqrt((dP**2).sum(axis=1).max()) if e>s else 0)
+            iStart.append(s)
+            iEnd.append(e)
+            A.append(self.Alpha[I].sum(axis=0))
+            D.append(self.Alpha[I].T.dot(dP))  # D_ab = sum alpha_a dP_b
+            children.append([])
+            if e-s<=self.nLeafMax or depth>=self.maxDepth:
+                return iNode
+            # Octant of each particle, particles are sorted by octant
+            code = (dP[:,0]>0) + 2*(dP[:,1]>0) + 4*(dP[:,2]>0)
+            iSort = np.argsort(code, kind='stable')
+            self.perm[s:e] = I[iSort]
+            counts = np.bincount(code, minlength=8)
+            sc = s
+            for iOct in range(8):
+                if counts[iOct]>0:
+                    sign = np.array([iOct&1, (iOct>>1)&1, (iOct>>2)&1])*2-1
+                    iChild = addNode(sc, sc+counts[iOct], c+sign*half/2, half/2, depth+1)
+                    children[iNode].append(iChild)
+                    sc += counts[iOct]
+            return iNode
+
+        if nP>0:
+            Pmin, Pmax = P.min(axis=0), P.max(axis=0)
+            addNode(0, nP, (Pmin+Pmax)/2, np.max(Pmax-Pmin)/2, 0)
+        self.center   = np.asarray(center).reshape(-1,3)
+        self.radius   = np.asarray(radius)
+        self.iStart   = np.asarray(iStart, dtype=int)
+        self.iEnd     = np.asarray(iEnd, dtype=int)
+        self.children = children
+        self.A        = np.asarray(A).reshape(-1,3)
+        self.D        = np.asarray(D).reshape(-1,3,3)
+
+    @property
+    def nNodes(self):
+        return len(self.children)
+
+    def u(self, CPs, RegFunction=0, RegParam=0, theta=0.5):
+        """ Induced velocity on control points
+
+        INPUTS:
+          CPs        : nCP x 3 control points
+          RegFunction: Regularization function (see VortexParticle.vp_u_raw):
+                       0: None
+                       1: Exponential
+                       2: Compact
+          RegParam   : scalar, regularization parameter
+          theta      : accuracy parameter, opening angle (radius/distance) below which
+                       the multipole expansion of a cell is used.
+        OUTPUTS:
+          u: (nCP x 3) velocity
+        """
+        CPs = np.asarray(CPs, dtype=float).reshape(-1,3)
+        if np.asarray(RegParam).size!=1:
+            raise Exception('Tree code only supports a scalar RegParam')
+        u = np.zeros(CPs.shape)
+        if self.nNodes==0:
+            return u
+        stack = [(0, np.arange(CPs.shape[0]))]
+        while len(stack)>0:
+            iNode, I = stack.pop()
+            d  = CPs[I] - self.center[iNode]
+            r  = np.sqrt(d[:,0]**2 + d[:,1]**2 + d[:,2]**2)
+            bFar = self.radius[iNode] < theta*r
+            if np.any(bFar):
+                u[I[bFar]] += self._multipole_u(iNode, d[bFar], r[bFar], RegFunction, RegParam)
+            I = I[~bFar]
+            if len(I)==0:
+                continue
+            if len(self.children[iNode])==0:
+                J = self.perm[self.iStart[iNode]:self.iEnd[iNode]]
+                u[I] += vps_u(CPs[I], self.Pv[J], self.Alpha[J], RegFunction=RegFunction, RegParam=RegParam)
+            else:
+                for iChild in self.children[iNode]:
+                    stack.append((iChild, I))
+        return u
+
+    def _multipole_u(self, iNode, d, r, RegFunction, RegParam):
+        """ Velocity from the monopole and dipole moments of a cell, at distances d=CP-center """
+        A = self.A[iNode]
+        D = self.D[iNode]
+        # Monopole, using the regularized kernel
+        if RegFunction==0:
+            ScalarPart = fourpi_inv/r**3
+        elif RegFunction==1:
+            ScalarPart = (1.-np.exp(-r**3/RegParam**3))/r**3*fourpi_inv
+        elif RegFunction==2:
+            ScalarPart = fourpi_inv/np.sqrt(RegParam**6+r**6)
+        else:
+            raise Exception('Wrong regularization function for particles {}'.format(RegFunction))
+        u = np.cross(A, d) * ScalarPart[:,None]
+        # Dipole, singular kernel:  - sum alpha x (grad K . dP)
+        w  = np.array([D[1,2]-D[2,1], D[2,0]-D[0,2], D[0,1]-D[1,0]]) # sum alpha x dP
+        Dd = d.dot(D.T)                                              # sum alpha (d.dP)
+        u += fourpi_inv * (- w[None,:]/r[:,None]**3 + 3*np.cross(Dd, d)/r[:,None]**5)
+        return u
+
+
+# --------------------------------------------------------------------------------}
+# --- Wrapper
+# --------------------------------------------------------------------------------{
+def vps_u_tree(CPs, Pv, Alpha, RegFunction=0, RegParam=0, theta=0.5, nLeafMax=32, method='tree'):
+    """ Induced velocity from nP vortex particles on nCP control points using a tree code
+
+    CPs   : nCP x 3
+    Pv    : nP x 3 Position of vortex particles
+    Alpha : nP x 3 Intensity of vortex particles
+    theta : accuracy parameter (see ParticleOctree.u), the smaller the more accurate
+    nLeafMax: maximum number of particles in a leaf cell
+    method: 'tree' or 'direct' (direct summation, for validation)
+
+    OUTPUTS:
+        u: (nCP x 3) velocity
+    """
+    if method=='direct':
+        return vps_u(CPs, Pv, Alpha, RegFunction=RegFunction, RegParam=RegParam)
+    elif method=='tree':
+        tree = ParticleOctree(Pv, Alpha, nLeafMax=nLeafMax)
+        return tree.u(CPs, RegFunction=RegFunction, RegParam=RegParam, theta=theta)
+    else:
+        raise NotImplementedError('Method {}'.format(method))
+
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class TestTreeCode(unittest.TestCase):
+    def test_tree_vs_direct(self):
+        np.random.seed(2)
+        nP    = 400
+        Pv    = np.random.uniform(-1,1,(nP,3))
+        Alpha = np.random.uniform(-1,1,(nP,3))/nP
+        for RegFunction in [0,1,2]:
+            u_ref = vps_u_tree(Pv, Pv, Alpha, RegFunction=RegFunction, RegParam=0.1, method='direct')
+            # theta=0 is a direct summation
+            u = vps_u_tree(Pv, Pv, Alpha, RegFunction=RegFunction, RegParam=0.1, theta=0, nLeafMax=10)
+            np.testing.assert_allclose(u, u_ref, rtol=1e-10, atol=1e-12)
+            # Error decreases with theta
+            errs = [np.linalg.norm(vps_u_tree(Pv, Pv, Alpha, RegFunction, 0.1, theta=theta, nLeafMax=10)-u_ref) for theta in [0.8, 0.4, 0.2]]
+            self.assertTrue(errs[0]>errs[1]>errs[2])
+            self.assertTrue(errs[2]<2e-2*np.linalg.norm(u_ref))
+
+    def test_multipole(self):
+        # Far from a cluster, the multipole error decreases as 1/R^3
+        np.random.seed(3)
+        Pv    = np.random.uniform(-0.5,0.5,(30,3))
+        Alpha = np.random.uniform(-1,1,(30,3))
+        tree  = ParticleOctree(Pv, Alpha, nLeafMax=100)
+        CP    = np.array([[4,1,0.5]])
+        u4    = tree.u(CP, theta=1) - vps_u(CP, Pv, Alpha)
+        u8    = tree.u(2*CP, theta=1) - vps_u(2*CP, Pv, Alpha)
+        np.testing.assert_array_less(np.linalg.norm(u8), np.linalg.norm(u4)/6)
+
+
+if __name__ == "__main__":
+    unittest.main()
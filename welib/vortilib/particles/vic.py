@@ -0,0 +1,302 @@
+"""
+2D Vortex-In-Cell (VIC) solver
+
+The particle vorticity is projected onto a regular mesh (welib.mesh.Mesh), the Poisson
+equation  Laplacian(psi) = -omega  is solved with FFTs for the velocity, which is then
+interpolated back onto the particles. The particles are convected with Runge-Kutta schemes
+and periodically remeshed onto the grid points, so that the number of particles is bounded by
+the grid size.
+
+Boundary conditions:
+  - 'periodic' : domain of period v[-1]-v[0] in each direction (first and last grid points coincide)
+  - 'freespace': unbounded domain, convolution with the Biot-Savart kernel on a doubled domain
+                 (Hockney-Eastwood). The vorticity needs to remain inside the mesh.
+
+Reference:
+    [1] R. Hockney, J. Eastwood - Computer simulation using particles, 1988
+    [2] G.-H. Cottet, P. Koumoutsakos - Vortex methods: theory and practice, 2000
+"""
+import numpy as np
+import unittest
+from welib.vortilib.particles.particles import Particles
+from welib.vortilib.particles.projection import interp_p2m_nd, interp_m2p_nd
+
+NPAD = 3 # Number of ghost cells for periodic projections
+
+# --------------------------------------------------------------------------------}
+# --- Poisson solvers
+# --------------------------------------------------------------------------------{
+def poisson_u_periodic_2d(omega, dx, dy):
+    """ Velocity from vorticity on a periodic grid, spectral solution of Laplacian(psi) = -omega
+    INPUTS:
+      omega: (n1 x n2) vorticity, on the unique grid points of the periodic domain
+      dx,dy: grid spacing
+    OUTPUTS:
+      u, v: (n1 x n2) velocity components, u=dpsi/dy, v=-dpsi/dx
+    """
+    n1, n2 = omega.shape
+    kx = 2*np.pi*np.fft.fftfreq(n1, dx)
+    ky = 2*np.pi*np.fft.rfftfreq(n2, dy)
+    KX, KY = np.meshgrid(kx, ky, indexing='ij')
+    k2 = KX**2 + KY**2
+    k2[0,0] = 1
+    psi_hat = np.fft.rfft2(omega)/k2
+    psi_hat[0,0] = 0
+    u = np.fft.irfft2( 1j*KY*psi_hat, s=(n1,n2))
+    v = np.fft.irfft2(-1j*KX*psi_hat, s=(n1,n2))
+    return u, v
+
+
+def biot_savart_kernel_fft_2d(n1, n2, dx, dy, epsilon=None):
+    """ FFT of the 2D Biot-Savart kernel on the doubled domain (2n1 x 2n2), for free-space convolution
+    The kernel is regularized with a Gaussian of radius epsilon (singular kernel, zero at r=0, if None)
+    OUTPUTS:
+      Kx_hat, Ky_hat: (2n1 x n2+1) real FFTs of the kernels, including the cell area dx*dy
+    """
+    x = np.concatenate((np.arange(n1), np.arange(-n1, 0)))*dx
+    y = np.concatenate((np.arange(n2), np.arange(-n2, 0)))*dy
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    r2 = X**2 + Y**2
+    r2[0,0] = 1
+    if epsilon is None:
+        f = 1/(2*np.pi*r2)
+    else:
+        f = (1-np.exp(-r2/epsilon**2))/(2*np.pi*r2)
+    f[0,0] = 0
+    Kx_hat = np.fft.rfft2(-Y*f*dx*dy)
+    Ky_hat = np.fft.rfft2( X*f*dx*dy)
+    return Kx_hat, Ky_hat
+
+
+def poisson_u_freespace_2d(omega, Kx_hat, Ky_hat):
+    """ Velocity from vorticity in free-space, convolution with the Biot-Savart kernel on a doubled domain
+    INPUTS:
+      omega         : (n1 x n2) vorticity
+      Kx_hat, Ky_hat: kernels FFTs, see biot_savart_kernel_fft_2d
+    OUTPUTS:
+      u, v: (n1 x n2) velocity components
+    """
+    n1, n2 = omega.shape
+    s = (2*n1, 2*n2)
+    omega_hat = np.fft.rfft2(omega, s=s) # zero padding
+    u = np.fft.irfft2(omega_hat*Kx_hat, s=s)[:n1,:n2]
+    v = np.fft.irfft2(omega_hat*Ky_hat, s=s)[:n1,:n2]
+    return u, v
+
+
+def _fold(a, axis, n):
+    """ Add the ghost cells of a padded periodic array back onto the n unique points """
+    a = np.moveaxis(a, axis, 0)
+    out = np.zeros((n,)+a.shape[1:])
+    np.add.at(out, (np.arange(a.shape[0])-NPAD) % n, a)
+    return np.moveaxis(out, 0, axis)
+
+
+# --------------------------------------------------------------------------------}
+# --- VIC
+# --------------------------------------------------------------------------------{
+class VIC2D():
+    """
+    2D Vortex-In-Cell solver on a regular welib.mesh.Mesh
+
+    Particles are stored in a welib.vortilib.particles.Particles object, with
+    Part.Intensity the circulation of each particle.
+    After each velocity evaluation, mesh.values contains [omega, u, v] on the grid points.
+    """
+    def __init__(self, mesh, bc='freespace', kernel='mp4', epsilon='dx'):
+        """
+        INPUTS:
+          mesh   : welib.mesh.Mesh, 2D and regular
+          bc     : boundary condition 'freespace' or 'periodic'
+          kernel : interpolation kernel for projections, 'mp4' or 'lambda3'
+          epsilon: regularization of the free-space kernel. 'dx': grid spacing, None: singular
+        """
+        if mesh.nDim!=2:
+            raise NotImplementedError('VIC only implemented in 2D')
+        if not mesh.bRegular:
+            raise Exception('VIC requires a regular mesh')
+        if bc not in ['freespace','periodic']:
+            raise NotImplementedError('Boundary condition {}'.format(bc))
+        self.mesh   = mesh
+        self.bc     = bc
+        self.kernel = kernel
+        self.v1 = np.asarray(mesh.v1, dtype=float)
+        self.v2 = np.asarray(mesh.v2, dtype=float)
+        self.dx = self.v1[1]-self.v1[0]
+        self.dy = self.v2[1]-self.v2[0]
+        if bc=='periodic':
+            # Unique points, and grid vectors padded with ghost cells
+            self.n  = (len(self.v1)-1, len(self.v2)-1)
+            self.L  = (self.v1[-1]-self.v1[0], self.v2[-1]-self.v2[0])
+            self.vp1 = self.v1[0] + self.dx*np.arange(-NPAD, self.n[0]+NPAD)
+            self.vp2 = self.v2[0] + self.dy*np.arange(-NPAD, self.n[1]+NPAD)
+        else:
+            self.n  = (len(self.v1), len(self.v2))
+            if epsilon=='dx':
+                epsilon = max(self.dx, self.dy)
+            self.Kx_hat, self.Ky_hat = biot_savart_kernel_fft_2d(self.n[0], self.n[1], self.dx, self.dy, epsilon)
+
+    def wrap(self, P):
+        """ Bring particles positions inside the periodic domain """
+        if self.bc=='periodic':
+            P = P.copy()
+            P[:,0] = self.v1[0] + np.mod(P[:,0]-self.v1[0], self.L[0])
+            P[:,1] = self.v2[0] + np.mod(P[:,1]-self.v2[0], self.L[1])
+        return P
+
+    def p2m(self, P, Gamma):
+        """ Vorticity on the grid, (n1 x n2), from particles positions and circulations """
+        Gamma = np.asarray(Gamma).reshape(-1,1)
+        if self.bc=='periodic':
+            m = interp_p2m_nd(self.wrap(P), Gamma, [self.vp1, self.vp2], kernel=self.kernel)[0]
+            m = _fold(_fold(m, 0, self.n[0]), 1, self.n[1])
+        else:
+            m = interp_p2m_nd(P, Gamma, [self.v1, self.v2], kernel=self.kernel)[0]
+        return m/(self.dx*self.dy)
+
+    def solve(self, omega):
+        """ Velocity on the grid, (n1 x n2), from the vorticity on the grid """
+        if self.bc=='periodic':
+            return poisson_u_periodic_2d(omega, self.dx, self.dy)
+        else:
+            return poisson_u_freespace_2d(omega, self.Kx_hat, self.Ky_hat)
+
+    def m2p(self, P, u, v):
+        """ Interpolate grid velocity onto particles, returns (nPart x 2) """
+        if self.bc=='periodic':
+            UV = np.pad(np.stack((u,v)), ((0,0),(NPAD,NPAD),(NPAD,NPAD)), mode='wrap')
+            return interp_m2p_nd(self.wrap(P), UV, [self.vp1, self.vp2], kernel=self.kernel)
+        else:
+            return interp_m2p_nd(P, np.stack((u,v)), [self.v1, self.v2], kernel=self.kernel)
+
+    def velocity(self, P, Gamma):
+        """ Velocity (nPart x 2) induced by all particles on the particles """
+        omega = self.p2m(P, Gamma)
+        u, v  = self.solve(omega)
+        values = np.stack((omega, u, v))
+        if self.bc=='periodic':
+            # Store values on all grid points, first and last points coincide
+            values = np.pad(values, ((0,0),(0,1),(0,1)), mode='wrap')
+        self.mesh.values = values
+        return self.m2p(P, u, v)
+
+    def step(self, Part, dt, scheme='RK2'):
+        """ Convect the particles over one time step (inviscid, circulations are unchanged)
+        scheme: 'Euler', 'RK2' (Heun) or 'RK4'
+        """
+        P, G = Part.P, Part.Intensity
+        if scheme=='Euler':
+            Pnew = P + dt*self.velocity(P, G)
+        elif scheme=='RK2':
+            k1 = self.velocity(P, G)
+            k2 = self.velocity(P + dt*k1, G)
+            Pnew = P + dt/2*(k1+k2)
+        elif scheme=='RK4':
+            k1 = self.velocity(P, G)
+            k2 = self.velocity(P + dt/2*k1, G)
+            k3 = self.velocity(P + dt/2*k2, G)
+            k4 = self.velocity(P + dt*k3, G)
+            Pnew = P + dt/6*(k1+2*k2+2*k3+k4)
+        else:
+            raise NotImplementedError('Time integration scheme {}'.format(scheme))
+        Part.P = self.wrap(Pnew)
+
+    def init_from_fun(self, fOmega, threshold=1e-12):
+        """ Particles at the grid points, with circulation omega*dx*dy, from a vorticity function fOmega(X,Y).
+        Grid points with |omega| below threshold*max(|omega|) are discarded.
+        """
+        X, Y  = np.meshgrid(self.v1[:self.n[0]], self.v2[:self.n[1]], indexing='ij')
+        Part  = Particles(nPart=X.size, nDim=2)
+        Part.P[:,0] = X.ravel()
+        Part.P[:,1] = Y.ravel()
+        Part.Intensity = fOmega(X, Y).ravel()*self.dx*self.dy
+        return self.remesh(Part, threshold=threshold, bProject=False)
+
+    def remesh(self, Part, threshold=1e-12, bProject=True):
+        """ Replace the particles by particles on the grid points, with the projected circulation.
+        Grid points with |omega| below threshold*max(|omega|) are discarded.
+        bProject: if False, the particles are assumed to be on all the grid points already
+        """
+        if bProject:
+            omega = self.p2m(Part.P, Part.Intensity)
+        else:
+            # Particles are already on the grid points
+            omega = Part.Intensity.reshape(self.n)/(self.dx*self.dy)
+        X, Y  = np.meshgrid(self.v1[:self.n[0]], self.v2[:self.n[1]], indexing='ij')
+        b     = np.abs(omega) > threshold*np.max(np.abs(omega))
+        if self.bc=='freespace':
+            # Interpolation kernels are zero near the boundaries, see projection.interp_coeffs
+            b[:1,:] = False; b[-2:,:] = False
+            b[:,:1] = False; b[:,-2:] = False
+        nPart = np.sum(b)
+        Part.reset(nPart)
+        Part.P[:,0]    = X[b]
+        Part.P[:,1]    = Y[b]
+        Part.Intensity = omega[b]*self.dx*self.dy
+        Part.Volume[:] = self.dx*self.dy
+        return Part
+
+    def run(self, Part, dt, nSteps, scheme='RK2', remeshEvery=1, threshold=1e-12, callback=None):
+        """ Time loop, remeshing every `remeshEvery` steps (no remeshing if 0)
+        callback: function called as callback(it, t, Part) after each step
+        """
+        for it in range(nSteps):
+            self.step(Part, dt, scheme=scheme)
+            if remeshEvery>0 and (it+1) % remeshEvery == 0:
+                self.remesh(Part, threshold=threshold)
+            if callback is not None:
+                callback(it, (it+1)*dt, Part)
+        return Part
+
+
+# --------------------------------------------------------------------------------}
+# --- TESTS
+# --------------------------------------------------------------------------------{
+class TestVIC(unittest.TestCase):
+    def test_periodic_poisson(self):
+        n = 32
+        x = np.arange(n)*2*np.pi/n
+        X, Y = np.meshgrid(x, x, indexing='ij')
+        # psi = sin(x) sin(2y), omega = 5 psi
+        omega = 5*np.sin(X)*np.sin(2*Y)
+        u, v = poisson_u_periodic_2d(omega, x[1], x[1])
+        np.testing.assert_allclose(u,  2*np.sin(X)*np.cos(2*Y), atol=1e-12)
+        np.testing.assert_allclose(v, -np.cos(X)*np.sin(2*Y), atol=1e-12)
+
+    def test_freespace_lambOseen(self):
+        from welib.mesh.mesh import Mesh
+        from welib.vortilib.elements.LambOseen import lo_omega, lo_u
+        v   = np.linspace(-2, 2, 81)
+        vic = VIC2D(Mesh(v, v), bc='freespace')
+        Part = vic.init_from_fun(lambda X,Y: lo_omega(X, Y, Gamma=1, t=0.01, nu=1))
+        np.testing.assert_almost_equal(np.sum(Part.Intensity), 1, 6)
+        U = vic.velocity(Part.P, Part.Intensity)
+        u_th, v_th = lo_u(Part.P[:,0], Part.P[:,1], Gamma=1, t=0.01, nu=1)
+        err = np.sqrt(np.mean((U[:,0]-u_th)**2 + (U[:,1]-v_th)**2))/np.max(np.sqrt(u_th**2+v_th**2))
+        self.assertTrue(err<2e-2)
+        # The Lamb-Oseen vortex is a steady solution of Euler equations
+        vic.run(Part, dt=0.05, nSteps=2, scheme='RK2', remeshEvery=1)
+        np.testing.assert_almost_equal(np.sum(Part.Intensity), 1, 6)
+        omega = vic.mesh.values[0]
+        X, Y  = np.meshgrid(v, v, indexing='ij')
+        np.testing.assert_almost_equal(np.sum(omega*X)/np.sum(omega), 0, 3)
+
+    def test_periodic_conservation(self):
+        from welib.mesh.mesh import Mesh
+        v    = np.linspace(0, 2*np.pi, 33)
+        vic  = VIC2D(Mesh(v, v), bc='periodic')
+        # Taylor-Green vortex, steady solution
+        Part = vic.init_from_fun(lambda X,Y: 2*np.sin(X)*np.sin(Y))
+        U    = vic.velocity(Part.P, Part.Intensity)
+        np.testing.assert_allclose(U[:,0],  np.sin(Part.P[:,0])*np.cos(Part.P[:,1]), atol=1e-10)
+        np.testing.assert_allclose(U[:,1], -np.cos(Part.P[:,0])*np.sin(Part.P[:,1]), atol=1e-10)
+        # Conservation of circulation with a non zero mean vorticity
+        Part = vic.init_from_fun(lambda X,Y: np.sin(X)*np.sin(Y)+1)
+        G0   = np.sum(Part.Intensity)
+        vic.run(Part, dt=0.1, nSteps=3, scheme='RK4', remeshEvery=2)
+        np.testing.assert_almost_equal(np.sum(Part.Intensity), G0, 8)
+        self.assertTrue(np.all(Part.P[:,0]>=v[0]) and np.all(Part.P[:,0]<v[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
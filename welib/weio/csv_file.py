@@ -229,6 +229,8 @@ class CSVFile(File):
         if (self.commentLines is not None) and len(self.commentLines)>0:
             skiprows = skiprows + self.commentLines
         skiprows =list(sorted(set(skiprows)))
+        if skiprows==list(range(len(skiprows))):
+            skiprows = len(skiprows) # contiguous header, faster for the parser than a list of rows
         if self.sep is not None:
             if self.sep=='\t':
                 self.sep=r'\s+'
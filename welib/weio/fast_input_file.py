@@ -116,6 +116,9 @@ class FASTInputFile(File):
     def toString(self):
         return self.fixedfile.toString()
 
+    def toStringForWrite(self):
+        return self.fixedfile.toStringForWrite()
+
     def keys(self):
         return self.fixedfile.keys()
 
@@ -848,10 +851,15 @@ class FASTInputFileBase(File):
         """ Sanity checks before write"""
         pass
 
-    def _write(self):
+    def toStringForWrite(self):
+        """ Content of the file as written by `write`, after sanity checks. Subclasses may override it """
         self._writeSanityChecks()
+        return self.toString()
+
+    def _write(self):
+        content = self.toStringForWrite()
         with open(self.filename,'w') as f:
-            f.write(self.toString())
+            f.write(content)
 
     def toDataFrame(self):
         return self._toDataFrame()
@@ -1823,10 +1831,10 @@ class ADPolarFile(FASTInputFileBase):
                 self['NumAlf'+labOffset] = self['AFCoeff'+labOffset].shape[0]
         # Potentially compute unsteady params here
 
-    def _write(self):
+    def toStringForWrite(self):
         nTabs = self['NumTabs']
         if nTabs==1:
-            FASTInputFileBase._write(self)
+            return FASTInputFileBase.toStringForWrite(self)
         else:
             self._writeSanityChecks()
             Labs=['Re','Ctrl','UserProp','alpha0','alpha1','alpha2','eta_e','C_nalpha','T_f0','T_V0','T_p','T_VL','b1','b2','b5','A1','A2','A5','S1','S2','S3','S4','Cn1','Cn2','St_sh','Cd0','Cm0','k0','k1','k2','k3','k1_hat','x_cp_bar','UACutout','filtCutOff','InclUAdata','NumAlf','AFCoeff']
@@ -1839,12 +1847,11 @@ class ADPolarFile(FASTInputFileBase):
                     i = self.getIDSafe(labRaw+labOffset)
                     if i>0:
                         self.data[i]['label'] = labRaw
-            # Write
-            with open(self.filename,'w') as f:
-                f.write(self.toString())
+            content = self.toString()
             # Restore labels 
             for i,labFull in enumerate(AllLabels):
                 self.data[i]['label'] = labFull
+            return content
 
     def _toDataFrame(self):
         dfs = FASTInputFileBase._toDataFrame(self)
@@ -4,18 +4,21 @@ Tools to read/write OpenFAST output files
 Main content:
 
 - class FASTOutputFile()
-- data, info = def load_output(filename)
-- data, info = def load_ascii_output(filename)
-- data, info = def load_binary_output(filename, use_buffer=True)
+- data, info = def load_output(filename, channels=None, tmin=None, tmax=None)
+- data, info = def load_ascii_output(filename, channels=None, tmin=None, tmax=None)
+- for data, info in iter_ascii_output(filename, nRowsPerBlock=100000): streaming read by blocks of rows
+- data, info = def load_binary_output(filename, use_buffer=True, iCols=None, iRows=None, channels=None, tmin=None, tmax=None)
+- class BinaryOutputView(): lazy, memory-mapped access to the data of a binary file
 - def writeDataFrame(df, filename, binary=True)
 - def writeBinary(fileName, channels, chanNames, chanUnits, fileID=2, descStr='')
 """
-from itertools import takewhile
+from itertools import takewhile, islice
 import numpy as np
 import pandas as pd
 import struct
 import os
 import re
+import warnings
 try:
     from .file import File, WrongFormatError, BrokenReaderError, EmptyFileError, BrokenFormatError
 except:
@@ -59,6 +62,9 @@ class FASTOutputFile(File):
         df['Time_[s]'] -=100
         f.writeDataFrame(df, '5MW_TimeShifted.outb')
 
+        # read only some channels (names or regular expressions), within a time window
+        f = FASTOutputFile('5MW.outb', channels=['RotSpeed', 'BldPitch1_[deg]', 'AB1N0[0-9]*Alpha'], tmin=100, tmax=200)
+
     """
 
     @staticmethod
@@ -76,7 +82,14 @@ class FASTOutputFile(File):
             self.read(**kwargs)
 
     def read(self, filename=None, **kwargs):
-        """ Reads the file self.filename, or `filename` if provided """
+        """ Reads the file self.filename, or `filename` if provided 
+
+        Optional keyword arguments, used to read only part of the file:
+          - channels: list of channel names or regular expressions, matched against the 
+                      channel names with or without units (e.g. 'RotSpeed', 'RotSpeed_[rpm]', 'AB1N.*Alpha').
+                      The time column is always included. Default: None, all channels are read.
+          - tmin, tmax: time window to read. Default: None, all times are read.
+        """
         
         # --- Standard tests and exceptions (generic code)
         if filename:
@@ -90,7 +103,7 @@ class FASTOutputFile(File):
         # --- Calling (children) function to read
         self._read(**kwargs)
 
-    def _read(self):
+    def _read(self, channels=None, tmin=None, tmax=None):
         def readline(iLine):
             with open(self.filename) as f:
                 for i, line in enumerate(f):
@@ -104,9 +117,9 @@ class FASTOutputFile(File):
         self['binary']=False
         try:
             if ext in ['.out','.elev','.dbg','.dbg2']:
-                self.data, self.info = load_ascii_output(self.filename)
+                self.data, self.info = load_ascii_output(self.filename, channels=channels, tmin=tmin, tmax=tmax)
             elif ext=='.outb':
-                self.data, self.info = load_binary_output(self.filename)
+                self.data, self.info = load_binary_output(self.filename, channels=channels, tmin=tmin, tmax=tmax)
                 self['binary']=True
             elif ext=='.elm':
                 F=CSVFile(filename=self.filename, sep=' ', commentLines=[0,2],colNamesLine=1)
@@ -114,8 +127,16 @@ class FASTOutputFile(File):
                 del F
                 self.info['attribute_units']=readline(3).replace('sec','s').split()
                 self.info['attribute_names']=self.data.columns.values
+                if channels is not None or tmin is not None or tmax is not None:
+                    # Selection done after reading for this format
+                    iCols = None if channels is None else _channelIndices(self.info['attribute_names'], self.info['attribute_units'], channels)
+                    iRows = _timeMask(self.data.iloc[:,0].values, tmin, tmax)
+                    self.data = self.data.iloc[slice(None) if iRows is None else iRows, slice(None) if iCols is None else iCols]
+                    if iCols is not None:
+                        self.info['attribute_names'] = self.data.columns.values
+                        self.info['attribute_units'] = [self.info['attribute_units'][i] for i in iCols]
             else:
-                self.data, self.info = load_output(self.filename)
+                self.data, self.info = load_output(self.filename, channels=channels, tmin=tmin, tmax=tmax)
         except MemoryError as e:    
             raise BrokenReaderError('FAST Out File {}: Memory error encountered\n{}'.format(self.filename,e))
         except Exception as e:    
@@ -177,13 +198,56 @@ class FASTOutputFile(File):
 # --------------------------------------------------------------------------------
 # --- Helper low level functions 
 # --------------------------------------------------------------------------------
-def load_output(filename):
+def _channelIndices(names, units, channels):
+    """ 
+    Return the sorted indices of the columns whose name matches one of `channels`.
+    A channel matches if it is equal to, or matches the regular expression, of either the 
+    column name (e.g. 'RotSpeed') or the column name with unit (e.g. 'RotSpeed_[rpm]').
+    The first column (time) is always included.
+    """
+    if isinstance(channels, str):
+        channels = [channels]
+    patterns = []
+    for c in channels:
+        try:
+            patterns.append(re.compile(c))
+        except re.error:
+            patterns.append(None)
+    if units is None or len(units)!=len(names):
+        units = [None]*len(names)
+    I = [0]
+    for i, (n, u) in enumerate(zip(names, units)):
+        if i==0:
+            continue
+        labels = [n] if u is None else [n, n+'_['+re.sub(r'[()\[\]]','',u).replace('sec','s')+']']
+        for c, p in zip(channels, patterns):
+            if any([l==c or (p is not None and p.fullmatch(l) is not None) for l in labels]):
+                I.append(i)
+                break
+    return I
+
+def _timeMask(time, tmin=None, tmax=None):
+    """ Return a boolean mask of the times within [tmin, tmax], or None if no bounds are given """
+    if tmin is None and tmax is None:
+        return None
+    b = np.ones(len(time), dtype=bool)
+    if tmin is not None:
+        b &= time>=tmin
+    if tmax is not None:
+        b &= time<=tmax
+    return b
+
+def load_output(filename, channels=None, tmin=None, tmax=None):
     """Load a FAST binary or ascii output file
 
     Parameters
     ----------
     filename : str
         filename
+    channels : list of str, optional
+        channel names or regular expressions to read (time is always read)
+    tmin, tmax : float, optional
+        time window to read
 
     Returns
     -------
@@ -202,40 +266,122 @@ def load_output(filename):
         try:
             f.readline()
         except UnicodeDecodeError:
-            return load_binary_output(filename)
-    return load_ascii_output(filename)
+            return load_binary_output(filename, channels=channels, tmin=tmin, tmax=tmax)
+    return load_ascii_output(filename, channels=channels, tmin=tmin, tmax=tmax)
+
+def _read_ascii_header(f, filename, channels=None):
+    """ 
+    Read the header of an ascii output file, `f` is left at the beginning of the data.
+    Returns the info dictionary, and the indices of the selected `channels` (None if all are selected)
+    """
+    info = {}
+    info['name'] = os.path.splitext(os.path.basename(filename))[0]
+    # Header is whatever is before the keyword `time`
+    in_header = True
+    header = []
+    while in_header:
+        l = f.readline()
+        if not l:
+            raise Exception('Error finding the end of FAST out file header. Keyword Time missing.')
+        first_word = (l+' dummy').lower().split()[0]
+        in_header=  (first_word != 'time') and  (first_word != 'alpha')
+        if in_header:
+            header.append(l)
+        else:
+            info['description'] = header
+            info['attribute_names'] = l.split()
+            info['attribute_units'] = [unit[1:-1] for unit in f.readline().split()]
+    iCols = None
+    if channels is not None:
+        iCols = _channelIndices(info['attribute_names'], info['attribute_units'], channels)
+        info['attribute_names'] = [info['attribute_names'][i] for i in iCols]
+        info['attribute_units'] = [info['attribute_units'][i] for i in iCols if i<len(info['attribute_units'])]
+    return info, iCols
+
+# np.loadtxt is implemented in C from numpy 1.23, it is then the fastest option to convert row blocks
+_NP_LOADTXT_IN_C = tuple([int(v) for v in re.findall(r'\d+', np.__version__)[:2]]) >= (1, 23)
+
+def _parse_ascii_block(lines):
+    """ 
+    Convert a list of lines containing a whitespace separated numerical table to a 2D array.
+    The bulk conversion is done with `np.fromstring`. If the lines contain anything else than
+    a regular table (comments, empty lines, missing values), `np.loadtxt` is used instead.
+    """
+    nCols = len(lines[0].split())
+    if nCols>0:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error') # np.fromstring warns when it cannot parse the full string
+            try:
+                data = np.fromstring(''.join(lines), sep=' ')
+                if data.size==len(lines)*nCols:
+                    return data.reshape(len(lines), nCols)
+            except (DeprecationWarning, ValueError):
+                pass
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore') # empty blocks
+        return np.loadtxt(lines, comments=('This'), ndmin=2) # Adding "This" for the Hydro Out files..
+
+def iter_ascii_output(filename, nRowsPerBlock=100000, channels=None, tmin=None, tmax=None):
+    """ 
+    Read a FAST ascii output file by blocks of rows, for files that do not fit in memory.
+    Yields tuples (data, info), where data is a block of at most `nRowsPerBlock` rows (2D array).
 
-def load_ascii_output(filename):
+    INPUTS:
+     - nRowsPerBlock: number of rows read and converted at once
+     - channels, tmin, tmax: see `load_ascii_output`. Reading stops at the first block after tmax.
+    """
     with open(filename) as f:
-        info = {}
-        info['name'] = os.path.splitext(os.path.basename(filename))[0]
-        # Header is whatever is before the keyword `time`
-        in_header = True
-        header = []
-        while in_header:
-            l = f.readline()
-            if not l:
-                raise Exception('Error finding the end of FAST out file header. Keyword Time missing.')
-            first_word = (l+' dummy').lower().split()[0]
-            in_header=  (first_word != 'time') and  (first_word != 'alpha')
-            if in_header:
-                header.append(l)
+        info, iCols = _read_ascii_header(f, filename, channels)
+        while True:
+            if _NP_LOADTXT_IN_C:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore') # end of file
+                    data = np.loadtxt(f, comments=('This'), max_rows=nRowsPerBlock, ndmin=2, usecols=iCols) # Adding "This" for the Hydro Out files..
             else:
-                info['description'] = header
-                info['attribute_names'] = l.split()
-                info['attribute_units'] = [unit[1:-1] for unit in f.readline().split()]
-        # ---
-        # Data, up to end of file or empty line (potential comment line at the end)
-#         data = np.array([l.strip().split() for l in takewhile(lambda x: len(x.strip())>0, f.readlines())]).astype(np.float)
-        # ---
-        data = np.loadtxt(f, comments=('This')) # Adding "This" for the Hydro Out files..
-        return data, info
-
-
-def load_binary_output(filename, use_buffer=True):
+                lines = list(islice(f, nRowsPerBlock))
+                if len(lines)==0:
+                    break
+                data = _parse_ascii_block(lines)
+                if iCols is not None and data.shape[0]>0:
+                    data = data[:, iCols]
+            if data.shape[0]==0:
+                if _NP_LOADTXT_IN_C:
+                    break
+                continue
+            iRows = _timeMask(data[:,0], tmin, tmax)
+            if iRows is not None:
+                if tmax is not None and data[0,0]>tmax:
+                    break
+                data = data[iRows]
+            yield data, info
+
+def load_ascii_output(filename, channels=None, tmin=None, tmax=None, nRowsPerBlock=100000):
+    """ 
+    Load a FAST ascii output file.
+    If `channels` is provided, only the selected columns are kept (see `_channelIndices`).
+    If `tmin` or `tmax` are provided, only the rows within the time window are returned.
+    The file is read and converted by blocks of rows (see `iter_ascii_output`).
+    """
+    blocks = []
+    info   = None
+    for data, info in iter_ascii_output(filename, nRowsPerBlock=nRowsPerBlock, channels=channels, tmin=tmin, tmax=tmax):
+        blocks.append(data)
+    if info is None:
+        # No data, we still read the header
+        with open(filename) as f:
+            info, _ = _read_ascii_header(f, filename, channels)
+        return np.zeros((0, len(info['attribute_names']))), info
+    if len(blocks)==1:
+        return blocks[0], info
+    return np.concatenate(blocks, axis=0), info
+
+
+def _read_binary_header(filename):
     """
+    Read the header of an OpenFAST binary file.
+    Returns a dictionary with the header values, and `offset` the position (in bytes) of the packed data 
+
     03/09/15: Ported from ReadFASTbinary.m by Mads M Pedersen, DTU Wind
-    24/10/18: Low memory/buffered version by E. Branlard, NREL
     18/01/19: New file format for exctended channels, by E. Branlard, NREL
 
     Info about ReadFASTbinary.m:
@@ -248,49 +394,8 @@ def load_binary_output(filename, use_buffer=True):
         fmt, nbytes = {'uint8': ('B', 1), 'int16':('h', 2), 'int32':('i', 4), 'float32':('f', 4), 'float64':('d', 8)}[type]
         return struct.unpack(fmt * n, fid.read(nbytes * n))
 
-    def freadRowOrderTableBuffered(fid, n, type_in, nCols, nOff=0, type_out='float64'):
-        """ 
-        Reads of row-ordered table from a binary file.
-
-        Read `n` data of type `type_in`, assumed to be a row ordered table of `nCols` columns.
-        Memory usage is optimized by allocating the data only once.
-        Buffered reading is done for improved performances (in particular for 32bit python)
-
-        `nOff` allows for additional column space at the begining of the storage table.
-        Typically, `nOff=1`, provides a column at the beginning to store the time vector.
-
-        @author E.Branlard, NREL
-
-        """
-        fmt, nbytes = {'uint8': ('B', 1), 'int16':('h', 2), 'int32':('i', 4), 'float32':('f', 4), 'float64':('d', 8)}[type_in]
-        nLines          = int(n/nCols)
-        GoodBufferSize  = 4096*40
-        nLinesPerBuffer = int(GoodBufferSize/nCols)
-        BufferSize      = nCols * nLinesPerBuffer
-        nBuffer         = int(n/BufferSize)
-        # Allocation of data
-        data = np.zeros((nLines,nCols+nOff), dtype = type_out)
-        # Reading
-        try:
-            nIntRead   = 0
-            nLinesRead = 0
-            while nIntRead<n:
-                nIntToRead = min(n-nIntRead, BufferSize)
-                nLinesToRead = int(nIntToRead/nCols)
-                Buffer = np.array(struct.unpack(fmt * nIntToRead, fid.read(nbytes * nIntToRead)))
-                Buffer = Buffer.reshape(-1,nCols)
-                data[ nLinesRead:(nLinesRead+nLinesToRead),  nOff:(nOff+nCols)  ] = Buffer
-                nLinesRead = nLinesRead + nLinesToRead
-                nIntRead   = nIntRead   + nIntToRead
-        except:
-            raise Exception('Read only %d of %d values in file:' % (nIntRead, n, filename))
-        return data
-
+    H = {}
     with open(filename, 'rb') as fid:
-        #----------------------------        
-        # get the header information
-        #----------------------------
-
         FileID = fread(fid, 1, 'int16')[0]  #;             % FAST output file format, INT(2)
 
         if FileID not in [FileFmtID_WithTime, FileFmtID_WithoutTime, FileFmtID_NoCompressWithoutTime, FileFmtID_ChanLen_In]:
@@ -305,18 +410,18 @@ def load_binary_output(filename, use_buffer=True):
         NT = fread(fid, 1, 'int32')[0]  #;             % The number of time steps, INT(4)
 
         if FileID == FileFmtID_WithTime:
-            TimeScl = fread(fid, 1, 'float64')  #;           % The time slopes for scaling, REAL(8)
-            TimeOff = fread(fid, 1, 'float64')  #;           % The time offsets for scaling, REAL(8)
+            H['TimeScl'] = fread(fid, 1, 'float64')[0]  #;           % The time slopes for scaling, REAL(8)
+            H['TimeOff'] = fread(fid, 1, 'float64')[0]  #;           % The time offsets for scaling, REAL(8)
         else:
-            TimeOut1 = fread(fid, 1, 'float64')  #;           % The first time in the time series, REAL(8)
-            TimeIncr = fread(fid, 1, 'float64')  #;           % The time increment, REAL(8)
+            H['TimeOut1'] = fread(fid, 1, 'float64')[0]  #;           % The first time in the time series, REAL(8)
+            H['TimeIncr'] = fread(fid, 1, 'float64')[0]  #;           % The time increment, REAL(8)
 
         if FileID == FileFmtID_NoCompressWithoutTime:
-            ColScl = np.ones ((NumOutChans, 1)) # The channel slopes for scaling, REAL(4)
-            ColOff = np.zeros((NumOutChans, 1)) # The channel offsets for scaling, REAL(4)
+            ColScl = np.ones (NumOutChans) # The channel slopes for scaling, REAL(4)
+            ColOff = np.zeros(NumOutChans) # The channel offsets for scaling, REAL(4)
         else:
-            ColScl = fread(fid, NumOutChans, 'float32')  # The channel slopes for scaling, REAL(4)
-            ColOff = fread(fid, NumOutChans, 'float32')  # The channel offsets for scaling, REAL(4)
+            ColScl = np.array(fread(fid, NumOutChans, 'float32'))  # The channel slopes for scaling, REAL(4)
+            ColOff = np.array(fread(fid, NumOutChans, 'float32'))  # The channel offsets for scaling, REAL(4)
 
         LenDesc      = fread(fid, 1, 'int32')[0]  #;  % The number of characters in the description string, INT(4)
         DescStrASCII = fread(fid, LenDesc, 'uint8')  #;  % DescStr converted to ASCII
@@ -331,65 +436,154 @@ def load_binary_output(filename, use_buffer=True):
         for iChan in range(NumOutChans + 1):
             ChanUnitASCII = fread(fid, LenName, 'uint8')  #; % ChanUnit converted to numeric ASCII
             ChanUnit.append("".join(map(chr, ChanUnitASCII)).strip()[1:-1])
+        H['offset'] = fid.tell()
 
-        # -------------------------
-        #  get the channel time series
-        # -------------------------
+    H.update({'FileID':FileID, 'NumOutChans':NumOutChans, 'NT':NT, 'ColScl':ColScl, 'ColOff':ColOff,
+              'DescStr':DescStr, 'ChanName':ChanName, 'ChanUnit':ChanUnit})
+    return H
 
-        nPts = NT * NumOutChans  #;           % number of data points in the file
 
+class BinaryOutputView(object):
+    """ 
+    Lazy, memory-mapped view on the data of an OpenFAST binary file (.outb).
+
+    The packed data (int16, or float64 for uncompressed files) is exposed without copy using `np.memmap`.
+    Channels are scaled to float64 only on demand, for the requested rows and columns.
+    Column 0 is the time vector, columns 1..NumOutChans are the output channels, as in `load_binary_output`.
+
+    Examples
+    --------
+
+        v = BinaryOutputView('5MW.outb')
+        time  = v.time
+        Omega = v.column(v.info['attribute_names'].index('RotSpeed'))
+        data  = v.toArray(iCols=[0,3,4], iRows=slice(0,1000))
+
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        H = _read_binary_header(filename)
+        self.header = H
+        FileID, NT, nChan = H['FileID'], H['NT'], H['NumOutChans']
+        self.info = {'name': os.path.splitext(os.path.basename(filename))[0],
+                     'description': H['DescStr'],
+                     'fileID': FileID,
+                     'attribute_names': H['ChanName'],
+                     'attribute_units': H['ChanUnit']}
+        # Scaling, with convention that channels with NaN scaling are set to 0
+        self.ColScl = H['ColScl'].astype(np.float64)
+        self.ColOff = H['ColOff'].astype(np.float64)
+        self.ColNaN = np.logical_and(np.isnan(self.ColScl), np.isnan(self.ColOff))
+        # Memory maps of packed time and data
+        offset = H['offset']
+        fileSize = os.path.getsize(filename)
         if FileID == FileFmtID_WithTime:
-            PackedTime = fread(fid, NT, 'int32')  #; % read the time data
-            cnt = len(PackedTime)
-            if cnt < NT:
-                raise Exception('Could not read entire %s file: read %d of %d time values' % (filename, cnt, NT))
-
-        if use_buffer:
-            # Reading data using buffers, and allowing an offset for time column (nOff=1)
-            if FileID == FileFmtID_NoCompressWithoutTime:
-                data = freadRowOrderTableBuffered(fid, nPts, 'float64', NumOutChans, nOff=1, type_out='float64')
-            else:
-                data = freadRowOrderTableBuffered(fid, nPts, 'int16', NumOutChans, nOff=1, type_out='float64')
+            if fileSize < offset + 4*NT:
+                raise Exception('Could not read entire %s file: file too small to contain %d time values' % (filename, NT))
+            self._packedTime = np.memmap(filename, dtype=np.int32, mode='r', offset=offset, shape=(NT,))
+            offset += 4*NT
+        else:
+            self._packedTime = None
+        dtype = np.float64 if FileID == FileFmtID_NoCompressWithoutTime else np.int16
+        nPts = NT * nChan
+        if fileSize < offset + np.dtype(dtype).itemsize*nPts:
+            raise Exception('Could not read entire %s file: file too small to contain %d values' % (filename, nPts))
+        if nPts>0:
+            self.packed = np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(NT, nChan))
         else:
-            # NOTE: unpacking huge data not possible on 32bit machines
-            if FileID == FileFmtID_NoCompressWithoutTime:
-                PackedData = fread(fid, nPts, 'float64')  #; % read the channel data
+            self.packed = np.zeros((NT, nChan), dtype=dtype)
+        self._time = None
+
+    @property
+    def shape(self):
+        """ Shape of the (unpacked) data, including the time column """
+        return (self.header['NT'], self.header['NumOutChans']+1)
+
+    @property
+    def time(self):
+        """ Time vector (computed once) """
+        if self._time is None:
+            H = self.header
+            if H['FileID'] == FileFmtID_WithTime:
+                self._time = (np.array(self._packedTime) - H['TimeOff']) / H['TimeScl']
             else:
-                PackedData = fread(fid, nPts, 'int16')  #; % read the channel data
+                self._time = H['TimeOut1'] + H['TimeIncr'] * np.arange(H['NT'])
+        return self._time
 
-            cnt = len(PackedData)
-            if cnt < nPts:
-                raise Exception('Could not read entire %s file: read %d of %d values' % (filename, cnt, nPts))
-            data = np.array(PackedData).reshape(NT, NumOutChans)
-            del PackedData
+    def column(self, iCol, iRows=None):
+        """ Return column iCol (0 is time) scaled to float64, for all rows, or the rows `iRows` (slice or indices)"""
+        return self.toArray(iCols=[iCol], iRows=iRows)[:,0]
 
-    if FileID == FileFmtID_WithTime:
-        time = (np.array(PackedTime) - TimeOff) / TimeScl;
-    else:
-        time = TimeOut1 + TimeIncr * np.arange(NT)
-
-    # -------------------------
-    #  Scale the packed binary to real data
-    # -------------------------
-    if use_buffer:
-        # Scaling Data
-        for iCol in range(NumOutChans):
-            if np.isnan(ColScl[iCol]) and np.isnan(ColOff[iCol]):
-                data[:,iCol+1] = 0 # probably due to a division by zero in Fortran
-            else:
-                data[:,iCol+1] = (data[:,iCol+1] - ColOff[iCol]) / ColScl[iCol]
-        # Adding time column
-        data[:,0] = time
-    else:
-        # NOTE: memory expensive due to time conversion, and concatenation
-        data = (data - ColOff) / ColScl
-        data = np.concatenate([time.reshape(NT, 1), data], 1)
-
-    info = {'name': os.path.splitext(os.path.basename(filename))[0],
-            'description': DescStr,
-            'fileID': FileID,
-            'attribute_names': ChanName,
-            'attribute_units': ChanUnit}
+    def toArray(self, iCols=None, iRows=None, blockSize=2**22):
+        """ 
+        Return the scaled data as a float64 array of shape nRows x nCols.
+        INPUTS:
+         - iCols: list of column indices (0 is time). If None, all columns.
+         - iRows: slice, boolean mask or array of row indices. If None, all rows.
+         - blockSize: approximate number of packed values scaled at once
+        """
+        nRowsTot, nColsTot = self.shape
+        iCols = np.arange(nColsTot) if iCols is None else np.asarray(iCols, dtype=int)
+        if iRows is None:
+            iRows = slice(None)
+        if isinstance(iRows, slice):
+            iRows = np.arange(nRowsTot)[iRows]
+        else:
+            iRows = np.asarray(iRows)
+            if iRows.dtype==bool:
+                iRows = np.where(iRows)[0]
+        bTime  = iCols==0
+        iChans = iCols[~bTime]-1 # Indices of channels in packed data
+        scl, off, bNaN = self.ColScl[iChans], self.ColOff[iChans], self.ColNaN[iChans]
+        data = np.empty((len(iRows), len(iCols)), dtype=np.float64)
+        if np.any(bTime):
+            data[:, bTime] = self.time[iRows][:,None]
+        if len(iChans)>0:
+            # Scaling by blocks of contiguous rows, to limit memory usage
+            nBlock = max(1, int(blockSize/self.shape[1]))
+            bContiguous = len(iRows)>0 and np.all(np.diff(iRows)==1)
+            jChans = np.where(~bTime)[0]
+            bAll = len(iChans)==nColsTot-1 and np.all(np.diff(iChans)==1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for i0 in range(0, len(iRows), nBlock):
+                    I = iRows[i0:i0+nBlock]
+                    if bContiguous:
+                        packed = self.packed[I[0]:I[-1]+1]
+                    else:
+                        packed = self.packed[I]
+                    if not bAll:
+                        packed = packed[:, iChans]
+                    data[i0:i0+nBlock, jChans] = (packed - off) / scl
+            if np.any(bNaN):
+                data[:, jChans[bNaN]] = 0 # probably due to a division by zero in Fortran
+        return data
+
+
+def load_binary_output(filename, use_buffer=True, iCols=None, iRows=None, channels=None, tmin=None, tmax=None):
+    """
+    Read an OpenFAST binary output file. The first column of the returned data is the time.
+
+    The packed data is memory mapped (see `BinaryOutputView`), and scaled by blocks, 
+    only for the columns `iCols` (0 is time) and rows `iRows` (slice, mask, or indices) if provided.
+    Alternatively, columns may be selected with `channels` (see `_channelIndices`), 
+    and rows with a time window `tmin`, `tmax`.
+    `use_buffer` is kept for backward compatibility, memory usage is now always limited to the output array.
+
+    03/09/15: Ported from ReadFASTbinary.m by Mads M Pedersen, DTU Wind
+    24/10/18: Low memory/buffered version by E. Branlard, NREL
+    18/01/19: New file format for exctended channels, by E. Branlard, NREL
+    """
+    view = BinaryOutputView(filename)
+    if channels is not None:
+        iCols = _channelIndices(view.info['attribute_names'], view.info['attribute_units'], channels)
+    if tmin is not None or tmax is not None:
+        iRows = _timeMask(view.time, tmin, tmax)
+    data = view.toArray(iCols=iCols, iRows=iRows)
+    info = view.info
+    if iCols is not None:
+        info['attribute_names'] = [info['attribute_names'][i] for i in iCols]
+        info['attribute_units'] = [info['attribute_units'][i] for i in iCols]
+    del view
     return data, info
 
 
@@ -0,0 +1,30 @@
+import unittest
+import os
+import numpy as np
+from welib.weio.fast_input_file import *
+
+MyDir=os.path.dirname(__file__)
+
+class Test(unittest.TestCase):
+
+    def test_polar_multitable_write(self):
+        # Content returned by toStringForWrite is the one written by write (label suffixes removed)
+        with open(os.path.join(MyDir, '../../../data/NREL5MW/5MW_Baseline/Airfoils/DU25_A17.dat')) as fid:
+            lines = fid.readlines()
+        lines[9] = lines[9].replace('1   NumTabs', '2   NumTabs')
+        filename = os.path.join(MyDir, '_polar2.dat')
+        with open(filename, 'w') as fid:
+            fid.write(''.join(lines + lines[10:]).rstrip()+'\n')
+        f = FASTInputFile(filename)
+        self.assertEqual(f['NumTabs'], 2)
+        content = f.toStringForWrite()
+        self.assertNotEqual(content, f.toString())
+        self.assertNotIn('Re_2', content)
+        f.write(filename)
+        with open(filename) as fid:
+            self.assertEqual(fid.read(), content)
+        self.assertEqual(FASTInputFile(filename)['NumAlf_2'], 140)
+        os.remove(filename)
+
+if __name__ == '__main__':
+    unittest.main()
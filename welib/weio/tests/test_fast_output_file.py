@@ -0,0 +1,55 @@
+import unittest
+import os
+import re
+import numpy as np
+from welib.weio.fast_output_file import *
+
+MyDir=os.path.dirname(__file__)
+
+class Test(unittest.TestCase):
+
+    def test_binary_view_rows(self):
+        # Rows and columns of the memory-mapped view, contiguous or not, vs the full data
+        filename = os.path.join(MyDir, '../../../data/example_files/fastout_allnodes.outb')
+        data, info = load_binary_output(filename)
+        v = BinaryOutputView(filename)
+        iCols = [0] + list(np.argsort(-np.std(data[:,1:], axis=0))[:3]+1) # time and varying channels
+        self.assertTrue(np.all(np.diff(data[50:54, iCols[1]])!=0))
+        for iRows in [slice(50,54), [50,52,51,53], [53,52,51,50], [51,52,53,54], [55,10,80]]:
+            np.testing.assert_array_equal(v.toArray(iCols=iCols, iRows=iRows), data[np.arange(len(data))[iRows]][:, iCols])
+        np.testing.assert_array_equal(v.toArray(iRows=[50,52,51,53], blockSize=1), data[[50,52,51,53]])
+
+    def test_binary_channels(self):
+        # Selection of channels (name, name with unit, regular expression) and time window from the memory map
+        filename = os.path.join(MyDir, '../../../data/example_files/fastout_allnodes.outb')
+        data, info = load_binary_output(filename)
+        names = info['attribute_names']
+        iCols = [0, names.index('RotSpeed'), names.index('BldPitch1')] + [i for i,n in enumerate(names) if re.fullmatch('RootM[xyz]c[1-3]', n)]
+        b = (data[:,0]>=2) & (data[:,0]<=5)
+        D, info2 = load_binary_output(filename, channels=['BldPitch1_[deg]', 'RootM[xyz]c[1-3]', 'RotSpeed'], tmin=2, tmax=5)
+        self.assertEqual(info2['attribute_names'], [names[i] for i in sorted(iCols)])
+        self.assertEqual(info2['attribute_units'], [info['attribute_units'][i] for i in sorted(iCols)])
+        np.testing.assert_array_equal(D, data[b][:, sorted(iCols)])
+        # Through FASTOutputFile
+        df = FASTOutputFile(filename, channels=['RotSpeed'], tmin=2).toDataFrame()
+        self.assertEqual(list(df.columns), ['Time_[s]', 'RotSpeed_[rpm]'])
+        np.testing.assert_array_equal(df.values, data[data[:,0]>=2][:, [0, names.index('RotSpeed')]])
+
+    def test_ascii_channels(self):
+        # Selection of channels and time window, read by blocks of rows
+        filename = os.path.join(MyDir, '_fastout.out')
+        time = np.arange(0, 10, 0.1)
+        data = np.column_stack((time, np.sin(time), np.cos(time), time**2))
+        with open(filename, 'w') as f:
+            f.write('Header line\n\nTime\tA\tB\tC\n(s)\t(m)\t(rad)\t(-)\n')
+            np.savetxt(f, data, fmt='%.8e', delimiter='\t')
+        D, info = load_ascii_output(filename)
+        np.testing.assert_allclose(D, data, rtol=1e-7)
+        D, info = load_ascii_output(filename, channels=['C', 'A'], tmin=2, tmax=5, nRowsPerBlock=7)
+        self.assertEqual(info['attribute_names'], ['Time', 'A', 'C'])
+        b = (time>=2) & (time<=5)
+        np.testing.assert_allclose(D, data[b][:,[0,1,3]], rtol=1e-7)
+        os.remove(filename)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,6 +76,32 @@ def Taero(WS, Pitch, Omega, R, rho, fCT):
     return T
 
 
+def single_roots(G, x, valid=None):
+    """ Roots of piecewise linear functions tabulated on a common grid, for many functions at once.
+
+    INPUTS:
+     - G: array n x m, values of the n functions at the m grid points
+     - x: array m, grid points
+     - valid: boolean array n x (m-1), intervals where roots are accepted (default: all)
+    OUTPUTS:
+     - x0: array n, root of each function, NaN if the function does not have exactly one root
+     - nRoots: array n, number of roots of each function
+    """
+    s = G>0
+    bCross = s[:,1:]!=s[:,:-1]
+    bCross &= ~(np.isnan(G[:,1:]) | np.isnan(G[:,:-1]))
+    if valid is not None:
+        bCross &= valid
+    nRoots = np.sum(bCross, axis=1)
+    x0 = np.full(G.shape[0], np.nan)
+    I  = np.where(nRoots==1)[0]
+    j  = np.argmax(bCross[I], axis=1)
+    g0 = G[I, j]
+    g1 = G[I, j+1]
+    x0[I] = x[j] + (x[j+1]-x[j]) * g0/(g0-g1)
+    return x0, nRoots
+
+
 class TabulatedWSEstimatorBase():
 
 
@@ -172,6 +198,7 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
         self.OmegaLow   = OmegaLow
         self.OmegaRated = OmegaRated
         self.OP     = None
+        self.invTable = None
         # Files
         self.operFile = operFile
         self.aeroMapFile = aeroMapFile
@@ -255,6 +282,74 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
         LambdaMid = self.Lambda[:-1] + np.diff(self.Lambda)/2
         Lambda = np.sort(np.concatenate((self.Lambda, LambdaMid)))
         self.LambdaHR = Lambda
+        # Inverse table needs to be recomputed
+        self.invTable = None
+
+    def computeInverseTable(self, nLambda=500, nPitchRefine=4):
+        """
+        Precompute a table to invert the torque for all time steps at once.
+        The torque is written with a dimensionless function of pitch and tip-speed ratio:
+            Q = 1/2 rho pi R^5 omega^2 g(pitch, lambda),    g = CP/lambda^3
+        g is tabulated on a refined (pitch, lambda) grid using the cubic interpolant of CP.
+        For a given Q, pitch and omega, the roots in lambda are found on the piecewise linear table.
+
+        INPUTS:
+         - nLambda: number of tip-speed ratios in the table
+         - nPitchRefine: number of pitch subdivisions between two pitch values of the aero map
+        """
+        Pitch  = np.asarray(self.Pitch).ravel()
+        Lambda = np.asarray(self.Lambda).ravel()
+        vPitch = np.concatenate([np.linspace(p0, p1, nPitchRefine+1)[:-1] for p0, p1 in zip(Pitch[:-1], Pitch[1:])] + [Pitch[-1:]])
+        vLambda = np.linspace(max(np.min(Lambda), 1e-3), np.max(Lambda), nLambda)
+        MP, ML = np.meshgrid(vPitch, vLambda, indexing='ij')
+        CP = self.fCP(MP, ML)
+        CP[CP<0] = 0
+        self.invTable = {'pitch':vPitch, 'lambda':vLambda, 'g':CP/ML**3}
+        return self.invTable
+
+    def estimateTable(self, Qa, pitch, omega, nMax=2**22):
+        """
+        Vectorized wind speed estimate using the inverse table (see computeInverseTable)
+
+        INPUTS:
+         - Qa: aerodynamic torque [Nm], array of length n
+         - pitch: pitch angle [deg], array of length n
+         - omega: rotational speed [rad/s], array of length n
+         - nMax: maximum number of elements of the temporary arrays (samples are processed by chunks)
+        OUTPUTS:
+         - WS: wind speed estimate [m/s], NaN if the table does not give a unique solution
+         - nRoots: number of solutions found in the table
+        """
+        if getattr(self, 'invTable', None) is None:
+            self.computeInverseTable()
+        vPitch  = self.invTable['pitch']
+        vLambda = self.invTable['lambda']
+        g       = self.invTable['g']
+        Qa    = np.atleast_1d(np.asarray(Qa, dtype=float)).ravel()
+        pitch = np.atleast_1d(np.asarray(pitch, dtype=float)).ravel()
+        omega = np.atleast_1d(np.asarray(omega, dtype=float)).ravel()
+        n = len(Qa)
+        WS     = np.full(n, np.nan)
+        nRoots = np.zeros(n, dtype=int)
+        bOK = omega>0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gStar = Qa/(1/2*self.rho*np.pi*self.R**5*omega**2)
+            LambdaMin = omega*self.R/self.WSmax
+        # Linear interpolation in pitch
+        p  = np.clip(pitch, vPitch[0], vPitch[-1])
+        ip = np.clip(np.searchsorted(vPitch, p, side='right')-1, 0, len(vPitch)-2)
+        wp = (p - vPitch[ip])/(vPitch[ip+1]-vPitch[ip])
+        nChunk = max(1, int(nMax/len(vLambda)))
+        for i0 in range(0, n, nChunk):
+            I = np.arange(i0, min(i0+nChunk, n))
+            I = I[bOK[I]]
+            if len(I)==0:
+                continue
+            G = (1-wp[I])[:,None]*g[ip[I]] + wp[I][:,None]*g[ip[I]+1] - gStar[I][:,None]
+            valid = vLambda[None,1:] >= LambdaMin[I][:,None] # WS<WSmax
+            Lambda0, nRoots[I] = single_roots(G, vLambda, valid=valid)
+            WS[I] = omega[I]*self.R/Lambda0
+        return WS, nRoots
 
     def Power(self,WS,Pitch,Omega):
         return Paero(WS, Pitch, Omega, self.R, self.rho, self.fCP)
@@ -289,6 +384,7 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
         NOTE: 
           - 'min'/ fCP : uses cubic interpolation
           - 'crossing': uses linear interpolation (but at higher res thanks)
+          - 'table': uses the inverse table (see estimateTable), 'min' is used as a fallback
         """
         info=None
         if debug:
@@ -321,6 +417,13 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
 #         if WSavg is not None:
 #             WS0=(WS0+WSavg)/2
         WS_est = WS0
+        if method=='table':
+            # Inverse table, with the optimizer as fallback if the solution is not unique or too far
+            WS_tab, nRoots = self.estimateTable(Qa, pitch, omega)
+            if nRoots[0]==1 and abs(WS_tab[0]-WS0)<=deltaWSMax and omega>=self.OmegaLow:
+                WS_est = WS_tab[0]
+            else:
+                method = 'min'
         if method.find('min')>=0:
             if omega<=0.1:
                 WS_est = WS0
@@ -503,7 +606,11 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
     def estimateTimeSeries(self, Qaero, Pitch, Omega, WS_prev=None, WS_ref=None, debug=False, **kwargs):
         """ 
         Perform wind speed estimation given a time series of aerodynamic torque, pitch and rotational speed
+        With method='table', the vectorized estimateTimeSeriesTable is used.
         """
+        if kwargs.get('method', None)=='table':
+            kwargs.pop('method')
+            return self.estimateTimeSeriesTable(Qaero, Pitch, Omega, WS_prev=WS_prev, **kwargs), None
         print('Estimating WS on time series...')
         WS_est = np.zeros(Omega.shape)
         if WS_prev is None:
@@ -526,6 +633,39 @@ class TabulatedWSEstimator(TabulatedWSEstimatorBase):
                         return WS_est, ts_info
         return WS_est, ts_info
 
+    def estimateTimeSeriesTable(self, Qaero, Pitch, Omega, WS_prev=None, relaxation=0, deltaWSMax=1, fallbackMethod='min', nMax=2**22, **kwargs):
+        """
+        Wind speed estimation on a time series, using the inverse table (see estimateTable).
+        The table is inverted for all samples at once, the time stepping then follows the sequential
+        estimator `estimate(method='table', relaxation=relaxation)`: the sequential estimator (`estimate` 
+        with `fallbackMethod`) is used for the samples where the table does not give a unique solution, 
+        where the estimate jumps by more than deltaWSMax compared to the previous (relaxed) estimate, 
+        or below OmegaLow.
+
+        INPUTS:
+         - Qaero: aerodynamic torque [Nm], array of length nt
+         - Pitch: pitch angle [deg], array of length nt
+         - Omega: rotational speed [rad/s], array of length nt
+         - WS_prev: wind speed guess for the first time step
+         - relaxation: relaxation factor, WS_i = relaxation WS_{i-1} + (1-relaxation) WS_est_i
+        OUTPUTS:
+         - WS_est: wind speed estimate [m/s], array of length nt
+        """
+        Qaero = np.asarray(Qaero, dtype=float).ravel()
+        Pitch = np.asarray(Pitch, dtype=float).ravel()
+        Omega = np.asarray(Omega, dtype=float).ravel()
+        if WS_prev is None:
+            WS_prev = 1
+        WS_tab, nRoots = self.estimateTable(Qaero, Pitch, Omega, nMax=nMax)
+        bTab = (nRoots==1) & (Omega>=self.OmegaLow)
+        WS_est = np.zeros(len(Qaero))
+        for i, (ws, b) in enumerate(zip(WS_tab.tolist(), bTab.tolist())):
+            if not b or abs(ws-WS_prev)>deltaWSMax:
+                ws, _ = self.estimate(Qaero[i], Pitch[i], Omega[i], WS_prev, relaxation=0, method=fallbackMethod, deltaWSMax=deltaWSMax, **kwargs)
+            WS_prev   = WS_prev*relaxation + (1-relaxation)*ws
+            WS_est[i] = WS_prev
+        return WS_est
+
     def estimateTimeSeriesFromOF(self, outFilename, tRange=None, **kwargs):
         """" 
          - tRange: tuple (tmin, tmax) to limit the time used
@@ -6,7 +6,7 @@ import scipy.interpolate as si
 from scipy.optimize import minimize_scalar
 
 
-from welib.ws_estimator.tabulated import TabulatedWSEstimatorBase
+from welib.ws_estimator.tabulated import TabulatedWSEstimatorBase, single_roots
 
 import welib.weio as weio
 from welib.weio.pickle_file import PickleFile
@@ -484,10 +484,86 @@ class TabulatedWSEstimatorFloating(TabulatedWSEstimatorBase):
 
 
 
+    def estimateTable(self, Qa, omega, pitch, phiy, nMax=2**22):
+        """
+        Vectorized wind speed estimate, inverting the torque table directly.
+        The torque is interpolated (multilinear, values clipped to the table bounds, see clip) at
+        all the wind speeds of the table, the roots are then found on the piecewise linear curves.
+
+        INPUTS:
+         - Qa: aerodynamic torque [Nm], array of length n
+         - omega: rotational speed [rad/s], array of length n
+         - pitch: pitch angle [deg], array of length n
+         - phiy: platform pitch angle [deg], array of length n
+         - nMax: maximum number of elements of the temporary arrays (samples are processed by chunks)
+        OUTPUTS:
+         - WS: wind speed estimate [m/s], NaN if the table does not give a unique solution
+         - nRoots: number of solutions found in the table
+        """
+        def gridWeights(x, v):
+            v = np.clip(v, x[0], x[-1])
+            if len(x)==1:
+                i = np.zeros(len(v), dtype=int)
+                return i, i, np.zeros(len(v))
+            i = np.clip(np.searchsorted(x, v, side='right')-1, 0, len(x)-2)
+            return i, i+1, (v-x[i])/(x[i+1]-x[i])
+        Qa    = np.atleast_1d(np.asarray(Qa, dtype=float)).ravel()
+        n     = len(Qa)
+        omega = np.broadcast_to(np.asarray(omega, dtype=float).ravel(), (n,))
+        pitch = np.broadcast_to(np.asarray(pitch, dtype=float).ravel(), (n,))
+        phiy  = np.broadcast_to(np.asarray(phiy , dtype=float).ravel(), (n,))
+        QT = np.moveaxis(self.Q, 0, -1) # nOmega x nPitch x nPhi x nWS
+        j0, j1, wj = gridWeights(self.omega, omega)
+        k0, k1, wk = gridWeights(self.pitch, pitch)
+        l0, l1, wl = gridWeights(self.phiy , phiy)
+        valid = self.WS[None,1:] <= self.WSmax
+        WS     = np.full(n, np.nan)
+        nRoots = np.zeros(n, dtype=int)
+        nChunk = max(1, int(nMax/len(self.WS)))
+        for i0 in range(0, n, nChunk):
+            I = np.arange(i0, min(i0+nChunk, n))
+            I = I[omega[I]>0]
+            if len(I)==0:
+                continue
+            G = -Qa[I][:,None]
+            for j, w1 in ((j0, 1-wj), (j1, wj)):
+                for k, w2 in ((k0, 1-wk), (k1, wk)):
+                    for l, w3 in ((l0, 1-wl), (l1, wl)):
+                        G = G + (w1[I]*w2[I]*w3[I])[:,None] * QT[j[I], k[I], l[I]]
+            WS[I], nRoots[I] = single_roots(G, self.WS, valid=valid)
+        return WS, nRoots
+
+    def estimateTimeSeriesTable(self, Qaero, omega, pitch, phiy, WS_prev=None, relaxation=0, deltaWSMax=1, fallbackMethod='crossing', nMax=2**22, **kwargs):
+        """
+        Wind speed estimation on a time series, using estimateTable for all samples at once.
+        The sequential estimator (`estimate` with `fallbackMethod`) is only used for the samples where
+        the table does not give a unique solution, or where the estimate jumps by more than deltaWSMax
+        compared to the previous (relaxed) estimate. The relaxation is applied at each time step, as in `estimate`.
+        See TabulatedWSEstimator.estimateTimeSeriesTable.
+        """
+        Qaero = np.asarray(Qaero, dtype=float).ravel()
+        omega = np.asarray(omega, dtype=float).ravel()
+        pitch = np.asarray(pitch, dtype=float).ravel()
+        phiy  = np.asarray(phiy , dtype=float).ravel()
+        if WS_prev is None:
+            WS_prev = 1
+        WS_tab, nRoots = self.estimateTable(Qaero, omega, pitch, phiy, nMax=nMax)
+        WS_est = np.zeros(len(Qaero))
+        for i, (ws, n) in enumerate(zip(WS_tab.tolist(), nRoots.tolist())):
+            if n!=1 or abs(ws-WS_prev)>deltaWSMax:
+                ws, _ = self.estimate(Qaero[i], omega[i], pitch[i], phiy[i], WS_prev, relaxation=0, method=fallbackMethod, deltaWSMax=deltaWSMax, **kwargs)
+            WS_prev   = WS_prev*relaxation + (1-relaxation)*ws
+            WS_est[i] = WS_prev
+        return WS_est
+
     def estimateTimeSeries(self, Qaero, omega, pitch, phiy, WS_prev=None, WS_ref=None, debug=False, time=None, **kwargs):
         """ 
         Perform wind speed estimation given a time series of aerodynamic torque, pitch and rotational speed
+        With method='table', the vectorized estimateTimeSeriesTable is used.
         """
+        if kwargs.get('method', None)=='table':
+            kwargs.pop('method')
+            return self.estimateTimeSeriesTable(Qaero, omega, pitch, phiy, WS_prev=WS_prev, **kwargs), None
         from welib.tools.tictoc import Timer
         WS_est = np.zeros(omega.shape)
         if WS_prev is None:
@@ -153,6 +153,30 @@ class Test(unittest.TestCase):
         #simpleTest(WSENoOper, pitch, omega, Qa, WS_guess, WS_ref, deltaWSMax=5, plot=plot)
 
 
+    def test_TimeSeriesTable(self):
+        # Vectorized estimation using the inverse table, compared to the optimizer
+        wse   = WSE
+        time  = np.linspace(0, 60, 300)
+        WS    = 11 + 3*np.sin(2*np.pi*time/60) + 0.5*np.sin(2*np.pi*time/7)
+        omega = np.interp(WS, wse.WS, wse.Omega)
+        pitch = np.interp(WS, wse.WS, wse.OP['Pitch_[deg]'])
+        Qa    = wse.Torque(WS, pitch, omega)
+        WS_tab, _ = wse.estimateTimeSeries(Qa, pitch, omega, WS_prev=WS[0], method='table')
+        WS_min, _ = wse.estimateTimeSeries(Qa[:50], pitch[:50], omega[:50], WS_prev=WS[0], method='min')
+        np.testing.assert_allclose(WS_tab, WS, atol=1e-2)
+        np.testing.assert_allclose(WS_tab[:50], WS_min, atol=1e-2)
+        # Single sample
+        WS_est, _ = wse.estimate(Qa[10], pitch[10], omega[10], WS[9], method='table')
+        np.testing.assert_almost_equal(WS_est, WS[10], 2)
+        # Relaxation, same as the sequential estimator, with a wind speed step larger than deltaWSMax
+        Qa = wse.Torque(WS+2*(time>30), pitch, omega)
+        WS_rel = wse.estimateTimeSeriesTable(Qa, pitch, omega, WS_prev=WS[0], relaxation=0.5)
+        WS_seq, ws = np.zeros(len(Qa)), WS[0]
+        for i in range(len(Qa)):
+            ws, _ = wse.estimate(Qa[i], pitch[i], omega[i], ws, relaxation=0.5, method='table')
+            WS_seq[i] = ws
+        np.testing.assert_allclose(WS_rel, WS_seq, rtol=1e-10)
+
     def test_TimeMethods(self):
         # Compare the computational time of the difference methods
         from timeit import timeit
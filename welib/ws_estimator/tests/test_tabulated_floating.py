@@ -0,0 +1,68 @@
+import unittest
+import os
+import numpy as np
+import pandas as pd
+from welib.ws_estimator.tabulated_floating import *
+
+scriptDir = os.path.dirname(__file__)
+
+def syntheticEstimator(R=60, rho=1.225):
+    """ Floating estimator with a synthetic CP table, function of the tip speed ratio, pitch and platform pitch """
+    WS    = np.arange(3, 26, 1.0)
+    rpm   = np.array([5, 8, 10, 12, 14])
+    pitch = np.array([0, 5, 10, 15])
+    phiy  = np.array([-5, 0, 5])
+    MWS, MRPM, MPitch, MPhi = np.meshgrid(WS, rpm, pitch, phiy, indexing='ij')
+    Lambda = MRPM*np.pi/30*R/MWS
+    CP = 0.5*np.clip(1-((Lambda-8)/8)**2, 0, None) * np.cos(MPhi*np.pi/180)**3 / (1+MPitch/10)
+    CT = 0.8*np.clip(Lambda/8, 0, 1.2)
+    wse = TabulatedWSEstimatorFloating(R=R, rho=rho)
+    # Operating conditions on a fine wind speed grid, used by the scalar estimator (WSHR)
+    vWS = np.linspace(WS[0], WS[-1], 1001)
+    OP = pd.DataFrame({'WS_[m/s]':vWS, 'Pitch_[deg]':vWS*0, 'RotSpeed_[rpm]':np.clip(8*vWS/R*30/np.pi, rpm[0], rpm[-1]), 'PhiY_[deg]':vWS*0})
+    wse._setOP(OP)
+    wse.setDB(WS, pitch, rpm, phiy, CP, CT)
+    return wse
+
+class Test(unittest.TestCase):
+
+    def test_table_vs_scalar(self):
+        # Vectorized inversion of the torque table vs the scalar estimator on a synthetic table
+        wse = syntheticEstimator()
+        np.random.seed(3)
+        n = 50
+        WS_ref = np.random.uniform(4, 12, n)
+        omega  = np.random.uniform(8, 14, n)*np.pi/30
+        pitch  = np.random.uniform(0, 15, n)
+        phiy   = np.random.uniform(-5, 5, n)
+        Qa     = wse.Torque(WS_ref, omega, pitch, phiy)
+
+        WS_tab, nRoots = wse.estimateTable(Qa, omega, pitch, phiy)
+        WS_sca = np.array([wse.estimate(Qa[i], omega[i], pitch[i], phiy[i], WS0=WS_ref[i], method='crossing')[0] for i in range(n)])
+
+        np.testing.assert_array_equal(nRoots, 1)
+        np.testing.assert_allclose(WS_tab, WS_ref, atol=1e-8)
+        np.testing.assert_allclose(WS_tab, WS_sca, atol=1e-2)
+
+        # Time series, the fallback is not triggered with a unique root
+        WS_ts, _ = wse.estimateTimeSeries(Qa, omega, pitch, phiy, WS_prev=WS_ref[0], method='table', deltaWSMax=10)
+        np.testing.assert_allclose(WS_ts, WS_tab)
+
+    def test_relaxation(self):
+        # Relaxation in the vectorized time series estimate, vs the scalar estimator
+        wse  = syntheticEstimator()
+        time = np.linspace(0, 60, 200)
+        WS_ref = 8 + 2*np.sin(2*np.pi*time/30) + 2*(time>30) # step larger than deltaWSMax
+        omega  = (10 + 2*np.sin(2*np.pi*time/40))*np.pi/30
+        pitch  = 5 + 3*np.sin(2*np.pi*time/20)
+        phiy   = 4*np.sin(2*np.pi*time/10)
+        Qa     = wse.Torque(WS_ref, omega, pitch, phiy)
+        WS_rel = wse.estimateTimeSeriesTable(Qa, omega, pitch, phiy, WS_prev=WS_ref[0], relaxation=0.5)
+        WS_seq, ws = np.zeros(len(Qa)), WS_ref[0]
+        for i in range(len(Qa)):
+            ws, _ = wse.estimate(Qa[i], omega[i], pitch[i], phiy[i], ws, relaxation=0.5, method='crossing')
+            WS_seq[i] = ws
+        np.testing.assert_allclose(WS_rel, WS_seq, atol=1e-2)
+
+if __name__ == '__main__':
+    unittest.main()